@@ -3,6 +3,22 @@ ASGI config for app404 project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The WSGI entry point (app404.wsgi) is still the default. Serve through this one
+when the async views matter: team13 routes / reverse-geocode / geocode /
+isochrone, team4 navigation routing and team5 nearest recommendations spend most
+of their time waiting on Neshan or IP geolocation, and under ASGI a worker keeps
+serving other requests meanwhile instead of blocking. Sync views keep working
+(Django runs them in a thread).
+
+    # development, one process
+    uvicorn app404.asgi:application --host 0.0.0.0 --port 8000
+
+    # production: gunicorn process management with uvicorn workers
+    gunicorn app404.asgi:application -k uvicorn_worker.UvicornWorker -b 0.0.0.0:8000 --workers 4
+
+In Docker set APP_SERVER=asgi (see Dockerfile). benchmarks/async_concurrency.py
+measures the difference per worker.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
@@ -14,3 +30,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app404.settings')
 
 application = get_asgi_application()
+
+# long-lived event loops: core.async_http keeps an httpx connection pool per loop
+from core import async_http  # noqa: E402
+
+async_http.ASGI = True
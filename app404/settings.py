@@ -17,6 +17,9 @@ ALLOWED_HOSTS = env.list("DJANGO_ALLOWED_HOSTS", default=["localhost", "127.0.0.
 
 TEAM_APPS = [s.strip() for s in env("TEAM_APPS", default="team1,team2,team3,team4,team5,team6,team7,team8,team9,team10,team11,team12,team13").split(",") if s.strip()]
 
+# Team apps whose urls/views are imported at boot instead of on first hit ("*" = all)
+TEAM_URLS_PRELOAD = env.list("TEAM_URLS_PRELOAD", default=[])
+
 INSTALLED_APPS = [
     "django.contrib.admin",
     "django.contrib.auth",
@@ -35,6 +38,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.RequestMetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -50,6 +54,13 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Per-request metrics at /api/metrics/ (core.middleware.RequestMetricsMiddleware);
+# 404 unless METRICS_ENABLED. METRICS_TOKEN, when set, must be sent as
+# "Authorization: Bearer <token>". Without it the endpoint is public: production
+# must set a token.
+METRICS_ENABLED = env.bool("METRICS_ENABLED", default=False)
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
+
 ROOT_URLCONF = "app404.urls"
 
 TEMPLATES = [
@@ -109,6 +120,12 @@ JWT_ALGORITHM = "HS256"
 JWT_ACCESS_TTL_SECONDS = env("JWT_ACCESS_TTL_SECONDS")
 JWT_REFRESH_TTL_SECONDS = env("JWT_REFRESH_TTL_SECONDS")
 
+# Resolved users for JWTAuthenticationMiddleware (see core/user_cache.py).
+# USER_CACHE_ALIAS names an entry in CACHES for the shared tier; empty disables it.
+USER_CACHE_TTL_SECONDS = env.int("USER_CACHE_TTL_SECONDS", default=30)
+USER_CACHE_MAX_ENTRIES = env.int("USER_CACHE_MAX_ENTRIES", default=2048)
+USER_CACHE_ALIAS = env("USER_CACHE_ALIAS", default="")
+
 JWT_COOKIE_SECURE = env.bool("JWT_COOKIE_SECURE", default=False)
 JWT_COOKIE_SAMESITE = env("JWT_COOKIE_SAMESITE", default="Lax")
 
@@ -130,7 +147,57 @@ CELERY_RESULT_BACKEND = env("CELERY_RESULT_BACKEND", default="")
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
+# Gemini calls get their own queue and workers so indexing never waits behind LLM latency or retries
+CELERY_TASK_ROUTES = {
+    "team2.tasks.tasks.tag_article": {"queue": "team2-llm"},
+    "team2.tasks.tasks.summarize_article": {"queue": "team2-llm"},
+    "team2.tasks.indexing.*": {"queue": "team2-index"},
+    "team2.tasks.tasks.enrich_article": {"queue": "team2-index"},
+}
 
 GEMINI_API_KEY = env("GEMINI_API_KEY", default=None)
 ELASTICSEARCH_URL = env("ELASTICSEARCH_URL", default="http://localhost:9200")
+# team2 bulk reindex: documents per _bulk request, and requests in flight
+TEAM2_INDEX_CHUNK_SIZE = env.int("TEAM2_INDEX_CHUNK_SIZE", default=500)
+TEAM2_INDEX_THREADS = env.int("TEAM2_INDEX_THREADS", default=2)
+# team2 incremental sync: re-read this much before the watermark, run this often (seconds)
+TEAM2_SEARCH_SYNC_OVERLAP_SECONDS = env.int("TEAM2_SEARCH_SYNC_OVERLAP_SECONDS", default=60)
+TEAM2_SEARCH_SYNC_INTERVAL = env.int("TEAM2_SEARCH_SYNC_INTERVAL", default=60)
+# team2 search result cache (team2.search_cache); the alias names a shared CACHES entry, empty disables that tier
+TEAM2_SEARCH_CACHE_TTL_SECONDS = env.int("TEAM2_SEARCH_CACHE_TTL_SECONDS", default=300)
+TEAM2_SEARCH_CACHE_MAX_ENTRIES = env.int("TEAM2_SEARCH_CACHE_MAX_ENTRIES", default=1024)
+TEAM2_SEARCH_CACHE_ALIAS = env("TEAM2_SEARCH_CACHE_ALIAS", default="")
+# team2 sharded vote counters (Article.sharded_score): shards per article, fold interval (seconds)
+TEAM2_VOTE_SHARDS = env.int("TEAM2_VOTE_SHARDS", default=8)
+TEAM2_VOTE_FOLD_INTERVAL = env.int("TEAM2_VOTE_FOLD_INTERVAL", default=30)
+# team2 tag_article prompt: existing tags offered to Gemini (team2.tag_index)
+TEAM2_TAG_SHORTLIST_SIZE = env.int("TEAM2_TAG_SHORTLIST_SIZE", default=30)
+# team2 Version content storage (team2.version_store): "full" or "delta" (line diffs against a base
+# version, a full snapshot at least every TEAM2_VERSION_MAX_CHAIN deltas), LRU of materialized texts
+TEAM2_VERSION_STORAGE = env("TEAM2_VERSION_STORAGE", default="full")
+TEAM2_VERSION_MAX_CHAIN = env.int("TEAM2_VERSION_MAX_CHAIN", default=10)
+TEAM2_VERSION_CACHE_SIZE = env.int("TEAM2_VERSION_CACHE_SIZE", default=512)
+# team2 Gemini quota shared by all workers (team2.rate_limit); a call that would wait longer than
+# the max wait is retried later. Repeated publishes within the coalesce window share one enrichment job.
+TEAM2_GEMINI_RATE_PER_MINUTE = env.float("TEAM2_GEMINI_RATE_PER_MINUTE", default=60)
+TEAM2_GEMINI_BURST = env.int("TEAM2_GEMINI_BURST", default=5)
+TEAM2_GEMINI_MAX_WAIT_SECONDS = env.float("TEAM2_GEMINI_MAX_WAIT_SECONDS", default=5)
+TEAM2_PUBLISH_COALESCE_SECONDS = env.int("TEAM2_PUBLISH_COALESCE_SECONDS", default=10)
+# team2 Gemini result cache (team2.llm_cache): a claim older than this is taken over
+TEAM2_LLM_CLAIM_SECONDS = env.int("TEAM2_LLM_CLAIM_SECONDS", default=120)
+# team4 in-memory region autocomplete (team4.region_index): memory budget (0 = always query the
+# database), how often other processes' rebuilds are noticed (seconds), results per search by default
+TEAM4_REGION_INDEX_MAX_MB = env.float("TEAM4_REGION_INDEX_MAX_MB", default=64)
+TEAM4_REGION_INDEX_CHECK_SECONDS = env.float("TEAM4_REGION_INDEX_CHECK_SECONDS", default=5)
+TEAM4_REGION_SEARCH_LIMIT = env.int("TEAM4_REGION_SEARCH_LIMIT", default=20)
+CELERY_BEAT_SCHEDULE = {
+    "team2-search-sync": {
+        "task": "team2.tasks.indexing.sync_search_index",
+        "schedule": TEAM2_SEARCH_SYNC_INTERVAL,
+    },
+    "team2-fold-vote-shards": {
+        "task": "team2.tasks.tasks.fold_vote_shards",
+        "schedule": TEAM2_VOTE_FOLD_INTERVAL,
+    },
+}
 TEAM2_FRONT_URL = env("TEAM2_FRONT_URL")
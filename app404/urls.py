@@ -17,6 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
+from core.lazy_urls import lazy_include, preload
 from core.web_views import home
 from core.web_auth_views import login_page, signup_page, logout_page
 
@@ -32,7 +33,11 @@ urlpatterns = [
 ]
 
 
+# Team URLconfs (and their heavy imports) load on the first request under their
+# prefix; TEAM_URLS_PRELOAD lists the ones to import at boot ("*" for all).
 for app in settings.TEAM_APPS:
-    urlpatterns.append(path(f"{app}/", include(f"{app}.urls")))
+    urlpatterns.append(lazy_include(f"{app}/", f"{app}.urls"))
+
+preload(urlpatterns, settings.TEAM_URLS_PRELOAD)
 
 
@@ -0,0 +1,6 @@
+"""
+Load tests for the app404 monolith.
+
+    python -m benchmarks                       per-team scenarios vs. baseline.json
+    python -m benchmarks.async_concurrency     WSGI vs. ASGI worker on Neshan-bound views
+"""
@@ -0,0 +1,133 @@
+"""
+Load test: requests per second one worker sustains on an endpoint that mostly
+waits on Neshan, served by the sync WSGI worker vs. the ASGI worker.
+
+    python -m benchmarks.async_concurrency [--requests 200] [--concurrency 50]
+        [--latency-ms 200] [--endpoint reverse|route|isochrone] [--modes wsgi asgi]
+
+A local stub stands in for api.neshan.org (NESHAN_API_BASE) and answers every
+call after --latency-ms. Each mode starts one worker of the real project:
+
+    wsgi   gunicorn app404.wsgi:application --workers 1       (one request at a time)
+    asgi   uvicorn app404.asgi:application --workers 1        (async views share one loop)
+
+Every request uses different coordinates, so core.http's response cache and
+coalescing never kick in: the numbers are pure concurrency per worker.
+"""
+import argparse
+import asyncio
+import sys
+import threading
+
+from benchmarks.harness import fire, free_port, start_server, stop_server, summarize
+
+# endpoint -> (path for request i, text that proves Neshan was really called)
+ENDPOINTS = {
+    "reverse": (
+        lambda i: f"/team13/reverse-geocode/?lat={35.6 + i * 1e-5:.6f}&lng=51.38",
+        '"formatted_address": "stub"',
+    ),
+    "route": (
+        lambda i: (
+            f"/team13/routes/?format=json&travel_mode=car&source_lat={35.6 + i * 1e-5:.6f}"
+            "&source_lng=51.38&dest_lat=35.75&dest_lng=51.41"
+        ),
+        '"eta_source": "neshan"',
+    ),
+    "isochrone": (
+        lambda i: f"/team13/isochrone/?lat={35.6 + i * 1e-5:.6f}&lng=51.38&time=10",
+        "FeatureCollection",
+    ),
+}
+
+_STUB_BODIES = {
+    "/v5/reverse": b'{"status": "OK", "formatted_address": "stub"}',
+    "/v4/direction": (
+        b'{"routes": [{"legs": [{"distance": {"value": 12000}, "duration": {"value": 900}}]}]}'
+    ),
+    "/v1/isochrone": b'{"type": "FeatureCollection", "features": []}',
+}
+
+
+def start_stub(port, latency):
+    """Keep-alive HTTP/1.1 stub on its own event loop thread; replies after `latency` seconds."""
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                path = head.split(b" ", 2)[1].split(b"?", 1)[0].decode()
+                await asyncio.sleep(latency)
+                body = _STUB_BODIES.get(path, b"{}")
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(asyncio.start_server(handle, "127.0.0.1", port, backlog=1024))
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+
+
+def run(modes, endpoint, total, concurrency, latency_ms):
+    stub_port = free_port()
+    start_stub(stub_port, latency_ms / 1000)
+    env = {"NESHAN_API_BASE": f"http://127.0.0.1:{stub_port}", "NESHAN_API_KEY_SERVICE": "bench"}
+    path, marker = ENDPOINTS[endpoint]
+
+    def build(i):
+        return "GET", path(i), None
+
+    def check(r):
+        return r.status_code == 200 and marker in r.text
+
+    rows = []
+    for mode in modes:
+        port = free_port()
+        proc = start_server(mode, port, env)
+        try:
+            base = f"http://127.0.0.1:{port}"
+            asyncio.run(fire(base, min(total, concurrency), concurrency, build, check))  # warm-up
+            result = asyncio.run(fire(base, total, concurrency, build, check))
+        finally:
+            stop_server(proc)
+        rows.append({"mode": mode, **summarize(*result)})
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=200, help="Stub Neshan response time.")
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="reverse")
+    parser.add_argument("--modes", nargs="+", choices=["wsgi", "asgi"], default=["wsgi", "asgi"])
+    args = parser.parse_args(argv)
+
+    rows = run(args.modes, args.endpoint, args.requests, args.concurrency, args.latency_ms)
+    print(f"{args.endpoint}: {args.requests} requests, {args.concurrency} concurrent, "
+          f"upstream {args.latency_ms:.0f} ms, 1 worker")
+    print(f"{'mode':<6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for r in rows:
+        print(f"{r['mode']:<6} {r['rps']:>8.1f} {r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} "
+              f"{r['p99_ms']:>8.0f} {r['errors']:>7}")
+    by_mode = {r["mode"]: r for r in rows}
+    if "wsgi" in by_mode and "asgi" in by_mode:
+        print(f"concurrency gained per worker: x{by_mode['asgi']['rps'] / by_mode['wsgi']['rps']:.1f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Latency of team4 facility proximity queries: the old full-table Python loop vs
+the indexed bounding-box prefilter (team4.services.spatial_service).
+
+    python -m benchmarks.facility_proximity [--facilities 100000] [--radius-km 5]
+        [--k 10] [--queries 50] [--legacy-queries 3] [--db URL]
+
+Facilities come from `generate_load_data` (points around Iranian cities, weighted
+by population); query points are drawn the same way. Reported per method, in ms
+(p50/p95), with the number of facilities each query returned:
+
+    legacy     load every active facility, calculate_distance_to() per row
+    radius     SpatialService.within_radius + hydrate of the first page (10)
+    k-nearest  SpatialService.k_nearest(k) + hydrate
+
+team4 runs on a throwaway SQLite file unless --db points it at another (empty)
+database.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.runner import database_env
+
+PAGE = 10
+
+
+def _legacy(lat, lng, radius_km):
+    from team4.fields import Point
+    from team4.models import Facility
+
+    center = Point(lng, lat)
+    out = []
+    for facility in Facility.objects.filter(status=True):
+        distance = facility.calculate_distance_to(center)
+        if distance is not None and distance <= radius_km:
+            out.append((facility, distance))
+    out.sort(key=lambda x: x[1])
+    return out
+
+
+def _radius(lat, lng, radius_km):
+    from team4.models import Facility
+    from team4.services.spatial_service import SpatialService
+
+    facilities = Facility.objects.filter(status=True)
+    hits = SpatialService.within_radius(facilities, lat, lng, radius_km)
+    SpatialService.hydrate(facilities, hits[:PAGE])
+    return hits
+
+
+def _k_nearest(lat, lng, k):
+    from team4.models import Facility
+    from team4.services.spatial_service import SpatialService
+
+    facilities = Facility.objects.filter(status=True)
+    return SpatialService.hydrate(facilities, SpatialService.k_nearest(facilities, lat, lng, k))
+
+
+def _time(fn, points):
+    ms, found = [], []
+    for lat, lng in points:
+        t0 = time.perf_counter()
+        found.append(len(fn(lat, lng)))
+        ms.append((time.perf_counter() - t0) * 1000)
+    return ms, found
+
+
+def _pct(values, p):
+    return statistics.quantiles(values, n=100)[p - 1] if len(values) > 1 else values[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--facilities", type=int, default=100_000)
+    parser.add_argument("--radius-km", type=float, default=5.0)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--legacy-queries", type=int, default=3, help="0 skips the (slow) full-scan method.")
+    parser.add_argument("--seed", type=int, default=1404)
+    parser.add_argument("--db", help="team4 database URL (default: a temporary SQLite file).")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="proximity-bench-") as tmp:
+        os.environ.update(database_env(Path(tmp), {"team4": args.db} if args.db else {}))
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app404.settings")
+        import django
+        from django.core.management import call_command
+
+        django.setup()
+        call_command("migrate", database="default", verbosity=0)
+        call_command("migrate", "team4", database="team4", verbosity=0)
+        t0 = time.perf_counter()
+        call_command("generate_load_data", scale=args.facilities, teams=["team4"], seed=args.seed, verbosity=0)
+        print(f"{args.facilities} facilities loaded in {time.perf_counter() - t0:.0f}s")
+
+        from core.load_data import CITIES, city_point
+
+        rng = random.Random(args.seed + 1)
+        weights = [c[6] for c in CITIES]
+        points = [city_point(rng, rng.choices(CITIES, weights)[0]) for _ in range(args.queries)]
+
+        methods = [
+            ("radius", lambda lat, lng: _radius(lat, lng, args.radius_km), points),
+            ("k-nearest", lambda lat, lng: _k_nearest(lat, lng, args.k), points),
+        ]
+        if args.legacy_queries:
+            methods.insert(0, ("legacy", lambda lat, lng: _legacy(lat, lng, args.radius_km),
+                               points[:args.legacy_queries]))
+
+        print(f"{'method':<10} {'queries':>7} {'p50 ms':>9} {'p95 ms':>9} {'found (mean)':>13}")
+        for name, fn, sample in methods:
+            ms, found = _time(fn, sample)
+            print(f"{name:<10} {len(sample):>7} {_pct(ms, 50):>9.2f} {_pct(ms, 95):>9.2f} "
+                  f"{statistics.mean(found):>13.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
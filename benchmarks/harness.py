@@ -0,0 +1,112 @@
+"""
+Pieces shared by the load tests: start one app server, drive it with a closed-loop
+async client, summarize latencies.
+"""
+import asyncio
+import math
+import os
+import socket
+import subprocess
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode, port, env=None, workers=1):
+    """
+    Run the project under gunicorn (mode "wsgi") or uvicorn ("asgi") on 127.0.0.1:port
+    and wait until /api/health/ answers. Returns the Popen; terminate() it when done.
+    """
+    env = {**os.environ, **(env or {})}
+    env.setdefault("DJANGO_SETTINGS_MODULE", "app404.settings")
+    bind = f"127.0.0.1:{port}"
+    if mode == "wsgi":
+        cmd = [
+            "gunicorn", "app404.wsgi:application", "-b", bind,
+            "--workers", str(workers), "--log-level", "warning",
+        ]
+    else:
+        cmd = [
+            "uvicorn", "app404.asgi:application", "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--no-access-log", "--log-level", "warning",
+        ]
+    # stdout carries the views' debug prints; server errors still reach stderr
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"{mode} server exited with {proc.returncode}")
+        try:
+            httpx.get(f"http://{bind}/api/health/", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit(f"{mode} server did not start")
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+async def fire(base, total, concurrency, build, check, headers=None):
+    """
+    Send `total` requests over `concurrency` keep-alive connections, each worker
+    starting its next request as soon as the previous one returns.
+
+    build(i) -> (method, path, json body or None); check(response) -> bool.
+    Returns (wall seconds, latencies in seconds, failed request count).
+    """
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    latencies, errors = [], 0
+    queue = iter(range(total))
+
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=120, headers=headers) as client:
+        async def worker():
+            nonlocal errors
+            for i in queue:
+                method, path, body = build(i)
+                t0 = time.perf_counter()
+                try:
+                    r = await client.request(method, path, json=body)
+                    if not check(r):
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - t0
+    return wall, latencies, errors
+
+
+def percentile(values, q):
+    """Nearest-rank percentile (q in 0..100) of a non-empty sequence."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summarize(wall, latencies, errors):
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / wall, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "errors": errors,
+    }
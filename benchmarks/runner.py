@@ -0,0 +1,227 @@
+"""
+Per-team load scenarios against a local server with seeded synthetic data,
+compared to the committed baseline.
+
+    python -m benchmarks [SCENARIO_OR_TEAM ...] [--requests 200] [--concurrency 8]
+        [--workers 2] [--mode wsgi|asgi] [--scale 2000] [--db ALIAS=URL ...]
+        [--team11-url URL] [--tolerance 0.3] [--update-baseline] [--json FILE]
+
+Every database alias is pointed at a fresh SQLite file in a temporary directory
+(--data-dir keeps and reuses it), migrated and seeded by benchmarks.seed; --db
+swaps one alias for another throwaway database, e.g. --db team4=mysql://... to
+run team4 on its production backend. The server is gunicorn (or uvicorn with
+--mode asgi) with DEBUG off. Scenarios whose backing service is missing (team2
+without Elasticsearch, team11 without --team11-url) are reported as skipped.
+
+Results are compared with benchmarks/baseline.json: the run fails (exit status 1)
+when a scenario has errors, its p50 or p95 latency grew by more than --tolerance,
+or its throughput dropped by more than --tolerance. Load settings not given on the
+command line are taken from the baseline so both runs have the same shape.
+--update-baseline rewrites the file from this run instead.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.harness import ROOT, fire, free_port, start_server, stop_server, summarize
+from benchmarks.scenarios import SCENARIOS
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULTS = {"requests": 200, "concurrency": 8, "warmup": 20, "workers": 2, "mode": "wsgi", "scale": 2000}
+METRICS = ("p50_ms", "p95_ms")
+
+
+def team_apps(env):
+    out = subprocess.run(
+        [sys.executable, "-c", "from django.conf import settings; print(','.join(settings.TEAM_APPS))"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return out.stdout.strip().split(",")
+
+
+def database_env(data_dir, overrides):
+    """DATABASE_URL / <TEAM>_DATABASE_URL for every alias, SQLite files under data_dir."""
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "app404.settings")}
+    urls = {"default": f"sqlite:///{data_dir / 'default.sqlite3'}"}
+    for app in team_apps(env):
+        urls[app] = f"sqlite:///{data_dir / (app + '.sqlite3')}"
+    urls.update(overrides)
+    out = {"DATABASE_URL": urls.pop("default")}
+    for alias, url in urls.items():
+        out[f"{alias.upper()}_DATABASE_URL"] = url
+    return out
+
+
+def prepare_data(data_dir, db_env, scale):
+    fixtures_path = data_dir / "fixtures.json"
+    if fixtures_path.exists():
+        fixtures = json.loads(fixtures_path.read_text(encoding="utf-8"))
+        if fixtures.get("scale") == scale:
+            return fixtures
+        raise SystemExit(f"{data_dir} was seeded at scale {fixtures.get('scale')}, not {scale}")
+    print(f"seeding scale {scale} into {data_dir} ...", flush=True)
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.seed", "--scale", str(scale), "--out", str(fixtures_path)],
+        cwd=ROOT, env={**os.environ, **db_env}, check=True,
+    )
+    return json.loads(fixtures_path.read_text(encoding="utf-8"))
+
+
+def skip_reason(scenario, fixtures, team11_url):
+    if scenario.server == "team11" and not team11_url:
+        return "no --team11-url"
+    missing = [name for name in scenario.requires if not fixtures["services"].get(name)]
+    return f"needs {', '.join(missing)}" if missing else None
+
+
+def run_scenario(scenario, base, fixtures, config):
+    headers = {"Authorization": f"Bearer {fixtures['access_token']}"} if scenario.auth else None
+
+    def build(i):
+        return scenario.build(i, fixtures)
+
+    def check(r):
+        return r.status_code in scenario.expect
+
+    if config["warmup"]:
+        asyncio.run(fire(base, config["warmup"], config["concurrency"], build, check, headers))
+    return summarize(*asyncio.run(fire(base, config["requests"], config["concurrency"], build, check, headers)))
+
+
+def compare(results, baseline, tolerance):
+    """Regression messages for `results` against the baseline scenarios."""
+    problems = []
+    for name, row in results.items():
+        if "skipped" in row:
+            continue
+        if row["errors"]:
+            problems.append(f"{name}: {row['errors']} of {row['requests']} requests failed")
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in METRICS:
+            limit = base[metric] * (1 + tolerance)
+            if row[metric] > limit:
+                problems.append(
+                    f"{name}: {metric} {row[metric]:.1f} > {limit:.1f} (baseline {base[metric]:.1f} +{tolerance:.0%})"
+                )
+        floor = base["rps"] * (1 - tolerance)
+        if row["rps"] < floor:
+            problems.append(
+                f"{name}: throughput {row['rps']:.1f} req/s < {floor:.1f} (baseline {base['rps']:.1f} -{tolerance:.0%})"
+            )
+    return problems
+
+
+def print_table(results, baseline):
+    w = max(len(n) for n in results)
+    print(f"{'scenario'.ljust(w)}  {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}  vs baseline")
+    for name, row in results.items():
+        if "skipped" in row:
+            print(f"{name.ljust(w)}  skipped ({row['skipped']})")
+            continue
+        base = baseline.get(name)
+        delta = "-"
+        if base:
+            delta = " ".join(
+                f"{label} {(row[key] / base[key] - 1):+.0%}"
+                for label, key in (("rps", "rps"), ("p50", "p50_ms"), ("p95", "p95_ms"))
+                if base[key]
+            )
+        print(f"{name.ljust(w)}  {row['rps']:>8.1f} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+              f"{row['p99_ms']:>8.1f} {row['errors']:>6}  {delta}")
+
+
+def select(patterns):
+    if not patterns:
+        return SCENARIOS
+    chosen = [s for s in SCENARIOS if any(s.name == p or s.name.startswith(p + ".") for p in patterns)]
+    if not chosen:
+        raise SystemExit(f"no scenario matches {' '.join(patterns)}; known: {', '.join(s.name for s in SCENARIOS)}")
+    return chosen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("scenarios", nargs="*", help="Scenario names or team prefixes (default: all).")
+    parser.add_argument("--requests", type=int, help="Measured requests per scenario.")
+    parser.add_argument("--concurrency", type=int, help="Concurrent connections.")
+    parser.add_argument("--warmup", type=int, help="Unmeasured requests sent first.")
+    parser.add_argument("--workers", type=int, help="Server worker processes.")
+    parser.add_argument("--mode", choices=["wsgi", "asgi"])
+    parser.add_argument("--scale", type=int, help="Data scale (manage.py generate_load_data --scale).")
+    parser.add_argument("--db", action="append", default=[], metavar="ALIAS=URL",
+                        help="Use this (throwaway) database for an alias instead of SQLite.")
+    parser.add_argument("--data-dir", type=Path, help="Keep the seeded databases here and reuse them.")
+    parser.add_argument("--team11-url", help="Base URL of a running team11 tripPlanService.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--json", type=Path, help="Also write this run's results here.")
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.exists() else {}
+    config = {**DEFAULTS, **baseline.get("config", {})}
+    for key in DEFAULTS:
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+    if baseline and not args.update_baseline and config != {**DEFAULTS, **baseline.get("config", {})}:
+        print(f"warning: load settings differ from the baseline's {baseline['config']}", file=sys.stderr)
+
+    overrides = dict(item.split("=", 1) for item in args.db)
+    data_dir = args.data_dir or Path(tempfile.mkdtemp(prefix="app404-bench-"))
+    data_dir.mkdir(parents=True, exist_ok=True)
+    results = {}
+    try:
+        db_env = database_env(data_dir.resolve(), overrides)
+        fixtures = prepare_data(data_dir, db_env, config["scale"])
+        port = free_port()
+        proc = start_server(config["mode"], port, {**db_env, "DEBUG": "False"}, workers=config["workers"])
+        try:
+            for scenario in select(args.scenarios):
+                reason = skip_reason(scenario, fixtures, args.team11_url)
+                if reason:
+                    results[scenario.name] = {"skipped": reason}
+                    continue
+                base = args.team11_url.rstrip("/") if scenario.server == "team11" else f"http://127.0.0.1:{port}"
+                print(f"running {scenario.name} ...", flush=True)
+                results[scenario.name] = run_scenario(scenario, base, fixtures, config)
+        finally:
+            stop_server(proc)
+    finally:
+        if not args.data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    base_scenarios = baseline.get("scenarios", {})
+    print_table(results, base_scenarios)
+    measured = {name: row for name, row in results.items() if "skipped" not in row}
+    if args.json:
+        args.json.write_text(json.dumps({"config": config, "scenarios": results}, indent=2) + "\n")
+
+    problems = compare(results, {} if args.update_baseline else base_scenarios, args.tolerance)
+    if args.update_baseline:
+        if problems:
+            print("not updating the baseline:\n  " + "\n  ".join(problems), file=sys.stderr)
+            return 1
+        args.baseline.write_text(json.dumps({
+            "config": config,
+            "machine": {"cpus": os.cpu_count(), "python": platform.python_version(), "platform": sys.platform},
+            "scenarios": {**base_scenarios, **measured},
+        }, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    for name in base_scenarios:
+        if name not in measured and (not args.scenarios or name in results):
+            print(f"warning: {name} is in the baseline but was not measured", file=sys.stderr)
+    if problems:
+        print("\nPERFORMANCE REGRESSION\n  " + "\n  ".join(problems), file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,92 @@
+"""
+Scripted requests against each team's hot endpoints.
+
+Each scenario turns a request number and the seed fixtures (benchmarks.seed) into
+one HTTP request. Request i varies coordinates / queries with i so caches see a
+realistic spread instead of one repeated key, and is identical from run to run.
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    build: Callable  # (i, fixtures) -> (method, path, json body or None)
+    expect: tuple = (200,)
+    auth: bool = False  # send the seeded user's access token
+    requires: tuple = ()  # fixtures["services"] keys that must be true
+    server: str = "app"  # "team11": the separate tripPlanService (--team11-url)
+
+
+def _point(i, fx, spread_km=10):
+    city = fx["cities"][i % len(fx["cities"])]
+    step = ((i * 7919) % 200 - 100) / 100 * spread_km / 111.0
+    return city["lat"] + step, city["lng"] - step
+
+
+def _future(days):
+    return (date.today() + timedelta(days=days)).isoformat()
+
+
+def _team4_nearby(i, fx):
+    lat, lng = _point(i, fx)
+    return "GET", f"/team4/api/facilities/nearby/?lat={lat:.5f}&lng={lng:.5f}&radius=5000", None
+
+
+def _team4_search(i, fx):
+    city = fx["cities"][i % len(fx["cities"])]["name_en"]
+    return "POST", "/team4/api/facilities/search/", {"city": city, "category": fx["team4"]["category"]}
+
+
+def _team13_places_in_radius(i, fx):
+    lat, lng = _point(i, fx)
+    return "GET", f"/team13/places-in-radius/?lat={lat:.5f}&lng={lng:.5f}&radius_km=5", None
+
+
+def _team5_personalized(i, fx):
+    return "GET", f"/team5/api/recommendations/personalized/?userId={fx['user_id']}&limit=20", None
+
+
+def _team5_popular(i, fx):
+    return "GET", "/team5/api/recommendations/popular/?limit=20", None
+
+
+def _team2_search(i, fx):
+    tags = fx["tags"]
+    return "GET", f"/team2/api/articles/search/?q={tags[i % len(tags)]}+{tags[(i * 3) % len(tags)]}", None
+
+
+def _team10_create_trip(i, fx):
+    start = 7 + i % 30
+    return "POST", "/team10/api/trips/", {
+        "destination": "tehran",
+        "start_date": _future(start),
+        "end_date": _future(start + 1 + i % 3),
+        "budget_level": ("ECONOMY", "MODERATE", "LUXURY")[i % 3],
+    }
+
+
+def _team11_generate_trip(i, fx):
+    start = 7 + i % 30
+    return "POST", "/api/trips/generate/", {
+        "province": fx["cities"][i % len(fx["cities"])]["name_fa"],
+        "start_date": _future(start),
+        "end_date": _future(start + 2),
+        "budget_level": "MEDIUM",
+    }
+
+
+SCENARIOS = [
+    Scenario("team4.facilities_nearby", _team4_nearby),
+    Scenario("team4.facilities_search", _team4_search),
+    Scenario("team13.places_in_radius", _team13_places_in_radius),
+    Scenario("team5.recommendations_personalized", _team5_personalized),
+    Scenario("team5.recommendations_popular", _team5_popular),
+    Scenario("team2.search_articles", _team2_search, requires=("elasticsearch",)),
+    Scenario("team10.create_trip", _team10_create_trip, expect=(201,), auth=True),
+    Scenario("team11.generate_trip", _team11_generate_trip, expect=(200, 201), auth=True, server="team11"),
+]
+
+BY_NAME = {s.name: s for s in SCENARIOS}
@@ -0,0 +1,79 @@
+"""
+Create every database and fill it with deterministic synthetic data for the load tests.
+
+    DATABASE_URL=... TEAM4_DATABASE_URL=... python -m benchmarks.seed --scale 2000 --out fixtures.json
+
+Meant to run against throwaway databases (benchmarks.runner points every alias at a
+temporary directory). The data comes from `manage.py generate_load_data --scale`.
+Writes what the scenarios
+need to address the data (ids, names, an access token, which optional services
+answered) to --out as JSON.
+"""
+import argparse
+import json
+import os
+import sys
+
+
+def migrate():
+    from django.conf import settings
+    from django.core.management import call_command
+
+    for alias in settings.DATABASES:
+        call_command("migrate", database=alias, verbosity=0, interactive=False)
+
+
+def _index_articles():
+    """Push the articles into Elasticsearch when it is reachable; the search scenario needs it."""
+    try:
+        from team2.tasks.indexing import INDEX_NAME, _get_es, index_all_articles
+
+        es = _get_es()
+        if not es.ping():
+            return False
+        index_all_articles()
+        es.indices.refresh(index=INDEX_NAME)
+        return True
+    except Exception:
+        return False
+
+
+def seed(scale, seed_value=1404):
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+
+    from core.jwt_utils import create_access_token
+    from core.load_data import CATEGORIES, CITIES, TAGS
+
+    migrate()
+    call_command("generate_load_data", scale=scale, seed=seed_value, verbosity=0)
+    user = get_user_model().objects.get(email="user0@load.example.com")
+    return {
+        "scale": scale,
+        "user_id": str(user.id),
+        "access_token": create_access_token(user),
+        "cities": [{"name_fa": c[0], "name_en": c[1], "lat": c[4], "lng": c[5]} for c in CITIES[:8]],
+        "team4": {"city": CITIES[0][1], "category": CATEGORIES[0][1]},
+        "tags": [fa for _, fa in TAGS],
+        "services": {"elasticsearch": _index_articles()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed synthetic load-test data.")
+    parser.add_argument("--scale", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1404)
+    parser.add_argument("--out", required=True, help="Where to write the fixture summary (JSON).")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app404.settings")
+    import django
+
+    django.setup()
+    fixtures = seed(args.scale, args.seed)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(fixtures, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Storage and read-latency benchmark for team2 Version content, full vs delta
+storage (team2.version_store).
+
+    python -m benchmarks.version_storage [--articles 20] [--versions 30]
+        [--lines 200] [--edits 3] [--reads 500] [--db URL]
+
+Each article gets --versions versions the way editors make them: copy the
+latest version (create_version_from_version), then change --edits lines of it.
+Reported per mode:
+
+    stored_kb     UTF-8 size of Version.content + Version.delta
+    cold/warm     get_version's work (fetch the row, serialize it) in ms, p50/p95,
+                  with an empty materialized-text cache and after a first pass
+
+team2 runs on a throwaway SQLite file unless --db points it at another (empty)
+database.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from benchmarks.runner import database_env
+
+MODES = ("full", "delta")
+
+
+def _fill(mode, args, rng):
+    from django.test import override_settings
+    from team2 import version_store
+    from team2.models import Article, Version
+
+    from core.load_data import persian_text
+
+    names = []
+    with override_settings(TEAM2_VERSION_STORAGE=mode):
+        for a in range(args.articles):
+            article = Article.objects.create(name=f"{mode}-{a}", creator_id=uuid.uuid4())
+            lines = [persian_text(rng, rng.randint(8, 25)) + "\n" for _ in range(args.lines)]
+            previous = None
+            for v in range(args.versions):
+                for _ in range(args.edits if previous else 0):
+                    lines[rng.randrange(len(lines))] = persian_text(rng, rng.randint(8, 25)) + "\n"
+                version = Version(name=f"{mode}-{a}-v{v}", article=article, editor_id=article.creator_id)
+                if previous is not None:
+                    version_store.assign(version, previous.text, base=previous)  # the copy...
+                    version.save()
+                version.text = "".join(lines)  # ...then the edit
+                version.save()
+                names.append(version.name)
+                previous = version
+            article.current_version = previous
+            article.save()
+    return names
+
+
+def _read_ms(names):
+    from team2.models import Version
+    from team2.serializers import VersionSerializer
+
+    out = []
+    for name in names:
+        t0 = time.perf_counter()
+        VersionSerializer(Version.objects.get(name=name)).data
+        out.append((time.perf_counter() - t0) * 1000)
+    return out
+
+
+def _pct(values, p):
+    return statistics.quantiles(values, n=100)[p - 1] if len(values) > 1 else values[0]
+
+
+def run(mode, args):
+    from team2 import version_store
+    from team2.models import Version
+
+    rng = random.Random(args.seed)
+    names = _fill(mode, args, rng)
+    rows = Version.objects.filter(name__in=names)
+    stored = sum(len(c.encode()) + len(d.encode()) for c, d in rows.values_list("content", "delta").iterator())
+    sample = [rng.choice(names) for _ in range(args.reads)]
+
+    version_store.clear()
+    cold = _read_ms(sample)
+    warm = _read_ms(sample)
+    return {
+        "mode": mode, "versions": len(names), "stored_kb": stored / 1024,
+        "cold_p50": _pct(cold, 50), "cold_p95": _pct(cold, 95),
+        "warm_p50": _pct(warm, 50), "warm_p95": _pct(warm, 95),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--articles", type=int, default=20)
+    parser.add_argument("--versions", type=int, default=30, help="Versions per article.")
+    parser.add_argument("--lines", type=int, default=200, help="Lines (paragraphs) per article text.")
+    parser.add_argument("--edits", type=int, default=3, help="Lines changed per version.")
+    parser.add_argument("--reads", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1404)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--db", help="team2 database URL (default: a temporary SQLite file).")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="version-bench-") as tmp:
+        os.environ.update(database_env(Path(tmp), {"team2": args.db} if args.db else {}))
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app404.settings")
+        import django
+        from django.core.management import call_command
+
+        django.setup()
+        call_command("migrate", "team2", database="team2", verbosity=0)
+
+        results = [run(mode, args) for mode in args.modes]
+        print(f"{'mode':<6} {'versions':>8} {'stored_kb':>10} {'cold p50/p95 ms':>17} {'warm p50/p95 ms':>17}")
+        for r in results:
+            print(f"{r['mode']:<6} {r['versions']:>8} {r['stored_kb']:>10.0f} "
+                  f"{r['cold_p50']:>8.2f}/{r['cold_p95']:<8.2f} {r['warm_p50']:>8.2f}/{r['warm_p95']:<8.2f}")
+        if len(results) == 2:
+            print(f"delta stores {1 - results[1]['stored_kb'] / results[0]['stored_kb']:.0%} less")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Contention benchmark: many voters voting on one article at the same time.
+
+    python -m benchmarks.vote_contention [--voters 16] [--votes 50]
+        [--modes legacy direct sharded] [--db URL]
+
+Every voter is a thread with its own database connection casting --votes
+upvotes as distinct users, so the final score must be voters * votes. Modes:
+
+    legacy   the old vote view: read the article, score += 1, save() the whole row
+    direct   team2.votes.cast_vote: UPDATE ... SET score = score + 1
+    sharded  cast_vote on an article with sharded_score, folded once at the end
+
+team2 runs on a throwaway SQLite file unless --db points it at another (empty)
+database, e.g. --db mysql://user:pw@127.0.0.1/team2_bench; SQLite serializes
+writers, so lock timeouts are retried and reported as `retries`. Lost updates
+are expected score minus the score actually stored.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from benchmarks.runner import database_env
+
+MODES = ("legacy", "direct", "sharded")
+
+
+def _legacy_vote(article_name, user_id, value):
+    from django.db import transaction
+    from team2.models import Article, Vote
+
+    article = Article.objects.get(name=article_name)
+    with transaction.atomic():
+        if Vote.objects.filter(user_id=user_id, article=article).first() is None:
+            Vote.objects.create(user_id=user_id, article=article, value=value)
+            article.score += value
+        article.save()
+
+
+def _direct_vote(article_name, user_id, value):
+    from team2 import votes
+    from team2.models import Article
+
+    votes.cast_vote(Article.objects.get(name=article_name), user_id, value)
+
+
+def run(mode, voters, per_voter):
+    from django.db import OperationalError, connections
+    from team2 import votes
+    from team2.models import Article
+
+    name = f"bench-{mode}-{uuid.uuid4().hex[:8]}"
+    Article.objects.create(name=name, creator_id=uuid.uuid4(), sharded_score=mode == "sharded")
+    vote = _legacy_vote if mode == "legacy" else _direct_vote
+    retries = [0] * voters
+    start = threading.Barrier(voters + 1)
+
+    def voter(i):
+        start.wait()
+        try:
+            for _ in range(per_voter):
+                user_id = uuid.uuid4()
+                while True:
+                    try:
+                        vote(name, user_id, 1)
+                        break
+                    except OperationalError:  # SQLite: database is locked
+                        retries[i] += 1
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=voter, args=(i,)) for i in range(voters)]
+    for t in threads:
+        t.start()
+    start.wait()
+    t0 = time.perf_counter()
+    for t in threads:
+        t.join()
+    seconds = time.perf_counter() - t0
+    if mode == "sharded":
+        votes.fold_score_shards()
+
+    expected = voters * per_voter
+    score = Article.objects.get(name=name).score
+    return {
+        "mode": mode, "votes": expected, "seconds": round(seconds, 3),
+        "votes_per_s": round(expected / seconds, 1), "score": score,
+        "lost_updates": expected - score, "retries": sum(retries),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--voters", type=int, default=16)
+    parser.add_argument("--votes", type=int, default=50, help="Votes per voter.")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--db", help="team2 database URL (default: a temporary SQLite file).")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="vote-bench-") as tmp:
+        overrides = {"team2": args.db} if args.db else {}
+        os.environ.update(database_env(Path(tmp), overrides))
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app404.settings")
+        import django
+        from django.core.management import call_command
+
+        django.setup()
+        call_command("migrate", "team2", database="team2", verbosity=0)
+
+        print(f"{'mode':<8} {'votes':>6} {'votes/s':>9} {'score':>6} {'lost':>5} {'retries':>8}")
+        for mode in args.modes:
+            r = run(mode, args.voters, args.votes)
+            print(f"{r['mode']:<8} {r['votes']:>6} {r['votes_per_s']:>9} {r['score']:>6} "
+                  f"{r['lost_updates']:>5} {r['retries']:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
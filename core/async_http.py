@@ -0,0 +1,183 @@
+"""
+Async counterpart of core.http for the async views.
+
+    from core.async_http import client
+
+    r = await client.get(url, params=..., headers=..., timeout=10, cache_ttl=60)
+
+Same timeouts, deadline, retry/backoff, circuit breaker, response cache and
+coalescing rules as core.http.client. Responses are httpx.Response objects;
+failures raise httpx.HTTPError subclasses (CircuitOpenError included).
+
+Under app404.asgi (ASGI = True) calls go through httpx.AsyncClient, one per
+event loop, which under uvicorn lives as long as the worker. Under WSGI Django
+runs every async view in an event loop of its own, so a client per loop would
+never reuse a connection: there the calls are sent by a pooled core.http
+client in a worker thread, and its response / errors are converted to httpx.
+"""
+import asyncio
+import copy
+import time
+import weakref
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+
+from core import metrics
+from core.http import BaseHttpClient, HttpClient, _cap_timeout
+from core.http import CircuitOpenError as _SyncCircuitOpenError
+from core.http import client as _sync_client
+
+# set by app404.asgi: event loops live as long as the worker process
+ASGI = False
+
+
+class CircuitOpenError(httpx.TransportError):
+    """The target host failed repeatedly and is being skipped for a while."""
+
+
+def _httpx_timeout(timeout):
+    """requests-style timeout (seconds or (connect, read)) as an httpx.Timeout."""
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+def _httpx_response(method, response):
+    """A requests.Response as an httpx.Response. Its body is already decoded."""
+    headers = [(k, v) for k, v in response.headers.items()
+               if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")]
+    return httpx.Response(response.status_code, headers=headers, content=response.content,
+                          request=httpx.Request(method, response.url))
+
+
+class AsyncHttpClient(BaseHttpClient):
+    def __init__(self, max_connections=100, max_keepalive_connections=20, sync=None, **options):
+        super().__init__(**options)
+        # the pooled client that sends the calls under WSGI
+        self.sync = HttpClient(**options) if sync is None else sync
+        self.limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_keepalive_connections
+        )
+        self._clients = weakref.WeakKeyDictionary()  # event loop -> httpx.AsyncClient
+
+    def _client(self):
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._clients[loop] = httpx.AsyncClient(limits=self.limits)
+        return client
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def request(self, method, url, *, params=None, headers=None, timeout=None,
+                      deadline=None, retries=None, cache_ttl=None, **kwargs):
+        """Same extra arguments as core.http.HttpClient.request()."""
+        method = method.upper()
+        if not ASGI:
+            return await self._send_sync(method, url, params=params, headers=headers, timeout=timeout,
+                                         deadline=deadline, retries=retries, cache_ttl=cache_ttl, **kwargs)
+        if params:
+            # requests drops None-valued params, httpx would send them empty
+            items = params.items() if hasattr(params, "items") else params
+            params = [(k, v) for k, v in items if v is not None]
+        if not cache_ttl or "json" in kwargs or "data" in kwargs or "content" in kwargs or "files" in kwargs:
+            return await self._send(method, url, params, headers, timeout, deadline, retries, kwargs)
+
+        key = self._cache_key(method, url, params, headers)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        # coalescing is per event loop: futures cannot be awaited from another loop
+        flight_key = (id(asyncio.get_running_loop()), key)
+        flight = self._flights.get(flight_key)
+        if flight is not None:
+            with self._lock:
+                self._stats["coalesced"] += 1
+            return copy.copy(await asyncio.shield(flight))
+
+        flight = self._flights[flight_key] = asyncio.get_running_loop().create_future()
+        try:
+            response = await self._send(method, url, params, headers, timeout, deadline, retries, kwargs)
+            if 200 <= response.status_code < 300:
+                self._cache_set(key, response, cache_ttl)
+            flight.set_result(response)
+            return response
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as exc:
+            flight.set_exception(exc)
+            # nobody may be waiting; don't log "exception was never retrieved"
+            flight.exception()
+            raise
+        finally:
+            self._flights.pop(flight_key, None)
+
+    async def _send_sync(self, method, url, **kwargs):
+        try:
+            response = await sync_to_async(self.sync.request, thread_sensitive=False)(method, url, **kwargs)
+        except _SyncCircuitOpenError as exc:
+            raise CircuitOpenError(str(exc)) from exc
+        except requests.Timeout as exc:
+            raise httpx.TimeoutException(str(exc)) from exc
+        except requests.ConnectionError as exc:
+            raise httpx.ConnectError(str(exc)) from exc
+        except requests.RequestException as exc:
+            raise httpx.TransportError(str(exc)) from exc
+        return _httpx_response(method, response)
+
+    async def _send(self, method, url, params, headers, timeout, deadline, retries, kwargs):
+        retries = self._retries_for(method, retries)
+        timeout = self.timeout if timeout is None else timeout
+        circuit = self._circuit(url)
+        stop_at = None if deadline is None else time.monotonic() + deadline
+        client = self._client()
+
+        attempt = 0
+        while True:
+            call_timeout = timeout
+            if stop_at is not None:
+                remaining = stop_at - time.monotonic()
+                if remaining <= 0:
+                    raise httpx.TimeoutException(f"deadline of {deadline}s exceeded for {url}")
+                call_timeout = _cap_timeout(timeout, remaining)
+            if not circuit.allow():
+                with self._lock:
+                    self._stats["short_circuited"] += 1
+                raise CircuitOpenError(f"circuit open for {self._host(url)}")
+
+            t0 = time.perf_counter()
+            try:
+                response = await client.request(
+                    method, url, params=params, headers=headers, timeout=_httpx_timeout(call_timeout), **kwargs
+                )
+            except httpx.TransportError:
+                metrics.record_outbound(url, time.perf_counter() - t0, ok=False)
+                circuit.record(False)
+                if attempt >= retries:
+                    raise
+            else:
+                metrics.record_outbound(url, time.perf_counter() - t0, ok=response.status_code < 500)
+                failed = response.status_code >= 500 or response.status_code == 429
+                circuit.record(not failed)
+                if response.status_code not in self.retry_statuses or attempt >= retries:
+                    return response
+
+            pause = self._sleep_for(attempt)
+            if stop_at is not None:
+                pause = min(pause, max(0.0, stop_at - time.monotonic()))
+            await asyncio.sleep(pause)
+            attempt += 1
+            with self._lock:
+                self._stats["retries"] += 1
+
+
+client = AsyncHttpClient(sync=_sync_client)
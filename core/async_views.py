@@ -0,0 +1,39 @@
+"""
+Helpers for `async def` views.
+
+Django 4.2's require_GET / require_http_methods wrap the view in a plain function,
+which turns an async view back into a sync one (and returns an un-awaited
+coroutine). Use these instead on async views. The ORM and the lazy request.user
+are sync-only: resolve them through sync_to_async (see `is_authenticated`).
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotAllowed
+from django.utils.log import log_response
+
+
+def require_http_methods(methods):
+    def decorator(view_func):
+        @wraps(view_func)
+        async def inner(request, *args, **kwargs):
+            if request.method not in methods:
+                response = HttpResponseNotAllowed(methods)
+                log_response(
+                    "Method Not Allowed (%s): %s", request.method, request.path,
+                    response=response, request=request,
+                )
+                return response
+            return await view_func(request, *args, **kwargs)
+        return inner
+    return decorator
+
+
+require_GET = require_http_methods(["GET"])
+require_POST = require_http_methods(["POST"])
+
+
+@sync_to_async
+def is_authenticated(request):
+    """`await is_authenticated(request)`: the lazy request.user may hit the DB on first access."""
+    return bool(getattr(request.user, "is_authenticated", False))
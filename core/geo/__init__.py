@@ -0,0 +1,31 @@
+"""
+Shared geo helpers for all team apps.
+
+Scalar helpers (haversine_km, geohash) are plain math; the *_many / matrix /
+within_radius / k_nearest kernels take sequences or NumPy arrays and compute
+every distance in one vectorized pass instead of a Python loop per row.
+"""
+from core.geo.distance import (
+    EARTH_RADIUS_KM,
+    bounding_box,
+    haversine_km,
+    haversine_km_many,
+    haversine_matrix,
+    in_bounding_box,
+    k_nearest,
+    within_radius,
+)
+from core.geo.geohash import geohash_decode, geohash_encode
+
+__all__ = [
+    "EARTH_RADIUS_KM",
+    "bounding_box",
+    "geohash_decode",
+    "geohash_encode",
+    "haversine_km",
+    "haversine_km_many",
+    "haversine_matrix",
+    "in_bounding_box",
+    "k_nearest",
+    "within_radius",
+]
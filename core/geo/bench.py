@@ -0,0 +1,85 @@
+"""
+Micro-benchmark for core.geo: per-call cost of the pure-Python loop the team apps
+used to run versus the vectorized kernels, at 1k / 100k / 1M points.
+
+    python -m core.geo.bench [--sizes 1000 100000 1000000] [--repeat 5]
+
+Points are spread over Iran's bounding box; the query point is Tehran.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from core.geo import haversine_km, haversine_km_many, k_nearest, within_radius
+
+TEHRAN = (35.6892, 51.3890)
+IRAN_BOX = (25.0, 39.8, 44.0, 63.3)  # min_lat, max_lat, min_lon, max_lon
+
+
+def _points(n, seed=404):
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(IRAN_BOX[0], IRAN_BOX[1], n)
+    lons = rng.uniform(IRAN_BOX[2], IRAN_BOX[3], n)
+    return lats, lons
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(sizes, repeat, loop_limit):
+    lat, lon = TEHRAN
+    rows = []
+    for n in sizes:
+        lats, lons = _points(n)
+        lat_list, lon_list = lats.tolist(), lons.tolist()
+
+        def python_loop():
+            return [
+                i for i, (a, b) in enumerate(zip(lat_list, lon_list))
+                if haversine_km(lat, lon, a, b) <= 50
+            ]
+
+        row = {"n": n}
+        # the scalar loop is only timed up to loop_limit points (1M takes seconds)
+        row["python_loop"] = _best_of(python_loop, 1 if n > 100_000 else repeat) if n <= loop_limit else None
+        row["many"] = _best_of(lambda: haversine_km_many(lat, lon, lats, lons), repeat)
+        row["within_50km"] = _best_of(lambda: within_radius(lat, lon, lats, lons, 50), repeat)
+        row["k_nearest_10"] = _best_of(lambda: k_nearest(lat, lon, lats, lons, 10), repeat)
+        rows.append(row)
+    return rows
+
+
+def _fmt(seconds):
+    if seconds is None:
+        return "-"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.0f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f} ms"
+    return f"{seconds:.2f} s"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--loop-limit", type=int, default=1_000_000,
+                        help="Largest size for which the pure-Python loop is timed.")
+    args = parser.parse_args(argv)
+
+    rows = run(args.sizes, args.repeat, args.loop_limit)
+    cols = ["python_loop", "many", "within_50km", "k_nearest_10"]
+    print(f"{'points':>10}  " + "  ".join(f"{c:>13}" for c in cols))
+    for row in rows:
+        print(f"{row['n']:>10}  " + "  ".join(f"{_fmt(row[c]):>13}" for c in cols))
+
+
+if __name__ == "__main__":
+    main()
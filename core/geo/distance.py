@@ -0,0 +1,121 @@
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+# length of one degree of latitude (and of longitude on the equator)
+_KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> float:
+    """Great-circle distance between two points in km. Plain math: cheaper than NumPy for one pair."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlam = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _as_array(values) -> np.ndarray:
+    """float64 array; None / unparsable entries become NaN and never match a radius."""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        out = np.empty(len(values), dtype=np.float64)
+        for i, v in enumerate(values):
+            try:
+                out[i] = float(v)
+            except (TypeError, ValueError):
+                out[i] = np.nan
+        return out
+
+
+def _haversine(lat1, lon1, lat2, lon2):
+    """Haversine on radian arrays, broadcasting like NumPy does."""
+    dphi = lat2 - lat1
+    dlam = lon2 - lon1
+    a = np.sin(dphi * 0.5) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlam * 0.5) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def haversine_km_many(lat, lon, lats, lons) -> np.ndarray:
+    """Distances in km from one point to every (lats[i], lons[i])."""
+    lats = np.radians(_as_array(lats))
+    lons = np.radians(_as_array(lons))
+    return _haversine(math.radians(lat), math.radians(lon), lats, lons)
+
+
+def haversine_matrix(lats1, lons1, lats2, lons2) -> np.ndarray:
+    """len(lats1) x len(lats2) matrix of distances in km."""
+    lat1 = np.radians(_as_array(lats1))[:, None]
+    lon1 = np.radians(_as_array(lons1))[:, None]
+    lat2 = np.radians(_as_array(lats2))[None, :]
+    lon2 = np.radians(_as_array(lons2))[None, :]
+    return _haversine(lat1, lon1, lat2, lon2)
+
+
+def bounding_box(lat, lon, radius_km):
+    """
+    (min_lat, max_lat, min_lon, max_lon) enclosing the circle of `radius_km`
+    around (lat, lon). Usable as a cheap prefilter, in NumPy or in SQL.
+    """
+    dlat = radius_km / _KM_PER_DEGREE
+    min_lat, max_lat = lat - dlat, lat + dlat
+    if min_lat <= -90 or max_lat >= 90:
+        # circle covers a pole: every longitude is in range
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+    cos_lat = max(math.cos(math.radians(max(abs(min_lat), abs(max_lat)))), 1e-12)
+    dlon = min(radius_km / (_KM_PER_DEGREE * cos_lat), 180.0)
+    return min_lat, max_lat, lon - dlon, lon + dlon
+
+
+def in_bounding_box(lats, lons, box) -> np.ndarray:
+    """Boolean mask of points inside a bounding_box() result (handles the antimeridian)."""
+    min_lat, max_lat, min_lon, max_lon = box
+    lats = _as_array(lats)
+    lons = _as_array(lons)
+    mask = (lats >= min_lat) & (lats <= max_lat)
+    if min_lon < -180:
+        mask &= (lons >= min_lon + 360) | (lons <= max_lon)
+    elif max_lon > 180:
+        mask &= (lons >= min_lon) | (lons <= max_lon - 360)
+    else:
+        mask &= (lons >= min_lon) & (lons <= max_lon)
+    return mask
+
+
+def within_radius(lat, lon, lats, lons, radius_km):
+    """
+    Indices and distances of the points within `radius_km`, nearest first.
+    Points are first cut down with a bounding box; exact distance is only
+    computed for the survivors.
+    """
+    lats = _as_array(lats)
+    lons = _as_array(lons)
+    candidates = np.flatnonzero(in_bounding_box(lats, lons, bounding_box(lat, lon, radius_km)))
+    dist = haversine_km_many(lat, lon, lats[candidates], lons[candidates])
+    keep = dist <= radius_km
+    idx, dist = candidates[keep], dist[keep]
+    order = np.argsort(dist, kind="stable")
+    return idx[order], dist[order]
+
+
+def k_nearest(lat, lon, lats, lons, k, max_km=None):
+    """
+    Indices and distances of the `k` nearest points (optionally within `max_km`),
+    nearest first. Uses argpartition, so it is O(n) rather than a full sort.
+    """
+    if max_km is not None:
+        idx, dist = within_radius(lat, lon, lats, lons, max_km)
+        return idx[:k], dist[:k]
+
+    dist = haversine_km_many(lat, lon, lats, lons)
+    valid = np.flatnonzero(~np.isnan(dist))
+    if k <= 0 or valid.size == 0:
+        return valid[:0], dist[valid[:0]]
+    if k < valid.size:
+        part = np.argpartition(dist[valid], k - 1)[:k]
+        valid = valid[part]
+    order = np.argsort(dist[valid], kind="stable")
+    idx = valid[order]
+    return idx, dist[idx]
@@ -0,0 +1,350 @@
+"""
+Shared outbound HTTP client for the team apps.
+
+    from core.http import client
+
+    r = client.get(url, params=..., headers=..., timeout=10)
+    r = client.get(url, params=..., cache_ttl=300)   # opt-in response cache
+    r = client.post(url, json=payload, deadline=20)
+
+One requests.Session per process with a connection pool per host, so calls to the
+same service reuse keep-alive connections instead of doing a TCP/TLS handshake each
+time. On top of that:
+
+- timeouts: (connect, read) defaults, plus an optional `deadline` in seconds that
+  bounds the whole call including retries and backoff;
+- retries: connection errors, timeouts and 429/502/503/504 are retried with
+  jittered exponential backoff, for idempotent methods only unless `retries=` is
+  passed explicitly;
+- circuit breaker: after `breaker_threshold` consecutive failures a host is
+  short-circuited for `breaker_cooldown` seconds (CircuitOpenError, which is a
+  requests.ConnectionError so existing `except RequestException` blocks keep working);
+- response cache: `cache_ttl=` stores successful responses in an in-process LRU keyed
+  by method, normalized URL, sorted params and headers;
+- coalescing: identical concurrent cached calls share one upstream request.
+
+Every call still goes through requests' HTTPAdapter, so core.metrics records it.
+"""
+import copy
+import http.cookiejar
+import random
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from core import metrics
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """The target host failed repeatedly and is being skipped for a while."""
+
+
+class _Circuit:
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = None  # when the half-open probe was let through
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            now = time.monotonic()
+            # a probe that never reported back (an error record() doesn't see) is given up after a cooldown
+            if now - self.opened_at >= self.cooldown and (self.probing is None or now - self.probing >= self.cooldown):
+                # half-open: let one probe through, the rest wait for its outcome; re-open if it fails
+                self.probing = now
+                return True
+            return False
+
+    def record(self, ok):
+        with self._lock:
+            self.probing = None
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+def _normalize_url(url, params):
+    """Lower-cased scheme/host, query string merged with params and sorted."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        items = params.items() if hasattr(params, "items") else params
+        for key, value in items:
+            if value is None:
+                continue
+            values = value if isinstance(value, (list, tuple)) else [value]
+            query.extend((str(key), str(v)) for v in values)
+    query.sort()
+    base = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", "", ""))
+    return base, tuple(query)
+
+
+class BaseHttpClient:
+    """Settings, breaker, cache and counters shared by HttpClient and core.async_http."""
+
+    def __init__(
+        self,
+        timeout=(3.05, 10),
+        retries=2,
+        backoff=0.2,
+        max_backoff=2.0,
+        retry_statuses=RETRY_STATUSES,
+        breaker_threshold=5,
+        breaker_cooldown=30.0,
+        cache_size=1024,
+    ):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_statuses = frozenset(retry_statuses)
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.cache_size = cache_size
+
+        self._lock = threading.Lock()
+        self._circuits = {}
+        self._cache = OrderedDict()  # key -> (expires_at, response)
+        self._flights = {}
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "retries": 0, "short_circuited": 0}
+
+    def circuit_open(self, url):
+        circuit = self._circuits.get(self._host(url))
+        return bool(circuit and circuit.is_open)
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def reset(self):
+        """Drop cached responses, breaker state and counters (tests)."""
+        with self._lock:
+            self._cache.clear()
+            self._circuits.clear()
+            for name in self._stats:
+                self._stats[name] = 0
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._stats)
+            out["cache_size"] = len(self._cache)
+            out["open_circuits"] = sorted(h for h, c in self._circuits.items() if c.is_open)
+        return out
+
+    # -- internals ------------------------------------------------------------
+
+    @staticmethod
+    def _host(url):
+        parts = urlsplit(url)
+        return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+    def _circuit(self, url):
+        host = self._host(url)
+        circuit = self._circuits.get(host)
+        if circuit is None:
+            with self._lock:
+                circuit = self._circuits.setdefault(
+                    host, _Circuit(self.breaker_threshold, self.breaker_cooldown)
+                )
+        return circuit
+
+    def _retries_for(self, method, retries):
+        if retries is None:
+            return self.retries if method in IDEMPOTENT_METHODS else 0
+        return retries
+
+    def _sleep_for(self, attempt):
+        # "full jitter": spreads retries from many workers instead of syncing them
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    @staticmethod
+    def _cache_key(method, url, params, headers):
+        base, query = _normalize_url(url, params)
+        hdrs = tuple(sorted((str(k).lower(), str(v)) for k, v in (headers or {}).items()))
+        return method, base, query, hdrs
+
+    def _cache_get(self, key):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._cache.move_to_end(key)
+                self._stats["hits"] += 1
+                return copy.copy(entry[1])
+            if entry is not None:
+                del self._cache[key]
+            self._stats["misses"] += 1
+        return None
+
+    def _cache_set(self, key, response, ttl):
+        with self._lock:
+            self._cache[key] = (time.monotonic() + ttl, response)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+
+class HttpClient(BaseHttpClient):
+    def __init__(self, pool_connections=32, pool_maxsize=20, **options):
+        super().__init__(**options)
+        self.session = requests.Session()
+        # the session is shared by every request of the process: never carry one
+        # caller's Set-Cookie over to the next call
+        self.session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+        # pool_connections = hosts kept, pool_maxsize = sockets kept per host
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    # -- public API -----------------------------------------------------------
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method, url, *, params=None, headers=None, timeout=None,
+                deadline=None, retries=None, cache_ttl=None, **kwargs):
+        """
+        Same arguments and return value as requests.request(), plus:
+
+        deadline   seconds for the whole call, retries and backoff included
+        retries    retry count; defaults to self.retries for idempotent methods, 0 otherwise
+        cache_ttl  cache successful (2xx) responses for this many seconds and coalesce
+                   identical concurrent calls; only for requests without a body
+        """
+        method = method.upper()
+        if not cache_ttl or "json" in kwargs or "data" in kwargs or "files" in kwargs:
+            return self._send(method, url, params, headers, timeout, deadline, retries, kwargs)
+
+        key = self._cache_key(method, url, params, headers)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._stats["coalesced"] += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.copy(flight.response)
+
+        try:
+            response = self._send(method, url, params, headers, timeout, deadline, retries, kwargs)
+            if 200 <= response.status_code < 300:
+                response.content  # read the body before it is shared
+                self._cache_set(key, response, cache_ttl)
+            flight.response = response
+            return response
+        except Exception as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _send(self, method, url, params, headers, timeout, deadline, retries, kwargs):
+        retries = self._retries_for(method, retries)
+        timeout = self.timeout if timeout is None else timeout
+        circuit = self._circuit(url)
+        stop_at = None if deadline is None else time.monotonic() + deadline
+
+        attempt = 0
+        while True:
+            call_timeout = timeout
+            if stop_at is not None:
+                remaining = stop_at - time.monotonic()
+                if remaining <= 0:
+                    raise requests.exceptions.Timeout(f"deadline of {deadline}s exceeded for {url}")
+                call_timeout = _cap_timeout(timeout, remaining)
+            if not circuit.allow():
+                with self._lock:
+                    self._stats["short_circuited"] += 1
+                raise CircuitOpenError(f"circuit open for {self._host(url)}")
+
+            try:
+                response = self.session.request(
+                    method, url, params=params, headers=headers, timeout=call_timeout, **kwargs
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                circuit.record(False)
+                if attempt >= retries:
+                    raise
+            else:
+                failed = response.status_code >= 500 or response.status_code == 429
+                circuit.record(not failed)
+                if response.status_code not in self.retry_statuses or attempt >= retries:
+                    return response
+                response.close()
+
+            pause = self._sleep_for(attempt)
+            if stop_at is not None:
+                pause = min(pause, max(0.0, stop_at - time.monotonic()))
+            time.sleep(pause)
+            attempt += 1
+            with self._lock:
+                self._stats["retries"] += 1
+
+
+def _cap_timeout(timeout, remaining):
+    if timeout is None:
+        return remaining
+    if isinstance(timeout, tuple):
+        return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+    return min(timeout, remaining)
+
+
+client = HttpClient()
+
+
+def _metrics_lines():
+    stats = client.stats()
+    lines = [
+        "# HELP app404_http_client_events_total Shared HTTP client cache and retry events.",
+        "# TYPE app404_http_client_events_total counter",
+    ]
+    for event in ("hits", "misses", "coalesced", "retries", "short_circuited"):
+        lines.append(f'app404_http_client_events_total{{event="{event}"}} {stats[event]}')
+    lines += [
+        "# HELP app404_http_client_open_circuits Hosts currently short-circuited.",
+        "# TYPE app404_http_client_open_circuits gauge",
+        f"app404_http_client_open_circuits {len(stats['open_circuits'])}",
+    ]
+    return lines
+
+
+metrics.register_collector(_metrics_lines)
@@ -0,0 +1,80 @@
+"""
+Lazily included URLconfs for team apps.
+
+`include("teamN.urls")` imports the team's urls/views (and whatever they pull in:
+sklearn, langchain, celery, ...) as soon as the root URLconf is loaded, i.e. in
+every worker before its first request. `lazy_include()` returns a resolver that
+only imports the URLconf when a request first matches its prefix (or when
+`load()` is called, e.g. for apps listed in TEAM_URLS_PRELOAD).
+
+Until loaded, a lazy resolver contributes nothing to reverse(); loading clears
+Django's URL caches so the team's names become reversible from then on.
+"""
+import threading
+from importlib import import_module
+
+from django.urls import URLResolver, clear_url_caches
+from django.urls.resolvers import RoutePattern
+
+
+class LazyURLResolver(URLResolver):
+    def __init__(self, pattern, urlconf_name):
+        super().__init__(pattern, urlconf_name)
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self):
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            module = import_module(self.urlconf_name)
+            # same namespace handling as include("<app>.urls")
+            self.app_name = getattr(module, "app_name", None)
+            self.namespace = self.app_name
+            self._reset_reverse_caches()
+            self._loaded = True
+        clear_url_caches()
+
+    def _reset_reverse_caches(self):
+        self._reverse_dict = {}
+        self._namespace_dict = {}
+        self._app_dict = {}
+        self._callback_strs = set()
+        self._populated = False
+
+    @property
+    def url_patterns(self):
+        if not self._loaded:
+            return []
+        return getattr(self.urlconf_module, "urlpatterns", self.urlconf_module)
+
+    def resolve(self, path):
+        if not self._loaded and self.pattern.match(str(path)):
+            self.load()
+        return super().resolve(path)
+
+    def check(self):
+        # system checks (manage.py check / runserver) validate every URLconf
+        self.load()
+        return super().check()
+
+
+def lazy_include(route, urlconf_name):
+    """Drop-in for path(route, include(urlconf_name)) that defers the import."""
+    return LazyURLResolver(RoutePattern(route, is_endpoint=False), urlconf_name)
+
+
+def preload(urlpatterns, apps):
+    """Load the lazy URLconfs of the given apps now ("*" loads all of them)."""
+    wanted = set(apps)
+    for resolver in urlpatterns:
+        if not isinstance(resolver, LazyURLResolver):
+            continue
+        if "*" in wanted or resolver.urlconf_name.split(".", 1)[0] in wanted:
+            resolver.load()
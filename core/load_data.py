@@ -0,0 +1,414 @@
+"""
+Synthetic, geographically plausible data for load tests (manage.py generate_load_data).
+
+Every team generator has three parts:
+
+    prepare(ctx)                 small catalog tables (cities, categories, tags...),
+                                 run once in the parent process; returns shared state
+    count(scale)                 number of primary rows at this scale
+    fill(ctx, state, start, stop, rng, batch_size)
+                                 primary rows [start, stop) plus their dependents, with
+                                 bulk_create; runs in worker processes, one chunk each;
+                                 returns the number of rows written
+
+Primary keys are assigned here rather than by the database (MySQL's bulk_create
+does not return them), offset past the rows already present so the command can
+be run again to grow a dataset. Points are drawn around real Iranian cities,
+weighted by population, with a spread that grows with the city.
+"""
+import math
+import random
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+
+# (name_fa, name_en, province_fa, province_en, lat, lng, population in thousands)
+CITIES = [
+    ("تهران", "Tehran", "تهران", "Tehran", 35.6892, 51.3890, 8700),
+    ("مشهد", "Mashhad", "خراسان رضوی", "Razavi Khorasan", 36.2605, 59.6168, 3000),
+    ("اصفهان", "Isfahan", "اصفهان", "Isfahan", 32.6546, 51.6680, 2000),
+    ("کرج", "Karaj", "البرز", "Alborz", 35.8400, 50.9391, 1600),
+    ("شیراز", "Shiraz", "فارس", "Fars", 29.5918, 52.5837, 1600),
+    ("تبریز", "Tabriz", "آذربایجان شرقی", "East Azerbaijan", 38.0800, 46.2919, 1600),
+    ("قم", "Qom", "قم", "Qom", 34.6416, 50.8746, 1200),
+    ("اهواز", "Ahvaz", "خوزستان", "Khuzestan", 31.3183, 48.6706, 1200),
+    ("کرمانشاه", "Kermanshah", "کرمانشاه", "Kermanshah", 34.3142, 47.0650, 950),
+    ("ارومیه", "Urmia", "آذربایجان غربی", "West Azerbaijan", 37.5527, 45.0760, 740),
+    ("رشت", "Rasht", "گیلان", "Gilan", 37.2808, 49.5832, 680),
+    ("زاهدان", "Zahedan", "سیستان و بلوچستان", "Sistan and Baluchestan", 29.4963, 60.8629, 590),
+    ("همدان", "Hamadan", "همدان", "Hamadan", 34.7992, 48.5146, 550),
+    ("کرمان", "Kerman", "کرمان", "Kerman", 30.2839, 57.0834, 540),
+    ("یزد", "Yazd", "یزد", "Yazd", 31.8974, 54.3569, 530),
+    ("اردبیل", "Ardabil", "اردبیل", "Ardabil", 38.2498, 48.2933, 530),
+    ("بندرعباس", "Bandar Abbas", "هرمزگان", "Hormozgan", 27.1832, 56.2666, 530),
+    ("اراک", "Arak", "مرکزی", "Markazi", 34.0917, 49.6892, 520),
+    ("زنجان", "Zanjan", "زنجان", "Zanjan", 36.6736, 48.4787, 430),
+    ("سنندج", "Sanandaj", "کردستان", "Kurdistan", 35.3219, 46.9862, 410),
+    ("قزوین", "Qazvin", "قزوین", "Qazvin", 36.2797, 50.0049, 400),
+    ("خرم‌آباد", "Khorramabad", "لرستان", "Lorestan", 33.4878, 48.3558, 370),
+    ("گرگان", "Gorgan", "گلستان", "Golestan", 36.8456, 54.4393, 350),
+    ("ساری", "Sari", "مازندران", "Mazandaran", 36.5633, 53.0601, 310),
+    ("کاشان", "Kashan", "اصفهان", "Isfahan", 33.9850, 51.4100, 300),
+    ("بجنورد", "Bojnurd", "خراسان شمالی", "North Khorasan", 37.4747, 57.3290, 230),
+    ("بوشهر", "Bushehr", "بوشهر", "Bushehr", 28.9234, 50.8203, 220),
+    ("بیرجند", "Birjand", "خراسان جنوبی", "South Khorasan", 32.8649, 59.2262, 200),
+    ("ایلام", "Ilam", "ایلام", "Ilam", 33.6374, 46.4227, 195),
+    ("شهرکرد", "Shahrekord", "چهارمحال و بختیاری", "Chaharmahal and Bakhtiari", 32.3256, 50.8644, 190),
+    ("سمنان", "Semnan", "سمنان", "Semnan", 35.5769, 53.3921, 185),
+    ("یاسوج", "Yasuj", "کهگیلویه و بویراحمد", "Kohgiluyeh and Boyer-Ahmad", 30.6682, 51.5880, 135),
+]
+_CITY_WEIGHTS = [c[6] for c in CITIES]
+
+# (slug, name_fa)
+TAGS = [
+    ("history", "تاریخی"), ("nature", "طبیعت"), ("food", "غذا"), ("museum", "موزه"),
+    ("bazaar", "بازار"), ("mosque", "مسجد"), ("garden", "باغ"), ("desert", "کویر"),
+    ("mountain", "کوهستان"), ("sea", "دریا"), ("architecture", "معماری"), ("handicraft", "صنایع دستی"),
+]
+CATEGORIES = [
+    ("هتل", "Hotel", False), ("رستوران", "Restaurant", False), ("موزه", "Museum", False),
+    ("بیمارستان", "Hospital", True), ("داروخانه", "Pharmacy", True), ("اقامتگاه بوم‌گردی", "Eco Lodge", False),
+]
+AMENITIES = [
+    ("پارکینگ", "Parking"), ("وای‌فای", "WiFi"), ("صبحانه", "Breakfast"),
+    ("استخر", "Pool"), ("رستوران", "Restaurant"), ("دسترسی ویلچر", "Wheelchair Access"),
+]
+PRICE_TIERS = ["free", "budget", "moderate", "expensive", "luxury"]
+WORDS_FA = (
+    "شهر تاریخ بنا مسجد بازار باغ کاخ پل میدان کوه دشت رود دریا ساحل کویر جنگل "
+    "قدیمی زیبا بزرگ معروف سنتی ایرانی صفوی قاجار هخامنشی ساسانی معماری کاشی گنبد "
+    "مناره ایوان حیاط آب نما گردشگر سفر بازدید فرهنگ هنر صنایع دستی فرش سفال غذا "
+    "محلی مردم جشن نوروز بهار تابستان پاییز زمستان قرن سال دوره ساخت مرمت ثبت جهانی "
+    "یونسکو موزه آثار نقاشی خط شعر شاعر آرامگاه زیارت کاروانسرا قنات بادگیر خانه محله"
+).split()
+
+_EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class Context:
+    def __init__(self, scale, seed, user_ids):
+        self.scale = scale
+        self.seed = seed
+        self.user_ids = user_ids
+
+
+def chunk_rng(seed, team, start):
+    return random.Random(f"{seed}:{team}:{start}")
+
+
+def rand_uuid(rng):
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def pick_city(rng):
+    return rng.choices(CITIES, weights=_CITY_WEIGHTS)[0]
+
+
+def city_point(rng, city):
+    """A point around the city centre; bigger cities spread further (Tehran ~25 km)."""
+    sigma_km = 2 + math.sqrt(city[6]) / 4
+    lat = city[4] + rng.gauss(0, sigma_km) / 111.0
+    lng = city[5] + rng.gauss(0, sigma_km) / (111.0 * math.cos(math.radians(city[4])))
+    return round(lat, 6), round(lng, 6)
+
+
+def persian_text(rng, sentences):
+    out = []
+    for _ in range(sentences):
+        out.append(" ".join(rng.choice(WORDS_FA) for _ in range(rng.randint(6, 16))) + ".")
+    return " ".join(out)
+
+
+def moment(rng, days=365):
+    return _EPOCH + timedelta(seconds=rng.randrange(days * 86400))
+
+
+def _next_pk(model, alias):
+    last = model.objects.using(alias).order_by("-pk").values_list("pk", flat=True).first()
+    return (last or 0) + 1
+
+
+def _bulk(alias, tables, batch_size):
+    """bulk_create each (model, rows) in order; returns the number of rows written."""
+    for model, rows in tables:
+        model.objects.using(alias).bulk_create(rows, batch_size=batch_size)
+    return sum(len(rows) for _, rows in tables)
+
+
+# -- users (default database) -------------------------------------------------
+
+def create_users(scale, seed, batch_size):
+    """max(20, scale/100) active users; returns their ids as strings."""
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+
+    User = get_user_model()
+    start = User.objects.filter(email__endswith="@load.example.com").count()
+    rng = random.Random(f"{seed}:users:{start}")
+    password = make_password(None)  # unusable; nobody logs in as these users
+    users = [
+        User(
+            id=rand_uuid(rng), email=f"user{i}@load.example.com", password=password,
+            first_name=f"کاربر{i}", age=rng.randint(18, 70),
+        )
+        for i in range(start, start + max(20, scale // 100))
+    ]
+    User.objects.bulk_create(users, batch_size=batch_size)
+    return [str(u) for u in User.objects.filter(email__endswith="@load.example.com").values_list("id", flat=True)]
+
+
+# -- team4: facilities ---------------------------------------------------------
+
+def team4_prepare(ctx):
+    from team4.fields import Point
+    from team4.models import Amenity, Category, City, Facility, Province
+
+    provinces = {}
+    for city in CITIES:
+        provinces[city[3]], _ = Province.objects.get_or_create(
+            name_en=city[3], defaults={"name_fa": city[2]}
+        )
+    cities = []
+    for city in CITIES:
+        obj, _ = City.objects.get_or_create(
+            name_en=city[1], province=provinces[city[3]],
+            defaults={"name_fa": city[0], "location": Point(city[5], city[4])},
+        )
+        cities.append(obj.pk)
+    categories = [
+        Category.objects.get_or_create(name_en=en, defaults={"name_fa": fa, "is_emergency": em})[0].pk
+        for fa, en, em in CATEGORIES
+    ]
+    amenities = [Amenity.objects.get_or_create(name_en=en, defaults={"name_fa": fa})[0].pk for fa, en in AMENITIES]
+    return {"cities": cities, "categories": categories, "amenities": amenities,
+            "first_pk": _next_pk(Facility, "team4")}
+
+
+def team4_fill(ctx, state, start, stop, rng, batch_size):
+    from team4 import search_index
+    from team4.fields import Point
+    from team4.models import Facility, FacilityAmenity, Image, Pricing, SearchName
+
+    facilities, links, prices, images = [], [], [], []
+    for i in range(start, stop):
+        c = rng.randrange(len(CITIES))
+        city = CITIES[c]
+        lat, lng = city_point(rng, city)
+        k = rng.randrange(len(CATEGORIES))
+        pk = state["first_pk"] + i
+        facilities.append(Facility(
+            fac_id=pk, name_fa=f"{CATEGORIES[k][0]} {city[0]} {pk}", name_en=f"{CATEGORIES[k][1]} {city[1]} {pk}",
+            category_id=state["categories"][k], city_id=state["cities"][c],
+            address=f"{city[0]}، خیابان {rng.choice(WORDS_FA)}، پلاک {rng.randint(1, 300)}",
+            location=Point(lng, lat), description_fa=persian_text(rng, 2),
+            avg_rating=round(rng.triangular(1, 5, 4), 2), review_count=int(rng.paretovariate(1.2)),
+            is_24_hour=CATEGORIES[k][2] or rng.random() < 0.1, price_tier=rng.choice(PRICE_TIERS),
+        ))
+        for amenity in rng.sample(state["amenities"], rng.randint(0, 3)):
+            links.append(FacilityAmenity(facility_id=pk, amenity_id=amenity))
+        if rng.random() < 0.6:
+            prices.append(Pricing(facility_id=pk, price_type="Per Night", price=rng.randrange(5, 300) * 100_000))
+        images.append(Image(facility_id=pk, image_url=f"https://picsum.photos/seed/f{pk}/640/480", is_primary=True))
+    names = search_index.entries("facility", facilities)
+    return _bulk("team4", [(Facility, facilities), (FacilityAmenity, links), (Pricing, prices), (Image, images),
+                           (SearchName, names)], batch_size)
+
+
+# -- team13: places, translations, comments, events ----------------------------
+
+def team13_prepare(ctx):
+    return {}
+
+
+def team13_fill(ctx, state, start, stop, rng, batch_size):
+    from team13.models import Comment, Event, EventTranslation, Place, PlaceTranslation
+
+    types = [t for t, _ in Place.PlaceType.choices]
+    labels = dict(Place.PlaceType.choices)
+    places, translations, comments, events, event_translations = [], [], [], [], []
+    for i in range(start, stop):
+        city = pick_city(rng)
+        lat, lng = city_point(rng, city)
+        ptype = rng.choice(types)
+        place = Place(place_id=rand_uuid(rng), type=ptype, city=city[0],
+                      address=f"{city[0]}، {rng.choice(WORDS_FA)}", latitude=lat, longitude=lng)
+        places.append(place)
+        translations.append(PlaceTranslation(place=place, lang="fa", name=f"{labels[ptype]} {rng.choice(WORDS_FA)} {i}",
+                                             description=persian_text(rng, 2)))
+        translations.append(PlaceTranslation(place=place, lang="en", name=f"{ptype.title()} {city[1]} {i}"))
+        comments.append(Comment(comment_id=rand_uuid(rng), target_type="place", target_id=place.place_id,
+                                rating=rng.randint(1, 5), body=persian_text(rng, 1) if rng.random() < 0.3 else ""))
+        if i % 20 == 0:
+            begins = moment(rng)
+            event = Event(event_id=rand_uuid(rng), start_at=begins, end_at=begins + timedelta(hours=rng.randint(2, 72)),
+                          city=city[0], address=place.address, latitude=lat, longitude=lng)
+            events.append(event)
+            event_translations.append(EventTranslation(event=event, lang="fa", title=f"جشنواره {rng.choice(WORDS_FA)}",
+                                                       description=persian_text(rng, 2)))
+    return _bulk("team13", [(Place, places), (PlaceTranslation, translations), (Comment, comments),
+                            (Event, events), (EventTranslation, event_translations)], batch_size)
+
+
+# -- team5: cities, places, media, ratings ------------------------------------
+
+def team5_prepare(ctx):
+    from team5.models import Team5City, Team5Media
+
+    Team5City.objects.bulk_create(
+        [Team5City(city_id=c[1].lower().replace(" ", "-"), city_name=c[0], latitude=c[4], longitude=c[5]) for c in CITIES],
+        ignore_conflicts=True,
+    )
+    return {"first": Team5Media.objects.filter(media_id__startswith="load-m").count()}
+
+
+def team5_fill(ctx, state, start, stop, rng, batch_size):
+    from team5.models import Team5Media, Team5MediaRating, Team5Place
+
+    places, media, ratings = [], [], []
+    offset = state["first"]
+    for i in range(start + offset, stop + offset):
+        if i % 10 == 0 or not places:
+            city = pick_city(rng)
+            lat, lng = city_point(rng, city)
+            place = Team5Place(place_id=f"load-p{i}", city_id=city[1].lower().replace(" ", "-"),
+                               place_name=f"{city[0]} {rng.choice(WORDS_FA)} {i}", latitude=lat, longitude=lng)
+            places.append(place)
+        slug, tag_fa = rng.choice(TAGS)
+        media.append(Team5Media(media_id=f"load-m{i}", place=places[-1], title=f"{tag_fa} {places[-1].place_name}",
+                                caption=f"{slug} " + persian_text(rng, 1)))
+        for user_id in rng.sample(ctx.user_ids, min(2, len(ctx.user_ids))):
+            rate = rng.choice([1.0, 2.0, 3.0, 3.5, 4.0, 4.5, 5.0])
+            ratings.append(Team5MediaRating(user_id=user_id, media_id=f"load-m{i}", rate=rate, liked=rate >= 4.0))
+    return _bulk("team5", [(Team5Place, places), (Team5Media, media), (Team5MediaRating, ratings)], batch_size)
+
+
+# -- team2: wiki articles, versions, tags, votes -------------------------------
+
+def team2_prepare(ctx):
+    from team2.models import Article, Tag
+
+    Tag.objects.bulk_create([Tag(name=fa) for _, fa in TAGS], ignore_conflicts=True)
+    return {"first": Article.objects.filter(name__startswith="load-").count()}
+
+
+def team2_fill(ctx, state, start, stop, rng, batch_size):
+    from team2.models import Article, Version, Vote
+
+    articles, versions, tag_links, votes = [], [], [], []
+    through = Version.tags.through
+    offset = state["first"]
+    for i in range(start + offset, stop + offset):
+        city = pick_city(rng)
+        article = Article(name=f"load-{i}", creator_id=rng.choice(ctx.user_ids), score=0)
+        for v in range(rng.randint(1, 3)):
+            version = Version(
+                name=f"load-{i}-v{v + 1}", article=article, editor_id=rng.choice(ctx.user_ids),
+                content=f"{city[0]}: " + persian_text(rng, rng.randint(10, 40)),
+                summary=persian_text(rng, 1),
+            )
+            versions.append(version)
+            for _, tag_fa in rng.sample(TAGS, 3):
+                tag_links.append(through(version_id=version.name, tag_id=tag_fa))
+        article.current_version = versions[-1]
+        for user_id in rng.sample(ctx.user_ids, min(len(ctx.user_ids), rng.randint(0, 10))):
+            value = 1 if rng.random() < 0.8 else -1
+            votes.append(Vote(user_id=user_id, article=article, value=value))
+            article.score += value
+        articles.append(article)
+    # Article -> current Version -> Article: insert articles first, then link them
+    current = {a.name: a.current_version for a in articles}
+    for a in articles:
+        a.current_version = None
+    written = _bulk("team2", [(Article, articles), (Version, versions)], batch_size)
+    for a in articles:
+        a.current_version = current[a.name]
+    Article.objects.using("team2").bulk_update(articles, ["current_version"], batch_size=batch_size)
+    return written + _bulk("team2", [(through, tag_links), (Vote, votes)], batch_size)
+
+
+def team2_finish(ctx):
+    from team2 import top_by_tag
+
+    top_by_tag.rebuild()  # bulk inserts bypass the incremental maintenance
+
+
+# -- team6: wiki articles ------------------------------------------------------
+
+def team6_prepare(ctx):
+    from team6.models import WikiArticle, WikiCategory
+
+    category, _ = WikiCategory.objects.get_or_create(slug="load-places", defaults={"title_fa": "مکان‌ها"})
+    return {"category": category.pk, "first": WikiArticle.objects.filter(slug__startswith="load-").count()}
+
+
+def team6_fill(ctx, state, start, stop, rng, batch_size):
+    from team6.models import WikiArticle
+
+    articles = []
+    offset = state["first"]
+    for i in range(start + offset, stop + offset):
+        city = pick_city(rng)
+        title = f"{rng.choice(WORDS_FA)} {city[0]}"
+        articles.append(WikiArticle(
+            id_article=rand_uuid(rng), place_name=city[0], slug=f"load-{i}", title_fa=title,
+            title_en=f"{city[1]} {i}", body_fa=persian_text(rng, rng.randint(20, 60)), summary=persian_text(rng, 2),
+            url=f"https://fa.wikipedia.org/wiki/load-{i}", category_id=state["category"],
+            author_user_id=rng.choice(ctx.user_ids), status="published", published_at=moment(rng),
+            view_count=int(rng.paretovariate(1.1)),
+        ))
+    return _bulk("team6", [(WikiArticle, articles)], batch_size)
+
+
+# -- team10: trips -------------------------------------------------------------
+
+def team10_prepare(ctx):
+    from team10.models import Trip, TripRequirements
+
+    return {"first_req": _next_pk(TripRequirements, "team10"), "first_trip": _next_pk(Trip, "team10")}
+
+
+def team10_fill(ctx, state, start, stop, rng, batch_size):
+    from team10.models import DailyPlan, Trip, TripRequirements
+
+    requirements, trips, plans = [], [], []
+    activities = [a for a, _ in DailyPlan.ACTIVITY_CHOICES]
+    sources = [s for s, _ in DailyPlan.SOURCE_CHOICES]
+    for i in range(start, stop):
+        city = pick_city(rng)
+        user_id = rng.choice(ctx.user_ids)
+        begins = moment(rng).replace(hour=9, minute=0, second=0)
+        days = rng.randint(1, 5)
+        req = TripRequirements(
+            id=state["first_req"] + i, user_id=user_id, start_at=begins, end_at=begins + timedelta(days=days),
+            destination_name=city[0], budget_level=rng.choice(["ECONOMY", "MODERATE", "LUXURY"]),
+            travelers_count=rng.randint(1, 5),
+        )
+        trip = Trip(id=state["first_trip"] + i, user_id=user_id, requirements=req, destination_name=city[0],
+                    status=rng.choice(["DRAFT", "CONFIRMED", "IN_PROGRESS", "EXPIRED"]))
+        requirements.append(req)
+        trips.append(trip)
+        for d in range(days):
+            for slot in range(rng.randint(2, 4)):
+                at = begins + timedelta(days=d, hours=slot * 3)
+                plans.append(DailyPlan(
+                    trip=trip, start_at=at, end_at=at + timedelta(hours=2), facility_id=rng.randint(1, 10_000),
+                    cost=rng.randrange(0, 50) * 100_000, activity_type=rng.choice(activities),
+                    description=persian_text(rng, 1), place_source_type=rng.choice(sources),
+                ))
+    return _bulk("team10", [(TripRequirements, requirements), (Trip, trips), (DailyPlan, plans)], batch_size)
+
+
+# team -> (prepare, primary rows at a scale, fill)
+GENERATORS = {
+    "team4": (team4_prepare, lambda scale: scale, team4_fill),
+    "team13": (team13_prepare, lambda scale: scale, team13_fill),
+    "team5": (team5_prepare, lambda scale: scale, team5_fill),
+    "team2": (team2_prepare, lambda scale: max(1, scale // 10), team2_fill),
+    "team6": (team6_prepare, lambda scale: max(1, scale // 10), team6_fill),
+    "team10": (team10_prepare, lambda scale: max(1, scale // 10), team10_fill),
+}
+
+# team -> run once in the parent after every chunk is written (derived tables)
+FINISH = {
+    "team2": team2_finish,
+}
@@ -0,0 +1,98 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from core import load_data
+
+
+def _init_worker():
+    import django
+    from django.apps import apps
+
+    if not apps.ready:  # spawn start method; fork inherits the set-up registry
+        django.setup()
+
+
+def _fill(team, ctx, state, ranges, batch_size):
+    """Worker: write each [start, stop) chunk of `team` in its own transaction."""
+    _, _, fill = load_data.GENERATORS[team]
+    rows = 0
+    t0 = time.perf_counter()
+    try:
+        for start, stop in ranges:
+            with transaction.atomic(using=team):
+                rows += fill(ctx, state, start, stop, load_data.chunk_rng(ctx.seed, team, start), batch_size)
+    finally:
+        connections.close_all()
+    return team, ranges[-1][1] - ranges[0][0], rows, time.perf_counter() - t0
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the team databases with realistic synthetic data for load tests: "
+        "facilities and places around Iranian cities, media ratings, Persian wiki "
+        "articles, trips, comments and votes. --scale N is about N places/facilities "
+        "(N/10 articles and trips); rows are bulk-inserted by parallel workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=int, required=True, help="Primary rows per place-like table.")
+        parser.add_argument("--seed", type=int, default=1404, help="Same seed, same data.")
+        parser.add_argument("--teams", nargs="+", choices=sorted(load_data.GENERATORS),
+                            help="Only these teams (default: every team with a database).")
+        parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+        parser.add_argument("--chunk-size", type=int, default=20_000,
+                            help="Primary rows per worker task and transaction.")
+        parser.add_argument("--batch-size", type=int, default=2_000, help="Rows per INSERT statement.")
+
+    def handle(self, *args, **options):
+        scale = options["scale"]
+        if scale < 1:
+            raise CommandError("--scale must be at least 1")
+        teams = [t for t in options["teams"] or load_data.GENERATORS if t in settings.DATABASES]
+        t0 = time.perf_counter()
+
+        user_ids = load_data.create_users(scale, options["seed"], options["batch_size"])
+        ctx = load_data.Context(scale, options["seed"], user_ids)
+        self.stdout.write(f"users: {len(user_ids)}")
+
+        # Catalogs in this process; tasks only need their ids.
+        tasks = []
+        for team in teams:
+            prepare, count, _ = load_data.GENERATORS[team]
+            state = prepare(ctx)
+            size = options["chunk_size"]
+            ranges = [(s, min(s + size, count(scale))) for s in range(0, count(scale), size)]
+            if connections[team].vendor == "sqlite":
+                # one writer per SQLite file; chunks of one team run back to back
+                tasks.append((team, state, ranges))
+            else:
+                tasks.extend((team, state, [r]) for r in ranges)
+
+        connections.close_all()  # don't hand open connections to forked workers
+        totals = {}
+        with ProcessPoolExecutor(max_workers=max(1, options["jobs"]), initializer=_init_worker) as pool:
+            futures = [pool.submit(_fill, team, ctx, state, ranges, options["batch_size"])
+                       for team, state, ranges in tasks]
+            for future in as_completed(futures):
+                team, primary, rows, seconds = future.result()
+                done = totals.setdefault(team, [0, 0])
+                done[0] += primary
+                done[1] += rows
+                self.stdout.write(f"{team}: +{primary} primary / {rows} rows in {seconds:.1f}s")
+
+        for team in totals:
+            if team in load_data.FINISH:
+                load_data.FINISH[team](ctx)
+
+        elapsed = time.perf_counter() - t0
+        rows = sum(r for _, r in totals.values())
+        for team, (primary, team_rows) in sorted(totals.items()):
+            self.stdout.write(f"  {team:<8} {primary:>9} primary {team_rows:>10} rows")
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {rows} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)"
+        ))
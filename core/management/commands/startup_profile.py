@@ -0,0 +1,152 @@
+import json
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter so every module is measured against a cold
+# sys.modules; prints one JSON line with timings (ms) and RSS (KiB).
+_CHILD = r"""
+import importlib, json, os, resource, sys, time
+
+def rss_kib():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return r // 1024 if sys.platform == "darwin" else r
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app404.settings")
+t0, r0 = time.perf_counter(), rss_kib()
+import django
+django.setup()
+t1, r1 = time.perf_counter(), rss_kib()
+for name in sys.argv[1:]:
+    importlib.import_module(name)
+t2, r2 = time.perf_counter(), rss_kib()
+print(json.dumps({
+    "setup_ms": (t1 - t0) * 1000, "setup_rss": r1 - r0,
+    "import_ms": (t2 - t1) * 1000, "import_rss": r2 - r1, "rss": r2,
+}))
+"""
+
+_IMPORTTIME = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\| (.*)$")
+
+
+class Command(BaseCommand):
+    help = (
+        "Report import time and RSS per team URLconf, each measured in a fresh "
+        "interpreter after django.setup(). Fails when a budget is exceeded."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "modules",
+            nargs="*",
+            help="Modules to profile (default: <app>.urls for every app in TEAM_APPS).",
+        )
+        parser.add_argument("--max-ms", type=float, help="Import-time budget per module in ms.")
+        parser.add_argument("--max-rss-mb", type=float, help="RSS budget per module in MiB.")
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=0,
+            help="Also list the N slowest transitive imports of each module (python -X importtime).",
+        )
+        parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+
+    def handle(self, *args, **options):
+        modules = options["modules"] or [f"{app}.urls" for app in settings.TEAM_APPS]
+        top = options["top"]
+
+        baseline = self._run([], top)
+        # django.setup() imports are paid by every worker; only list what the module adds
+        seen = {name for _, name in baseline.pop("imports", [])}
+        rows = []
+        for name in modules:
+            row = self._run([name], top)
+            row["module"] = name
+            imports = row.pop("imports", [])
+            if top:
+                row["slowest"] = [
+                    {"module": mod, "cumulative_ms": ms}
+                    for ms, mod in imports if mod not in seen
+                ][:top]
+            rows.append(row)
+
+        if options["json"]:
+            self.stdout.write(json.dumps({"django_setup": baseline, "modules": rows}, indent=2))
+        else:
+            self._print_table(baseline, rows)
+
+        over = []
+        for row in rows:
+            if "error" in row:
+                over.append(f"{row['module']}: {row['error']}")
+                continue
+            if options["max_ms"] is not None and row["import_ms"] > options["max_ms"]:
+                over.append(f"{row['module']}: {row['import_ms']:.0f} ms > {options['max_ms']:.0f} ms")
+            if options["max_rss_mb"] is not None and row["import_rss"] / 1024 > options["max_rss_mb"]:
+                over.append(
+                    f"{row['module']}: {row['import_rss'] / 1024:.1f} MiB > {options['max_rss_mb']:.1f} MiB"
+                )
+        if over:
+            raise CommandError("Startup budget exceeded:\n  " + "\n  ".join(over))
+
+    def _run(self, modules, top):
+        cmd = [sys.executable]
+        if top:
+            cmd += ["-X", "importtime"]
+        cmd += ["-c", _CHILD, *modules]
+
+        env = os.environ.copy()
+        env.setdefault("DJANGO_SETTINGS_MODULE", "app404.settings")
+        proc = subprocess.run(cmd, cwd=str(settings.BASE_DIR), env=env, capture_output=True, text=True)
+        lines = proc.stdout.strip().splitlines()
+        if proc.returncode != 0 or not lines:
+            last = proc.stderr.strip().splitlines()[-1:] or ["no output"]
+            return {"error": last[0]}
+
+        result = json.loads(lines[-1])
+        if top:
+            result["imports"] = self._top_level_imports(proc.stderr)
+        return result
+
+    @staticmethod
+    def _top_level_imports(stderr):
+        """(cumulative ms, module) for imports that were not nested in another import, slowest first."""
+        entries = []
+        for line in stderr.splitlines():
+            m = _IMPORTTIME.match(line)
+            if m and not m.group(3).startswith(" "):
+                entries.append((int(m.group(2)) / 1000, m.group(3)))
+        entries.sort(reverse=True)
+        return entries
+
+    def _print_table(self, baseline, rows):
+        names = [r["module"] for r in rows] + ["django.setup()"]
+        names += ["    " + item["module"] for r in rows for item in r.get("slowest", [])]
+        w = max(len(n) for n in names)
+        self.stdout.write(f"{'module'.ljust(w)}  {'import ms':>10}  {'RSS +MiB':>9}  {'RSS MiB':>8}")
+        self.stdout.write("-" * (w + 34))
+        if "error" in baseline:
+            self.stdout.write(self.style.ERROR(f"{'django.setup()'.ljust(w)}  {baseline['error']}"))
+            return
+        self.stdout.write(
+            f"{'django.setup()'.ljust(w)}  {baseline['setup_ms']:>10.0f}  "
+            f"{baseline['setup_rss'] / 1024:>9.1f}  {baseline['rss'] / 1024:>8.1f}"
+        )
+        for row in rows:
+            if "error" in row:
+                self.stdout.write(self.style.ERROR(f"{row['module'].ljust(w)}  {row['error']}"))
+                continue
+            self.stdout.write(
+                f"{row['module'].ljust(w)}  {row['import_ms']:>10.0f}  "
+                f"{row['import_rss'] / 1024:>9.1f}  {row['rss'] / 1024:>8.1f}"
+            )
+            for item in row.get("slowest", []):
+                self.stdout.write(f"    {item['module']:<{w - 4}}  {item['cumulative_ms']:>10.0f}")
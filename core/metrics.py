@@ -0,0 +1,209 @@
+"""
+In-process request metrics, rendered in the Prometheus text format at /api/metrics/.
+
+RequestMetricsMiddleware fills these per request (route, team app, wall time,
+DB queries per alias, outbound HTTP calls per host, response size). Everything is
+kept per worker process; scrape each worker or put a shared registry in front.
+With METRICS_ENABLED off the middleware removes itself at startup.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from asgiref.local import Local
+
+_lock = threading.Lock()
+# asgiref's Local follows a request across sync_to_async / async_to_sync hops
+_local = Local()
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Counter:
+    def __init__(self, name, help_text, labels):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self._values = {}
+
+    def inc(self, labels, amount=1):
+        with _lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with _lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_labels(self.labels, labels)} {_num(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels, buckets):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, labels, value):
+        i = bisect_left(self.buckets, value)
+        with _lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[i] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with _lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                le = bound if bound == "+Inf" else _num(bound)
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.labels + ('le',), labels + (le,))} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_labels(self.labels, labels)} {_num(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labels, labels)} {cumulative}")
+        return lines
+
+
+def _num(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+REQUEST_DURATION = Histogram(
+    "app404_http_request_duration_seconds", "Wall time per request.",
+    ("app", "route", "method", "status"), LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "app404_http_response_size_bytes", "Response body size.",
+    ("app", "route"), SIZE_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    "app404_db_queries_per_request", "Database queries per request, by database alias.",
+    ("app", "alias"), COUNT_BUCKETS,
+)
+DB_TIME = Histogram(
+    "app404_db_time_per_request_seconds", "Time spent in database queries per request, by alias.",
+    ("app", "alias"), LATENCY_BUCKETS,
+)
+OUTBOUND_REQUESTS = Counter(
+    "app404_outbound_requests_total", "Outbound HTTP calls, by target host.",
+    ("app", "host", "outcome"),
+)
+OUTBOUND_DURATION = Histogram(
+    "app404_outbound_request_duration_seconds", "Outbound HTTP call latency, by target host.",
+    ("app", "host"), LATENCY_BUCKETS,
+)
+
+REGISTRY = [REQUEST_DURATION, RESPONSE_SIZE, DB_QUERIES, DB_TIME, OUTBOUND_REQUESTS, OUTBOUND_DURATION]
+
+
+def current_app():
+    """Team app of the request being served on this thread ("-" outside a request)."""
+    return getattr(_local, "app", "-")
+
+
+@contextmanager
+def request_scope(app):
+    previous = getattr(_local, "app", None)
+    _local.app = app
+    try:
+        yield
+    finally:
+        if previous is None:
+            del _local.app
+        else:
+            _local.app = previous
+
+
+def record_outbound(url, seconds, ok=True):
+    host = urlsplit(url).hostname or "-"
+    app = current_app()
+    OUTBOUND_REQUESTS.inc((app, host, "ok" if ok else "error"))
+    OUTBOUND_DURATION.observe((app, host), seconds)
+
+
+_requests_patched = False
+
+
+def instrument_requests():
+    """Time every call made through the `requests` library (idempotent)."""
+    global _requests_patched
+    if _requests_patched:
+        return
+    try:
+        from requests.adapters import HTTPAdapter
+    except ImportError:
+        return
+    original_send = HTTPAdapter.send
+
+    def send(self, request, *args, **kwargs):
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            response = original_send(self, request, *args, **kwargs)
+            ok = response.status_code < 500
+            return response
+        finally:
+            record_outbound(request.url, time.perf_counter() - t0, ok)
+
+    HTTPAdapter.send = send
+    _requests_patched = True
+
+
+def _extra_lines():
+    from core import user_cache
+    stats = user_cache.stats()
+    lines = [
+        "# HELP app404_user_cache_lookups_total JWT user cache lookups, by result.",
+        "# TYPE app404_user_cache_lookups_total counter",
+    ]
+    for result in ("hits", "shared_hits", "misses"):
+        lines.append(f'app404_user_cache_lookups_total{{result="{result}"}} {stats[result]}')
+    lines += [
+        "# HELP app404_user_cache_entries Entries in the in-process user cache.",
+        "# TYPE app404_user_cache_entries gauge",
+        f"app404_user_cache_entries {stats['size']}",
+    ]
+    return lines
+
+
+_collectors = [_extra_lines]
+
+
+def register_collector(fn):
+    """Add a callable returning extra exposition lines (gauges kept elsewhere)."""
+    _collectors.append(fn)
+    return fn
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _lock:
+        for metric in REGISTRY:
+            getattr(metric, "_values", getattr(metric, "_series", {})).clear()
@@ -1,11 +1,15 @@
-from django.contrib.auth import get_user_model
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.utils.deprecation import MiddlewareMixin
 from jwt import ExpiredSignatureError, InvalidTokenError
 
+from core import metrics, user_cache
 from core.jwt_utils import decode_token
 
-User = get_user_model()
-
 
 class JWTAuthenticationMiddleware(MiddlewareMixin):
     """
@@ -32,14 +36,67 @@ class JWTAuthenticationMiddleware(MiddlewareMixin):
 
             user_id = payload.get("sub")
             tv = payload.get("tv")
-            user = User.objects.filter(id=user_id, is_active=True).first()
+            user = user_cache.get_user(user_id, tv)
             if not user:
                 return
 
-            if user.token_version != tv:
-                return
-
             request.user = user
             request.jwt_payload = payload
         except (ExpiredSignatureError, InvalidTokenError):
             return
+
+
+class RequestMetricsMiddleware:
+    """
+    Records wall time, DB queries/time per database alias, outbound HTTP calls and
+    response size for every request into core.metrics (served at /api/metrics/).
+    Removes itself at startup unless METRICS_ENABLED is set.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        metrics.instrument_requests()
+
+    def __call__(self, request):
+        app = self._team_app(request.path)
+        db_stats = {}
+
+        t0 = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(self._db_wrapper(alias, db_stats)))
+            stack.enter_context(metrics.request_scope(app))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - t0
+
+        match = getattr(request, "resolver_match", None)
+        route = match.route if match else "<unmatched>"
+        metrics.REQUEST_DURATION.observe((app, route, request.method, f"{response.status_code // 100}xx"), elapsed)
+        if response.streaming:
+            size = int(response.get("Content-Length") or 0)
+        else:
+            size = len(response.content)
+        metrics.RESPONSE_SIZE.observe((app, route), size)
+        for alias, (count, seconds) in db_stats.items():
+            metrics.DB_QUERIES.observe((app, alias), count)
+            metrics.DB_TIME.observe((app, alias), seconds)
+        return response
+
+    @staticmethod
+    def _team_app(path):
+        prefix = path.lstrip("/").split("/", 1)[0]
+        return prefix if prefix in settings.TEAM_APPS else "core"
+
+    @staticmethod
+    def _db_wrapper(alias, db_stats):
+        def wrapper(execute, sql, params, many, context):
+            t0 = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                stats = db_stats.setdefault(alias, [0, 0.0])
+                stats[0] += 1
+                stats[1] += time.perf_counter() - t0
+        return wrapper
@@ -0,0 +1,73 @@
+"""
+Query budgets for list endpoints (tests only).
+
+    from core.query_budget import QueryBudgetMixin
+
+    class PlaceListBudgetTests(QueryBudgetMixin, TestCase):
+        databases = {"default", "team13"}
+
+        def test_place_list(self):
+            self.assertQueryBudget(
+                "team13 place_list", "/team13/places/", make_places, budget=20,
+                data={"format": "json"},
+            )
+
+The endpoint is rendered with 10 and then 100 rows (make_rows(n) tops the data up
+to n rows); the query count, summed over every database alias of the test case,
+must be the same at both sizes and within `budget`. Per-row lookups (N+1) fail the
+first check, a new query on the hot path the second. A table of every endpoint
+checked is printed when the test process exits.
+"""
+import atexit
+import sys
+from contextlib import ExitStack
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+SIZES = (10, 100)
+
+_report = []
+
+
+def _print_report():
+    if not _report:
+        return
+    w = max(len(row[0]) for row in _report)
+    sizes = "".join(f"{f'@{n}':>7}" for n in SIZES)
+    lines = [f"\nQuery budgets\n{'endpoint'.ljust(w)}{sizes}{'budget':>8}  status"]
+    for name, counts, budget, ok in _report:
+        lines.append(f"{name.ljust(w)}{''.join(f'{c:>7}' for c in counts)}{budget:>8}  {'ok' if ok else 'OVER'}")
+    sys.stderr.write("\n".join(lines) + "\n")
+
+
+atexit.register(_print_report)
+
+
+class QueryBudgetMixin:
+    query_budget_sizes = SIZES
+
+    def count_queries(self, fn, aliases=None):
+        """(result of fn(), {alias: [sql, ...]}) for the queries fn ran."""
+        aliases = sorted(aliases or getattr(self, "databases", None) or ["default"])
+        with ExitStack() as stack:
+            captured = {a: stack.enter_context(CaptureQueriesContext(connections[a])) for a in aliases}
+            result = fn()
+        return result, {a: [q["sql"] for q in ctx.captured_queries] for a, ctx in captured.items()}
+
+    def assertQueryBudget(self, name, url, make_rows, budget, data=None, method="get", aliases=None):
+        counts, queries = [], {}
+        for n in self.query_budget_sizes:
+            make_rows(n)
+            response, queries = self.count_queries(
+                lambda: getattr(self.client, method)(url, data), aliases
+            )
+            self.assertEqual(response.status_code, 200, f"{name}: HTTP {response.status_code} at {n} rows")
+            counts.append(sum(len(q) for q in queries.values()))
+
+        ok = len(set(counts)) == 1 and counts[-1] <= budget
+        _report.append((name, counts, budget, ok))
+        if not ok:
+            listing = "\n".join(f"  [{alias}] {sql}" for alias, sqls in queries.items() for sql in sqls)
+            sizes = ", ".join(f"{c} at {n} rows" for n, c in zip(self.query_budget_sizes, counts))
+            self.fail(f"{name}: {sizes} (budget {budget}). Queries at {self.query_budget_sizes[-1]} rows:\n{listing}")
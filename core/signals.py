@@ -0,0 +1,15 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core import user_cache
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_cached_user(sender, instance, **kwargs):
+    # logout bumps token_version by one, so the previous version may still be cached
+    tv = instance.token_version
+    user_cache.invalidate(instance.id, token_versions=[tv, tv - 1] if tv else [tv])
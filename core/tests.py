@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -22,3 +22,380 @@ class AuthFlowTests(TestCase):
         # logout
         res3 = self.client.post("/api/auth/logout/", data="{}", content_type="application/json")
         self.assertEqual(res3.status_code, 200)
+
+
+class UserCacheTests(TestCase):
+    def setUp(self):
+        from core import user_cache
+        self.user_cache = user_cache
+        user_cache.clear()
+        self.user = User.objects.create_user(email="c@test.com", password="x-Strong-pass-91")
+
+    def _me(self, token):
+        return self.client.get("/api/auth/me/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_repeated_requests_hit_cache(self):
+        from core.jwt_utils import create_access_token
+        token = create_access_token(self.user)
+
+        self.assertEqual(self._me(token).status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self._me(token).status_code, 200)
+
+        stats = self.user_cache.stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_token_version_bump_invalidates(self):
+        from core.jwt_utils import create_access_token
+        token = create_access_token(self.user)
+        self.assertEqual(self._me(token).status_code, 200)
+
+        self.user.token_version += 1
+        self.user.save(update_fields=["token_version"])
+        self.assertEqual(self._me(token).status_code, 401)
+
+    def test_deactivation_invalidates(self):
+        from core.jwt_utils import create_access_token
+        token = create_access_token(self.user)
+        self.assertEqual(self._me(token).status_code, 200)
+
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        self.assertEqual(self._me(token).status_code, 401)
+
+
+class VerifyBulkTests(TestCase):
+    def test_bulk_verify_keeps_order(self):
+        import json
+        from core.jwt_utils import create_access_token, create_refresh_token
+        u1 = User.objects.create_user(email="b1@test.com", password="x-Strong-pass-91")
+        u2 = User.objects.create_user(email="b2@test.com", password="x-Strong-pass-91")
+        tokens = [create_access_token(u1), "garbage", create_refresh_token(u2), create_access_token(u2)]
+
+        res = self.client.post(
+            "/api/auth/verify/bulk/",
+            data=json.dumps({"tokens": tokens}),
+            content_type="application/json",
+        )
+        self.assertEqual(res.status_code, 200)
+        results = res.json()["results"]
+        self.assertEqual([r["valid"] for r in results], [True, False, False, True])
+        self.assertEqual(results[0]["user"]["email"], "b1@test.com")
+        self.assertEqual(results[3]["user"]["id"], str(u2.id))
+
+    def test_bulk_verify_rejects_bad_body(self):
+        res = self.client.post("/api/auth/verify/bulk/", data='{"tokens": "x"}', content_type="application/json")
+        self.assertEqual(res.status_code, 400)
+
+
+class LazyURLResolverTests(TestCase):
+    def test_urlconf_imported_on_first_match(self):
+        from core.lazy_urls import lazy_include
+        resolver = lazy_include("team1/", "team1.urls")
+        self.assertFalse(resolver.loaded)
+        self.assertEqual(resolver.url_patterns, [])
+
+        from django.urls import Resolver404
+        with self.assertRaises(Resolver404):
+            resolver.resolve("team2/ping/")
+        self.assertFalse(resolver.loaded)
+
+        match = resolver.resolve("team1/ping/")
+        self.assertTrue(resolver.loaded)
+        self.assertEqual(match.func.__module__, "team1.views")
+
+
+class GeoTests(SimpleTestCase):
+    TEHRAN = (35.6892, 51.3890)
+    SHIRAZ = (29.5918, 52.5837)
+    ISFAHAN = (32.6546, 51.6680)
+
+    def test_vectorized_matches_scalar(self):
+        from core.geo import haversine_km, haversine_km_many, haversine_matrix
+        lats, lons = zip(self.SHIRAZ, self.ISFAHAN)
+        many = haversine_km_many(*self.TEHRAN, lats, lons)
+        self.assertAlmostEqual(many[0], haversine_km(*self.TEHRAN, *self.SHIRAZ), places=6)
+        self.assertAlmostEqual(many[1], 337, delta=5)
+        matrix = haversine_matrix([self.TEHRAN[0]], [self.TEHRAN[1]], lats, lons)
+        self.assertEqual(matrix.shape, (1, 2))
+        self.assertAlmostEqual(matrix[0, 1], many[1], places=6)
+
+    def test_within_radius_and_k_nearest(self):
+        from core.geo import k_nearest, within_radius
+        lats = [self.SHIRAZ[0], None, self.ISFAHAN[0], self.TEHRAN[0]]
+        lons = [self.SHIRAZ[1], 51.0, self.ISFAHAN[1], self.TEHRAN[1]]
+
+        idx, dist = within_radius(*self.TEHRAN, lats, lons, 400)
+        self.assertEqual(list(idx), [3, 2])
+        self.assertAlmostEqual(dist[0], 0.0)
+
+        idx, _ = k_nearest(*self.TEHRAN, lats, lons, 2)
+        self.assertEqual(list(idx), [3, 2])
+
+    def test_bounding_box_contains_circle(self):
+        from core.geo import bounding_box, haversine_km
+        min_lat, max_lat, min_lon, max_lon = bounding_box(*self.TEHRAN, 50)
+        self.assertAlmostEqual(haversine_km(*self.TEHRAN, max_lat, self.TEHRAN[1]), 50, delta=0.01)
+        self.assertGreaterEqual(haversine_km(*self.TEHRAN, self.TEHRAN[0], max_lon), 50)
+
+    def test_geohash_round_trip(self):
+        from core.geo import geohash_decode, geohash_encode
+        self.assertEqual(geohash_encode(57.64911, 10.40744, 11), "u4pruydqqvj")
+        lat, lon, lat_err, lon_err = geohash_decode(geohash_encode(*self.TEHRAN, 7))
+        self.assertLessEqual(abs(lat - self.TEHRAN[0]), lat_err)
+        self.assertLessEqual(abs(lon - self.TEHRAN[1]), lon_err)
+
+
+class BenchmarkCompareTests(SimpleTestCase):
+    BASE = {"s": {"rps": 100.0, "p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 30.0, "errors": 0}}
+
+    def row(self, **overrides):
+        return {"requests": 200, **self.BASE["s"], **overrides}
+
+    def test_within_tolerance_passes(self):
+        from benchmarks.runner import compare
+        results = {"s": self.row(rps=80.0, p95_ms=25.0), "other": {"skipped": "needs x"}}
+        self.assertEqual(compare(results, self.BASE, 0.3), [])
+
+    def test_latency_throughput_and_errors_fail(self):
+        from benchmarks.runner import compare
+        problems = compare({"s": self.row(rps=60.0, p95_ms=40.0, errors=3)}, self.BASE, 0.3)
+        self.assertEqual(len(problems), 3)
+        self.assertTrue(any("p95_ms" in p for p in problems))
+        self.assertTrue(any("throughput" in p for p in problems))
+        self.assertTrue(any("3 of 200" in p for p in problems))
+
+
+class LoadDataTests(TestCase):
+    databases = {"default", "team13", "team2"}
+
+    def fill(self, team, start, stop, seed=7):
+        from core import load_data
+        prepare, _, fill = load_data.GENERATORS[team]
+        ctx = load_data.Context(stop, seed, load_data.create_users(stop, seed, 500))
+        return fill(ctx, prepare(ctx), start, stop, load_data.chunk_rng(seed, team, start), 500)
+
+    def test_places_are_near_their_city(self):
+        from core.geo import haversine_km
+        from core.load_data import CITIES
+        from team13.models import Place, PlaceTranslation
+        self.fill("team13", 0, 200)
+        self.assertEqual(Place.objects.count(), 200)
+        self.assertEqual(PlaceTranslation.objects.filter(lang="fa").count(), 200)
+        centres = {c[0]: (c[4], c[5]) for c in CITIES}
+        for place in Place.objects.all():
+            self.assertLess(haversine_km(*centres[place.city], place.latitude, place.longitude), 150)
+
+    def test_chunks_are_disjoint_and_consistent(self):
+        from team2.models import Article, Version, Vote
+        rows = self.fill("team2", 0, 30) + self.fill("team2", 30, 60)
+        self.assertEqual(Article.objects.count(), 60)
+        self.assertFalse(Article.objects.filter(current_version=None).exists())
+        self.assertEqual(rows, sum(m.objects.count() for m in (Article, Version, Version.tags.through, Vote)))
+        article = Article.objects.get(name="load-0")
+        self.assertEqual(article.score, sum(v.value for v in article.votes.all()))
+
+
+@override_settings(METRICS_ENABLED=True)
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        from core import metrics
+        metrics.reset()
+
+    def test_request_recorded_and_exposed(self):
+        self.client.get("/api/health/")
+        res = self.client.get("/api/metrics/")
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res["Content-Type"].startswith("text/plain"))
+        body = res.content.decode()
+        self.assertIn(
+            'app404_http_request_duration_seconds_count{app="core",route="api/health/",method="GET",status="2xx"} 1',
+            body,
+        )
+        self.assertIn("app404_user_cache_lookups_total", body)
+
+    def test_db_queries_counted_per_alias(self):
+        from core.jwt_utils import create_access_token
+        from core import user_cache
+        user_cache.clear()
+        user = User.objects.create_user(email="m@test.com", password="x-Strong-pass-91")
+        self.client.get("/api/auth/me/", HTTP_AUTHORIZATION=f"Bearer {create_access_token(user)}")
+        body = self.client.get("/api/metrics/").content.decode()
+        self.assertIn('app404_db_queries_per_request_count{app="core",alias="default"} 1', body)
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_token_required_when_configured(self):
+        self.assertEqual(self.client.get("/api/metrics/").status_code, 401)
+        self.assertEqual(self.client.get("/api/metrics/", HTTP_AUTHORIZATION="Bearer s3cre").status_code, 401)
+        res = self.client.get("/api/metrics/", HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertEqual(res.status_code, 200)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_not_served_when_disabled(self):
+        self.assertEqual(self.client.get("/api/metrics/").status_code, 404)
+
+
+class HttpClientTests(SimpleTestCase):
+    """core.http against a throwaway local server."""
+
+    @classmethod
+    def setUpClass(cls):
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        super().setUpClass()
+        cls.hits = {}
+        cls.fail_next = {}
+        hits, fail_next = cls.hits, cls.fail_next
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                import time
+                path = self.path.split("?")[0]
+                hits[path] = hits.get(path, 0) + 1
+                if path == "/slow":
+                    time.sleep(0.2)
+                status = 503 if fail_next.get(path, 0) > 0 else 200
+                if status == 503:
+                    fail_next[path] -= 1
+                body = f'{{"n": {hits[path]}}}'.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        cls.base = f"http://127.0.0.1:{cls.server.server_port}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        from core.http import HttpClient
+        self.hits.clear()
+        self.fail_next.clear()
+        self.http = HttpClient(backoff=0.01, breaker_threshold=3, breaker_cooldown=60)
+
+    def test_retries_transient_status(self):
+        self.fail_next["/flaky"] = 2
+        res = self.http.get(f"{self.base}/flaky")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.hits["/flaky"], 3)
+        self.assertEqual(self.http.stats()["retries"], 2)
+
+    def test_no_retry_when_disabled(self):
+        self.fail_next["/flaky"] = 1
+        res = self.http.request("GET", f"{self.base}/flaky", retries=0)
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(self.hits["/flaky"], 1)
+
+    def test_cache_key_ignores_param_order(self):
+        a = self.http.get(f"{self.base}/c?b=2", params={"a": 1}, cache_ttl=60)
+        b = self.http.get(f"{self.base}/c", params={"b": 2, "a": "1"}, cache_ttl=60)
+        self.assertEqual(a.json(), b.json())
+        self.assertEqual(self.hits["/c"], 1)
+        self.http.get(f"{self.base}/c", params={"a": 1}, cache_ttl=60)
+        self.assertEqual(self.hits["/c"], 2)
+
+    def test_error_responses_not_cached(self):
+        self.fail_next["/e"] = 1
+        self.assertEqual(self.http.get(f"{self.base}/e", retries=0, cache_ttl=60).status_code, 503)
+        self.assertEqual(self.http.get(f"{self.base}/e", retries=0, cache_ttl=60).status_code, 200)
+
+    def test_concurrent_identical_requests_coalesced(self):
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda _: self.http.get(f"{self.base}/slow", cache_ttl=60).json(), range(8)))
+        self.assertEqual(self.hits["/slow"], 1)
+        self.assertEqual(results, [{"n": 1}] * 8)
+
+    def test_circuit_opens_after_repeated_failures(self):
+        from core.http import CircuitOpenError
+        self.fail_next["/down"] = 100
+        for _ in range(3):
+            self.http.get(f"{self.base}/down", retries=0)
+        self.assertTrue(self.http.circuit_open(self.base))
+        with self.assertRaises(CircuitOpenError):
+            self.http.get(f"{self.base}/other")
+        self.assertNotIn("/other", self.hits)
+
+    def test_half_open_circuit_admits_a_single_probe(self):
+        from unittest import mock
+        from core.http import _Circuit
+        circuit = _Circuit(threshold=1, cooldown=10)
+        with mock.patch("core.http.time.monotonic", return_value=100.0):
+            circuit.record(False)
+            self.assertFalse(circuit.allow())
+        with mock.patch("core.http.time.monotonic", return_value=110.0):
+            self.assertTrue(circuit.allow())
+            self.assertFalse(circuit.allow())
+            circuit.record(False)
+            self.assertFalse(circuit.allow())
+        with mock.patch("core.http.time.monotonic", return_value=120.0):
+            self.assertTrue(circuit.allow())
+            self.assertFalse(circuit.allow())
+        # a probe that never reports back is given up after a cooldown
+        with mock.patch("core.http.time.monotonic", return_value=130.0):
+            self.assertTrue(circuit.allow())
+            circuit.record(True)
+            self.assertTrue(circuit.allow())
+            self.assertTrue(circuit.allow())
+
+    def test_deadline_bounds_retries(self):
+        import requests
+        self.fail_next["/flaky"] = 100
+        self.http.backoff = self.http.max_backoff = 0.5
+        self.http.breaker_threshold = 100
+        with self.assertRaises(requests.Timeout):
+            self.http.get(f"{self.base}/flaky", retries=50, deadline=0.3)
+
+    def test_async_client_retries_and_coalesces(self):
+        import asyncio
+        from unittest import mock
+        from core.async_http import AsyncHttpClient
+        client = AsyncHttpClient(backoff=0.01)
+        self.fail_next["/flaky"] = 1
+
+        async def scenario():
+            flaky = await client.get(f"{self.base}/flaky", params=[("a", 1), ("b", None)])
+            slow = await asyncio.gather(*(client.get(f"{self.base}/slow", cache_ttl=60) for _ in range(5)))
+            return flaky, slow
+
+        with mock.patch("core.async_http.ASGI", True):
+            flaky, slow = asyncio.run(scenario())
+        self.assertEqual((flaky.status_code, self.hits["/flaky"]), (200, 2))
+        self.assertEqual(str(flaky.request.url), f"{self.base}/flaky?a=1")
+        self.assertEqual(self.hits["/slow"], 1)
+        self.assertEqual({r.json()["n"] for r in slow}, {1})
+
+    def test_async_client_under_wsgi_uses_the_pooled_client(self):
+        import asyncio
+        from unittest import mock
+        import httpx
+        from core.async_http import AsyncHttpClient, CircuitOpenError
+        from core.http import HttpClient
+        client = AsyncHttpClient(sync=HttpClient(backoff=0.01, breaker_threshold=1))
+
+        with mock.patch("core.async_http.httpx.AsyncClient") as async_client:
+            # each async view gets an event loop of its own under WSGI
+            first = asyncio.run(client.get(f"{self.base}/a", params=[("q", "x")], cache_ttl=60))
+            second = asyncio.run(client.get(f"{self.base}/a", params={"q": "x"}, cache_ttl=60))
+        async_client.assert_not_called()
+        self.assertIsInstance(first, httpx.Response)
+        self.assertEqual((first.json(), second.json(), self.hits["/a"]), ({"n": 1}, {"n": 1}, 1))
+
+        self.fail_next["/down"] = 1
+        self.assertEqual(asyncio.run(client.get(f"{self.base}/down", retries=0)).status_code, 503)
+        with self.assertRaises(CircuitOpenError):
+            asyncio.run(client.get(f"{self.base}/down"))
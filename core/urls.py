@@ -8,5 +8,7 @@ urlpatterns = [
     path("auth/logout/", views.logout_api),
     path("auth/me/", views.me),
     path("auth/verify/", views.verify),
+    path("auth/verify/bulk/", views.verify_bulk),
     path("health/", views.health),
+    path("metrics/", views.metrics),
 ]
\ No newline at end of file
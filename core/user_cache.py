@@ -0,0 +1,193 @@
+"""
+Short-lived cache of active users, keyed by the (sub, tv) pair carried in access tokens.
+
+Two tiers:
+  * a bounded in-process LRU (per worker, no network hop)
+  * an optional shared tier on top of Django's cache framework (USER_CACHE_ALIAS)
+
+Entries are dropped by core.signals whenever a user is saved (logout bumps
+token_version, admins flip is_active, ...). Other workers' in-process tiers are
+only bounded by USER_CACHE_TTL_SECONDS, so keep that TTL short.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+
+_lock = threading.Lock()
+_local = OrderedDict()
+_stats = {"hits": 0, "shared_hits": 0, "misses": 0, "invalidations": 0}
+
+
+def _ttl() -> int:
+    return getattr(settings, "USER_CACHE_TTL_SECONDS", 30)
+
+
+def _max_entries() -> int:
+    return getattr(settings, "USER_CACHE_MAX_ENTRIES", 2048)
+
+
+def _shared():
+    alias = getattr(settings, "USER_CACHE_ALIAS", None)
+    if not alias:
+        return None
+    from django.core.cache import caches
+    return caches[alias]
+
+
+def _shared_key(user_id, tv) -> str:
+    return f"core:user:{user_id}:{tv}"
+
+
+def _count(name: str):
+    with _lock:
+        _stats[name] += 1
+
+
+def _local_get(key):
+    with _lock:
+        entry = _local.get(key)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del _local[key]
+            return None
+        _local.move_to_end(key)
+    # views mutate request.user (logout bumps token_version), never hand out the cached instance
+    return copy.copy(user)
+
+
+def _local_set(key, user):
+    user = copy.copy(user)
+    with _lock:
+        _local[key] = (time.monotonic() + _ttl(), user)
+        _local.move_to_end(key)
+        while len(_local) > _max_entries():
+            _local.popitem(last=False)
+
+
+def _cached(key):
+    user = _local_get(key)
+    if user is not None:
+        _count("hits")
+        return user
+
+    shared = _shared()
+    if shared is not None:
+        user = shared.get(_shared_key(*key))
+        if user is not None:
+            _count("shared_hits")
+            _local_set(key, user)
+            return user
+
+    _count("misses")
+    return None
+
+
+def _store(key, user):
+    _local_set(key, user)
+    shared = _shared()
+    if shared is not None:
+        shared.set(_shared_key(*key), user, _ttl())
+
+
+def get_user(user_id, tv):
+    """
+    Return the active user whose id is `user_id` and whose token_version equals `tv`,
+    or None. Only hits the database on a miss in both tiers.
+    """
+    if user_id is None or tv is None or _ttl() <= 0:
+        return _load(user_id, tv)
+
+    key = (str(user_id), tv)
+    user = _cached(key)
+    if user is None:
+        user = _load(user_id, tv)
+        if user is not None:
+            _store(key, user)
+    return user
+
+
+def get_users(pairs):
+    """
+    Bulk variant of get_user for many (user_id, tv) pairs.
+    Returns {(str(user_id), tv): user} for the valid pairs; all misses share one query.
+    """
+    found, missing = {}, set()
+    for user_id, tv in pairs:
+        if user_id is None or tv is None:
+            continue
+        key = (str(user_id), tv)
+        if key in found or key in missing:
+            continue
+        user = _cached(key) if _ttl() > 0 else None
+        if user is None:
+            missing.add(key)
+        else:
+            found[key] = user
+
+    if missing:
+        User = get_user_model()
+        ids = set()
+        for uid, _ in missing:
+            try:
+                ids.add(User._meta.pk.to_python(uid))
+            except ValidationError:
+                continue
+        loaded = {str(u.id): u for u in User.objects.filter(id__in=ids, is_active=True)} if ids else {}
+        for key in missing:
+            user = loaded.get(key[0])
+            if user is not None and user.token_version == key[1]:
+                found[key] = user
+                if _ttl() > 0:
+                    _store(key, user)
+    return found
+
+
+def _load(user_id, tv):
+    User = get_user_model()
+    try:
+        user = User.objects.filter(id=user_id, is_active=True).first()
+    except (ValidationError, ValueError, TypeError):
+        # malformed uuid in `sub`
+        return None
+    if not user or user.token_version != tv:
+        return None
+    return user
+
+
+def invalidate(user_id, token_versions=()):
+    """
+    Drop every cached entry for `user_id`. The shared tier is keyed by tv, so the
+    caller passes the token versions that may still be cached there.
+    """
+    uid = str(user_id)
+    with _lock:
+        for key in [k for k in _local if k[0] == uid]:
+            del _local[key]
+        _stats["invalidations"] += 1
+
+    shared = _shared()
+    if shared is not None and token_versions:
+        shared.delete_many([_shared_key(uid, tv) for tv in token_versions])
+
+
+def clear():
+    with _lock:
+        _local.clear()
+        for name in _stats:
+            _stats[name] = 0
+
+
+def stats() -> dict:
+    with _lock:
+        data = dict(_stats)
+        data["size"] = len(_local)
+    lookups = data["hits"] + data["shared_hits"] + data["misses"]
+    data["hit_rate"] = (data["hits"] + data["shared_hits"]) / lookups if lookups else 0.0
+    return data
@@ -0,0 +1,86 @@
+"""
+In-process token verification for team apps.
+
+Team apps running inside the monolith should call these helpers instead of
+looping back over HTTP to /api/auth/verify/ or /api/auth/me/: tokens are decoded
+locally with core.jwt_utils.decode_token and users are resolved through
+core.user_cache. Apps deployed out of process (no `core` app installed) keep
+their HTTP call to CORE_BASE_URL; see `in_process()`.
+"""
+from django.apps import apps
+from jwt import InvalidTokenError
+
+from core import user_cache
+from core.jwt_utils import decode_token
+
+
+def in_process() -> bool:
+    return apps.is_installed("core")
+
+
+def user_claims(user) -> dict:
+    """The same fields /api/auth/verify/ exposes as X-User-* headers."""
+    return {
+        "id": str(user.id),
+        "email": user.email,
+        "first_name": user.first_name or "",
+        "last_name": user.last_name or "",
+        "age": user.age,
+    }
+
+
+def _access_payload(token):
+    if not token:
+        return None
+    try:
+        payload = decode_token(token)
+    except InvalidTokenError:
+        return None
+    if payload.get("type") != "access":
+        return None
+    return payload
+
+
+def verify_token(token):
+    """Return user_claims() for a valid access token, else None."""
+    payload = _access_payload(token)
+    if payload is None:
+        return None
+    user = user_cache.get_user(payload.get("sub"), payload.get("tv"))
+    return user_claims(user) if user else None
+
+
+def verify_tokens(tokens):
+    """
+    Verify many access tokens at once. Returns a list aligned with `tokens`
+    holding user_claims() or None; uncached users are loaded with one query.
+    """
+    payloads = [_access_payload(t) for t in tokens]
+    users = user_cache.get_users(
+        (p.get("sub"), p.get("tv")) for p in payloads if p is not None
+    )
+
+    results = []
+    for payload in payloads:
+        user = None
+        if payload is not None:
+            user = users.get((str(payload.get("sub")), payload.get("tv")))
+        results.append(user_claims(user) if user else None)
+    return results
+
+
+def verify_request(request):
+    """
+    Claims for the caller of `request`. JWTAuthenticationMiddleware has usually
+    resolved request.user already; otherwise the cookie/Bearer token is decoded here.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and getattr(user, "is_authenticated", False):
+        return user_claims(user)
+
+    token = request.COOKIES.get("access_token")
+    if not token:
+        auth = request.headers.get("Authorization", "")
+        if auth.startswith("Bearer "):
+            token = auth.split(" ", 1)[1].strip()
+    return verify_token(token)
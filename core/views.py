@@ -1,5 +1,6 @@
+import hmac
 import json
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth import authenticate, get_user_model
@@ -8,10 +9,14 @@ from django.core.exceptions import ValidationError
 from django.contrib.auth.password_validation import validate_password
 
 from core.jwt_utils import create_access_token, create_refresh_token, decode_token
+from core import metrics as request_metrics
 from core.auth import api_login_required
+from core.verifier import verify_tokens
 
 User = get_user_model()
 
+VERIFY_BULK_MAX_TOKENS = 200
+
 
 def _set_auth_cookies(resp: JsonResponse, access: str, refresh: str, settings):
     resp.set_cookie(
@@ -43,6 +48,18 @@ def health(request):
     return JsonResponse({"status": "ok"})
 
 
+def metrics(request):
+    from django.conf import settings
+
+    if not getattr(settings, "METRICS_ENABLED", False):
+        raise Http404
+    token = getattr(settings, "METRICS_TOKEN", "")
+    sent = request.headers.get("Authorization", "")
+    if token and not hmac.compare_digest(sent.encode(), f"Bearer {token}".encode()):
+        return JsonResponse({"detail": "Authentication required"}, status=401)
+    return HttpResponse(request_metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @csrf_exempt
 @require_POST
 def signup_api(request):
@@ -199,3 +216,28 @@ def verify(request):
     resp["X-User-Last-Name"] = u.last_name or ""
     resp["X-User-Age"] = str(u.age or "")
     return resp
+
+
+@csrf_exempt
+@require_POST
+def verify_bulk(request):
+    """
+    Service-to-service verification of many access tokens in one call.
+    Body: {"tokens": ["<jwt>", ...]}; results come back in the same order.
+    """
+    try:
+        data = json.loads(request.body.decode("utf-8"))
+    except Exception:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+    tokens = data.get("tokens") if isinstance(data, dict) else None
+    if not isinstance(tokens, list) or not all(isinstance(t, str) for t in tokens):
+        return JsonResponse({"error": "tokens must be a list of strings"}, status=400)
+    if len(tokens) > VERIFY_BULK_MAX_TOKENS:
+        return JsonResponse({"error": f"at most {VERIFY_BULK_MAX_TOKENS} tokens per request"}, status=400)
+
+    results = [
+        {"valid": claims is not None, "user": claims}
+        for claims in verify_tokens(tokens)
+    ]
+    return JsonResponse({"ok": True, "results": results})
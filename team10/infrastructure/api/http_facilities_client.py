@@ -3,13 +3,15 @@ HTTP implementation of FacilitiesServicePort calling Team 4 Facilities API.
 Uses api_integration_guide.json: SearchRegions, GetPlacesInRegion, GetNearbyPlaces, GetPlaceByIds.
 GetTravelEstimates is not implemented by the API; we compute a local estimate.
 """
-import math
 import logging
 from typing import List, Optional
 from datetime import datetime
 
 import requests
 
+from core.geo import haversine_km
+from core.http import client as http_client
+
 from ..ports.facilities_service_port import FacilitiesServicePort
 from ..models.region import Region
 from ..models.search_criteria import SearchCriteria
@@ -45,15 +47,17 @@ class HttpFacilitiesClient(FacilitiesServicePort):
     Maps the external API to the internal Facility/Region/TravelInfo models.
     """
 
-    def __init__(self, base_url: str = "http://localhost:8000", timeout: int = 10):
+    def __init__(self, base_url: str = "http://localhost:8000", timeout: int = 10, cache_ttl: int = 300):
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
-        self._session = requests.Session()
+        # GETs (regions, places, nearby) are cached by core.http; POSTs never are
+        self.cache_ttl = cache_ttl
+        self._http = http_client
 
     def _get(self, path: str, params: Optional[dict] = None) -> Optional[dict]:
         url = f"{self.base_url}{path}"
         try:
-            r = self._session.get(url, params=params, timeout=self.timeout)
+            r = self._http.get(url, params=params, timeout=self.timeout, cache_ttl=self.cache_ttl)
             r.raise_for_status()
             return r.json()
         except requests.RequestException as e:
@@ -63,7 +67,7 @@ class HttpFacilitiesClient(FacilitiesServicePort):
     def _post(self, path: str, json: Optional[dict] = None, params: Optional[dict] = None) -> Optional[dict]:
         url = f"{self.base_url}{path}"
         try:
-            r = self._session.post(url, json=json or {}, params=params, timeout=self.timeout)
+            r = self._http.post(url, json=json or {}, params=params, timeout=self.timeout)
             r.raise_for_status()
             return r.json()
         except requests.RequestException as e:
@@ -211,13 +215,7 @@ class HttpFacilitiesClient(FacilitiesServicePort):
 
     @staticmethod
     def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-        R = 6371
-        lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        return R * c
+        return haversine_km(lat1, lon1, lat2, lon2)
 
     @staticmethod
     def _normalize_category(raw: str) -> str:
@@ -8,6 +8,8 @@ from typing import List
 
 import requests
 
+from core.http import client as http_client
+
 from ..ports.recommendation_service_port import RecommendationServicePort
 from ..models.recommended_place import RecommendedPlace
 from ...domain.enums.season import Season
@@ -29,6 +31,7 @@ class HttpRecommendationClient(RecommendationServicePort):
         default_budget_level: str = "MODERATE",
         default_trip_duration_days: int = 3,
         limit_places: int = 50,
+        cache_ttl: int = 60,
     ):
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
@@ -36,7 +39,8 @@ class HttpRecommendationClient(RecommendationServicePort):
         self.default_budget_level = default_budget_level
         self.default_trip_duration_days = default_trip_duration_days
         self.limit_places = min(50, max(1, limit_places))
-        self._session = requests.Session()
+        self.cache_ttl = cache_ttl
+        self._http = http_client
 
     def get_recommendations(
         self,
@@ -59,7 +63,7 @@ class HttpRecommendationClient(RecommendationServicePort):
         }
         url = f"{self.base_url}{path}"
         try:
-            r = self._session.get(url, params=params, timeout=self.timeout)
+            r = self._http.get(url, params=params, timeout=self.timeout, cache_ttl=self.cache_ttl)
             r.raise_for_status()
             data = r.json()
         except requests.RequestException as e:
@@ -8,6 +8,7 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(c
 
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
+from core.http import client as http_client
 from team10.infrastructure.ports.wiki_service_port import WikiServicePort
 
 logging.basicConfig(level=logging.INFO)
@@ -36,7 +37,7 @@ class HttpWikiClient(WikiServicePort):
         params = {"place": destination_name}
 
         try:
-            response = requests.get(endpoint, params=params, timeout=5)
+            response = http_client.get(endpoint, params=params, timeout=5, cache_ttl=600)
             
             if response.status_code == 200:
                 data = response.json()
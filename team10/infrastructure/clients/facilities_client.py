@@ -1,7 +1,8 @@
-import math
 from typing import List, Optional, Dict
 from datetime import datetime
 
+from core.geo import haversine_km, haversine_km_many
+
 from ..ports.facilities_service_port import FacilitiesServicePort
 from ..models.region import Region
 from ..models.search_criteria import SearchCriteria
@@ -509,17 +510,16 @@ class MockFacilitiesClient(FacilitiesServicePort):
 
     def find_facilities_in_area(self, criteria: SearchCriteria) -> List[Facility]:
         """Find facilities matching search criteria."""
-        results = []
-        for facility in self._facility_cache.values():
-            # Check distance from criteria center
-            distance = self._calculate_distance(
-                criteria.latitude, criteria.longitude,
-                facility.latitude, facility.longitude
-            )
-            if distance <= criteria.radius:
-                if criteria.facility_type is None or facility.facility_type == criteria.facility_type:
-                    results.append(facility)
-        return results
+        facilities = [
+            f for f in self._facility_cache.values()
+            if criteria.facility_type is None or f.facility_type == criteria.facility_type
+        ]
+        # Distance from criteria center, computed for all candidates at once
+        distances = haversine_km_many(
+            criteria.latitude, criteria.longitude,
+            [f.latitude for f in facilities], [f.longitude for f in facilities]
+        )
+        return [f for f, d in zip(facilities, distances) if d <= criteria.radius]
 
     def get_cost_estimate(
         self,
@@ -622,15 +622,4 @@ class MockFacilitiesClient(FacilitiesServicePort):
         
         Returns distance in kilometers.
         """
-        R = 6371  # Earth's radius in kilometers
-        
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        delta_lat = math.radians(lat2 - lat1)
-        delta_lon = math.radians(lon2 - lon1)
-        
-        a = (math.sin(delta_lat / 2) ** 2 +
-             math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon / 2) ** 2)
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        
-        return R * c
+        return haversine_km(lat1, lon1, lat2, lon2)
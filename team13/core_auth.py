@@ -1,5 +1,6 @@
 # یکپارچه‌سازی با احراز هویت Core — مرحله ۶
-# در صورت تنظیم CORE_BASE_URL، وضعیت کاربر از /api/auth/me گرفته می‌شود؛ وگرنه از request.user همین سرور.
+# اگر Core در همین پروسه باشد، توکن به‌صورت محلی (core.verifier) بررسی می‌شود؛
+# فقط وقتی team13 جدا از Core اجرا شود و CORE_BASE_URL تنظیم شده باشد، از /api/auth/me گرفته می‌شود.
 
 import logging
 from django.conf import settings
@@ -11,19 +12,47 @@ def get_current_user_info(request):
     """
     وضعیت کاربر جاری را برمی‌گرداند تا در UI (ورود/خروج، نام کاربر) استفاده شود.
 
-    - اگر CORE_BASE_URL تنظیم شده باشد: درخواست GET به CORE_BASE_URL/api/auth/me/
+    - اگر Core در همین پروسه نصب باشد: core.verifier (بدون درخواست HTTP به خود سرور).
+    - اگر Core جداست و CORE_BASE_URL تنظیم شده باشد: درخواست GET به CORE_BASE_URL/api/auth/me/
       با ارسال کوکی‌های درخواست فعلی؛ در صورت موفقیت خروجی user از JSON.
     - در غیر این صورت: از request.user (همان سرور) استفاده می‌شود.
 
     خروجی در صورت احراز هویت موفق: dict با کلیدهای email, first_name, last_name, age
     در غیر این صورت: None
     """
+    verifier = _core_verifier()
+    if verifier is not None:
+        return _user_from_claims(verifier.verify_request(request))
+
     base_url = getattr(settings, "CORE_BASE_URL", None) or ""
     if base_url:
         return _fetch_user_from_core(request, base_url.rstrip("/"))
     return _user_from_request(request)
 
 
+def _core_verifier():
+    """ماژول core.verifier وقتی Core در همین پروسه است؛ وگرنه None."""
+    try:
+        from django.apps import apps
+        if apps.is_installed("core"):
+            from core import verifier
+            return verifier
+    except ImportError:
+        pass
+    return None
+
+
+def _user_from_claims(claims):
+    if not claims:
+        return None
+    return {
+        "email": claims.get("email") or "",
+        "first_name": claims.get("first_name") or "",
+        "last_name": claims.get("last_name") or "",
+        "age": claims.get("age"),
+    }
+
+
 def _user_from_request(request):
     """استفاده از request.user همین سرور (همان‌دمان با Core)."""
     user = getattr(request, "user", None)
@@ -39,17 +68,13 @@ def _user_from_request(request):
 
 def _fetch_user_from_core(request, base_url):
     """فراخوانی Core برای دریافت وضعیت کاربر با ارسال کوکی."""
-    try:
-        import requests
-    except ImportError:
-        logger.warning("برای فراخوانی Core، پکیج requests لازم است.")
-        return _user_from_request(request)
+    from core.http import client as http_client
 
     url = f"{base_url}/api/auth/me/"
     cookies = dict(request.COOKIES) if request.COOKIES else {}
     headers = {"Accept": "application/json"}
     try:
-        resp = requests.get(url, cookies=cookies, headers=headers, timeout=3)
+        resp = http_client.get(url, cookies=cookies, headers=headers, timeout=3, retries=0)
         if resp.status_code != 200:
             return None
         data = resp.json()
@@ -2,12 +2,19 @@
 # کلید و endpointها را در config تنظیم کنید؛ سپس از توابع این پکیج در views و geo_utils استفاده می‌شود.
 
 from .config import get_api_key, is_configured
-from .routing import fetch_route_eta, fetch_route_eta_no_traffic, fetch_route_eta_pedestrian
-from .geocoding import geocode, reverse_geocode, reverse_geocode_address
+from .routing import (
+    afetch_route_eta,
+    afetch_route_eta_no_traffic,
+    afetch_route_eta_pedestrian,
+    fetch_route_eta,
+    fetch_route_eta_no_traffic,
+    fetch_route_eta_pedestrian,
+)
+from .geocoding import ageocode, areverse_geocode, geocode, reverse_geocode, reverse_geocode_address
 from .search import search_autocomplete, search_count, search_response
 from .tsp import fetch_tsp
 from .distance_matrix import fetch_distance_matrix
-from .isochrone import fetch_isochrone
+from .isochrone import afetch_isochrone, fetch_isochrone
 from .map_matching import fetch_map_matching
 
 __all__ = [
@@ -26,4 +33,11 @@ __all__ = [
     "search_autocomplete",
     "search_count",
     "search_response",
+    # نسخه‌های async برای viewهای async (app404.asgi)
+    "afetch_route_eta",
+    "afetch_route_eta_no_traffic",
+    "afetch_route_eta_pedestrian",
+    "afetch_isochrone",
+    "ageocode",
+    "areverse_geocode",
 ]
@@ -77,7 +77,8 @@ def is_configured():
 
 
 # آدرس پایهٔ API — مستندات: https://platform.neshan.org/docs/api/routing-category/routing/
-NESHAN_API_BASE = "https://api.neshan.org"
+# با NESHAN_API_BASE می‌توان آن را به یک سرور آزمایشی اشاره داد (مثلاً benchmarks/async_concurrency.py).
+NESHAN_API_BASE = os.environ.get("NESHAN_API_BASE") or "https://api.neshan.org"
 # مسیریابی با ترافیک (خودرو/موتور): نوع وسیله type=car|motorcycle اجباری است.
 NESHAN_DIRECTION_PATH = "/v4/direction"
 # مسیریابی بدون ترافیک (فقط خودرو): https://platform.neshan.org/docs/api/routing-category/noTraffic-routing-api/
@@ -98,3 +99,9 @@ NESHAN_SEARCH_PATH = "/v1/search"
 # تبدیل آدرس به مختصات: https://platform.neshan.org/docs/api/search-category/geocoding/
 NESHAN_GEOCODING_PATH = "/geocoding/v1"
 NESHAN_GEOCODING_PLUS_PATH = "/geocoding/v1/plus"
+
+# مدت نگهداری پاسخ‌ها در کش core.http (ثانیه)؛ درخواست‌های یکسان هم‌زمان فقط یک‌بار ارسال می‌شوند.
+# مسیرهای با ترافیک زود کهنه می‌شوند؛ آدرس و مختصات تقریباً ثابت‌اند.
+NESHAN_CACHE_TTL_TRAFFIC = 60
+NESHAN_CACHE_TTL_SEARCH = 300
+NESHAN_CACHE_TTL_STATIC = 24 * 3600
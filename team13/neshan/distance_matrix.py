@@ -4,12 +4,15 @@
 # بدون ترافیک: GET https://api.neshan.org/v1/distance-matrix/no-traffic
 
 import logging
+
+from core.http import client as http_client
 from .config import (
     get_api_key,
     is_configured,
     NESHAN_API_BASE,
     NESHAN_DISTANCE_MATRIX_PATH,
     NESHAN_DISTANCE_MATRIX_NO_TRAFFIC_PATH,
+    NESHAN_CACHE_TTL_TRAFFIC,
 )
 
 logger = logging.getLogger(__name__)
@@ -56,7 +59,6 @@ def fetch_distance_matrix(origins, destinations, vehicle_type=TYPE_CAR, no_traff
     if not origins_str or not destinations_str:
         return None
     try:
-        import requests
         path = NESHAN_DISTANCE_MATRIX_NO_TRAFFIC_PATH if no_traffic else NESHAN_DISTANCE_MATRIX_PATH
         url = f"{NESHAN_API_BASE.rstrip('/')}{path}"
         params = {
@@ -65,7 +67,7 @@ def fetch_distance_matrix(origins, destinations, vehicle_type=TYPE_CAR, no_traff
             "destinations": destinations_str,
         }
         headers = {"Api-Key": api_key}
-        resp = requests.get(url, params=params, headers=headers, timeout=20)
+        resp = http_client.get(url, params=params, headers=headers, timeout=20, cache_ttl=NESHAN_CACHE_TTL_TRAFFIC)
         if resp.status_code != 200:
             logger.debug("Neshan distance-matrix HTTP %s: %s", resp.status_code, resp.text[:200])
             return None
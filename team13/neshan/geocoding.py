@@ -6,6 +6,8 @@ import json
 import logging
 from urllib.parse import quote
 
+from core.async_http import client as async_http_client
+from core.http import client as http_client
 from .config import (
     NESHAN_API_BASE,
     NESHAN_GEOCODING_PATH,
@@ -13,6 +15,7 @@ from .config import (
     NESHAN_REVERSE_PATH,
     get_api_key,
     is_configured,
+    NESHAN_CACHE_TTL_STATIC,
 )
 
 logger = logging.getLogger(__name__)
@@ -25,6 +28,36 @@ def reverse_geocode(lat, lng):
     neighbourhood، city، state، place، municipality_zone، in_traffic_zone، in_odd_even_zone،
     village، county، district؛ در صورت خطا None.
     """
+    request = _reverse_request(lat, lng)
+    if request is None:
+        return None
+    url, params, headers = request
+    try:
+        resp = http_client.get(url, params=params, headers=headers, timeout=10, cache_ttl=NESHAN_CACHE_TTL_STATIC)
+        return _parse_reverse(resp)
+    except Exception as e:
+        logger.debug("Neshan reverse failed: %s", e)
+        return None
+
+
+async def areverse_geocode(lat, lng):
+    """نسخهٔ async از reverse_geocode برای viewهای async (ASGI)."""
+    request = _reverse_request(lat, lng)
+    if request is None:
+        return None
+    url, params, headers = request
+    try:
+        resp = await async_http_client.get(
+            url, params=params, headers=headers, timeout=10, cache_ttl=NESHAN_CACHE_TTL_STATIC
+        )
+        return _parse_reverse(resp)
+    except Exception as e:
+        logger.debug("Neshan reverse failed: %s", e)
+        return None
+
+
+def _reverse_request(lat, lng):
+    """(url, params, headers) برای v5/reverse، یا None اگر کلید یا مختصات معتبر نباشد."""
     if not is_configured():
         return None
     try:
@@ -32,25 +65,20 @@ def reverse_geocode(lat, lng):
         lng_f = float(lng)
     except (TypeError, ValueError):
         return None
-    api_key = get_api_key()
-    try:
-        import requests
-        url = f"{NESHAN_API_BASE.rstrip('/')}{NESHAN_REVERSE_PATH}"
-        params = {"lat": lat_f, "lng": lng_f}
-        headers = {"Api-Key": api_key}
-        resp = requests.get(url, params=params, headers=headers, timeout=10)
-        if resp.status_code != 200:
-            logger.debug("Neshan reverse HTTP %s: %s", resp.status_code, resp.text[:200])
-            return None
-        data = resp.json()
-        if not isinstance(data, dict):
-            return None
-        if data.get("status") != "OK":
-            return None
-        return data
-    except Exception as e:
-        logger.debug("Neshan reverse failed: %s", e)
+    url = f"{NESHAN_API_BASE.rstrip('/')}{NESHAN_REVERSE_PATH}"
+    return url, {"lat": lat_f, "lng": lng_f}, {"Api-Key": get_api_key()}
+
+
+def _parse_reverse(resp):
+    if resp.status_code != 200:
+        logger.debug("Neshan reverse HTTP %s: %s", resp.status_code, resp.text[:200])
+        return None
+    data = resp.json()
+    if not isinstance(data, dict):
+        return None
+    if data.get("status") != "OK":
         return None
+    return data
 
 
 def reverse_geocode_address(lat, lng):
@@ -88,6 +116,34 @@ def geocode(
         دیکشنری با کلید items (لیست حداکثر ۵ نتیجه؛ هر آیتم: location, province, city, neighbourhood, unMatchedTerm)
         یا None در صورت خطا.
     """
+    request = _geocode_request(address, province, city, location, extent, plus)
+    if request is None:
+        return None
+    url, headers = request
+    try:
+        resp = http_client.get(url, headers=headers, timeout=10, cache_ttl=NESHAN_CACHE_TTL_STATIC)
+        return _parse_geocode(resp)
+    except Exception as e:
+        logger.debug("Neshan geocode failed: %s", e)
+        return None
+
+
+async def ageocode(address, province=None, city=None, location=None, extent=None, plus=False):
+    """نسخهٔ async از geocode برای viewهای async (ASGI)."""
+    request = _geocode_request(address, province, city, location, extent, plus)
+    if request is None:
+        return None
+    url, headers = request
+    try:
+        resp = await async_http_client.get(url, headers=headers, timeout=10, cache_ttl=NESHAN_CACHE_TTL_STATIC)
+        return _parse_geocode(resp)
+    except Exception as e:
+        logger.debug("Neshan geocode failed: %s", e)
+        return None
+
+
+def _geocode_request(address, province, city, location, extent, plus):
+    """(url, headers) برای geocoding؛ بدنهٔ JSON در query param json. None اگر ورودی کافی نباشد."""
     if not is_configured():
         return None
     address = (address or "").strip()
@@ -121,18 +177,14 @@ def geocode(
     base = NESHAN_API_BASE.rstrip("/")
     json_str = json.dumps(payload, ensure_ascii=False)
     url = f"{base}{path}?json={quote(json_str)}"
-    api_key = get_api_key()
-    try:
-        import requests
-        headers = {"Api-Key": api_key, "Content-Type": "application/json"}
-        resp = requests.get(url, headers=headers, timeout=10)
-        if resp.status_code != 200:
-            logger.debug("Neshan geocode HTTP %s: %s", resp.status_code, resp.text[:200])
-            return None
-        data = resp.json()
-        if not isinstance(data, dict):
-            return None
-        return data
-    except Exception as e:
-        logger.debug("Neshan geocode failed: %s", e)
+    return url, {"Api-Key": get_api_key(), "Content-Type": "application/json"}
+
+
+def _parse_geocode(resp):
+    if resp.status_code != 200:
+        logger.debug("Neshan geocode HTTP %s: %s", resp.status_code, resp.text[:200])
+        return None
+    data = resp.json()
+    if not isinstance(data, dict):
         return None
+    return data
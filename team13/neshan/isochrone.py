@@ -3,7 +3,10 @@
 # Endpoint: GET https://api.neshan.org/v1/isochrone
 
 import logging
-from .config import get_api_key, is_configured, NESHAN_API_BASE, NESHAN_ISOCHRONE_PATH
+
+from core.async_http import client as async_http_client
+from core.http import client as http_client
+from .config import get_api_key, is_configured, NESHAN_API_BASE, NESHAN_ISOCHRONE_PATH, NESHAN_CACHE_TTL_SEARCH
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +21,38 @@ def fetch_isochrone(lat, lng, distance_km=None, time_minutes=None, polygon=False
     denoise: 0 تا 1؛ هرچه به 1 نزدیک‌تر، پولیگان ساده‌تر (پیش‌فرض 0).
     خروجی: GeoJSON FeatureCollection یا None در صورت خطا.
     """
+    params = _isochrone_params(lat, lng, distance_km, time_minutes, polygon, denoise)
+    if params is None:
+        return None
+    try:
+        url = f"{NESHAN_API_BASE.rstrip('/')}{NESHAN_ISOCHRONE_PATH}"
+        headers = {"Api-Key": get_api_key()}
+        resp = http_client.get(url, params=params, headers=headers, timeout=20, cache_ttl=NESHAN_CACHE_TTL_SEARCH)
+        return _parse_isochrone(resp)
+    except Exception as e:
+        logger.debug("Neshan isochrone failed: %s", e)
+        return None
+
+
+async def afetch_isochrone(lat, lng, distance_km=None, time_minutes=None, polygon=False, denoise=0):
+    """نسخهٔ async از fetch_isochrone برای viewهای async (ASGI)."""
+    params = _isochrone_params(lat, lng, distance_km, time_minutes, polygon, denoise)
+    if params is None:
+        return None
+    try:
+        url = f"{NESHAN_API_BASE.rstrip('/')}{NESHAN_ISOCHRONE_PATH}"
+        headers = {"Api-Key": get_api_key()}
+        resp = await async_http_client.get(
+            url, params=params, headers=headers, timeout=20, cache_ttl=NESHAN_CACHE_TTL_SEARCH
+        )
+        return _parse_isochrone(resp)
+    except Exception as e:
+        logger.debug("Neshan isochrone failed: %s", e)
+        return None
+
+
+def _isochrone_params(lat, lng, distance_km, time_minutes, polygon, denoise):
+    """query params برای isochrone، یا None اگر کلید یا ورودی معتبر نباشد."""
     if not is_configured():
         return None
     if distance_km is None and time_minutes is None:
@@ -29,7 +64,6 @@ def fetch_isochrone(lat, lng, distance_km=None, time_minutes=None, polygon=False
         lng_f = float(lng)
     except (TypeError, ValueError):
         return None
-    api_key = get_api_key()
     params = {
         "location": f"{lat_f},{lng_f}",
     }
@@ -48,15 +82,11 @@ def fetch_isochrone(lat, lng, distance_km=None, time_minutes=None, polygon=False
     params["polygon"] = "true" if polygon else "false"
     if denoise is not None and 0 <= denoise <= 1:
         params["denoise"] = denoise
-    try:
-        import requests
-        url = f"{NESHAN_API_BASE.rstrip('/')}{NESHAN_ISOCHRONE_PATH}"
-        headers = {"Api-Key": api_key}
-        resp = requests.get(url, params=params, headers=headers, timeout=20)
-        if resp.status_code != 200:
-            logger.debug("Neshan isochrone HTTP %s: %s", resp.status_code, resp.text[:200])
-            return None
-        return resp.json()
-    except Exception as e:
-        logger.debug("Neshan isochrone failed: %s", e)
+    return params
+
+
+def _parse_isochrone(resp):
+    if resp.status_code != 200:
+        logger.debug("Neshan isochrone HTTP %s: %s", resp.status_code, resp.text[:200])
         return None
+    return resp.json()
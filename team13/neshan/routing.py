@@ -4,12 +4,16 @@
 # عابر پیاده: https://platform.neshan.org/docs/api/routing-category/routing_pedestrian/
 
 import logging
+
+from core.async_http import client as async_http_client
+from core.http import client as http_client
 from .config import (
     get_api_key,
     is_configured,
     NESHAN_API_BASE,
     NESHAN_DIRECTION_PATH,
     NESHAN_DIRECTION_NO_TRAFFIC_PATH,
+    NESHAN_CACHE_TTL_TRAFFIC,
 )
 
 logger = logging.getLogger(__name__)
@@ -20,33 +24,51 @@ VEHICLE_MOTORCYCLE = "motorcycle"
 VEHICLE_PEDESTRIAN = "pedestrian"
 
 
+def _parse_direction(resp):
+    """پاسخ direction نشان ← (distance_km, duration_seconds, route_geometry)."""
+    if resp.status_code != 200:
+        logger.debug("Neshan direction HTTP %s: %s", resp.status_code, resp.text[:200])
+        return None, None, None
+    data = resp.json()
+    routes = data.get("routes") or []
+    if not routes:
+        return None, None, None
+    first = routes[0]
+    legs = first.get("legs") or []
+    distance_m = None
+    duration_s = None
+    for leg in legs:
+        d = (leg.get("distance") or {}).get("value")
+        t = (leg.get("duration") or {}).get("value")
+        if d is not None:
+            distance_m = (distance_m or 0) + d
+        if t is not None:
+            duration_s = (duration_s or 0) + t
+    dist_km = (distance_m / 1000.0) if distance_m is not None else None
+    return dist_km, duration_s, first
+
+
 def _request_direction(url_path, params, api_key, timeout=15):
     """درخواست GET به یک endpoint مسیریابی نشان؛ خروجی (distance_km, duration_seconds, route_geometry)."""
     try:
-        import requests
         url = f"{NESHAN_API_BASE.rstrip('/')}{url_path}"
         headers = {"Api-Key": api_key}
-        resp = requests.get(url, params=params, headers=headers, timeout=timeout)
-        if resp.status_code != 200:
-            logger.debug("Neshan direction HTTP %s: %s", resp.status_code, resp.text[:200])
-            return None, None, None
-        data = resp.json()
-        routes = data.get("routes") or []
-        if not routes:
-            return None, None, None
-        first = routes[0]
-        legs = first.get("legs") or []
-        distance_m = None
-        duration_s = None
-        for leg in legs:
-            d = (leg.get("distance") or {}).get("value")
-            t = (leg.get("duration") or {}).get("value")
-            if d is not None:
-                distance_m = (distance_m or 0) + d
-            if t is not None:
-                duration_s = (duration_s or 0) + t
-        dist_km = (distance_m / 1000.0) if distance_m is not None else None
-        return dist_km, duration_s, first
+        resp = http_client.get(url, params=params, headers=headers, timeout=timeout, cache_ttl=NESHAN_CACHE_TTL_TRAFFIC)
+        return _parse_direction(resp)
+    except Exception as e:
+        logger.debug("Neshan direction failed: %s", e)
+        return None, None, None
+
+
+async def _arequest_direction(url_path, params, api_key, timeout=15):
+    """نسخهٔ async از _request_direction برای viewهای async (ASGI)."""
+    try:
+        url = f"{NESHAN_API_BASE.rstrip('/')}{url_path}"
+        headers = {"Api-Key": api_key}
+        resp = await async_http_client.get(
+            url, params=params, headers=headers, timeout=timeout, cache_ttl=NESHAN_CACHE_TTL_TRAFFIC
+        )
+        return _parse_direction(resp)
     except Exception as e:
         logger.debug("Neshan direction failed: %s", e)
         return None, None, None
@@ -84,6 +106,39 @@ def _build_direction_params(lat_origin, lng_origin, lat_dest, lng_dest, vehicle_
     return params
 
 
+def _route_eta_args(lng_origin, lat_origin, lng_dest, lat_dest, vehicle_type=VEHICLE_CAR,
+                    waypoints=None, avoid_traffic_zone=False, avoid_odd_even_zone=False, alternative=False, bearing=None):
+    if vehicle_type not in (VEHICLE_CAR, VEHICLE_MOTORCYCLE):
+        vehicle_type = VEHICLE_CAR
+    params = _build_direction_params(
+        lat_origin, lng_origin, lat_dest, lng_dest, vehicle_type,
+        waypoints=waypoints, avoid_traffic_zone=avoid_traffic_zone,
+        avoid_odd_even_zone=avoid_odd_even_zone, alternative=alternative, bearing=bearing,
+    )
+    return NESHAN_DIRECTION_PATH, params
+
+
+def _route_eta_no_traffic_args(lng_origin, lat_origin, lng_dest, lat_dest,
+                               waypoints=None, avoid_traffic_zone=False, avoid_odd_even_zone=False,
+                               alternative=False, bearing=None):
+    params = _build_direction_params(
+        lat_origin, lng_origin, lat_dest, lng_dest, VEHICLE_CAR,
+        waypoints=waypoints, avoid_traffic_zone=avoid_traffic_zone,
+        avoid_odd_even_zone=avoid_odd_even_zone, alternative=alternative, bearing=bearing,
+    )
+    return NESHAN_DIRECTION_NO_TRAFFIC_PATH, params
+
+
+def _route_eta_pedestrian_args(lng_origin, lat_origin, lng_dest, lat_dest,
+                               waypoints=None, alternative=False, bearing=None):
+    params = _build_direction_params(
+        lat_origin, lng_origin, lat_dest, lng_dest, VEHICLE_PEDESTRIAN,
+        waypoints=waypoints, avoid_traffic_zone=False, avoid_odd_even_zone=False,
+        alternative=alternative, bearing=bearing,
+    )
+    return NESHAN_DIRECTION_PATH, params
+
+
 def fetch_route_eta(lng_origin, lat_origin, lng_dest, lat_dest, vehicle_type=VEHICLE_CAR,
                     waypoints=None, avoid_traffic_zone=False, avoid_odd_even_zone=False, alternative=False, bearing=None):
     """
@@ -92,15 +147,11 @@ def fetch_route_eta(lng_origin, lat_origin, lng_dest, lat_dest, vehicle_type=VEH
     """
     if not is_configured():
         return None, None, None
-    api_key = get_api_key()
-    if vehicle_type not in (VEHICLE_CAR, VEHICLE_MOTORCYCLE):
-        vehicle_type = VEHICLE_CAR
-    params = _build_direction_params(
-        lat_origin, lng_origin, lat_dest, lng_dest, vehicle_type,
-        waypoints=waypoints, avoid_traffic_zone=avoid_traffic_zone,
-        avoid_odd_even_zone=avoid_odd_even_zone, alternative=alternative, bearing=bearing,
+    path, params = _route_eta_args(
+        lng_origin, lat_origin, lng_dest, lat_dest, vehicle_type, waypoints,
+        avoid_traffic_zone, avoid_odd_even_zone, alternative, bearing,
     )
-    return _request_direction(NESHAN_DIRECTION_PATH, params, api_key)
+    return _request_direction(path, params, get_api_key())
 
 
 def fetch_route_eta_no_traffic(lng_origin, lat_origin, lng_dest, lat_dest,
@@ -114,13 +165,11 @@ def fetch_route_eta_no_traffic(lng_origin, lat_origin, lng_dest, lat_dest,
     """
     if not is_configured():
         return None, None, None
-    api_key = get_api_key()
-    params = _build_direction_params(
-        lat_origin, lng_origin, lat_dest, lng_dest, VEHICLE_CAR,
-        waypoints=waypoints, avoid_traffic_zone=avoid_traffic_zone,
-        avoid_odd_even_zone=avoid_odd_even_zone, alternative=alternative, bearing=bearing,
+    path, params = _route_eta_no_traffic_args(
+        lng_origin, lat_origin, lng_dest, lat_dest, waypoints,
+        avoid_traffic_zone, avoid_odd_even_zone, alternative, bearing,
     )
-    return _request_direction(NESHAN_DIRECTION_NO_TRAFFIC_PATH, params, api_key)
+    return _request_direction(path, params, get_api_key())
 
 
 def fetch_route_eta_pedestrian(lng_origin, lat_origin, lng_dest, lat_dest,
@@ -134,10 +183,43 @@ def fetch_route_eta_pedestrian(lng_origin, lat_origin, lng_dest, lat_dest,
     """
     if not is_configured():
         return None, None, None
-    api_key = get_api_key()
-    params = _build_direction_params(
-        lat_origin, lng_origin, lat_dest, lng_dest, VEHICLE_PEDESTRIAN,
-        waypoints=waypoints, avoid_traffic_zone=False, avoid_odd_even_zone=False,
-        alternative=alternative, bearing=bearing,
+    path, params = _route_eta_pedestrian_args(
+        lng_origin, lat_origin, lng_dest, lat_dest, waypoints, alternative, bearing,
+    )
+    return _request_direction(path, params, get_api_key())
+
+
+# نسخه‌های async همان توابع با همان آرگومان‌ها و خروجی؛ برای viewهای async زیر app404.asgi
+
+async def afetch_route_eta(lng_origin, lat_origin, lng_dest, lat_dest, vehicle_type=VEHICLE_CAR,
+                           waypoints=None, avoid_traffic_zone=False, avoid_odd_even_zone=False,
+                           alternative=False, bearing=None):
+    if not is_configured():
+        return None, None, None
+    path, params = _route_eta_args(
+        lng_origin, lat_origin, lng_dest, lat_dest, vehicle_type, waypoints,
+        avoid_traffic_zone, avoid_odd_even_zone, alternative, bearing,
+    )
+    return await _arequest_direction(path, params, get_api_key())
+
+
+async def afetch_route_eta_no_traffic(lng_origin, lat_origin, lng_dest, lat_dest,
+                                      waypoints=None, avoid_traffic_zone=False, avoid_odd_even_zone=False,
+                                      alternative=False, bearing=None):
+    if not is_configured():
+        return None, None, None
+    path, params = _route_eta_no_traffic_args(
+        lng_origin, lat_origin, lng_dest, lat_dest, waypoints,
+        avoid_traffic_zone, avoid_odd_even_zone, alternative, bearing,
+    )
+    return await _arequest_direction(path, params, get_api_key())
+
+
+async def afetch_route_eta_pedestrian(lng_origin, lat_origin, lng_dest, lat_dest,
+                                      waypoints=None, alternative=False, bearing=None):
+    if not is_configured():
+        return None, None, None
+    path, params = _route_eta_pedestrian_args(
+        lng_origin, lat_origin, lng_dest, lat_dest, waypoints, alternative, bearing,
     )
-    return _request_direction(NESHAN_DIRECTION_PATH, params, api_key)
+    return await _arequest_direction(path, params, get_api_key())
@@ -3,7 +3,9 @@
 # Endpoint: GET https://api.neshan.org/v3/trip
 
 import logging
-from .config import get_api_key, is_configured, NESHAN_API_BASE, NESHAN_TSP_PATH
+
+from core.http import client as http_client
+from .config import get_api_key, is_configured, NESHAN_API_BASE, NESHAN_TSP_PATH, NESHAN_CACHE_TTL_TRAFFIC
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +46,6 @@ def fetch_tsp(waypoints, round_trip=True, source_is_any_point=True, last_is_any_
             return None
         waypoints_str = "|".join(parts)
     try:
-        import requests
         url = f"{NESHAN_API_BASE.rstrip('/')}{NESHAN_TSP_PATH}"
         params = {"waypoints": waypoints_str}
         if round_trip is not None:
@@ -54,7 +55,7 @@ def fetch_tsp(waypoints, round_trip=True, source_is_any_point=True, last_is_any_
         if last_is_any_point is not None:
             params["lastIsAnyPoint"] = "true" if last_is_any_point else "false"
         headers = {"Api-Key": api_key}
-        resp = requests.get(url, params=params, headers=headers, timeout=15)
+        resp = http_client.get(url, params=params, headers=headers, timeout=15, cache_ttl=NESHAN_CACHE_TTL_TRAFFIC)
         if resp.status_code != 200:
             logger.debug("Neshan TSP HTTP %s: %s", resp.status_code, resp.text[:200])
             return None
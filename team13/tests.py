@@ -1,6 +1,87 @@
 from django.test import TestCase
 
+from core.query_budget import QueryBudgetMixin
+
 class TeamPingTests(TestCase):
     def test_ping_requires_auth(self):
         res = self.client.get("/team13/ping/")
         self.assertEqual(res.status_code, 401)
+
+
+class PlacesInRadiusTests(TestCase):
+    databases = {"default", "team13"}
+
+    def setUp(self):
+        from .models import Place, PlaceTranslation
+        near = Place.objects.using("team13").create(type="hospital", city="تهران", latitude=35.70, longitude=51.40)
+        Place.objects.using("team13").create(type="food", city="شیراز", latitude=29.59, longitude=52.58)
+        PlaceTranslation.objects.using("team13").create(place=near, lang="fa", name="بیمارستان")
+        self.near = near
+
+    def test_only_places_inside_radius(self):
+        res = self.client.get("/team13/places-in-radius/", {"lat": 35.6892, "lng": 51.3890, "radius_km": 10})
+        self.assertEqual(res.status_code, 200)
+        places = res.json()["places"]
+        self.assertEqual([p["place_id"] for p in places], [str(self.near.place_id)])
+        self.assertEqual(places[0]["name_fa"], "بیمارستان")
+
+    def test_nearest_place(self):
+        res = self.client.get("/team13/nearest-place/", {"lat": 35.7001, "lng": 51.4001, "radius_km": 1})
+        self.assertEqual(res.json()["place"]["place_id"], str(self.near.place_id))
+
+
+class AsyncRouteViewTests(TestCase):
+    databases = {"default", "team13"}
+
+    def setUp(self):
+        from unittest.mock import AsyncMock, patch
+        from .models import Place, PlaceTranslation
+        self.src = Place.objects.using("team13").create(type="food", city="تهران", latitude=35.70, longitude=51.40)
+        self.dst = Place.objects.using("team13").create(type="food", city="تهران", latitude=35.75, longitude=51.41)
+        PlaceTranslation.objects.using("team13").create(place=self.src, lang="fa", name="مبدأ آزمایشی")
+        fetch = AsyncMock(return_value=(12.0, 900, {"legs": []}))
+        patcher = patch("team13.neshan.afetch_route_eta", fetch)
+        self.fetch = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_place_ids_use_neshan_eta(self):
+        res = self.client.get("/team13/routes/", {
+            "format": "json", "source_place_id": self.src.place_id, "destination_place_id": self.dst.place_id,
+        })
+        self.assertEqual(res.status_code, 200)
+        data = res.json()
+        self.assertEqual((data["distance_km"], data["eta_minutes"], data["eta_source"]), (12.0, 15, "neshan"))
+        self.assertEqual(data["source_name"], "مبدأ آزمایشی")
+        self.fetch.assert_awaited_once()
+
+    def test_transit_falls_back_to_haversine(self):
+        res = self.client.get("/team13/routes/", {
+            "format": "json", "travel_mode": "transit",
+            "source_lat": 35.70, "source_lng": 51.40, "dest_lat": 35.75, "dest_lng": 51.41,
+        })
+        self.assertEqual(res.json()["eta_source"], "haversine")
+        self.fetch.assert_not_awaited()
+
+    def test_post_not_allowed(self):
+        self.assertEqual(self.client.post("/team13/routes/").status_code, 405)
+
+
+class PlaceListQueryBudgetTests(QueryBudgetMixin, TestCase):
+    databases = {"default", "team13"}
+
+    def make_places(self, n):
+        from .models import Comment, Place, PlaceTranslation
+        types = [t for t, _ in Place.PlaceType.choices]
+        for i in range(Place.objects.using("team13").count(), n):
+            place = Place.objects.using("team13").create(
+                type=types[i % len(types)], city="تهران", latitude=35.7 + i * 1e-4, longitude=51.4,
+            )
+            PlaceTranslation.objects.using("team13").create(place=place, lang="fa", name=f"مکان {i}")
+            PlaceTranslation.objects.using("team13").create(place=place, lang="en", name=f"Place {i}")
+            Comment.objects.using("team13").create(target_type="place", target_id=place.place_id, rating=4)
+
+    def test_place_list_json(self):
+        self.assertQueryBudget(
+            "team13 place_list (json)", "/team13/places/", self.make_places, budget=18,
+            data={"format": "json", "lat": 35.7, "lng": 51.4},
+        )
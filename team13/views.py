@@ -1,6 +1,5 @@
 # مطابق فاز ۳، ۵، ۷ — سرویس امکانات و حمل‌ونقل (گروه Axiom)
 import base64
-import math
 import re
 import uuid
 from pathlib import Path
@@ -14,7 +13,10 @@ from urllib.parse import quote
 from django.db.models import Avg, Count, F, Q, Subquery, OuterRef
 from django.db.models.functions import Coalesce
 from django.views.decorators.http import require_GET, require_POST
+from asgiref.sync import sync_to_async
+from core.async_views import require_GET as async_require_GET
 from core.auth import api_login_required
+from core.geo import haversine_km, haversine_km_many, k_nearest, within_radius
 
 from .context_processors import team13_user_context
 from .neshan.config import get_web_key
@@ -69,13 +71,7 @@ def _login_required_team13(view_func):
 
 def _distance_km(lat1, lon1, lat2, lon2):
     """فاصله تقریبی به کیلومتر (Haversine)."""
-    R = 6371
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlam = math.radians(lon2 - lon1)
-    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return R * c
+    return haversine_km(lat1, lon1, lat2, lon2)
 
 
 def _team13_context(request, extra=None):
@@ -241,10 +237,18 @@ def place_list(request):
     }
 
     user_lat, user_lng = _parse_lat_lng(request)
+    distances = None
+    if user_lat is not None and user_lng is not None:
+        # همهٔ فاصله‌ها در یک محاسبهٔ برداری
+        distances = haversine_km_many(
+            user_lat, user_lng,
+            [p.latitude for p in places_qs], [p.longitude for p in places_qs],
+        )
     places = []
-    for p in places_qs:
-        trans_fa = p.translations.filter(lang="fa").first()
-        trans_en = p.translations.filter(lang="en").first()
+    for i, p in enumerate(places_qs):
+        # از ترجمه‌های prefetch‌شده؛ filter() روی هر مکان دو کوئری جدا می‌زد
+        trans_fa = next((t for t in p.translations.all() if t.lang == "fa"), None)
+        trans_en = next((t for t in p.translations.all() if t.lang == "en"), None)
         item = {
             "place_id": str(p.place_id),
             "type": p.type,
@@ -257,8 +261,8 @@ def place_list(request):
             "name_en": trans_en.name if trans_en else "",
             "rating": rating_by_place.get(str(p.place_id)),
         }
-        if user_lat is not None and user_lng is not None:
-            item["distance_km"] = round(_distance_km(user_lat, user_lng, p.latitude, p.longitude), 2)
+        if distances is not None:
+            item["distance_km"] = round(float(distances[i]), 2)
         places.append(item)
 
     # Distance filter (when lat/lng present): keep only places within max_distance_km
@@ -397,16 +401,12 @@ def nearest_place(request):
             radius_km = 0.05
     except (TypeError, ValueError):
         radius_km = 0.05
-    places = list(Place.objects.using(TEAM13_DB).all())
-    best = None
-    best_d = float("inf")
-    for p in places:
-        d = _distance_km(lat, lng, p.latitude, p.longitude)
-        if d <= radius_km and d < best_d:
-            best_d = d
-            best = p
-    if best is None:
+    coords = list(Place.objects.using(TEAM13_DB).values_list("place_id", "latitude", "longitude"))
+    idx, dist = k_nearest(lat, lng, [c[1] for c in coords], [c[2] for c in coords], 1, max_km=radius_km)
+    if len(idx) == 0:
         return JsonResponse({"place": None})
+    best = Place.objects.using(TEAM13_DB).get(place_id=coords[idx[0]][0])
+    best_d = float(dist[0])
     trans_fa = best.translations.filter(lang="fa").first()
     trans_en = best.translations.filter(lang="en").first()
     payload = {
@@ -1064,80 +1064,79 @@ def event_rate(request, event_id):
 # مسیریابی و امکانات روی مسیر (در صورت تنظیم نشان از API نشان؛ وگرنه Haversine)
 # -----------------------------------------------------------------------------
 
-def _compute_route_result(source, dest, travel_mode, request, **route_options):
-    """محاسبه فاصله و ETA؛ برای خودرو/موتور در صورت وجود کلید نشان از API نشان استفاده می‌شود.
-    route_options: vehicle_type, avoid_traffic_zone, avoid_odd_even_zone, alternative (برای fetch_route_eta).
-    """
-    dist_km = _distance_km(source.latitude, source.longitude, dest.latitude, dest.longitude)
-    eta_minutes = None
-    eta_source = "haversine"
+# سرعت تقریبی (کیلومتر بر دقیقه) برای تخمین ETA وقتی نشان پاسخی ندهد
+_FALLBACK_KM_PER_MINUTE = {"car": 0.5, "motorcycle": 0.5, "walk": 0.08}
+_DEFAULT_KM_PER_MINUTE = 0.4
 
-    route_geometry = None
+
+def _route_call(travel_mode, route_options):
+    """
+    کدام تابع مسیریابی نشان برای این حالت سفر صدا زده شود:
+    (نام تابع، آرگومان‌های اضافه، eta_source) یا None برای حالت‌هایی که از نشان استفاده نمی‌کنند.
+    """
+    alternative = route_options.get("alternative", False)
+    bearing = route_options.get("bearing")
     if travel_mode in ("car", "motorcycle"):
+        kwargs = {
+            "avoid_traffic_zone": route_options.get("avoid_traffic_zone", False),
+            "avoid_odd_even_zone": route_options.get("avoid_odd_even_zone", False),
+            "alternative": alternative,
+            "bearing": bearing,
+        }
+        if travel_mode == "car" and route_options.get("no_traffic", False):
+            return "fetch_route_eta_no_traffic", kwargs, "neshan_no_traffic"
+        kwargs["vehicle_type"] = route_options.get("vehicle_type") or ("motorcycle" if travel_mode == "motorcycle" else "car")
+        return "fetch_route_eta", kwargs, "neshan"
+    if travel_mode == "walk":
+        return "fetch_route_eta_pedestrian", {"alternative": alternative, "bearing": bearing}, "neshan_pedestrian"
+    return None
+
+
+def _route_eta(dist_km, travel_mode, call, fetched):
+    """(distance_km, eta_minutes, eta_source, route_geometry) از پاسخ نشان یا تخمین haversine."""
+    dist_neshan, dur_sec, route_geometry = fetched or (None, None, None)
+    if call is not None and dist_neshan is not None and dur_sec is not None:
+        return dist_neshan, max(1, round(dur_sec / 60.0)), call[2], route_geometry
+    speed = _FALLBACK_KM_PER_MINUTE.get(travel_mode, _DEFAULT_KM_PER_MINUTE)
+    return dist_km, max(1, round(dist_km / speed)), "haversine", route_geometry
+
+
+async def _afetch_route_eta(lat_src, lng_src, lat_dest, lng_dest, travel_mode, route_options):
+    """فاصله و ETA از API نشان (کلاینت async)؛ worker در زمان انتظار برای نشان آزاد می‌ماند."""
+    from . import neshan
+    dist_km = _distance_km(lat_src, lng_src, lat_dest, lng_dest)
+    call = _route_call(travel_mode, route_options)
+    fetched = None
+    if call is not None:
         try:
-            no_traffic = route_options.get("no_traffic", False)
-            bearing = route_options.get("bearing")
-            if travel_mode == "car" and no_traffic:
-                from .neshan import fetch_route_eta_no_traffic
-                dist_neshan, dur_sec, route_geometry = fetch_route_eta_no_traffic(
-                    source.longitude, source.latitude, dest.longitude, dest.latitude,
-                    avoid_traffic_zone=route_options.get("avoid_traffic_zone", False),
-                    avoid_odd_even_zone=route_options.get("avoid_odd_even_zone", False),
-                    alternative=route_options.get("alternative", False),
-                    bearing=bearing,
-                )
-                eta_source = "neshan_no_traffic"
-            else:
-                from .neshan import fetch_route_eta
-                vehicle_type = route_options.get("vehicle_type") or ("motorcycle" if travel_mode == "motorcycle" else "car")
-                dist_neshan, dur_sec, route_geometry = fetch_route_eta(
-                    source.longitude, source.latitude,
-                    dest.longitude, dest.latitude,
-                    vehicle_type=vehicle_type,
-                    avoid_traffic_zone=route_options.get("avoid_traffic_zone", False),
-                    avoid_odd_even_zone=route_options.get("avoid_odd_even_zone", False),
-                    alternative=route_options.get("alternative", False),
-                    bearing=bearing,
-                )
-                eta_source = "neshan"
-            if dist_neshan is not None and dur_sec is not None:
-                dist_km = dist_neshan
-                eta_minutes = max(1, round(dur_sec / 60.0))
-            else:
-                eta_minutes = max(1, round(dist_km / 0.5))
-        except Exception:
-            eta_minutes = max(1, round(dist_km / 0.5))
-    elif travel_mode == "walk":
-        try:
-            from .neshan import fetch_route_eta_pedestrian
-            bearing = route_options.get("bearing")
-            dist_neshan, dur_sec, route_geometry = fetch_route_eta_pedestrian(
-                source.longitude, source.latitude, dest.longitude, dest.latitude,
-                alternative=route_options.get("alternative", False),
-                bearing=bearing,
-            )
-            if dist_neshan is not None and dur_sec is not None:
-                dist_km = dist_neshan
-                eta_minutes = max(1, round(dur_sec / 60.0))
-                eta_source = "neshan_pedestrian"
-            else:
-                eta_minutes = max(1, round(dist_km / 0.08))
+            fetched = await getattr(neshan, "a" + call[0])(lng_src, lat_src, lng_dest, lat_dest, **call[1])
         except Exception:
-            eta_minutes = max(1, round(dist_km / 0.08))
-    else:
-        eta_minutes = max(1, round(dist_km / 0.4))
+            fetched = None
+    return _route_eta(dist_km, travel_mode, call, fetched)
+
+
+def _route_result(travel_mode, eta, extra):
+    dist_km, eta_minutes, eta_source, route_geometry = eta
+    result = {
+        **extra,
+        "travel_mode": travel_mode,
+        "distance_km": round(dist_km, 2),
+        "eta_minutes": eta_minutes,
+        "eta_source": eta_source,
+    }
+    if route_geometry is not None:
+        result["route_geometry"] = route_geometry
+    return result
 
+
+def _place_route_fields(source, dest):
     trans_src = source.translations.filter(lang="fa").first()
     trans_dst = dest.translations.filter(lang="fa").first()
-    result = {
+    return {
         "source_place_id": str(source.place_id),
         "destination_place_id": str(dest.place_id),
         "source_name": trans_src.name if trans_src else str(source.place_id),
         "destination_name": trans_dst.name if trans_dst else str(dest.place_id),
-        "travel_mode": travel_mode,
-        "distance_km": round(dist_km, 2),
-        "eta_minutes": eta_minutes,
-        "eta_source": eta_source,
         "source_amenities": list(source.amenities.values_list("amenity_name", flat=True)),
         "destination_amenities": list(dest.amenities.values_list("amenity_name", flat=True)),
         "source_lat": source.latitude,
@@ -1145,78 +1144,12 @@ def _compute_route_result(source, dest, travel_mode, request, **route_options):
         "dest_lat": dest.latitude,
         "dest_lng": dest.longitude,
     }
-    if route_geometry is not None:
-        result["route_geometry"] = route_geometry
-    return result
 
 
-def _compute_route_result_from_coords(lat_src, lng_src, name_src, lat_dest, lng_dest, name_dest, travel_mode, **route_options):
-    """محاسبه فاصله و ETA از روی مختصات؛ برای خودرو/موتور در صورت وجود نشان از API نشان."""
-    dist_km = _distance_km(lat_src, lng_src, lat_dest, lng_dest)
-    eta_minutes = None
-    eta_source = "haversine"
-
-    route_geometry = None
-    if travel_mode in ("car", "motorcycle"):
-        try:
-            no_traffic = route_options.get("no_traffic", False)
-            bearing = route_options.get("bearing")
-            if travel_mode == "car" and no_traffic:
-                from .neshan import fetch_route_eta_no_traffic
-                dist_neshan, dur_sec, route_geometry = fetch_route_eta_no_traffic(
-                    lng_src, lat_src, lng_dest, lat_dest,
-                    avoid_traffic_zone=route_options.get("avoid_traffic_zone", False),
-                    avoid_odd_even_zone=route_options.get("avoid_odd_even_zone", False),
-                    alternative=route_options.get("alternative", False),
-                    bearing=bearing,
-                )
-                eta_source = "neshan_no_traffic"
-            else:
-                from .neshan import fetch_route_eta
-                vehicle_type = route_options.get("vehicle_type") or ("motorcycle" if travel_mode == "motorcycle" else "car")
-                dist_neshan, dur_sec, route_geometry = fetch_route_eta(
-                    lng_src, lat_src, lng_dest, lat_dest,
-                    vehicle_type=vehicle_type,
-                    avoid_traffic_zone=route_options.get("avoid_traffic_zone", False),
-                    avoid_odd_even_zone=route_options.get("avoid_odd_even_zone", False),
-                    alternative=route_options.get("alternative", False),
-                    bearing=bearing,
-                )
-                eta_source = "neshan"
-            if dist_neshan is not None and dur_sec is not None:
-                dist_km = dist_neshan
-                eta_minutes = max(1, round(dur_sec / 60.0))
-            else:
-                eta_minutes = max(1, round(dist_km / 0.5))
-        except Exception:
-            eta_minutes = max(1, round(dist_km / 0.5))
-    elif travel_mode == "walk":
-        try:
-            from .neshan import fetch_route_eta_pedestrian
-            bearing = route_options.get("bearing")
-            dist_neshan, dur_sec, route_geometry = fetch_route_eta_pedestrian(
-                lng_src, lat_src, lng_dest, lat_dest,
-                alternative=route_options.get("alternative", False),
-                bearing=bearing,
-            )
-            if dist_neshan is not None and dur_sec is not None:
-                dist_km = dist_neshan
-                eta_minutes = max(1, round(dur_sec / 60.0))
-                eta_source = "neshan_pedestrian"
-            else:
-                eta_minutes = max(1, round(dist_km / 0.08))
-        except Exception:
-            eta_minutes = max(1, round(dist_km / 0.08))
-    else:
-        eta_minutes = max(1, round(dist_km / 0.4))
-
-    result = {
+def _coords_route_fields(lat_src, lng_src, name_src, lat_dest, lng_dest, name_dest):
+    return {
         "source_name": name_src or "مبدأ",
         "destination_name": name_dest or "مقصد",
-        "travel_mode": travel_mode,
-        "distance_km": round(dist_km, 2),
-        "eta_minutes": eta_minutes,
-        "eta_source": eta_source,
         "source_amenities": [],
         "destination_amenities": [],
         "source_lat": lat_src,
@@ -1224,116 +1157,64 @@ def _compute_route_result_from_coords(lat_src, lng_src, name_src, lat_dest, lng_
         "dest_lat": lat_dest,
         "dest_lng": lng_dest,
     }
-    if route_geometry is not None:
-        result["route_geometry"] = route_geometry
-    return result
 
 
-@require_GET
-def route_request(request):
-    """
-    مسیریابی و ETA بین دو مکان + امکانات مبدأ و مقصد.
-    پذیرش: source_place_id/destination_place_id (مکان از دیتابیس) یا
-    source_lat, source_lng, source_name, dest_lat, dest_lng, dest_name (جستجوی آدرس).
-    """
-    src_id = request.GET.get("source_place_id")
-    dst_id = request.GET.get("destination_place_id")
-    source_lat = request.GET.get("source_lat")
-    source_lng = request.GET.get("source_lng")
-    source_name = request.GET.get("source_name", "")
-    dest_lat = request.GET.get("dest_lat")
-    dest_lng = request.GET.get("dest_lng")
-    dest_name = request.GET.get("dest_name", "")
-    travel_mode = request.GET.get("travel_mode", "car").lower()
-    if travel_mode not in ("car", "walk", "transit", "motorcycle"):
-        travel_mode = "car"
-    # پارامترهای اختیاری API مسیریابی نشان (v4)
+def _route_options(request):
+    """پارامترهای اختیاری API مسیریابی نشان (v4) از query string."""
     vehicle_type = request.GET.get("vehicle_type", "").lower().strip() or None
     if vehicle_type and vehicle_type not in ("car", "motorcycle"):
         vehicle_type = None
-    avoid_traffic_zone = request.GET.get("avoid_traffic_zone", "").lower() in ("1", "true", "yes")
-    avoid_odd_even_zone = request.GET.get("avoid_odd_even_zone", "").lower() in ("1", "true", "yes")
-    alternative = request.GET.get("alternative", "").lower() in ("1", "true", "yes")
-    no_traffic = request.GET.get("no_traffic", "").lower() in ("1", "true", "yes")
     try:
         bearing = int(request.GET.get("bearing", ""))
         if not (0 <= bearing <= 360):
             bearing = None
     except (TypeError, ValueError):
         bearing = None
-    route_options = {
+    return {
         "vehicle_type": vehicle_type,
-        "avoid_traffic_zone": avoid_traffic_zone,
-        "avoid_odd_even_zone": avoid_odd_even_zone,
-        "alternative": alternative,
-        "no_traffic": no_traffic,
+        "avoid_traffic_zone": request.GET.get("avoid_traffic_zone", "").lower() in ("1", "true", "yes"),
+        "avoid_odd_even_zone": request.GET.get("avoid_odd_even_zone", "").lower() in ("1", "true", "yes"),
+        "alternative": request.GET.get("alternative", "").lower() in ("1", "true", "yes"),
+        "no_traffic": request.GET.get("no_traffic", "").lower() in ("1", "true", "yes"),
         "bearing": bearing,
     }
 
-    if _wants_json(request):
-        if src_id and dst_id:
-            try:
-                source = Place.objects.using(TEAM13_DB).prefetch_related("translations", "amenities").get(place_id=src_id)
-                dest = Place.objects.using(TEAM13_DB).prefetch_related("translations", "amenities").get(place_id=dst_id)
-                result = _compute_route_result(source, dest, travel_mode, request, **route_options)
-                if getattr(request.user, "is_authenticated", False):
-                    try:
-                        RouteLog.objects.using(TEAM13_DB).create(
-                            user_id=getattr(request.user, "id", None),
-                            source_place=source,
-                            destination_place=dest,
-                            travel_mode=travel_mode,
-                        )
-                    except Exception:
-                        pass
-                return JsonResponse(result)
-            except Place.DoesNotExist:
-                return JsonResponse({"error": "مکان مبدأ یا مقصد یافت نشد"}, status=404)
-        if source_lat and source_lng and dest_lat and dest_lng:
-            try:
-                lat_s = float(source_lat)
-                lng_s = float(source_lng)
-                lat_d = float(dest_lat)
-                lng_d = float(dest_lng)
-                result = _compute_route_result_from_coords(
-                    lat_s, lng_s, source_name, lat_d, lng_d, dest_name, travel_mode, **route_options
-                )
-                return JsonResponse(result)
-            except (TypeError, ValueError):
-                pass
-        return JsonResponse({"error": "source_place_id و destination_place_id یا source_lat/lng و dest_lat/lng الزامی است"}, status=400)
 
-    # صفحه HTML
-    route_result = None
-    if source_lat and source_lng and dest_lat and dest_lng:
+def _parse_route_coords(source_lat, source_lng, dest_lat, dest_lng):
+    """(lat_s, lng_s, lat_d, lng_d) یا None اگر مختصات ناقص یا نامعتبر باشد."""
+    if not (source_lat and source_lng and dest_lat and dest_lng):
+        return None
+    try:
+        return float(source_lat), float(source_lng), float(dest_lat), float(dest_lng)
+    except (TypeError, ValueError):
+        return None
+
+
+def _load_route_places(src_id, dst_id):
+    qs = Place.objects.using(TEAM13_DB).prefetch_related("translations", "amenities")
+    return qs.get(place_id=src_id), qs.get(place_id=dst_id)
+
+
+def _log_route(request, source, dest, travel_mode):
+    if getattr(request.user, "is_authenticated", False):
         try:
-            lat_s = float(source_lat)
-            lng_s = float(source_lng)
-            lat_d = float(dest_lat)
-            lng_d = float(dest_lng)
-            route_result = _compute_route_result_from_coords(
-                lat_s, lng_s, source_name, lat_d, lng_d, dest_name, travel_mode, **route_options
+            RouteLog.objects.using(TEAM13_DB).create(
+                user_id=getattr(request.user, "id", None),
+                source_place=source,
+                destination_place=dest,
+                travel_mode=travel_mode,
             )
-        except (TypeError, ValueError):
-            route_result = {"error": "مختصات مبدأ یا مقصد نامعتبر است."}
-    elif src_id and dst_id:
-        try:
-            source = Place.objects.using(TEAM13_DB).prefetch_related("translations", "amenities").get(place_id=src_id)
-            dest = Place.objects.using(TEAM13_DB).prefetch_related("translations", "amenities").get(place_id=dst_id)
-            route_result = _compute_route_result(source, dest, travel_mode, request, **route_options)
-            if getattr(request.user, "is_authenticated", False):
-                try:
-                    RouteLog.objects.using(TEAM13_DB).create(
-                        user_id=getattr(request.user, "id", None),
-                        source_place=source,
-                        destination_place=dest,
-                        travel_mode=travel_mode,
-                    )
-                except Exception:
-                    pass
-        except Place.DoesNotExist:
-            route_result = {"error": "مکان مبدأ یا مقصد یافت نشد."}
+        except Exception:
+            pass
+
+
+def _place_route_fields_logged(request, source, dest, travel_mode):
+    fields = _place_route_fields(source, dest)
+    _log_route(request, source, dest, travel_mode)
+    return fields
 
+
+def _render_routes_page(request, route_result, travel_mode, src_id, dst_id):
     places_choices = list(Place.objects.using(TEAM13_DB).all().prefetch_related("translations")[:200])
     places_for_select = []
     for p in places_choices:
@@ -1350,6 +1231,68 @@ def route_request(request):
     }))
 
 
+@async_require_GET
+async def route_request(request):
+    """
+    مسیریابی و ETA بین دو مکان + امکانات مبدأ و مقصد.
+    پذیرش: source_place_id/destination_place_id (مکان از دیتابیس) یا
+    source_lat, source_lng, source_name, dest_lat, dest_lng, dest_name (جستجوی آدرس).
+    async: در زمان انتظار برای API نشان worker آزاد است؛ دیتابیس و قالب با sync_to_async اجرا می‌شوند.
+    """
+    src_id = request.GET.get("source_place_id")
+    dst_id = request.GET.get("destination_place_id")
+    source_name = request.GET.get("source_name", "")
+    dest_name = request.GET.get("dest_name", "")
+    travel_mode = request.GET.get("travel_mode", "car").lower()
+    if travel_mode not in ("car", "walk", "transit", "motorcycle"):
+        travel_mode = "car"
+    route_options = _route_options(request)
+    coords = _parse_route_coords(
+        request.GET.get("source_lat"), request.GET.get("source_lng"),
+        request.GET.get("dest_lat"), request.GET.get("dest_lng"),
+    )
+    has_coords = all(request.GET.get(k) for k in ("source_lat", "source_lng", "dest_lat", "dest_lng"))
+
+    async def from_places():
+        source, dest = await sync_to_async(_load_route_places)(src_id, dst_id)
+        eta = await _afetch_route_eta(
+            source.latitude, source.longitude, dest.latitude, dest.longitude, travel_mode, route_options
+        )
+        fields = await sync_to_async(_place_route_fields_logged)(request, source, dest, travel_mode)
+        return _route_result(travel_mode, eta, fields)
+
+    async def from_coords():
+        eta = await _afetch_route_eta(*coords, travel_mode, route_options)
+        return _route_result(travel_mode, eta, _coords_route_fields(
+            coords[0], coords[1], source_name, coords[2], coords[3], dest_name
+        ))
+
+    if _wants_json(request):
+        if src_id and dst_id:
+            try:
+                return JsonResponse(await from_places())
+            except Place.DoesNotExist:
+                return JsonResponse({"error": "مکان مبدأ یا مقصد یافت نشد"}, status=404)
+        if coords is not None:
+            return JsonResponse(await from_coords())
+        return JsonResponse({"error": "source_place_id و destination_place_id یا source_lat/lng و dest_lat/lng الزامی است"}, status=400)
+
+    # صفحه HTML
+    route_result = None
+    if has_coords:
+        if coords is None:
+            route_result = {"error": "مختصات مبدأ یا مقصد نامعتبر است."}
+        else:
+            route_result = await from_coords()
+    elif src_id and dst_id:
+        try:
+            route_result = await from_places()
+        except Place.DoesNotExist:
+            route_result = {"error": "مکان مبدأ یا مقصد یافت نشد."}
+
+    return await sync_to_async(_render_routes_page)(request, route_result, travel_mode, src_id, dst_id)
+
+
 # -----------------------------------------------------------------------------
 # مسیریابی فروشنده دوره‌گرد (TSP) — بهینه‌سازی ترتیب بازدید از چند نقطه
 # مستندات: https://platform.neshan.org/docs/api/routing-category/tsp/
@@ -1450,8 +1393,8 @@ def distance_matrix_request(request):
 # مستندات: https://platform.neshan.org/docs/api/routing-category/isochrone/
 # -----------------------------------------------------------------------------
 
-@require_GET
-def isochrone_request(request):
+@async_require_GET
+async def isochrone_request(request):
     """
     محدوده‌ای که از نقطه مرکز در زمان یا مسافت معین قابل دسترسی است.
     GET: location=lat,lng یا lat و lng جداگانه؛ distance (کیلومتر) و/یا time (دقیقه) — حداقل یکی اجباری.
@@ -1508,8 +1451,8 @@ def isochrone_request(request):
         except (TypeError, ValueError):
             pass
     try:
-        from .neshan import fetch_isochrone
-        data = fetch_isochrone(
+        from .neshan import afetch_isochrone
+        data = await afetch_isochrone(
             lat_f, lng_f,
             distance_km=distance_km,
             time_minutes=time_minutes,
@@ -1575,8 +1518,8 @@ def map_matching_request(request):
 # تبدیل مختصات به آدرس (Reverse Geocode) با API نشان
 # -----------------------------------------------------------------------------
 
-@require_GET
-def reverse_geocode_view(request):
+@async_require_GET
+async def reverse_geocode_view(request):
     """
     پراکسی تبدیل نقطه به آدرس (Reverse Geocoding) نشان.
     مستندات: https://platform.neshan.org/docs/api/search-category/reverse-geocoding/
@@ -1589,8 +1532,8 @@ def reverse_geocode_view(request):
     except (TypeError, ValueError):
         return JsonResponse({"error": "پارامترهای lat و lng الزامی و باید عدد باشند", "address": None, "address_compact": None}, status=400)
     try:
-        from .neshan import reverse_geocode
-        data = reverse_geocode(lat, lng)
+        from .neshan import areverse_geocode
+        data = await areverse_geocode(lat, lng)
     except Exception:
         data = None
     if data is None:
@@ -1606,7 +1549,7 @@ def reverse_geocode_view(request):
 # تبدیل آدرس به مختصات (Geocoding) با API نشان
 # -----------------------------------------------------------------------------
 
-def geocode_view(request):
+async def geocode_view(request):
     """
     پراکسی تبدیل آدرس متنی به مختصات (Geocoding) نشان.
     مستندات: https://platform.neshan.org/docs/api/search-category/geocoding/
@@ -1663,8 +1606,8 @@ def geocode_view(request):
     if not address:
         return JsonResponse({"error": "پارامتر address (یا q) الزامی است", "items": []}, status=400)
     try:
-        from .neshan import geocode
-        data = geocode(address, province=province, city=city, location=location, extent=extent, plus=plus)
+        from .neshan import ageocode
+        data = await ageocode(address, province=province, city=city, location=location, extent=extent, plus=plus)
     except Exception:
         data = None
     if data is None:
@@ -1801,6 +1744,18 @@ EMERGENCY_PLACE_TYPES = [
 ]
 
 
+def _places_within(qs, lat, lon, radius_km):
+    """
+    (place, distance_km) برای مکان‌های qs در شعاع radius_km.
+    ابتدا فقط مختصات خوانده و به‌صورت برداری فیلتر می‌شود؛ ترجمه‌ها فقط برای مکان‌های داخل شعاع واکشی می‌شوند.
+    """
+    coords = list(qs.values_list("place_id", "latitude", "longitude"))
+    idx, dist = within_radius(lat, lon, [c[1] for c in coords], [c[2] for c in coords], radius_km)
+    ids = [coords[i][0] for i in idx]
+    by_id = qs.prefetch_related("translations").in_bulk(ids)
+    return [(by_id[pid], float(d)) for pid, d in zip(ids, dist) if pid in by_id]
+
+
 @require_GET
 def places_in_radius(request):
     """
@@ -1836,23 +1791,12 @@ def places_in_radius(request):
             if t and t in dict(Place.PlaceType.choices):
                 filter_types.append(t)
 
-    try:
-        if filter_types:
-            qs = Place.objects.using(TEAM13_DB).filter(type__in=filter_types).prefetch_related("translations")
-        else:
-            qs = Place.objects.using(TEAM13_DB).prefetch_related("translations")
-        all_places = list(qs)
-    except Exception:
-        all_places = list(Place.objects.using(TEAM13_DB).prefetch_related("translations"))
+    qs = Place.objects.using(TEAM13_DB)
+    if filter_types:
+        qs = qs.filter(type__in=filter_types)
 
     with_dist = []
-    for p in all_places:
-        try:
-            d = _distance_km(lat, lon, float(p.latitude), float(p.longitude))
-        except (TypeError, ValueError):
-            continue
-        if d > radius_km:
-            continue
+    for p, d in _places_within(qs, lat, lon, radius_km):
         trans_fa = next((t for t in p.translations.all() if t.lang == "fa"), None)
         trans_en = next((t for t in p.translations.all() if t.lang == "en"), None)
         name_fa = (trans_fa.name if trans_fa else "").strip()
@@ -1903,19 +1847,9 @@ def emergency_nearby(request):
 
     emergency_places = []
     try:
-        all_emergency = list(
-            Place.objects.using(TEAM13_DB)
-            .filter(type__in=EMERGENCY_PLACE_TYPES)
-            .prefetch_related("translations")
-        )
+        qs = Place.objects.using(TEAM13_DB).filter(type__in=EMERGENCY_PLACE_TYPES)
         with_dist = []
-        for p in all_emergency:
-            try:
-                d = _distance_km(lat, lon, float(p.latitude), float(p.longitude))
-            except (TypeError, ValueError):
-                continue
-            if d > radius_km:
-                continue
+        for p, d in _places_within(qs, lat, lon, radius_km):
             trans_fa = next((t for t in p.translations.all() if t.lang == "fa"), None)
             trans_en = next((t for t in p.translations.all() if t.lang == "en"), None)
             name_fa = (trans_fa.name if trans_fa else "").strip()
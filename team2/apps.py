@@ -6,5 +6,5 @@ class Team2Config(AppConfig):
     name = 'team2'
 
     def ready(self):
-        from .tasks.indexing import index_all_articles
-        index_all_articles.apply_async(countdown=15)
+        from .tasks.indexing import sync_search_index
+        sync_search_index.apply_async(countdown=15)
@@ -0,0 +1,187 @@
+"""
+In-memory Elasticsearch stand-in for tests (and local runs without a cluster).
+
+    es = InMemoryElasticsearch().start()
+    with override_settings(ELASTICSEARCH_URL=es.url):
+        ...
+    es.stop()
+
+Speaks enough of the REST API for the official client: _bulk, single-document
+index/get/delete, _refresh, _count and a simple _search/_msearch (match_all,
+multi_match scored by matching terms). Documents live in
+`es.indices[index][id]`; `es.calls` counts requests per endpoint so tests can
+check round-trips, and ids in `es.reject_ids` fail inside _bulk the way a
+mapping error would.
+"""
+import json
+import re
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+_TOKEN = re.compile(r"\w+")
+
+
+def _terms(value):
+    if isinstance(value, list):
+        return [t for v in value for t in _terms(v)]
+    return _TOKEN.findall(str(value).lower())
+
+
+class InMemoryElasticsearch:
+    def __init__(self):
+        self.indices = {}
+        self.calls = Counter()
+        self.reject_ids = set()
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def docs(self, index):
+        return self.indices.get(index, {})
+
+    # -- API -------------------------------------------------------------------
+
+    def bulk(self, body, default_index=None):
+        lines = [json.loads(line) for line in body.splitlines() if line.strip()]
+        items, errors, i = [], False, 0
+        while i < len(lines):
+            (op, meta), = lines[i].items()
+            index, doc_id = meta.get("_index", default_index), str(meta.get("_id"))
+            source = None if op == "delete" else lines[i + 1]
+            i += 1 if op == "delete" else 2
+            if doc_id in self.reject_ids:
+                errors = True
+                items.append({op: {"_index": index, "_id": doc_id, "status": 400, "error": {
+                    "type": "mapper_parsing_exception", "reason": f"rejected {doc_id}"}}})
+                continue
+            with self._lock:
+                docs = self.indices.setdefault(index, {})
+                if op == "delete":
+                    status = 200 if docs.pop(doc_id, None) is not None else 404
+                elif op == "update":
+                    docs[doc_id] = {**docs.get(doc_id, {}), **source.get("doc", {})}
+                    status = 200
+                else:
+                    status = 200 if doc_id in docs else 201
+                    docs[doc_id] = source
+            items.append({op: {"_index": index, "_id": doc_id, "status": status, "result": "ok"}})
+        return {"took": 1, "errors": errors, "items": items}
+
+    def search(self, index, body):
+        docs = self.docs(index)
+        query = body.get("query") or {"match_all": {}}
+        hits = []
+        if "multi_match" in query:
+            wanted = set(_terms(query["multi_match"]["query"]))
+            fields = [f.split("^")[0] for f in query["multi_match"].get("fields", [])]
+            for doc_id, source in docs.items():
+                score = sum(
+                    1 for f in fields or source for t in _terms(source.get(f, "")) if t in wanted
+                )
+                if score:
+                    hits.append((float(score), doc_id, source))
+            hits.sort(key=lambda h: (-h[0], h[1]))
+        else:
+            hits = [(1.0, doc_id, source) for doc_id, source in sorted(docs.items())]
+        size = body.get("size", 10)
+        return {
+            "took": 1, "timed_out": False,
+            "hits": {
+                "total": {"value": len(hits), "relation": "eq"},
+                "max_score": hits[0][0] if hits else None,
+                "hits": [{"_index": index, "_id": i, "_score": s, "_source": src} for s, i, src in hits[:size]],
+            },
+        }
+
+    def msearch(self, body, default_index=None):
+        lines = [json.loads(line) for line in body.splitlines() if line.strip()]
+        responses = []
+        for header, search in zip(lines[::2], lines[1::2]):
+            responses.append({**self.search(header.get("index", default_index), search), "status": 200})
+        return {"took": 1, "responses": responses}
+
+    # -- HTTP --------------------------------------------------------------------
+
+    def _route(self, method, path, body):
+        parts = [p for p in path.split("/") if p]
+        if not parts:
+            return 200, {"name": "in-memory", "cluster_name": "stub", "version": {"number": "8.12.0"},
+                         "tagline": "You Know, for Search"}
+        if parts[-1] == "_bulk":
+            self.calls["_bulk"] += 1
+            return 200, self.bulk(body.decode(), parts[0] if len(parts) == 2 else None)
+        if parts[-1] == "_msearch":
+            self.calls["_msearch"] += 1
+            return 200, self.msearch(body.decode(), parts[0] if len(parts) == 2 else None)
+        index = parts[0]
+        if len(parts) == 1:
+            if method == "HEAD":
+                return (200 if index in self.indices else 404), None
+            if method == "PUT":
+                self.indices.setdefault(index, {})
+                return 200, {"acknowledged": True, "index": index}
+            if method == "DELETE":
+                self.indices.pop(index, None)
+                return 200, {"acknowledged": True}
+        endpoint = parts[1]
+        self.calls[endpoint] += 1
+        if endpoint == "_refresh":
+            return 200, {"_shards": {"total": 1, "successful": 1, "failed": 0}}
+        if endpoint == "_count":
+            return 200, {"count": len(self.docs(index))}
+        if endpoint == "_search":
+            return 200, self.search(index, json.loads(body or b"{}"))
+        if endpoint == "_doc" and len(parts) == 3:
+            doc_id = parts[2]
+            if method in ("PUT", "POST"):
+                out = self.bulk(json.dumps({"index": {"_index": index, "_id": doc_id}}) + "\n" + body.decode())
+                item = out["items"][0]["index"]
+                return item["status"], {"_index": index, "_id": doc_id, "result": "created"}
+            source = self.docs(index).get(doc_id)
+            if method == "DELETE":
+                self.docs(index).pop(doc_id, None)
+                return (200 if source else 404), {"_index": index, "_id": doc_id, "result": "deleted"}
+            if source is None:
+                return 404, {"_index": index, "_id": doc_id, "found": False}
+            return 200, {"_index": index, "_id": doc_id, "found": True, "_source": source}
+        return 400, {"error": {"type": "unsupported", "reason": f"{method} {path}"}, "status": 400}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _serve(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                status, payload = stub._route(self.command, urlsplit(self.path).path, body)
+                data = b"" if payload is None else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("X-Elastic-Product", "Elasticsearch")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _serve
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
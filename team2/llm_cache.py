@@ -0,0 +1,135 @@
+"""
+Gemini results of the summarize/tag tasks, keyed by content hash.
+
+The key is sha256(kind, prompt version, model, content): publishing a version
+whose content was already processed (create_version_from_version copies it
+verbatim) reuses the stored output instead of calling Gemini again, and bumping
+a task's prompt version retires its old entries.
+
+Rows live in the team2 database (LLMResult) so every Celery worker shares them.
+A row with no result yet is a claim: the worker that created it calls Gemini,
+anyone else asking for the same key gets Pending and retries later, so the
+summarize/tag chord of two identical publishes makes one call, not two. Claims
+older than TEAM2_LLM_CLAIM_SECONDS (a crashed worker) are taken over.
+
+Hits, computed entries and the Gemini time hits saved are exported at
+/api/metrics/.
+"""
+import hashlib
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.db.models import Count, F, FloatField, Sum
+from django.utils import timezone
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Pending(Exception):
+    """Another worker is computing this result right now."""
+
+
+def content_key(kind, prompt_version, model, content):
+    digest = hashlib.sha256()
+    for part in (kind, str(prompt_version), model, content or ""):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def claim_seconds():
+    return getattr(settings, "TEAM2_LLM_CLAIM_SECONDS", 120)
+
+
+def lookup(kind, prompt_version, model, content):
+    """
+    Returns (key, result). result is the cached output, or None when the caller
+    now owns the call and must put() or release() the key. Raises Pending while
+    another worker owns it.
+    """
+    from team2.models import LLMResult
+
+    key = content_key(kind, prompt_version, model, content)
+    now = timezone.now()
+    try:
+        with transaction.atomic(using=router.db_for_write(LLMResult)):
+            LLMResult.objects.create(key=key, kind=kind, claimed_at=now)
+        return key, None
+    except IntegrityError:
+        pass
+
+    row = LLMResult.objects.filter(key=key).values("result", "claimed_at").first()
+    if row is None:  # released in between
+        return lookup(kind, prompt_version, model, content)
+    if row["result"] is not None:
+        LLMResult.objects.filter(key=key).update(hits=F("hits") + 1, last_hit_at=now)
+        return key, row["result"]
+    stale = now - timedelta(seconds=claim_seconds())
+    if row["claimed_at"] is None or row["claimed_at"] < stale:
+        if LLMResult.objects.filter(key=key, claimed_at=row["claimed_at"], result__isnull=True).update(claimed_at=now):
+            logger.info("team2 llm cache: taking over stale %s claim %s", kind, key[:12])
+            return key, None
+    raise Pending(key)
+
+
+def put(key, result, seconds):
+    """Store the output of the call claimed by lookup(); seconds is what it took."""
+    from team2.models import LLMResult
+
+    LLMResult.objects.filter(key=key).update(result=result, seconds=seconds, claimed_at=None)
+
+
+def release(key):
+    """Give up a claim (the call failed) so a retry can take it."""
+    from team2.models import LLMResult
+
+    LLMResult.objects.filter(key=key, result__isnull=True).delete()
+
+
+def stats():
+    from team2.models import LLMResult
+
+    rows = (
+        LLMResult.objects.filter(result__isnull=False)
+        .values("kind")
+        .annotate(
+            entries=Count("key"),
+            total_hits=Sum("hits"),
+            saved=Sum(F("hits") * F("seconds"), output_field=FloatField()),
+        )
+        .order_by("kind")
+    )
+    return {r["kind"]: {"entries": r["entries"], "hits": r["total_hits"] or 0, "saved_seconds": r["saved"] or 0.0}
+            for r in rows}
+
+
+def _metrics_lines():
+    try:
+        s = stats()
+    except Exception:  # database unreachable: leave the series out rather than fail the scrape
+        logger.exception("team2 llm cache stats failed")
+        return []
+    lines = [
+        "# HELP app404_team2_llm_cache_hits_total Gemini calls answered from the team2 content-hash cache.",
+        "# TYPE app404_team2_llm_cache_hits_total counter",
+    ]
+    lines += [f'app404_team2_llm_cache_hits_total{{kind="{k}"}} {v["hits"]}' for k, v in s.items()]
+    lines += [
+        "# HELP app404_team2_llm_cache_entries Results computed by Gemini and stored (cache misses).",
+        "# TYPE app404_team2_llm_cache_entries gauge",
+    ]
+    lines += [f'app404_team2_llm_cache_entries{{kind="{k}"}} {v["entries"]}' for k, v in s.items()]
+    lines += [
+        "# HELP app404_team2_llm_cache_saved_seconds_total Gemini time avoided by cache hits.",
+        "# TYPE app404_team2_llm_cache_saved_seconds_total counter",
+    ]
+    lines += [f'app404_team2_llm_cache_saved_seconds_total{{kind="{k}"}} {float(v["saved_seconds"])!r}'
+              for k, v in s.items()]
+    return lines
+
+
+metrics.register_collector(_metrics_lines)
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-18 06:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team2', '0004_search_sync_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchsyncstate',
+            name='generation',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.27 on 2026-10-18 06:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+TOP_K = 3  # team2.top_by_tag.TOP_K when this migration was written
+
+
+def fill(apps, schema_editor):
+    db = schema_editor.connection.alias
+    Article = apps.get_model('team2', 'Article')
+    Tag = apps.get_model('team2', 'Tag')
+    TagTopArticle = apps.get_model('team2', 'TagTopArticle')
+    rows = []
+    for name in Tag.objects.using(db).values_list('name', flat=True):
+        ranked = (
+            Article.objects.using(db)
+            .filter(current_version__tags=name, deleted_at__isnull=True)
+            .order_by('-score', 'name')
+            .values_list('name', flat=True)[:TOP_K]
+        )
+        rows.extend(TagTopArticle(tag_id=name, article_id=a, rank=rank) for rank, a in enumerate(ranked))
+    TagTopArticle.objects.using(db).bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team2', '0005_search_cache_generation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagTopArticle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='team2.article')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='top_articles', to='team2.tag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tag', 'rank'], name='team2_tagto_tag_id_5e7e2b_idx')],
+            },
+        ),
+        migrations.RunPython(fill, migrations.RunPython.noop),
+    ]
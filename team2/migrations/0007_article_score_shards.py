@@ -0,0 +1,31 @@
+# Generated by Django 4.2.27 on 2026-10-18 06:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team2', '0006_tag_top_article'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='sharded_score',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='ArticleScoreShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('delta', models.IntegerField(default=0)),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_shards', to='team2.article')),
+            ],
+            options={
+                'unique_together': {('article', 'shard')},
+            },
+        ),
+    ]
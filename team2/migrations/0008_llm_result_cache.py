@@ -0,0 +1,60 @@
+# Generated by Django 4.2.27 on 2026-10-18 06:06
+
+import hashlib
+
+from django.db import migrations, models
+
+# team2.tasks.tasks.MODEL_NAME and prompt versions when this migration was written
+MODEL_NAME = "gemini-2.5-flash"
+PROMPT_VERSION = 1
+
+
+def _key(kind, content):
+    digest = hashlib.sha256()
+    for part in (kind, str(PROMPT_VERSION), MODEL_NAME, content or ""):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def seed(apps, schema_editor):
+    """Reuse the summaries and tags Gemini already produced for existing versions."""
+    db = schema_editor.connection.alias
+    Version = apps.get_model('team2', 'Version')
+    LLMResult = apps.get_model('team2', 'LLMResult')
+    rows = {}
+    versions = Version.objects.using(db).exclude(content='').prefetch_related('tags').order_by('created_at')
+    for version in versions.iterator(chunk_size=500):
+        if version.summary:
+            key = _key('summary', version.content)
+            rows.setdefault(key, LLMResult(key=key, kind='summary', result={'summary': version.summary}))
+        tags = [t.name for t in version.tags.all()]
+        if tags:
+            key = _key('tags', version.content)
+            rows.setdefault(key, LLMResult(key=key, kind='tags',
+                                           result={'selected_existing_tags': tags, 'new_tags': []}))
+    LLMResult.objects.using(db).bulk_create(rows.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team2', '0007_article_score_shards'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMResult',
+            fields=[
+                ('key', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('kind', models.CharField(max_length=16)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('seconds', models.FloatField(default=0)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_hit_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(seed, migrations.RunPython.noop),
+    ]
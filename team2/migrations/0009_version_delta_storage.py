@@ -0,0 +1,121 @@
+# Generated by Django 4.2.27 on 2026-10-18 06:12
+
+import json
+from difflib import SequenceMatcher
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# team2.version_store.encode / decode when this migration was written, frozen here
+def _lines(text):
+    return text.splitlines(keepends=True)
+
+
+def encode(base_text, text):
+    a, b = _lines(base_text), _lines(text)
+    ops = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            literal = "".join(b[j1:j2])
+            if ops and isinstance(ops[-1], str):
+                ops[-1] += literal
+            else:
+                ops.append(literal)
+    return json.dumps(ops, ensure_ascii=False, separators=(",", ":"))
+
+
+def decode(base_text, delta):
+    a = _lines(base_text)
+    return "".join(op if isinstance(op, str) else "".join(a[op[0]:op[1]]) for op in json.loads(delta))
+
+
+def _by_article(Version, db, **filters):
+    versions = Version.objects.using(db).filter(**filters).order_by('article_id', 'created_at', 'name')
+    article, group = None, []
+    for version in versions.iterator(chunk_size=500):
+        if version.article_id != article and group:
+            yield group
+            group = []
+        article = version.article_id
+        group.append(version)
+    if group:
+        yield group
+
+
+def to_delta(apps, schema_editor):
+    """With TEAM2_VERSION_STORAGE = "delta", chain each article's versions in creation order."""
+    if getattr(settings, 'TEAM2_VERSION_STORAGE', 'full') != 'delta':
+        return
+    max_chain = getattr(settings, 'TEAM2_VERSION_MAX_CHAIN', 10)
+    db = schema_editor.connection.alias
+    Version = apps.get_model('team2', 'Version')
+    for versions in _by_article(Version, db):
+        changed = []
+        previous, previous_text = None, None
+        for version in versions:
+            text = version.content
+            if previous is not None and previous.delta_depth < max_chain:
+                delta = encode(previous_text, text)
+                if len(delta) < len(text):
+                    version.content, version.delta_base, version.delta = '', previous, delta
+                    version.delta_depth = previous.delta_depth + 1
+                    changed.append(version)
+            previous, previous_text = version, text
+        Version.objects.using(db).bulk_update(changed, ['content', 'delta_base', 'delta', 'delta_depth'],
+                                              batch_size=500)
+
+
+def to_full(apps, schema_editor):
+    db = schema_editor.connection.alias
+    Version = apps.get_model('team2', 'Version')
+    article_ids = Version.objects.using(db).filter(delta_base__isnull=False).values_list('article_id', flat=True)
+    for versions in _by_article(Version, db, article_id__in=set(article_ids)):
+        by_name = {v.name: v for v in versions}
+        texts = {}
+
+        def text(v):
+            if v.name not in texts:
+                if v.delta_base_id is None:
+                    texts[v.name] = v.content
+                else:
+                    base = by_name.get(v.delta_base_id) or Version.objects.using(db).get(pk=v.delta_base_id)
+                    texts[v.name] = decode(text(base), v.delta)
+            return texts[v.name]
+
+        changed = [v for v in versions if v.delta_base_id is not None]
+        for v in changed:
+            text(v)
+        for v in changed:
+            v.content, v.delta_base, v.delta, v.delta_depth = texts[v.name], None, '', 0
+        Version.objects.using(db).bulk_update(changed, ['content', 'delta_base', 'delta', 'delta_depth'],
+                                              batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team2', '0008_llm_result_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='version',
+            name='delta',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='version',
+            name='delta_base',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='+', to='team2.version'),
+        ),
+        migrations.AddField(
+            model_name='version',
+            name='delta_depth',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(to_delta, to_full),
+    ]
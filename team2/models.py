@@ -16,8 +16,10 @@ class Article(models.Model):
     creator_id = models.UUIDField()
     current_version = models.OneToOneField('Version', on_delete=models.SET_NULL, null=True, blank=True, related_name='current_of')
     score = models.IntegerField(default=0)
+    # hot article: votes go to ArticleScoreShard rows and are folded into score periodically
+    sharded_score = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
@@ -27,17 +29,38 @@ class Article(models.Model):
 class Version(models.Model):
     name = models.CharField(max_length=255, primary_key=True)
     article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='versions')
+    # full text; empty for versions stored as a delta against delta_base (team2.version_store),
+    # read and write the text through Version.text
     content = models.TextField(blank=True, default='')
+    delta_base = models.ForeignKey('self', null=True, blank=True, on_delete=models.RESTRICT, related_name='+')
+    delta = models.TextField(blank=True, default='')
+    delta_depth = models.PositiveSmallIntegerField(default=0)  # deltas to replay from the nearest snapshot
     summary = models.TextField(blank=True, default='')
     editor_id = models.UUIDField()
     tags = models.ManyToManyField(Tag, blank=True, related_name='versions')
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return self.name
 
+    @property
+    def text(self):
+        from team2 import version_store
+        return version_store.materialize(self)
+
+    @text.setter
+    def text(self, value):
+        from team2 import version_store
+        version_store.assign(self, value)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        if '_text' in self.__dict__:
+            from team2 import version_store
+            version_store.after_save(self)
+
 
 class PublishRequest(models.Model):
     STATUS_CHOICES = [
@@ -74,3 +97,75 @@ class Vote(models.Model):
 
     def __str__(self):
         return f"{self.user_id} -> {self.article_id}: {self.value}"
+
+
+class SearchSyncState(models.Model):
+    """High-water mark of the incremental search sync and generation of the result cache (one row per index)."""
+    name = models.CharField(max_length=64, primary_key=True)
+    watermark = models.DateTimeField(null=True, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    generation = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.watermark}"
+
+
+class TagTopArticle(models.Model):
+    """Materialized top articles per tag, maintained by team2.top_by_tag."""
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='top_articles')
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=['tag', 'rank'])]
+
+    def __str__(self):
+        return f"{self.tag_id} #{self.rank}: {self.article_id}"
+
+
+class ArticleScoreShard(models.Model):
+    """Pending score delta of a sharded article (team2.votes), one row per shard."""
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='score_shards')
+    shard = models.PositiveSmallIntegerField()
+    delta = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('article', 'shard')
+
+    def __str__(self):
+        return f"{self.article_id}[{self.shard}]: {self.delta:+d}"
+
+
+class LLMResult(models.Model):
+    """Gemini output for one (task, prompt version, model, content hash); see team2.llm_cache."""
+    key = models.CharField(max_length=64, primary_key=True)
+    kind = models.CharField(max_length=16)
+    result = models.JSONField(null=True, blank=True)  # None while a worker is computing it
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    seconds = models.FloatField(default=0)  # what the Gemini call took
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_hit_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.kind} {self.key[:12]} ({self.hits} hits)"
+
+
+class RateLimitBucket(models.Model):
+    """Token bucket shared by every worker (team2.rate_limit)."""
+    name = models.CharField(max_length=64, primary_key=True)
+    tokens = models.FloatField()
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name}: {self.tokens:.2f}"
+
+
+class EnrichmentRequest(models.Model):
+    """A publish waiting for its tag/summary job; repeated publishes of the article share it."""
+    article = models.OneToOneField(Article, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    requested_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.article_id} @ {self.requested_at}"
@@ -0,0 +1,56 @@
+"""
+Token buckets shared by every Celery worker, stored in the team2 database.
+
+Celery's own rate_limit task option counts per worker process, so N workers
+would send N times the quota. A bucket here is one RateLimitBucket row: taking a
+token locks the row, refills it by `rate` tokens per second (at most `burst`
+stored) and takes one if available.
+
+    rate_limit.take("gemini", rate=1.0, burst=5, max_wait=5)
+
+sleeps until a token is free, or raises RateLimited(retry_after) when that would
+take longer than max_wait, so the task can be retried later instead of holding
+a worker.
+"""
+import time
+
+from django.db import router, transaction
+from django.utils import timezone
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"rate limited, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+def acquire(name, rate, burst):
+    """Take a token from bucket `name`. Returns 0 when granted, else the seconds until one is."""
+    from team2.models import RateLimitBucket
+
+    RateLimitBucket.objects.get_or_create(name=name, defaults={"tokens": burst, "updated_at": timezone.now()})
+    with transaction.atomic(using=router.db_for_write(RateLimitBucket)):
+        bucket = RateLimitBucket.objects.select_for_update().get(name=name)
+        now = timezone.now()
+        elapsed = max(0.0, (now - bucket.updated_at).total_seconds())
+        tokens = min(float(burst), bucket.tokens + elapsed * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        RateLimitBucket.objects.filter(name=name).update(tokens=tokens, updated_at=now)
+    return wait
+
+
+def take(name, rate, burst, max_wait):
+    """Block until a token is taken; RateLimited if that would take more than max_wait seconds."""
+    waited = 0.0
+    while True:
+        wait = acquire(name, rate, burst)
+        if not wait:
+            return waited
+        if waited + wait > max_wait:
+            raise RateLimited(wait)
+        time.sleep(wait)
+        waited += wait
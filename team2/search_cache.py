@@ -0,0 +1,163 @@
+"""
+Cache of article search results, keyed by (index generation, normalized query, size).
+
+Two tiers, as in core.user_cache:
+  * a bounded in-process LRU with a TTL (TEAM2_SEARCH_CACHE_MAX_ENTRIES,
+    TEAM2_SEARCH_CACHE_TTL_SECONDS)
+  * an optional shared tier on top of Django's cache framework (TEAM2_SEARCH_CACHE_ALIAS)
+
+The index generation is a counter in the database (SearchSyncState), bumped by
+everything that changes the index: publishing, the per-version indexing task,
+full reindexes and the incremental sync. Every lookup reads the current
+generation, so a bump in a Celery worker retires the entries in every web worker
+at once and stale results are never served; old entries just age out.
+
+Every hit adds the Elasticsearch time the entry originally cost to
+`saved_seconds`; hits, misses and saved time are exported at /api/metrics/.
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import F
+
+from core import metrics
+
+_lock = threading.Lock()
+_local = OrderedDict()
+_stats = {"hits": 0, "shared_hits": 0, "misses": 0, "saved_seconds": 0.0}
+
+_SPACES = re.compile(r"\s+")
+# Arabic code points Persian keyboards still produce, and the harakat
+_PERSIAN = str.maketrans({"ي": "ی", "ك": "ک", "ة": "ه", "ۀ": "ه", **{chr(c): None for c in range(0x064B, 0x0653)}})
+_STATE = "articles"  # the SearchSyncState row of team2.tasks.indexing.INDEX_NAME
+
+
+def normalize(query):
+    """Case-fold, unify Arabic/Persian letter forms and collapse whitespace."""
+    return _SPACES.sub(" ", query.translate(_PERSIAN).casefold()).strip()
+
+
+def generation():
+    from team2.models import SearchSyncState
+
+    value = SearchSyncState.objects.filter(name=_STATE).values_list("generation", flat=True).first()
+    return value or 0
+
+
+def bump_generation():
+    """Retire every cached result (the index changed)."""
+    from team2.models import SearchSyncState
+
+    if not SearchSyncState.objects.filter(name=_STATE).update(generation=F("generation") + 1):
+        SearchSyncState.objects.get_or_create(name=_STATE, defaults={"generation": 1})
+
+
+def _ttl():
+    return getattr(settings, "TEAM2_SEARCH_CACHE_TTL_SECONDS", 300)
+
+
+def _max_entries():
+    return getattr(settings, "TEAM2_SEARCH_CACHE_MAX_ENTRIES", 1024)
+
+
+def _shared():
+    alias = getattr(settings, "TEAM2_SEARCH_CACHE_ALIAS", None)
+    if not alias:
+        return None
+    from django.core.cache import caches
+    return caches[alias]
+
+
+def _shared_key(key):
+    gen, query, size = key
+    return f"team2:search:{gen}:{size}:{hashlib.sha1(query.encode()).hexdigest()}"
+
+
+def _hit(name, es_seconds):
+    with _lock:
+        _stats[name] += 1
+        _stats["saved_seconds"] += es_seconds
+
+
+def get(key):
+    """Cached results for key = (generation, normalized query, size), or None."""
+    if _ttl() <= 0:
+        return None
+    with _lock:
+        entry = _local.get(key)
+        if entry is not None and entry[0] < time.monotonic():
+            del _local[key]
+            entry = None
+        if entry is not None:
+            _local.move_to_end(key)
+    if entry is not None:
+        _hit("hits", entry[2])
+        return entry[1]
+
+    shared = _shared()
+    if shared is not None:
+        value = shared.get(_shared_key(key))
+        if value is not None:
+            results, es_seconds = value
+            _hit("shared_hits", es_seconds)
+            _local_set(key, results, es_seconds)
+            return results
+
+    with _lock:
+        _stats["misses"] += 1
+    return None
+
+
+def _local_set(key, results, es_seconds):
+    with _lock:
+        _local[key] = (time.monotonic() + _ttl(), results, es_seconds)
+        _local.move_to_end(key)
+        while len(_local) > _max_entries():
+            _local.popitem(last=False)
+
+
+def put(key, results, es_seconds):
+    """Store the results for `key`; es_seconds is what fetching them cost."""
+    if _ttl() <= 0:
+        return
+    _local_set(key, results, es_seconds)
+    shared = _shared()
+    if shared is not None:
+        shared.set(_shared_key(key), (results, es_seconds), _ttl())
+
+
+def stats():
+    with _lock:
+        return {**_stats, "size": len(_local)}
+
+
+def clear():
+    with _lock:
+        _local.clear()
+        _stats.update(hits=0, shared_hits=0, misses=0, saved_seconds=0.0)
+
+
+def _metrics_lines():
+    s = stats()
+    lines = [
+        "# HELP app404_team2_search_cache_lookups_total team2 search result cache lookups, by result.",
+        "# TYPE app404_team2_search_cache_lookups_total counter",
+    ]
+    for result in ("hits", "shared_hits", "misses"):
+        lines.append(f'app404_team2_search_cache_lookups_total{{result="{result}"}} {s[result]}')
+    lines += [
+        "# HELP app404_team2_search_cache_saved_seconds_total Elasticsearch time avoided by cache hits.",
+        "# TYPE app404_team2_search_cache_saved_seconds_total counter",
+        f"app404_team2_search_cache_saved_seconds_total {s['saved_seconds']!r}",
+        "# HELP app404_team2_search_cache_entries Entries in the in-process search cache.",
+        "# TYPE app404_team2_search_cache_entries gauge",
+        f"app404_team2_search_cache_entries {s['size']}",
+    ]
+    return lines
+
+
+metrics.register_collector(_metrics_lines)
@@ -10,6 +10,7 @@ class TagSerializer(serializers.ModelSerializer):
 
 class VersionSerializer(serializers.ModelSerializer):
     tags = TagSerializer(many=True, read_only=True)
+    content = serializers.CharField(source='text', allow_blank=True, required=False)
 
     class Meta:
         model = Version
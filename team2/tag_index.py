@@ -0,0 +1,104 @@
+"""
+Shortlist of existing tags relevant to an article, for the tag_article prompt.
+
+Instead of the whole vocabulary, the prompt gets the TEAM2_TAG_SHORTLIST_SIZE
+tags that best match the article text. Matching is on character trigrams of the
+normalized text (search_cache.normalize), which tolerates Persian affixes and
+half-spaces (کتاب / کتاب‌ها / کتابخانه share trigrams): a tag scores the
+IDF-weighted share of its trigrams that occur in the article, so rare trigrams
+count more than ones every other tag has too.
+
+The index (trigram -> tags) is kept per process. It is built on first use and
+then refreshed incrementally: tags created by this process are added by add(),
+tags created elsewhere are picked up by their created_at on the next shortlist().
+"""
+import math
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from team2.search_cache import normalize
+
+N = 3
+# re-read tags created this long before the last refresh: a slow transaction may commit them late
+OVERLAP = timedelta(seconds=60)
+
+_lock = threading.Lock()
+_postings = {}  # trigram -> set of tag names
+_grams = {}  # tag name -> its trigrams
+_seen_until = None  # created_at of tags already indexed (None: not built yet)
+
+
+def grams(text):
+    """Character trigrams of each word, padded with spaces so short tags still have some."""
+    out = set()
+    for word in normalize(text).replace("‌", "").split():
+        padded = f" {word} "
+        out.update(padded[i:i + N] for i in range(max(1, len(padded) - N + 1)))
+    return out
+
+
+def _add(name):
+    if name in _grams:
+        return
+    tag_grams = grams(name)
+    _grams[name] = tag_grams
+    for g in tag_grams:
+        _postings.setdefault(g, set()).add(name)
+
+
+def add(name):
+    """Index a tag created by this process."""
+    with _lock:
+        if _seen_until is not None:
+            _add(name)
+
+
+def _refresh():
+    global _seen_until
+    from team2.models import Tag
+
+    now = timezone.now()
+    tags = Tag.objects.filter(deleted_at__isnull=True)
+    if _seen_until is not None:
+        tags = tags.filter(created_at__gte=_seen_until - OVERLAP)
+    for name in tags.values_list("name", flat=True).iterator():
+        _add(name)
+    _seen_until = now
+
+
+def clear():
+    global _seen_until
+    with _lock:
+        _postings.clear()
+        _grams.clear()
+        _seen_until = None
+
+
+def _limit():
+    return getattr(settings, "TEAM2_TAG_SHORTLIST_SIZE", 30)
+
+
+def shortlist(text, limit=None):
+    """The `limit` existing tags that best match `text`, best first."""
+    limit = limit or _limit()
+    with _lock:
+        _refresh()
+        total = len(_grams)
+        idf = {}
+        scores = {}
+        for g in grams(text):
+            tags = _postings.get(g)
+            if not tags:
+                continue
+            idf[g] = weight = math.log(1 + total / len(tags))
+            for name in tags:
+                scores[name] = scores.get(name, 0.0) + weight
+        ranked = []
+        for name, score in scores.items():
+            full = sum(idf.get(g) or math.log(1 + total / len(_postings[g])) for g in _grams[name])
+            ranked.append((-score / full, -score, name))  # ties: the more specific tag
+    ranked.sort()
+    return [name for _, _, name in ranked[:limit]]
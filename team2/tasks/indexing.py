@@ -1,69 +1,221 @@
 import logging
+import time
+from datetime import timedelta
 
 from celery import shared_task
 from django.conf import settings
-from team2.models import Article, Version
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+from team2 import search_cache
+from team2.models import Article, SearchSyncState, Tag, Version
 
 logger = logging.getLogger(__name__)
 
 INDEX_NAME = "articles"
-_ES = None
+_SYNC_LOCK_SECONDS = 600
+_ES = {}
 
 
 def _get_es():
-    global _ES
-    if _ES is None:
+    url = settings.ELASTICSEARCH_URL
+    if url not in _ES:
         from elasticsearch import Elasticsearch
-        _ES = Elasticsearch(hosts=[settings.ELASTICSEARCH_URL])
-    return _ES
+        _ES[url] = Elasticsearch(hosts=[url])
+    return _ES[url]
 
 
-@shared_task(bind=True, max_retries=2, default_retry_delay=10)
-def index_article_version(self, results, version_name):
-    version = Version.objects.get(name=version_name)
-    body = {
-        "article_name": version.article.name,
+def _document(article, version):
+    return {
+        "article_name": article.name,
         "version_name": version.name,
-        "content": version.content,
+        "content": version.text,
         "summary": version.summary,
         "tags": [tag.name for tag in version.tags.all()],
     }
 
+
+def _articles():
+    return (
+        Article.objects.select_related("current_version")
+        .prefetch_related(Prefetch("current_version__tags", queryset=Tag.objects.only("name")))
+        .order_by("name")
+    )
+
+
+def _searchable(article):
+    version = article.current_version
+    return article.deleted_at is None and version is not None and version.deleted_at is None
+
+
+def _actions(articles, chunk_size):
+    """
+    Bulk actions for `articles`, streamed from the database: "index" for searchable
+    articles, "delete" for soft-deleted or unpublished ones.
+    """
+    # iterator(chunk_size) keeps memory flat; the tags prefetch runs once per chunk
+    for article in articles.iterator(chunk_size=chunk_size):
+        if _searchable(article):
+            yield {"_index": INDEX_NAME, "_id": article.name, "_source": _document(article, article.current_version)}
+        else:
+            yield {"_op_type": "delete", "_index": INDEX_NAME, "_id": article.name}
+
+
+def _send_chunk(es, actions):
+    from elasticsearch.helpers import streaming_bulk
+
+    results = streaming_bulk(
+        es, actions, chunk_size=len(actions), raise_on_error=False, raise_on_exception=False,
+    )
+    return list(results)
+
+
+def _bulk_send(es, actions, chunk_size, thread_count):
+    """
+    Send `actions` in chunks of `chunk_size` from a pool of `thread_count` threads,
+    at most that many requests in flight; the actions (and their database reads)
+    are consumed in this thread. Failed documents are logged and counted, not
+    raised; deleting a document that is already gone counts as deleted.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    counts = {"indexed": 0, "deleted": 0, "failed": 0}
+
+    def collect(done):
+        for future in done:
+            for ok, item in future.result():
+                ((op_type, op),) = item.items()
+                if op_type == "delete" and (ok or op.get("status") == 404):
+                    counts["deleted"] += 1
+                elif ok:
+                    counts["indexed"] += 1
+                else:
+                    counts["failed"] += 1
+                    logger.error("Failed to %s article %s: %s", op_type, op.get("_id"),
+                                 op.get("error") or op.get("exception"))
+
+    with ThreadPoolExecutor(max_workers=thread_count) as pool:
+        pending, chunk = set(), []
+        for action in actions:
+            chunk.append(action)
+            if len(chunk) < chunk_size:
+                continue
+            if len(pending) >= thread_count:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending.add(pool.submit(_send_chunk, es, chunk))
+            chunk = []
+        if chunk:
+            pending.add(pool.submit(_send_chunk, es, chunk))
+        collect(wait(pending).done)
+    return counts
+
+
+def _timed(counts, t0):
+    seconds = time.perf_counter() - t0
+    done = counts["indexed"] + counts.get("deleted", 0)
+    return {**counts, "seconds": round(seconds, 3), "docs_per_sec": round(done / seconds, 1) if seconds else 0.0}
+
+
+def bulk_index_articles(es=None, chunk_size=None, thread_count=None):
+    """
+    Reindex every published, non-deleted article through the bulk API.
+    Returns {"indexed", "deleted", "failed", "seconds", "docs_per_sec"}.
+    """
+    chunk_size = chunk_size or settings.TEAM2_INDEX_CHUNK_SIZE
+    thread_count = thread_count or settings.TEAM2_INDEX_THREADS
+    t0 = time.perf_counter()
+    articles = _articles().filter(
+        current_version__isnull=False, deleted_at__isnull=True, current_version__deleted_at__isnull=True,
+    )
+    counts = _bulk_send(es or _get_es(), _actions(articles, chunk_size), chunk_size, thread_count)
+    search_cache.bump_generation()
+    return _timed(counts, t0)
+
+
+def sync_changed_articles(es=None, chunk_size=None, thread_count=None):
+    """
+    Push only the articles changed since the last successful sync.
+
+    An article is picked up when its own updated_at/deleted_at or its current
+    version's updated_at/deleted_at is past the stored watermark (less
+    TEAM2_SEARCH_SYNC_OVERLAP_SECONDS, so rows committed late by a slow
+    transaction are still seen; re-sending them is harmless). Soft-deleted and
+    unpublished articles are removed from the index. The watermark only moves
+    when every document went through, and a row lock in the database keeps two
+    runs from overlapping. The first run, with no watermark, indexes everything.
+
+    Returns {"indexed", "deleted", "failed", "seconds", "docs_per_sec", "watermark"}
+    or None when another run holds the lock.
+    """
+    chunk_size = chunk_size or settings.TEAM2_INDEX_CHUNK_SIZE
+    thread_count = thread_count or settings.TEAM2_INDEX_THREADS
+    now = timezone.now()
+    SearchSyncState.objects.get_or_create(name=INDEX_NAME)
+    claimed = SearchSyncState.objects.filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now), name=INDEX_NAME,
+    ).update(locked_until=now + timedelta(seconds=_SYNC_LOCK_SECONDS))
+    if not claimed:
+        return None
+
+    t0 = time.perf_counter()
+    try:
+        watermark = SearchSyncState.objects.get(name=INDEX_NAME).watermark
+        articles = _articles()
+        if watermark is not None:
+            since = watermark - timedelta(seconds=settings.TEAM2_SEARCH_SYNC_OVERLAP_SECONDS)
+            articles = articles.filter(
+                Q(updated_at__gt=since) | Q(deleted_at__gt=since)
+                | Q(current_version__updated_at__gt=since) | Q(current_version__deleted_at__gt=since)
+            )
+        counts = _bulk_send(es or _get_es(), _actions(articles, chunk_size), chunk_size, thread_count)
+    except Exception:
+        SearchSyncState.objects.filter(name=INDEX_NAME).update(locked_until=None)
+        raise
+    # `now` was taken before reading, so anything written during the run is newer
+    if counts["indexed"] or counts["deleted"]:
+        search_cache.bump_generation()
+    new_watermark = now if not counts["failed"] else watermark
+    SearchSyncState.objects.filter(name=INDEX_NAME).update(watermark=new_watermark, locked_until=None)
+    return {**_timed(counts, t0), "watermark": new_watermark.isoformat() if new_watermark else None}
+
+
+@shared_task(bind=True, max_retries=2, default_retry_delay=10)
+def index_article_version(self, results, version_name):
+    version = Version.objects.select_related("article").get(name=version_name)
+    body = _document(version.article, version)
+
     try:
         _get_es().index(index=INDEX_NAME, id=version.article.name, document=body)
     except Exception as exc:
         raise self.retry(exc=exc)
+    search_cache.bump_generation()
 
 
 @shared_task(bind=True, max_retries=1, default_retry_delay=30)
-def index_all_articles(self):
-    es = _get_es()
-    articles = Article.objects.filter(
-        current_version__isnull=False
-    ).select_related('current_version')
-
-    indexed = 0
-    for article in articles:
-        version = article.current_version
-        body = {
-            "article_name": article.name,
-            "version_name": version.name,
-            "content": version.content,
-            "summary": version.summary,
-            "tags": [tag.name for tag in version.tags.all()],
-        }
-        try:
-            es.index(index=INDEX_NAME, id=article.name, document=body)
-            indexed += 1
-        except Exception:
-            logger.exception("Failed to index article %s", article.name)
+def index_all_articles(self, chunk_size=None, thread_count=None):
+    report = bulk_index_articles(chunk_size=chunk_size, thread_count=thread_count)
+    logger.info(
+        "Startup indexing complete: %d articles indexed, %d failed in %.1fs (%.0f docs/s).",
+        report["indexed"], report["failed"], report["seconds"], report["docs_per_sec"],
+    )
+    return report
 
-    logger.info("Startup indexing complete: %d articles indexed.", indexed)
-    return indexed
 
+@shared_task(bind=True, ignore_result=True)
+def sync_search_index(self, chunk_size=None, thread_count=None):
+    report = sync_changed_articles(chunk_size=chunk_size, thread_count=thread_count)
+    if report is None:
+        logger.info("Search sync already running; skipped.")
+    elif report["indexed"] or report["deleted"] or report["failed"]:
+        logger.info(
+            "Search sync: %d indexed, %d deleted, %d failed in %.1fs; watermark %s.",
+            report["indexed"], report["deleted"], report["failed"], report["seconds"], report["watermark"],
+        )
+    return report
 
-def search_articles_semantic(query, size=10):
-    search_body = {
+
+def _search_body(query, size):
+    return {
         "query": {
             "multi_match": {
                 "query": query,
@@ -74,16 +226,71 @@ def search_articles_semantic(query, size=10):
         "size": size
     }
 
-    resp = _get_es().search(index=INDEX_NAME, body=search_body)
-    results = []
 
-    for hit in resp["hits"]["hits"]:
-        results.append({
+def _hits(resp):
+    return [
+        {
             "article_name": hit["_source"]["article_name"],
             "version_name": hit["_source"]["version_name"],
             "score": hit["_score"],
             "summary": hit["_source"]["summary"],
             "tags": hit["_source"]["tags"],
-        })
+        }
+        for hit in resp["hits"]["hits"]
+    ]
+
+
+def search_articles_semantic(query, size=10):
+    resp = _get_es().search(index=INDEX_NAME, body=_search_body(query, size))
+    return _hits(resp)
 
+
+def msearch_articles(queries, size=1):
+    """search_articles_semantic for many queries in one _msearch round-trip; one result list per query."""
+    if not queries:
+        return []
+    searches = []
+    for query in queries:
+        searches.extend([{"index": INDEX_NAME}, _search_body(query, size)])
+    resp = _get_es().msearch(searches=searches)
+    out = []
+    for query, item in zip(queries, resp["responses"]):
+        if "error" in item:
+            raise RuntimeError(f"search for {query!r} failed: {item['error']}")
+        out.append(_hits(item))
+    return out
+
+
+def cached_search_articles(query, size=10):
+    """search_articles_semantic on the normalized query, through team2.search_cache."""
+    query = search_cache.normalize(query)
+    key = (search_cache.generation(), query, size)
+    results = search_cache.get(key)
+    if results is None:
+        t0 = time.perf_counter()
+        results = search_articles_semantic(query, size)
+        search_cache.put(key, results, time.perf_counter() - t0)
     return results
+
+
+def cached_msearch_articles(queries, size=1):
+    """
+    {query: results} for many queries: cached ones from team2.search_cache, the rest
+    in one _msearch round-trip (its time is split evenly among them).
+    """
+    gen = search_cache.generation()
+    normalized = {q: search_cache.normalize(q) for q in queries}
+    found = {}
+    for norm in dict.fromkeys(normalized.values()):
+        results = search_cache.get((gen, norm, size))
+        if results is not None:
+            found[norm] = results
+    missing = [norm for norm in dict.fromkeys(normalized.values()) if norm not in found]
+    if missing:
+        t0 = time.perf_counter()
+        fetched = msearch_articles(missing, size)
+        share = (time.perf_counter() - t0) / len(missing)
+        for norm, results in zip(missing, fetched):
+            search_cache.put((gen, norm, size), results, share)
+            found[norm] = results
+    return {q: found[norm] for q, norm in normalized.items()}
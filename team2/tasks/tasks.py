@@ -3,13 +3,22 @@ import json
 import logging
 import re
 import sys
+import time
+from datetime import timedelta
 
 from celery import shared_task
 from django.conf import settings
-from team2.models import Article, Tag, Version
+from django.utils import timezone
+from celery import chord
+from team2 import llm_cache, rate_limit, tag_index, top_by_tag
+from team2.models import Article, EnrichmentRequest, Tag, Version
+from team2.tasks.indexing import index_article_version
 from team2.models import Article, Version
 
 MODEL_NAME = "gemini-2.5-flash"
+# bump when a prompt changes: results cached under the old version are not reused
+TAG_PROMPT_VERSION = 1
+SUMMARY_PROMPT_VERSION = 1
 _CLIENT = None
 
 
@@ -21,19 +30,73 @@ def _get_client():
     return _CLIENT
 
 
+def _generate(prompt):
+    """generate_content under the Gemini rate limit shared by all workers (team2.rate_limit)."""
+    rate_limit.take(
+        "gemini",
+        rate=settings.TEAM2_GEMINI_RATE_PER_MINUTE / 60,
+        burst=settings.TEAM2_GEMINI_BURST,
+        max_wait=settings.TEAM2_GEMINI_MAX_WAIT_SECONDS,
+    )
+    return _get_client().models.generate_content(model=MODEL_NAME, contents=prompt)
+
+
+def _deferral_count(task):
+    return (task.request.kwargs or {}).get("_deferrals", 0)
+
+
+def _defer(task, exc, countdown=None):
+    """
+    Retry later without using up the retry budget. Celery counts every retry in
+    request.retries, so deferrals are counted apart, in the _deferrals kwarg,
+    and added to max_retries of every retry.
+    """
+    deferrals = _deferral_count(task) + 1
+    kwargs = {**(task.request.kwargs or {}), "_deferrals": deferrals}
+    return task.retry(kwargs=kwargs, exc=exc, countdown=countdown, max_retries=task.max_retries + deferrals)
+
+
+def _cached_call(task, kind, prompt_version, content, compute):
+    """
+    compute() -> JSON-able result, run only when no result for this content is
+    cached (team2.llm_cache). Waits by retrying while another worker computes it.
+    """
+    try:
+        key, result = llm_cache.lookup(kind, prompt_version, MODEL_NAME, content)
+    except llm_cache.Pending as exc:
+        # the claim expires after llm_cache.claim_seconds(), so the wait is bounded
+        raise _defer(task, exc)
+    if result is not None:
+        return result
+
+    t0 = time.perf_counter()
+    try:
+        result = compute()
+    except rate_limit.RateLimited as exc:
+        llm_cache.release(key)
+        # waiting for quota is not a failure: don't use up the retry budget
+        raise _defer(task, exc, countdown=exc.retry_after)
+    except Exception as exc:
+        llm_cache.release(key)
+        raise task.retry(exc=exc, max_retries=task.max_retries + _deferral_count(task))
+    llm_cache.put(key, result, time.perf_counter() - t0)
+    return result
+
+
 @shared_task(bind=True, max_retries=2, default_retry_delay=10)
-def tag_article(self, article_name):
+def tag_article(self, article_name, _deferrals=0):
     article = Article.objects.get(name=article_name)
     version_name = article.current_version
     if version_name is None:
         return None
 
     version = Version.objects.get(name=version_name)
-    content = version.content
+    content = version.text
 
-    existing_tags = list(Tag.objects.values_list("name", flat=True))
+    def classify():
+        existing_tags = tag_index.shortlist(content)
 
-    prompt = f"""You are a content classification assistant. Your ONLY output must be a single valid JSON object with no extra text, no markdown fences, no explanation.
+        prompt = f"""You are a content classification assistant. Your ONLY output must be a single valid JSON object with no extra text, no markdown fences, no explanation.
 
 Select relevant tags from EXISTING TAGS. Only suggest NEW tags if absolutely necessary. Maximum 5 total tags. Use concise Farsi tags. Prefer existing tags.
 
@@ -45,9 +108,8 @@ EXISTING TAGS: {existing_tags}
 ARTICLE:
 {content}"""
 
-    try:
-        response = _get_client().models.generate_content(model=MODEL_NAME, contents=prompt)
-        
+        response = _generate(prompt)
+
         text = response.text.strip()
         if text.startswith("```"):
             text = re.sub(r'^```(?:json)?\s*', '', text)
@@ -56,11 +118,14 @@ ARTICLE:
         if match:
             text = match.group(0)
         data = json.loads(text)
+        return {
+            "selected_existing_tags": data.get("selected_existing_tags", []),
+            "new_tags": data.get("new_tags", []),
+        }
 
-        selected_existing = data.get("selected_existing_tags", [])
-        new_tags = data.get("new_tags", [])
-    except Exception as exc:
-        raise self.retry(exc=exc)
+    data = _cached_call(self, "tags", TAG_PROMPT_VERSION, content, classify)
+    selected_existing = data["selected_existing_tags"]
+    new_tags = data["new_tags"]
 
     for tag_name in selected_existing:
         try:
@@ -70,9 +135,15 @@ ARTICLE:
             continue
 
     for tag_name in new_tags:
-        tag, _ = Tag.objects.get_or_create(name=tag_name.lower())
+        tag, created = Tag.objects.get_or_create(name=tag_name.lower())
+        if created:
+            tag_index.add(tag.name)
         version.tags.add(tag)
 
+    # tags live in the M2M table; bump the version so the search sync sees them
+    Version.objects.filter(pk=version.pk).update(updated_at=timezone.now())
+    top_by_tag.refresh_article(article.name)
+
     return {
         "selected_existing_tags": selected_existing,
         "new_tags": new_tags,
@@ -80,7 +151,7 @@ ARTICLE:
 
 
 @shared_task(bind=True, max_retries=2, default_retry_delay=10)
-def summarize_article(self, article_name):
+def summarize_article(self, article_name, _deferrals=0):
     article = Article.objects.get(name=article_name)
     version_name = article.current_version
 
@@ -88,9 +159,10 @@ def summarize_article(self, article_name):
         return
 
     version = Version.objects.get(name=version_name)
-    content = version.content
+    content = version.text
 
-    prompt = f"""
+    def summarize():
+        prompt = f"""
 You are an assistant that writes concise, neutral summaries.
 
 Summarize the following article in 3–6 sentences in FARSI.
@@ -102,15 +174,50 @@ ARTICLE:
 {content}
 \"\"\"
 """
+        response = _generate(prompt)
+        return {"summary": response.text.strip()}
 
-    try:
-        response = _get_client().models.generate_content(model=MODEL_NAME, contents=prompt)
-    except Exception as exc:
-        raise self.retry(exc=exc)
-
-    summary = response.text.strip()
+    summary = _cached_call(self, "summary", SUMMARY_PROMPT_VERSION, content, summarize)["summary"]
 
     version.summary = summary
-    version.save(update_fields=["summary"])
+    version.save(update_fields=["summary", "updated_at"])
 
     return summary
+
+
+def request_enrichment(article_name):
+    """
+    After a publish: tag and summarize the article's current version once
+    TEAM2_PUBLISH_COALESCE_SECONDS have passed. Publishing it again before the job
+    starts joins the pending request instead of queueing another job.
+    """
+    delay = settings.TEAM2_PUBLISH_COALESCE_SECONDS
+    request, created = EnrichmentRequest.objects.get_or_create(article_id=article_name)
+    if not created:
+        # a request whose job never ran (broker down, worker lost) must not swallow publishes forever
+        stale = timezone.now() - timedelta(seconds=max(60, 10 * delay))
+        if not EnrichmentRequest.objects.filter(pk=request.pk, requested_at__lt=stale).update(
+            requested_at=timezone.now()
+        ):
+            return
+    enrich_article.apply_async((article_name,), countdown=delay)
+
+
+@shared_task(ignore_result=True)
+def enrich_article(article_name):
+    if not EnrichmentRequest.objects.filter(article_id=article_name).delete()[0]:
+        return  # already handled
+    version_name = Article.objects.filter(name=article_name).values_list("current_version", flat=True).first()
+    if version_name is None:
+        return
+    # re-index once tags and summary are in; the publish already indexed the text
+    chord([tag_article.s(article_name), summarize_article.s(article_name)])(
+        index_article_version.s(version_name)
+    )
+
+
+@shared_task
+def fold_vote_shards():
+    from team2.votes import fold_score_shards
+
+    return fold_score_shards()
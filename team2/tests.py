@@ -1,6 +1,618 @@
-from django.test import TestCase
+import uuid
+
+from django.test import TestCase, override_settings
+
+from team2.es_stub import InMemoryElasticsearch
+from team2.models import Article, Tag, Version
+
 
 class TeamPingTests(TestCase):
     def test_ping_requires_auth(self):
         res = self.client.get("/team2/ping/")
         self.assertEqual(res.status_code, 401)
+
+
+class ElasticsearchStubMixin:
+    """Runs the test case against team2.es_stub instead of a cluster."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.es = InMemoryElasticsearch().start()
+        cls.settings = override_settings(ELASTICSEARCH_URL=cls.es.url)
+        cls.settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        cls.es.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.es.indices.clear()
+        self.es.calls.clear()
+        self.es.reject_ids.clear()
+        tags = Tag.objects.bulk_create([Tag(name="تاریخی"), Tag(name="طبیعت")])
+        user = uuid.uuid4()
+        for i in range(25):
+            article = Article.objects.create(name=f"a{i:02}", creator_id=user)
+            version = Version.objects.create(name=f"a{i:02}-v1", article=article, editor_id=user,
+                                             content=f"متن {i}", summary="خلاصه")
+            version.tags.set(tags[: i % 3])
+            article.current_version = version
+            article.save()
+        Article.objects.create(name="draft", creator_id=user)
+
+
+class BulkIndexTests(ElasticsearchStubMixin, TestCase):
+    databases = {"default", "team2"}
+
+    def test_streams_chunks_through_bulk_api(self):
+        from team2.tasks.indexing import INDEX_NAME, bulk_index_articles
+
+        from team2.models import SearchSyncState
+
+        SearchSyncState.objects.create(name=INDEX_NAME)
+        # one streamed SELECT, one tags query per chunk (not per article), the cache generation bump
+        with self.assertNumQueries(5, using="team2"):
+            report = bulk_index_articles(chunk_size=10, thread_count=2)
+        self.assertEqual((report["indexed"], report["failed"]), (25, 0))
+        self.assertEqual(self.es.calls["_bulk"], 3)
+        docs = self.es.docs(INDEX_NAME)
+        self.assertNotIn("draft", docs)
+        self.assertEqual(docs["a05"]["version_name"], "a05-v1")
+        self.assertEqual(sorted(docs["a05"]["tags"]), ["تاریخی", "طبیعت"])
+
+    def test_failed_documents_are_counted(self):
+        from team2.tasks.indexing import index_all_articles
+
+        self.es.reject_ids.update({"a03", "a17"})
+        with self.assertLogs("team2.tasks.indexing", "ERROR"):
+            report = index_all_articles(chunk_size=10)
+        self.assertEqual((report["indexed"], report["failed"]), (23, 2))
+
+
+@override_settings(TEAM2_SEARCH_SYNC_OVERLAP_SECONDS=0)
+class SearchSyncTests(ElasticsearchStubMixin, TestCase):
+    databases = {"default", "team2"}
+
+    def sync(self):
+        from team2.tasks.indexing import sync_changed_articles
+        return sync_changed_articles(chunk_size=10)
+
+    def test_only_changes_since_watermark_are_sent(self):
+        from team2.tasks.indexing import INDEX_NAME
+
+        self.assertEqual(self.sync()["indexed"], 25)
+        self.assertEqual(self.sync()["indexed"], 0)
+
+        version = Version.objects.get(name="a04-v1")
+        version.content = "متن تازه"
+        version.save()
+        report = self.sync()
+        self.assertEqual((report["indexed"], report["deleted"]), (1, 0))
+        self.assertEqual(self.es.docs(INDEX_NAME)["a04"]["content"], "متن تازه")
+
+    def test_soft_deleted_articles_are_removed(self):
+        from django.utils import timezone
+        from team2.tasks.indexing import INDEX_NAME
+
+        self.sync()
+        article = Article.objects.get(name="a07")
+        article.deleted_at = timezone.now()
+        article.save()
+        report = self.sync()
+        self.assertEqual((report["indexed"], report["deleted"]), (0, 1))
+        self.assertNotIn("a07", self.es.docs(INDEX_NAME))
+
+    def test_failures_keep_the_watermark(self):
+        from django.utils import timezone
+        from team2.models import SearchSyncState
+
+        self.sync()
+        watermark = SearchSyncState.objects.get().watermark
+        Version.objects.filter(name__in=["a01-v1", "a02-v1"]).update(summary="x", updated_at=timezone.now())
+        self.es.reject_ids.add("a02")
+        with self.assertLogs("team2.tasks.indexing", "ERROR"):
+            self.assertEqual(self.sync()["failed"], 1)
+        self.assertEqual(SearchSyncState.objects.get().watermark, watermark)
+        self.es.reject_ids.clear()
+        self.assertEqual(self.sync()["indexed"], 2)
+
+    def test_overlapping_run_is_skipped(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from team2.models import SearchSyncState
+
+        SearchSyncState.objects.create(name="articles", locked_until=timezone.now() + timedelta(minutes=5))
+        self.assertIsNone(self.sync())
+        self.assertEqual(self.es.calls["_bulk"], 0)
+
+
+class WikiBatchTests(ElasticsearchStubMixin, TestCase):
+    databases = {"default", "team2"}
+
+    def setUp(self):
+        from team2 import search_cache
+        from team2.tasks.indexing import bulk_index_articles
+
+        super().setUp()
+        search_cache.clear()
+        bulk_index_articles()
+        self.es.calls.clear()
+
+    def batch(self, contents):
+        return self.client.post("/team2/api/wiki/batch/", {"contents": contents}, content_type="application/json")
+
+    def test_one_search_and_one_article_query_per_batch(self):
+        # index generation + matched articles
+        with self.assertNumQueries(2, using="team2"):
+            res = self.batch(["متن 5", " متن 12 ", "zzz", "متن 5"])
+        self.assertEqual(res.status_code, 200)
+        results = res.json()["results"]
+        self.assertEqual(self.es.calls["_msearch"], 1)
+        self.assertEqual(results["متن 5"]["url"], "/articles/a05")
+        self.assertEqual(results[" متن 12 "]["description"], "متن 12")
+        self.assertIsNone(results["zzz"])
+
+    def test_hits_are_cached_until_invalidated(self):
+        from team2 import search_cache
+
+        self.batch(["متن 5", "zzz"])
+        self.assertEqual(self.client.get("/team2/api/wiki/", {"content": "متن 5"}).status_code, 200)
+        self.assertEqual(self.client.get("/team2/api/wiki/", {"content": "zzz"}).status_code, 404)
+        self.assertEqual(self.es.calls["_msearch"], 1)
+
+        search_cache.bump_generation()
+        self.batch(["متن 5"])
+        self.assertEqual(self.es.calls["_msearch"], 2)
+
+    def test_rejects_bad_payloads(self):
+        self.assertEqual(self.batch([]).status_code, 400)
+        self.assertEqual(self.batch([1, 2]).status_code, 400)
+        self.assertEqual(self.batch(["x"] * 51).status_code, 400)
+
+
+class SearchCacheTests(WikiBatchTests):
+    def search(self, q):
+        res = self.client.get("/team2/api/articles/search/", {"q": q})
+        self.assertEqual(res.status_code, 200)
+        return res.json()["results"]
+
+    def test_normalized_queries_share_an_entry(self):
+        first = self.search("متن 7")
+        self.assertEqual(self.search("  متن   7 "), first)
+        self.assertEqual(self.search("متن\u064e 7"), first)  # with a fatha
+        self.assertEqual(self.es.calls["_search"], 1)
+
+    def test_reindexing_a_version_retires_cached_results(self):
+        from team2.tasks.indexing import index_article_version
+
+        self.search("متن 7")
+        index_article_version(None, "a07-v1")
+        self.search("متن 7")
+        self.assertEqual(self.es.calls["_search"], 2)
+
+    @override_settings(METRICS_ENABLED=True)
+    def test_hits_and_saved_time_are_reported(self):
+        from team2 import search_cache
+
+        self.search("متن 3")
+        self.search("متن 3")
+        stats = search_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertGreater(stats["saved_seconds"], 0)
+        body = self.client.get("/api/metrics/").content.decode()
+        self.assertIn('app404_team2_search_cache_lookups_total{result="hits"} 1', body)
+        self.assertIn("app404_team2_search_cache_saved_seconds_total", body)
+
+
+class TopByTagTests(TestCase):
+    databases = {"default", "team2"}
+
+    def setUp(self):
+        from team2 import top_by_tag
+
+        self.tags = Tag.objects.bulk_create([Tag(name=f"t{i}") for i in range(6)])
+        creator = uuid.uuid4()
+        for i in range(12):
+            article = Article.objects.create(name=f"a{i:02}", creator_id=creator, score=i)
+            version = Version.objects.create(name=f"a{i:02}-v1", article=article, editor_id=creator,
+                                             summary=f"s{i}")
+            version.tags.set([self.tags[i % 6], self.tags[(i + 1) % 6]])
+            article.current_version = version
+            article.save()
+        top_by_tag.rebuild()
+
+    def top(self, **params):
+        res = self.client.get("/team2/api/articles/top-by-tag/", params)
+        self.assertEqual(res.status_code, 200)
+        return {row["tag"]: [a["name"] for a in row["articles"]] for row in res.json()}
+
+    def test_single_read_regardless_of_tag_count(self):
+        with self.assertNumQueries(1, using="team2"):
+            top = self.top()
+        self.assertEqual(len(top), 6)
+        self.assertEqual(top["t1"], ["a07", "a06", "a01"])
+        self.assertEqual(list(self.top(limit=2)), ["t0", "t1"])
+
+    def test_vote_moves_article_into_ranking(self):
+        from django.contrib.auth import get_user_model
+        from core.jwt_utils import create_access_token
+
+        user = get_user_model().objects.create_user(email="voter@example.com", password="x")
+        Article.objects.filter(name="a00").update(score=6)
+        self.client.cookies["access_token"] = create_access_token(user)
+        res = self.client.post("/team2/api/vote/", {"article_name": "a00", "value": 1},
+                               content_type="application/json")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.top()["t0"], ["a11", "a00", "a06"])  # a05 drops out
+
+    def test_publish_moves_article_between_tags(self):
+        from team2 import top_by_tag
+
+        article = Article.objects.get(name="a11")
+        version = Version.objects.create(name="a11-v2", article=article, editor_id=article.creator_id)
+        version.tags.set([self.tags[3]])
+        article.current_version = version
+        article.save()
+        top_by_tag.refresh_article("a11")
+        top = self.top()
+        self.assertNotIn("a11", top["t5"] + top["t0"])
+        self.assertEqual(top["t3"][0], "a11")
+
+
+class VoteTests(TestCase):
+    databases = {"default", "team2"}
+
+    def setUp(self):
+        self.article = Article.objects.create(name="hot", creator_id=uuid.uuid4(), score=10)
+
+    def vote(self, value):
+        from django.contrib.auth import get_user_model
+        from core.jwt_utils import create_access_token
+
+        user = get_user_model().objects.get_or_create(email="voter@example.com")[0]
+        self.client.cookies["access_token"] = create_access_token(user)
+        return self.client.post("/team2/api/vote/", {"article_name": "hot", "value": value},
+                                content_type="application/json")
+
+    def test_changing_a_vote_applies_the_difference(self):
+        self.assertEqual(self.vote(1).json()["score"], 11)
+        self.assertEqual(self.vote(1).status_code, 400)
+        self.assertEqual(self.vote(-1).json()["score"], 9)
+        self.assertEqual(Article.objects.get(name="hot").score, 9)
+
+    def test_stale_instances_do_not_overwrite_each_other(self):
+        from team2 import votes
+
+        first, second = Article.objects.get(name="hot"), Article.objects.get(name="hot")
+        votes.cast_vote(first, uuid.uuid4(), 1)
+        votes.cast_vote(second, uuid.uuid4(), 1)  # read before the first vote landed
+        second.current_version = None
+        second.save(update_fields=["current_version", "updated_at"])  # as publishing does
+        self.assertEqual(Article.objects.get(name="hot").score, 12)
+
+    @override_settings(TEAM2_VOTE_SHARDS=4)
+    def test_sharded_votes_are_folded_into_the_score(self):
+        from team2 import votes
+        from team2.models import ArticleScoreShard
+
+        Article.objects.filter(name="hot").update(sharded_score=True)
+        self.assertEqual(self.vote(1).json()["score"], 11)
+        article = Article.objects.get(name="hot")
+        for _ in range(5):
+            votes.cast_vote(article, uuid.uuid4(), -1)
+        self.assertEqual(Article.objects.get(name="hot").score, 10)  # not folded yet
+        self.assertEqual(votes.current_score("hot"), 6)
+        self.assertLessEqual(ArticleScoreShard.objects.filter(article=article).count(), 4)
+
+        self.assertEqual(votes.fold_score_shards(), 1)
+        self.assertEqual(Article.objects.get(name="hot").score, 6)
+        self.assertEqual(votes.current_score("hot"), 6)
+        self.assertEqual(votes.fold_score_shards(), 0)
+
+
+class LLMCacheTests(TestCase):
+    databases = {"default", "team2"}
+
+    def setUp(self):
+        from unittest import mock
+
+        self.calls = []
+
+        def generate_content(model, contents):
+            self.calls.append(contents)
+            text = '{"selected_existing_tags": ["تاریخی"], "new_tags": ["سفر"]}' if "JSON" in contents else "خلاصه"
+            return mock.Mock(text=text)
+
+        client = mock.Mock()
+        client.models.generate_content.side_effect = generate_content
+        patcher = mock.patch("team2.tasks.tasks._get_client", return_value=client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        Tag.objects.create(name="تاریخی")
+
+    def publish(self, name, content):
+        article = Article.objects.create(name=name, creator_id=uuid.uuid4())
+        article.current_version = Version.objects.create(name=f"{name}-v1", article=article,
+                                                         editor_id=article.creator_id, content=content)
+        article.save()
+        return article.current_version
+
+    @override_settings(METRICS_ENABLED=True)
+    def test_identical_content_calls_gemini_once(self):
+        from team2.tasks.tasks import summarize_article, tag_article
+
+        first, copy = self.publish("a", "متن یکسان"), self.publish("b", "متن یکسان")
+        for name in ("a", "b"):
+            summarize_article(name)
+            tag_article(name)
+        self.assertEqual(len(self.calls), 2)  # one summary, one classification
+        copy.refresh_from_db()
+        self.assertEqual(copy.summary, "خلاصه")
+        self.assertEqual(sorted(copy.tags.values_list("name", flat=True)), ["تاریخی", "سفر"])
+
+        summarize_article.apply(args=["a"])
+        self.assertEqual(len(self.calls), 2)
+        body = self.client.get("/api/metrics/").content.decode()
+        self.assertIn('app404_team2_llm_cache_hits_total{kind="summary"} 2', body)
+        self.assertIn('app404_team2_llm_cache_entries{kind="tags"} 1', body)
+
+    def test_changed_content_or_prompt_version_misses(self):
+        from unittest import mock
+        from team2.tasks.tasks import summarize_article
+
+        self.publish("a", "نسخه اول")
+        self.publish("b", "نسخه دوم")
+        summarize_article("a")
+        summarize_article("b")
+        with mock.patch("team2.tasks.tasks.SUMMARY_PROMPT_VERSION", 2):
+            summarize_article("a")
+        self.assertEqual(len(self.calls), 3)
+
+    def test_concurrent_claims_and_failures(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from team2 import llm_cache
+        from team2.models import LLMResult
+
+        key, result = llm_cache.lookup("summary", 1, "m", "x")
+        self.assertIsNone(result)
+        with self.assertRaises(llm_cache.Pending):
+            llm_cache.lookup("summary", 1, "m", "x")
+        llm_cache.release(key)  # the call failed
+        self.assertEqual(llm_cache.lookup("summary", 1, "m", "x"), (key, None))
+
+        LLMResult.objects.filter(key=key).update(claimed_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(llm_cache.lookup("summary", 1, "m", "x"), (key, None))  # crashed owner
+        llm_cache.put(key, {"summary": "s"}, 1.5)
+        self.assertEqual(llm_cache.lookup("summary", 1, "m", "x"), (key, {"summary": "s"}))
+        self.assertEqual(llm_cache.stats()["summary"], {"entries": 1, "hits": 1, "saved_seconds": 1.5})
+
+
+@override_settings(TEAM2_TAG_SHORTLIST_SIZE=3)
+class TagIndexTests(TestCase):
+    databases = {"default", "team2"}
+
+    def setUp(self):
+        from team2 import tag_index
+
+        tag_index.clear()
+        self.addCleanup(tag_index.clear)
+        names = ["تاریخ", "تاریخی", "طبیعت", "کوهنوردی", "غذا", "موسیقی"] + [f"برچسب{i}" for i in range(50)]
+        Tag.objects.bulk_create([Tag(name=n) for n in names])
+
+    def test_relevant_tags_first(self):
+        from team2 import tag_index
+
+        top = tag_index.shortlist("کوهنوردی در طبیعت زیبای البرز و بناهای تاریخی")
+        self.assertEqual(len(top), 3)
+        self.assertEqual(top[0], "کوهنوردی")
+        self.assertEqual(set(top), {"کوهنوردی", "طبیعت", "تاریخی"})
+        self.assertEqual(tag_index.shortlist("سلام"), [])
+
+    def test_new_tags_are_picked_up_incrementally(self):
+        from team2 import tag_index
+
+        self.assertNotIn("دریا", tag_index.shortlist("سفر به دریا"))
+        Tag.objects.create(name="دریا")  # created by another worker
+        self.assertEqual(tag_index.shortlist("سفر به دریا")[0], "دریا")
+        tag_index.add("سفر")  # created by this one
+        self.assertIn("سفر", tag_index.shortlist("سفر به دریا"))
+
+    def test_prompt_carries_only_the_shortlist(self):
+        from unittest import mock
+        from team2.tasks.tasks import tag_article
+
+        prompts = []
+        client = mock.Mock()
+        client.models.generate_content.side_effect = lambda model, contents: (
+            prompts.append(contents) or mock.Mock(text='{"selected_existing_tags": ["طبیعت"], "new_tags": []}')
+        )
+        article = Article.objects.create(name="a", creator_id=uuid.uuid4())
+        article.current_version = Version.objects.create(name="a-v1", article=article, editor_id=article.creator_id,
+                                                         content="کوهنوردی در طبیعت")
+        article.save()
+        with mock.patch("team2.tasks.tasks._get_client", return_value=client):
+            tag_article("a")
+        self.assertIn("طبیعت", prompts[0])
+        self.assertNotIn("برچسب", prompts[0])
+        self.assertEqual(list(article.current_version.tags.values_list("name", flat=True)), ["طبیعت"])
+
+
+@override_settings(TEAM2_VERSION_STORAGE="delta", TEAM2_VERSION_MAX_CHAIN=3)
+class VersionStorageTests(TestCase):
+    databases = {"default", "team2"}
+
+    def setUp(self):
+        from team2 import version_store
+
+        version_store.clear()
+        self.addCleanup(version_store.clear)
+        self.lines = [f"بند {i}: " + "متن نمونه " * 8 + "\n" for i in range(40)]
+        self.article = Article.objects.create(name="a", creator_id=uuid.uuid4())
+        self.v1 = self.new_version("a-v1", "".join(self.lines))
+        self.article.current_version = self.v1
+        self.article.save()
+
+    def new_version(self, name, text, base=None):
+        from team2 import version_store
+
+        version = Version(name=name, article=self.article, editor_id=self.article.creator_id)
+        version_store.assign(version, text, base=base)
+        version.save()
+        return version
+
+    def edit(self, i, text):
+        lines = list(self.lines)
+        lines[i] = text + "\n"
+        return "".join(lines)
+
+    def test_versions_are_stored_as_small_deltas(self):
+        v2 = self.new_version("a-v2", self.edit(3, "تغییر"))
+        copy = self.new_version("a-v3", v2.text, base=v2)
+        stored = Version.objects.get(name="a-v3")
+        self.assertEqual((stored.content, stored.delta_base_id, stored.delta_depth), ("", "a-v2", 2))
+        self.assertLess(len(stored.delta), 20)
+        self.assertEqual(stored.text, self.edit(3, "تغییر"))
+        self.assertEqual(Version.objects.get(name="a-v2").text, self.edit(3, "تغییر"))
+        self.assertEqual(copy.text, v2.text)
+
+    def test_chain_is_capped_by_snapshots(self):
+        base = self.v1
+        for i in range(5):
+            base = self.new_version(f"a-e{i}", self.edit(i, f"ویرایش {i}"), base=base)
+        depths = list(Version.objects.filter(name__startswith="a-e").order_by("name").values_list("delta_depth", flat=True))
+        self.assertEqual(depths, [1, 2, 3, 0, 1])
+
+    def test_reads_replay_the_chain_once(self):
+        from team2 import version_store
+
+        v2 = self.new_version("a-v2", self.edit(1, "x"))
+        v3 = self.new_version("a-v3", self.edit(2, "y"), base=v2)
+        version_store.clear()
+        with self.assertNumQueries(3, using="team2"):  # v3, then its bases v2 and v1
+            self.assertEqual(Version.objects.get(name="a-v3").text, v3.text)
+        with self.assertNumQueries(1, using="team2"):  # v2 was materialized on the way
+            self.assertEqual(Version.objects.get(name="a-v2").text, self.edit(1, "x"))
+
+    def test_editing_a_base_keeps_its_dependents(self):
+        v2 = self.new_version("a-v2", self.edit(1, "x"))
+        v2_text = v2.text
+        v1 = Version.objects.get(name="a-v1")
+        v1.text = "کاملا متفاوت\n" + "".join(self.lines[20:])
+        v1.save()
+        self.assertEqual(Version.objects.get(name="a-v2").text, v2_text)
+        self.assertEqual(Version.objects.get(name="a-v1").text, v1.text)
+
+    def test_api_reads_and_writes_text(self):
+        from django.contrib.auth import get_user_model
+        from core.jwt_utils import create_access_token
+
+        user = get_user_model().objects.create_user(email="editor@example.com", password="x")
+        self.client.cookies["access_token"] = create_access_token(user)
+        res = self.client.post("/team2/api/versions/create/",
+                               {"source_version_name": "a-v1", "new_version_name": "a-v2"},
+                               content_type="application/json")
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.json()["content"], self.v1.text)
+        self.assertEqual(Version.objects.get(name="a-v2").delta, "[[0,40]]")
+
+        res = self.client.patch("/team2/api/versions/a-v2/update/", {"content": self.edit(5, "نو")},
+                               content_type="application/json")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.client.get("/team2/api/versions/a-v2/").json()["content"], self.edit(5, "نو").strip())
+
+
+@override_settings(TEAM2_GEMINI_RATE_PER_MINUTE=60, TEAM2_GEMINI_BURST=2, TEAM2_GEMINI_MAX_WAIT_SECONDS=0)
+class GeminiQueueTests(TestCase):
+    databases = {"default", "team2"}
+
+    def test_bucket_allows_bursts_then_refills(self):
+        from datetime import timedelta
+        from team2 import rate_limit
+        from team2.models import RateLimitBucket
+
+        self.assertEqual([rate_limit.acquire("b", rate=1, burst=2) for _ in range(2)], [0, 0])
+        self.assertGreater(rate_limit.acquire("b", rate=1, burst=2), 0.9)
+        with self.assertRaises(rate_limit.RateLimited):
+            rate_limit.take("b", rate=1, burst=2, max_wait=0.5)
+        bucket = RateLimitBucket.objects.get(name="b")
+        RateLimitBucket.objects.filter(name="b").update(updated_at=bucket.updated_at - timedelta(seconds=1.5))
+        self.assertEqual(rate_limit.acquire("b", rate=1, burst=2), 0)
+
+    def test_rate_limited_call_releases_its_claim(self):
+        from unittest import mock
+        from team2 import rate_limit
+        from team2.models import LLMResult
+        from team2.tasks.tasks import summarize_article
+
+        creator = uuid.uuid4()
+        for name in ("a", "b", "c"):
+            article = Article.objects.create(name=name, creator_id=creator)
+            article.current_version = Version.objects.create(name=f"{name}-v1", article=article,
+                                                             editor_id=creator, content=f"متن {name}")
+            article.save()
+        client = mock.Mock()
+        client.models.generate_content.return_value = mock.Mock(text="خلاصه")
+        with mock.patch("team2.tasks.tasks._get_client", return_value=client):
+            summarize_article("a")
+            summarize_article("b")
+            with self.assertRaises(rate_limit.RateLimited):
+                summarize_article("c")
+        self.assertEqual(client.models.generate_content.call_count, 2)
+        self.assertFalse(LLMResult.objects.filter(result__isnull=True).exists())
+
+    def test_deferrals_do_not_use_up_the_retry_budget(self):
+        from unittest import mock
+        from team2 import rate_limit
+        from team2.tasks.tasks import summarize_article
+
+        article = Article.objects.create(name="a", creator_id=uuid.uuid4())
+        article.current_version = Version.objects.create(name="a-v1", article=article,
+                                                         editor_id=article.creator_id, content="متن")
+        article.save()
+        outcomes = [rate_limit.RateLimited(1), rate_limit.RateLimited(1), ConnectionError("503"),
+                    mock.Mock(text="خلاصه")]
+
+        def generate(prompt):
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        with mock.patch("team2.tasks.tasks._generate", side_effect=generate):
+            result = summarize_article.apply(args=["a"])
+        self.assertTrue(result.successful(), result.result)
+        self.assertEqual(outcomes, [])
+        self.assertEqual(Version.objects.get(name="a-v1").summary, "خلاصه")
+
+    def test_llm_tasks_have_their_own_queue(self):
+        from team2.celery import app
+
+        def queue(name):
+            return app.amqp.router.route({}, name)["queue"].name
+
+        self.assertEqual(queue("team2.tasks.tasks.tag_article"), "team2-llm")
+        self.assertEqual(queue("team2.tasks.tasks.summarize_article"), "team2-llm")
+        self.assertEqual(queue("team2.tasks.indexing.index_article_version"), "team2-index")
+        self.assertEqual(queue("team2.tasks.tasks.enrich_article"), "team2-index")
+
+    def test_repeated_publishes_share_one_job(self):
+        from unittest import mock
+        from team2.tasks import tasks
+
+        article = Article.objects.create(name="a", creator_id=uuid.uuid4())
+        article.current_version = Version.objects.create(name="a-v2", article=article, editor_id=article.creator_id)
+        article.save()
+        with mock.patch.object(tasks.enrich_article, "apply_async") as enqueue:
+            for _ in range(3):
+                tasks.request_enrichment("a")
+        enqueue.assert_called_once_with(("a",), countdown=10)
+
+        with mock.patch.object(tasks, "chord") as chord:
+            tasks.enrich_article("a")
+            tasks.enrich_article("a")  # the queued duplicate finds nothing to do
+        chord.assert_called_once()
+        chord.return_value.assert_called_once_with(tasks.index_article_version.s("a-v2"))
@@ -0,0 +1,86 @@
+"""
+Top articles per tag, kept in the TagTopArticle table so top_articles_by_tag is one read.
+
+A tag's rows are recomputed (one small ordered query) only when something that
+can change its ranking happens to one of its articles: a vote, a publish (the
+current version, hence the tag set, changes), or a retag. refresh_article()
+works out which tags are affected and skips tags whose ranking cannot move,
+i.e. the article is not listed, the list is full and its score is below the
+last entry.
+"""
+from django.db import router, transaction
+
+from team2.models import Article, Tag, TagTopArticle, Version
+
+TOP_K = 3
+
+
+def _ranked(tag_name):
+    return list(
+        Article.objects.filter(current_version__tags=tag_name, deleted_at__isnull=True)
+        .order_by('-score', 'name')
+        .values_list('name', flat=True)[:TOP_K]
+    )
+
+
+def refresh_tags(tag_names):
+    """Recompute the top articles of each tag."""
+    db = router.db_for_write(TagTopArticle)
+    for name in sorted(set(tag_names)):
+        with transaction.atomic(using=db):
+            # the tag row serializes concurrent refreshes of the same tag
+            if not Tag.objects.using(db).select_for_update().filter(name=name).exists():
+                continue
+            TagTopArticle.objects.using(db).filter(tag_id=name).delete()
+            TagTopArticle.objects.using(db).bulk_create([
+                TagTopArticle(tag_id=name, article_id=article, rank=rank)
+                for rank, article in enumerate(_ranked(name))
+            ])
+
+
+def refresh_article(article_name):
+    """Update the tags an article is ranked under, or now belongs to, after its score, version or tags changed."""
+    article = Article.objects.filter(name=article_name).values('score', 'current_version', 'deleted_at').first()
+    current = set()
+    if article and article['current_version'] and not article['deleted_at']:
+        current = set(
+            Version.tags.through.objects.filter(version_id=article['current_version']).values_list('tag_id', flat=True)
+        )
+    listed = {}
+    for row in TagTopArticle.objects.filter(tag__in=current).select_related('article').only(
+        'tag_id', 'article__name', 'article__score',
+    ):
+        listed.setdefault(row.tag_id, []).append(row.article)
+    stale = set(TagTopArticle.objects.filter(article_id=article_name).values_list('tag_id', flat=True))
+
+    for tag in current:
+        top = listed.get(tag, [])
+        if article_name in {a.name for a in top} or len(top) < TOP_K or article['score'] >= min(a.score for a in top):
+            stale.add(tag)
+    refresh_tags(stale)
+
+
+def rebuild():
+    refresh_tags(Tag.objects.values_list('name', flat=True))
+
+
+def top_articles(limit=None):
+    """[{"tag", "articles": [{"name", "summary", "score"}]}] ordered by tag name, in one query."""
+    rows = (
+        TagTopArticle.objects.select_related('article__current_version')
+        .order_by('tag_id', 'rank')
+        .iterator()
+    )
+    result = []
+    for row in rows:
+        if not result or result[-1]['tag'] != row.tag_id:
+            if limit is not None and len(result) == limit:
+                break
+            result.append({'tag': row.tag_id, 'articles': []})
+        version = row.article.current_version
+        result[-1]['articles'].append({
+            'name': row.article.name,
+            'summary': version.summary if version else '',
+            'score': row.article.score,
+        })
+    return result
@@ -23,4 +23,5 @@ urlpatterns = [
     path("api/publish-requests/<int:pk>/approve/", views.approve_publish_request, name="team2-approve-publish-request"),
     path("api/publish-requests/<int:pk>/reject/", views.reject_publish_request, name="team2-reject-publish-request"),
     path("api/wiki/", views.wiki_content, name="team2-wiki-content"),
+    path("api/wiki/batch/", views.wiki_content_batch, name="team2-wiki-content-batch"),
 ]
\ No newline at end of file
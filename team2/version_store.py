@@ -0,0 +1,195 @@
+"""
+Optional delta storage of Version content.
+
+TEAM2_VERSION_STORAGE = "full" keeps every version's text in Version.content.
+With "delta", text written through Version.text is stored as a line diff
+against a base version (delta_base + delta), which makes copies from
+create_version_from_version nearly free. A version falls back to a full
+snapshot when:
+  * its chain would exceed TEAM2_VERSION_MAX_CHAIN deltas, so a read never
+    replays more than that
+  * the diff would not be smaller than the text
+  * other versions are stored against it. Their deltas are re-encoded against
+    the new text, so chains never grow when a base is edited, and a version
+    with dependents can never end up in its own chain.
+
+Both layouts are read the same way (Version.text). Materialized texts are kept
+in a per-process LRU (TEAM2_VERSION_CACHE_SIZE) keyed by (name, updated_at),
+so a chain is replayed once, not on every read of it or of its siblings.
+
+The delta format is JSON: a list of [start, stop] (copy those lines of the
+base) and strings (literal text). It is stored in the database, so it must
+stay readable by decode().
+"""
+import json
+import threading
+from collections import OrderedDict
+from difflib import SequenceMatcher
+
+from django.conf import settings
+
+_lock = threading.Lock()
+_cache = OrderedDict()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _lines(text):
+    return text.splitlines(keepends=True)
+
+
+def encode(base_text, text):
+    """Delta that turns base_text into text."""
+    a, b = _lines(base_text), _lines(text)
+    ops = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:  # replace / insert; deletes just skip base lines
+            literal = "".join(b[j1:j2])
+            if ops and isinstance(ops[-1], str):
+                ops[-1] += literal
+            else:
+                ops.append(literal)
+    return json.dumps(ops, ensure_ascii=False, separators=(",", ":"))
+
+
+def decode(base_text, delta):
+    a = _lines(base_text)
+    return "".join(op if isinstance(op, str) else "".join(a[op[0]:op[1]]) for op in json.loads(delta))
+
+
+def _mode():
+    return getattr(settings, "TEAM2_VERSION_STORAGE", "full")
+
+
+def _max_chain():
+    return getattr(settings, "TEAM2_VERSION_MAX_CHAIN", 10)
+
+
+def _cache_size():
+    return getattr(settings, "TEAM2_VERSION_CACHE_SIZE", 512)
+
+
+def _cache_get(key):
+    with _lock:
+        text = _cache.get(key)
+        if text is None:
+            _stats["misses"] += 1
+            return None
+        _cache.move_to_end(key)
+        _stats["hits"] += 1
+        return text
+
+
+def _cache_put(key, text):
+    with _lock:
+        _cache[key] = text
+        _cache.move_to_end(key)
+        while len(_cache) > _cache_size():
+            _cache.popitem(last=False)
+
+
+def stats():
+    with _lock:
+        return {**_stats, "size": len(_cache)}
+
+
+def clear():
+    with _lock:
+        _cache.clear()
+        _stats.update(hits=0, misses=0)
+
+
+def materialize(version):
+    """The full text of `version`, replaying its delta chain if it has one."""
+    from team2.models import Version
+
+    if "_text" in version.__dict__:  # assigned, maybe not saved yet
+        return version._text
+    if version.delta_base_id is None:
+        return version.content
+
+    chain = []  # delta versions, newest first
+    v = version
+    while True:
+        if v.delta_base_id is None:
+            text = v.content
+            break
+        cached = _cache_get((v.pk, v.updated_at))
+        if cached is not None:
+            text = cached
+            break
+        chain.append(v)
+        v = Version.objects.only("name", "content", "delta", "delta_base", "updated_at").get(pk=v.delta_base_id)
+    for v in reversed(chain):
+        text = decode(text, v.delta)
+        _cache_put((v.pk, v.updated_at), text)
+    return text
+
+
+def _snapshot(version, text):
+    version.content, version.delta_base, version.delta, version.delta_depth = text, None, "", 0
+
+
+def _store(version, text, base):
+    """Delta against `base` when that is allowed and pays off, else a snapshot."""
+    if base is None or base.pk == version.pk or base.delta_depth + 1 > _max_chain():
+        _snapshot(version, text)
+        return
+    delta = encode(materialize(base), text)
+    if len(delta) >= len(text):
+        _snapshot(version, text)
+        return
+    version.content, version.delta_base, version.delta, version.delta_depth = "", base, delta, base.delta_depth + 1
+
+
+def _default_base(version):
+    from team2.models import Version
+
+    if version.delta_base_id is not None:
+        return version.delta_base
+    current = version.article.current_version_id if version.article_id else None
+    if current is None:
+        return None
+    return Version.objects.filter(pk=current).first()
+
+
+def assign(version, text, base=None):
+    """
+    Set the text of `version` (saved with the next version.save()). `base` is
+    the version to diff against; by default the version keeps its current base
+    or uses the article's published version.
+    """
+    from team2.models import Version
+
+    dependents = [] if version._state.adding else list(Version.objects.filter(delta_base=version))
+    if dependents:
+        # their texts, decoded against the old text, before it is overwritten
+        version._reencode = [(d, materialize(d)) for d in dependents]
+    if _mode() != "delta" or dependents:
+        _snapshot(version, text)
+    else:
+        _store(version, text, base or _default_base(version))
+    version._text = text
+
+
+def after_save(version):
+    """
+    Version.save() hook: cache the text just written and store the dependents of
+    an edited base against its new text (their texts stay the same).
+    """
+    from team2.models import Version
+
+    text = version.__dict__.pop("_text", None)
+    if text is not None and version.delta_base_id is not None:
+        _cache_put((version.pk, version.updated_at), text)
+    dependents, version._reencode = getattr(version, "_reencode", None) or [], None
+    for child, child_text in dependents:
+        if _mode() == "delta":
+            _store(child, child_text, version)
+        else:
+            _snapshot(child, child_text)
+        # no updated_at bump: the child's text did not change
+        Version.objects.filter(pk=child.pk).update(
+            content=child.content, delta_base=child.delta_base, delta=child.delta, delta_depth=child.delta_depth,
+        )
@@ -3,9 +3,9 @@ import time
 import logging
 
 from django.conf import settings
+from django.db import router, transaction
 from django.http import JsonResponse
 from django.shortcuts import redirect, get_object_or_404
-from django.db import transaction
 from rest_framework import status
 
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
@@ -15,14 +15,14 @@ from core.auth import api_login_required
 from .authentication import JWTMiddlewareAuthentication
 from django.db.models import Prefetch
 from .models import Article, Version, Vote, PublishRequest, Tag
-from celery import chord
 from .serializers import (
     ArticleSerializer, VersionSerializer, CreateArticleSerializer,
     CreateVersionFromVersionSerializer, CreateEmptyVersionSerializer, VoteSerializer,
     PublishRequestSerializer, CreatePublishRequestSerializer,
 )
-from .tasks.tasks import summarize_article, tag_article
-from .tasks.indexing import index_article_version, search_articles_semantic
+from .tasks.tasks import request_enrichment
+from .tasks.indexing import cached_msearch_articles, cached_search_articles, index_article_version
+from . import search_cache, top_by_tag, version_store, votes
 
 TEAM_NAME = "team2"
 
@@ -100,22 +100,26 @@ def create_version_from_version(request):
     source_name = serializer.validated_data['source_version_name']
     new_name = serializer.validated_data['new_version_name']
 
-    source_version = get_object_or_404(Version, name=source_name)
-
-    if Version.objects.filter(name=new_name).exists():
-        return Response(
-            {"detail": "Version with this name already exists."},
-            status=status.HTTP_400_BAD_REQUEST,
+    # the copy may be a delta against the source: lock it so an edit can't land
+    # between reading its text and saving the copy (update_version takes the same lock)
+    with transaction.atomic(using=router.db_for_write(Version)):
+        source_version = get_object_or_404(Version.objects.select_for_update(), name=source_name)
+
+        if Version.objects.filter(name=new_name).exists():
+            return Response(
+                {"detail": "Version with this name already exists."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        new_version = Version(
+            name=new_name,
+            article=source_version.article,
+            summary=source_version.summary,
+            editor_id=request.user.id,
         )
-
-    new_version = Version.objects.create(
-        name=new_name,
-        article=source_version.article,
-        content=source_version.content,
-        summary=source_version.summary,
-        editor_id=request.user.id,
-    )
-    new_version.tags.set(source_version.tags.all())
+        version_store.assign(new_version, source_version.text, base=source_version)
+        new_version.save(force_insert=True)
+        new_version.tags.set(source_version.tags.all())
 
     return Response(VersionSerializer(new_version).data, status=status.HTTP_201_CREATED)
 
@@ -131,38 +135,27 @@ def vote(request):
     value = serializer.validated_data['value']
 
     article = get_object_or_404(Article, name=article_name)
-    user_id = request.user.id
-
-    with transaction.atomic():
-        existing_vote = Vote.objects.filter(user_id=user_id, article=article).first()
 
-        if existing_vote:
-            if existing_vote.value == value:
-                return Response(
-                    {"detail": "You have already voted this way."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-            old_value = existing_vote.value
-            existing_vote.value = value
-            existing_vote.save()
-            article.score += value - old_value
-        else:
-            Vote.objects.create(user_id=user_id, article=article, value=value)
-            article.score += value
-
-        article.save()
+    try:
+        score = votes.cast_vote(article, request.user.id, value)
+    except votes.AlreadyVoted:
+        return Response(
+            {"detail": "You have already voted this way."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
 
-    return Response({"article": article.name, "score": article.score, "your_vote": value})
+    return Response({"article": article.name, "score": score, "your_vote": value})
 
 
 @api_view(['PATCH'])
 @authentication_classes(AUTH_CLASSES)
 @permission_classes(PERM_CLASSES)
 def update_version(request, version_name):
-    version = get_object_or_404(Version, name=version_name)
-    serializer = VersionSerializer(version, data=request.data, partial=True)
-    serializer.is_valid(raise_exception=True)
-    serializer.save()
+    with transaction.atomic(using=router.db_for_write(Version)):
+        version = get_object_or_404(Version.objects.select_for_update(), name=version_name)
+        serializer = VersionSerializer(version, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
     return Response(VersionSerializer(version).data)
 
 
@@ -180,11 +173,13 @@ def publish_version(request, version_name):
         )
 
     article.current_version = version
-    article.save()
+    article.save(update_fields=['current_version', 'updated_at'])  # never write back a stale score
+    search_cache.bump_generation()
+    top_by_tag.refresh_article(article.name)
 
-    chord(
-        [tag_article.s(article.name), summarize_article.s(article.name)]
-    )(index_article_version.s(version.name))
+    # searchable right away; tags and summary follow from the (coalesced) enrichment job
+    index_article_version.delay(None, version.name)
+    request_enrichment(article.name)
 
     return Response(ArticleSerializer(article).data)
 
@@ -242,7 +237,7 @@ def search_articles(request):
         return Response({"detail": "Query missing"}, status=400)
 
     try:
-        results = search_articles_semantic(query)
+        results = cached_search_articles(query)
     except Exception as e:
         return Response(
             {"detail": f"Search service unavailable: {e}"},
@@ -253,6 +248,43 @@ def search_articles(request):
     return resp
 
 
+WIKI_BATCH_MAX = 50
+
+
+def _wiki_hits(queries):
+    """Top search hit (or None) per query; uncached ones share one _msearch round-trip."""
+    return {q: (results[0] if results else None) for q, results in cached_msearch_articles(queries).items()}
+
+
+def _wiki_payload(article, hit):
+    version = article.current_version
+    content = version.text if version else ""
+    summary = version.summary if version else ""
+    images = re.findall(r'!\[.*?\]\((https?://\S+?)\)', content)
+
+    return {
+        "tags": hit.get("tags", []),
+        "summary": summary,
+        "description": content,
+        "images": images,
+        "url": f"/articles/{article.name}",
+        "updated_at": article.updated_at.isoformat() if article.updated_at else None,
+    }
+
+
+def _wiki_lookup(queries):
+    """{query: wiki payload or None}; one ES round-trip and one article query for the whole batch."""
+    hits = _wiki_hits(queries)
+    names = {hit["article_name"] for hit in hits.values() if hit}
+    articles = Article.objects.select_related('current_version').in_bulk(names) if names else {}
+    out = {}
+    for query in queries:
+        hit = hits.get(query)
+        article = articles.get(hit["article_name"]) if hit else None
+        out[query] = _wiki_payload(article, hit) if article else None
+    return out
+
+
 @api_view(['GET'])
 @authentication_classes(AUTH_CLASSES)
 @permission_classes([AllowAny])
@@ -262,39 +294,48 @@ def wiki_content(request):
         return Response({"detail": "Query parameter 'content' is required."}, status=400)
 
     try:
-        results = search_articles_semantic(content, size=1)
+        hit = _wiki_hits([content])[content]
     except Exception as e:
         return Response(
             {"detail": f"Search service unavailable: {e}"},
             status=status.HTTP_503_SERVICE_UNAVAILABLE,
         )
 
-    if not results:
+    if not hit:
         return Response({"detail": "No results found."}, status=404)
 
-    hit = results[0]
-    article_name = hit["article_name"]
-
     try:
-        article = Article.objects.select_related('current_version').get(name=article_name)
+        article = Article.objects.select_related('current_version').get(name=hit["article_name"])
     except Article.DoesNotExist:
         return Response({"detail": "Article not found."}, status=404)
 
-    version = article.current_version
-    content = version.content if version else ""
-    summary = version.summary if version else ""
-    tags = hit.get("tags", [])
+    return Response(_wiki_payload(article, hit))
 
-    images = re.findall(r'!\[.*?\]\((https?://\S+?)\)', content)
 
-    return Response({
-        "tags": tags,
-        "summary": summary,
-        "description": content,
-        "images": images,
-        "url": f"/articles/{article_name}",
-        "updated_at": article.updated_at.isoformat() if article.updated_at else None,
-    })
+@api_view(['POST'])
+@authentication_classes(AUTH_CLASSES)
+@permission_classes([AllowAny])
+def wiki_content_batch(request):
+    """
+    wiki_content for many places at once: {"contents": ["...", ...]} ->
+    {"results": {content: payload or null}}, null where nothing matched.
+    """
+    contents = request.data.get("contents")
+    if not isinstance(contents, list) or not contents or not all(isinstance(c, str) for c in contents):
+        return Response({"detail": "'contents' must be a non-empty list of strings."}, status=400)
+    if len(contents) > WIKI_BATCH_MAX:
+        return Response({"detail": f"At most {WIKI_BATCH_MAX} contents per request."}, status=400)
+
+    queries = {c: c.strip() for c in contents}
+    try:
+        found = _wiki_lookup([q for q in dict.fromkeys(queries.values()) if q])
+    except Exception as e:
+        return Response(
+            {"detail": f"Search service unavailable: {e}"},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    return Response({"results": {c: found.get(q) for c, q in queries.items()}})
 
 
 @api_view(['POST'])
@@ -381,11 +422,13 @@ def approve_publish_request(request, pk):
 
     version = pub_request.version
     article.current_version = version
-    article.save()
+    article.save(update_fields=['current_version', 'updated_at'])  # never write back a stale score
+    search_cache.bump_generation()
+    top_by_tag.refresh_article(article.name)
 
-    chord(
-        [tag_article.s(article.name), summarize_article.s(article.name)]
-    )(index_article_version.s(version.name))
+    # searchable right away; tags and summary follow from the (coalesced) enrichment job
+    index_article_version.delay(None, version.name)
+    request_enrichment(article.name)
 
     return Response(PublishRequestSerializer(pub_request).data)
 
@@ -457,30 +500,12 @@ def top_rated_articles(request):
 @authentication_classes(AUTH_CLASSES)
 @permission_classes([AllowAny])
 def top_articles_by_tag(request):
-    tags = Tag.objects.all()
-    result = []
-
-    for tag in tags:
-        articles = Article.objects.filter(
-            current_version__isnull=False,
-            current_version__tags=tag,
-        ).select_related('current_version').order_by('-score')[:3]
-
-        if not articles:
-            continue
-
-        items = []
-        for a in articles:
-            v = a.current_version
-            items.append({
-                "name": a.name,
-                "summary": v.summary if v else "",
-                "score": a.score,
-            })
-
-        result.append({
-            "tag": tag.name,
-            "articles": items,
-        })
-
-    return Response(result)
+    limit = request.GET.get("limit")
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            return Response({"detail": "'limit' must be an integer."}, status=400)
+        if limit < 1:
+            return Response({"detail": "'limit' must be positive."}, status=400)
+    return Response(top_by_tag.top_articles(limit))
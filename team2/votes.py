@@ -0,0 +1,102 @@
+"""
+Vote counting for team2 articles.
+
+Scores only ever change by a delta applied in the database
+(UPDATE ... SET score = score + %s), never by read-modify-write in Python, so
+concurrent votes cannot overwrite each other.
+
+Very hot articles can be switched to sharded counting (Article.sharded_score):
+each vote then adds its delta to one of TEAM2_VOTE_SHARDS ArticleScoreShard
+rows picked at random, so parallel voters rarely wait on the same row, and
+fold_score_shards() (a periodic task) moves the pending deltas into
+Article.score. Between folds the stored score lags; current_score() adds the
+pending deltas back in.
+"""
+import random
+
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.db.models import F, Sum
+
+from team2 import top_by_tag
+from team2.models import Article, ArticleScoreShard, Vote
+
+
+class AlreadyVoted(Exception):
+    pass
+
+
+def _db():
+    return router.db_for_write(Article)
+
+
+def _add_to_shard(article_name, delta):
+    shard = random.randrange(max(1, settings.TEAM2_VOTE_SHARDS))
+    shards = ArticleScoreShard.objects.filter(article_id=article_name, shard=shard)
+    if shards.update(delta=F('delta') + delta):
+        return
+    try:
+        with transaction.atomic(using=_db()):
+            ArticleScoreShard.objects.create(article_id=article_name, shard=shard, delta=delta)
+    except IntegrityError:  # another voter created it first
+        shards.update(delta=F('delta') + delta)
+
+
+def add_to_score(article, delta):
+    if article.sharded_score:
+        _add_to_shard(article.name, delta)
+    else:
+        Article.objects.filter(name=article.name).update(score=F('score') + delta)
+
+
+def current_score(article_name):
+    """Stored score plus deltas not folded yet."""
+    score = Article.objects.filter(name=article_name).values_list('score', flat=True).get()
+    pending = ArticleScoreShard.objects.filter(article_id=article_name).aggregate(total=Sum('delta'))['total']
+    return score + (pending or 0)
+
+
+def cast_vote(article, user_id, value):
+    """
+    Record `user_id`'s vote (+1/-1) on `article` and apply the score change.
+    Raises AlreadyVoted when the user already voted this way. Returns the new score.
+    """
+    with transaction.atomic(using=_db()):
+        existing = Vote.objects.select_for_update().filter(user_id=user_id, article=article).first()
+        if existing is None:
+            try:
+                with transaction.atomic(using=_db()):
+                    Vote.objects.create(user_id=user_id, article=article, value=value)
+            except IntegrityError:  # a parallel first vote by the same user won
+                existing = Vote.objects.select_for_update().get(user_id=user_id, article=article)
+        if existing is not None:
+            if existing.value == value:
+                raise AlreadyVoted
+            delta = value - existing.value
+            existing.value = value
+            existing.save(update_fields=['value', 'updated_at'])
+        else:
+            delta = value
+        add_to_score(article, delta)
+
+    if not article.sharded_score:
+        top_by_tag.refresh_article(article.name)
+    return current_score(article.name)
+
+
+def fold_score_shards():
+    """Move pending shard deltas into Article.score; returns the number of articles updated."""
+    db = _db()
+    names = list(
+        ArticleScoreShard.objects.exclude(delta=0).values_list('article_id', flat=True).distinct()
+    )
+    for name in names:
+        with transaction.atomic(using=db):
+            shards = list(ArticleScoreShard.objects.select_for_update().filter(article_id=name).exclude(delta=0))
+            total = sum(s.delta for s in shards)
+            for s in shards:
+                # relative, so deltas added by voters not blocked by the lock (SQLite) survive
+                ArticleScoreShard.objects.filter(pk=s.pk).update(delta=F('delta') - s.delta)
+            Article.objects.filter(name=name).update(score=F('score') + total)
+        top_by_tag.refresh_article(name)
+    return len(names)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class Team4Config(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'team4'
+
+    def ready(self):
+        import team4.signals  # noqa: F401
@@ -1,7 +1,8 @@
 from django.db import models
 from django.core.exceptions import ValidationError
 from django.db.models import Func, Value
-import math
+
+from core.geo import haversine_km
 
 
 class Point:
@@ -33,23 +34,7 @@ class Point:
         if not isinstance(other, Point):
             raise TypeError("other must be a Point object")
         
-        # Convert to radians
-        lat1 = math.radians(self.latitude)
-        lat2 = math.radians(other.latitude)
-        lon1 = math.radians(self.longitude)
-        lon2 = math.radians(other.longitude)
-        
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        
-        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-        c = 2 * math.asin(math.sqrt(a))
-        
-        # Earth radius in kilometers
-        r = 6371
-        
-        return c * r
+        return haversine_km(self.latitude, self.longitude, other.latitude, other.longitude)
 
 
 class PointField(models.Field):
@@ -57,6 +42,7 @@ class PointField(models.Field):
     Custom field that stores data as MySQL POINT type.
     In Python: Point(longitude, latitude)
     In MySQL: POINT(longitude latitude)
+    Other backends (the SQLite dev DB) store the same WKT as plain text.
     """
     
     description = "A geographic point (longitude, latitude)"
@@ -65,6 +51,8 @@ class PointField(models.Field):
         super().__init__(*args, **kwargs)
     
     def db_type(self, connection):
+        if connection.vendor != 'mysql':
+            return 'text'
         return 'POINT'
     
     def from_db_value(self, value, expression, connection):
@@ -134,6 +122,9 @@ class PointField(models.Field):
         """Prepare value for saving to database - return raw SQL expression"""
         if value is None:
             return None
+        # Expressions (e.g. the CASE of bulk_update) compile themselves
+        if hasattr(value, 'as_sql'):
+            return value
             
         # Prepare the value first
         value = self.get_prep_value(value)
@@ -158,12 +149,17 @@ class PointField(models.Field):
     def get_placeholder(self, value, compiler, connection):
         """Return placeholder for SQL query"""
         # For MySQL/MariaDB POINT type, use ST_GeomFromText
+        # (an expression already yields a geometry: its values carry their own placeholder)
+        if connection.vendor != 'mysql' or hasattr(value, 'as_sql'):
+            return "%s"
         return "ST_GeomFromText(%s)"
     
     def select_format(self, compiler, sql, params):
         """Format SELECT to return location as binary data that can be parsed"""
         # Return as-is, MySQL will return as WKB binary
         # Or use ST_AsText for text format
+        if compiler.connection.vendor != 'mysql':
+            return sql, params
         return f"ST_AsText({sql})", params
     
     def value_to_string(self, obj):
@@ -174,3 +170,45 @@ class PointField(models.Field):
         if isinstance(value, Point):
             return f"{value.longitude},{value.latitude}"
         return str(value)
+
+
+class PointCoordinateField(models.FloatField):
+    """
+    Copy of one coordinate ('latitude' or 'longitude') of a PointField on the
+    same model, in a plain indexable column. POINT values can't be range-scanned
+    by a B-tree (and SQLite has no spatial index at all), so radius queries
+    filter on these columns instead (team4.services.spatial_service).
+
+    The value is taken from the point in pre_save, so it stays in sync through
+    save(), bulk_create() and update_or_create(). QuerySet.update(location=...)
+    bypasses it and must set the coordinate columns too.
+    """
+
+    def __init__(self, point_field, axis, *args, **kwargs):
+        if axis not in ('latitude', 'longitude'):
+            raise ValueError("axis must be 'latitude' or 'longitude'")
+        self.point_field = point_field
+        self.axis = axis
+        kwargs.setdefault('null', True)
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['point_field'] = self.point_field
+        kwargs['axis'] = self.axis
+        kwargs.pop('null', None)
+        kwargs.pop('editable', None)
+        if not self.null:
+            kwargs['null'] = False
+        if self.editable:
+            kwargs['editable'] = True
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        point = model_instance._meta.get_field(self.point_field).to_python(
+            getattr(model_instance, self.point_field)
+        )
+        value = getattr(point, self.axis) if isinstance(point, Point) else None
+        setattr(model_instance, self.attname, value)
+        return value
@@ -0,0 +1,351 @@
+"""
+Shared machinery of the team4 fixture loaders (management/commands/load_*).
+
+A loader does the following:
+- reads its fixture with iter_json(), which parses a top-level JSON array item
+  by item, so memory stays flat however large the file is;
+- resolves foreign keys from lookup maps, each preloaded with one query;
+- hands new and changed rows to a Batch. A Batch writes them batch_size at a
+  time with bulk_create / bulk_update, one transaction per batch.
+
+FixtureCommand ties that together:
+- --database, --file and --batch-size options;
+- row counts and timing that load_all_data reports;
+- search_index.bulk_load() around the load, so the names are indexed once at
+  the end instead of row by row.
+"""
+import json
+import os
+import re
+import time
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from team4 import search_index
+from team4.fields import Point, PointCoordinateField
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+READ_SIZE = 1 << 16
+
+_SPACE = re.compile(r'\s*')
+
+
+def fixture_path(filename):
+    """`filename` under team4/fixtures, or as given (absolute or relative to the working directory)."""
+    path = os.path.join(FIXTURES_DIR, filename)
+    return path if os.path.exists(path) else filename
+
+
+def iter_json(path, read_size=READ_SIZE):
+    """Items of the top-level JSON array in `path`, decoded one at a time."""
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buf, pos, eof = '', 0, False
+        state = 'open'  # '[' -> an item or ']' -> (',' item)* -> ']'
+        while True:
+            pos = _SPACE.match(buf, pos).end()
+            if pos < len(buf):
+                char = buf[pos]
+                if state == 'open':
+                    if char != '[':
+                        raise ValueError(f'{path}: not a JSON array')
+                    pos, state = pos + 1, 'first'
+                    continue
+                if state == 'next' or (state == 'first' and char == ']'):
+                    if char == ']':
+                        return
+                    if char != ',':
+                        raise ValueError(f'{path}: expected "," or "]", got {char!r}')
+                    pos, state = pos + 1, 'item'
+                    continue
+                try:
+                    item, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    end = len(buf)
+                # an item running to the end of the buffer may be cut short: read on and decode it again
+                if end < len(buf) or eof:
+                    yield item
+                    pos, state = end, 'next'
+                    continue
+            elif eof:
+                raise ValueError(f'{path}: unexpected end of the JSON array')
+            chunk = f.read(read_size)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+
+
+def point(location):
+    """Point of a fixture {'latitude': .., 'longitude': ..} dict, or None when either is missing."""
+    if location and location.get('latitude') and location.get('longitude'):
+        return Point(float(location['longitude']), float(location['latitude']))
+    return None
+
+
+def _state(columns, values):
+    """Comparable form of the `values` of model fields `columns`."""
+    return tuple((v.longitude, v.latitude) if isinstance(v, Point) else f.to_python(v)
+                 for f, v in zip(columns, values))
+
+
+class Batch:
+    """
+    New and changed rows of one model, written every `size` rows, one transaction per batch.
+
+    `fields` are the columns bulk_update writes for changed rows; auto_now
+    timestamps and PointCoordinateField copies are added and recomputed, since
+    bulk_update skips pre_save. Created rows get their pks back from the insert
+    where the backend returns them, else by looking up their `key` (unique
+    fields). `after(created, updated)` runs inside the batch's transaction,
+    once every row has its pk.
+    """
+
+    def __init__(self, model, using, fields=(), size=1000, key=None, after=None):
+        self.model = model
+        self.using = using
+        self.size = size
+        self.key = key
+        self.after = after
+        self.derived = [f for f in model._meta.concrete_fields
+                        if getattr(f, 'auto_now', False) or isinstance(f, PointCoordinateField)]
+        self.fields = [*fields, *(f.name for f in self.derived if f.name not in fields)]
+        self.created, self.updated = [], []
+        self.pending = set()  # id() of the rows not written yet
+        self.created_rows = self.updated_rows = 0
+
+    @property
+    def rows(self):
+        return self.created_rows + self.updated_rows
+
+    def __contains__(self, obj):
+        return id(obj) in self.pending
+
+    def add(self, obj, created=True):
+        (self.created if created else self.updated).append(obj)
+        self.pending.add(id(obj))
+        if len(self.created) + len(self.updated) >= self.size:
+            self.flush()
+
+    def flush(self):
+        if not (self.created or self.updated):
+            return
+        objects = self.model.objects.using(self.using)
+        with transaction.atomic(using=self.using):
+            if self.created:
+                objects.bulk_create(self.created)
+                self._fill_pks(objects, self.created)
+            if self.updated:
+                for obj in self.updated:
+                    for field in self.derived:
+                        field.pre_save(obj, False)
+                objects.bulk_update(self.updated, self.fields)
+            if self.after:
+                self.after(self.created, self.updated)
+        self.created_rows += len(self.created)
+        self.updated_rows += len(self.updated)
+        self.created, self.updated = [], []
+        self.pending.clear()
+
+    def _fill_pks(self, objects, created):
+        missing = [obj for obj in created if obj.pk is None]
+        if not missing or not self.key:
+            return
+        lookup = {f'{name}__in': {getattr(obj, name) for obj in missing} for name in self.key}
+        pks = {tuple(row[:-1]): row[-1] for row in objects.filter(**lookup).values_list(*self.key, 'pk')}
+        for obj in missing:
+            obj.pk = pks.get(tuple(getattr(obj, name) for name in self.key))
+
+
+class FixtureCommand(BaseCommand):
+    """
+    Base of the load_* commands. Subclasses set `fixture` (a file name under
+    team4/fixtures) and `index_kinds` (search_index kinds they write), and
+    implement load(items), which returns the rows written. After handle(),
+    `rows` and `seconds` hold the totals.
+    """
+    fixture = None
+    index_kinds = ()
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', type=str, default='team4', help='The database to use')
+        parser.add_argument('--file', type=str, default=self.fixture, help='Fixture under team4/fixtures')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk write and transaction')
+
+    def handle(self, *args, **options):
+        self.db = options['database']
+        self.batch_size = options['batch_size']
+        self.rows, self.seconds = 0, 0.0
+        path = fixture_path(options['file'])
+        if not os.path.exists(path):
+            self.stdout.write(self.style.ERROR(f'❌ File not found: {path}'))
+            return
+        t0 = time.perf_counter()
+        indexing = search_index.bulk_load(*self.index_kinds, using=self.db) if self.index_kinds else nullcontext()
+        with indexing:
+            self.rows = self.load(iter_json(path))
+        self.seconds = time.perf_counter() - t0
+
+    def load(self, items):
+        raise NotImplementedError
+
+    def batch(self, model, fields=(), **kwargs):
+        return Batch(model, self.db, fields, self.batch_size, **kwargs)
+
+
+class FacilityFixtureCommand(FixtureCommand):
+    """
+    Base of the facility loaders (hotels, hospitals, restaurants, museums).
+
+    A facility is matched on (name_fa, city), as update_or_create did. Its city
+    is found by the fixture's city_id, or else by city_name_fa. Its category is
+    the fixture's category_id, or else the first category whose name_fa
+    contains `category_name`. Amenities listed in the fixture, minus unknown
+    ids, replace the facility's own. A name_en already used by another facility
+    in the city is skipped, or suffixed with the fixture id when
+    `rename_duplicates` is set.
+    """
+    index_kinds = ('facility',)
+    label = 'مکان‌ها'
+    category_name = None
+    # fixture fields and their default when missing, and fields set regardless of the fixture
+    defaults = {'status': True, 'is_24_hour': False, 'price_tier': 'unknown'}
+    fixed = {}
+    rename_duplicates = False
+
+    FIELDS = ['name_en', 'category', 'address', 'location', 'phone', 'email', 'website', 'description_fa',
+              'description_en', 'avg_rating', 'review_count', 'status', 'is_24_hour', 'price_tier']
+
+    def fallback_category(self):
+        from team4.models import Category
+
+        return (Category.objects.using(self.db).filter(name_fa__contains=self.category_name)
+                .values_list('category_id', flat=True).first())
+
+    def category_for(self, item, categories, fallback):
+        cat_id = item.get('category_id')
+        return cat_id if cat_id in categories else fallback
+
+    def load(self, items):
+        from team4.models import Amenity, Category, City, Facility, FacilityAmenity
+
+        db = self.db
+        # lookup maps, one query each
+        categories = set(Category.objects.using(db).values_list('category_id', flat=True))
+        fallback = self.fallback_category()
+        valid_amenity_ids = set(Amenity.objects.using(db).values_list('amenity_id', flat=True))
+        cities, city_names = set(), {}
+        for city_id, name_fa in City.objects.using(db).order_by('city_id').values_list('city_id', 'name_fa'):
+            cities.add(city_id)
+            city_names.setdefault(name_fa, city_id)
+        # (name_fa, city) -> (pk, name_en) of a stored facility, or the Facility written by this run;
+        # (name_en, city) -> the (name_fa, city) using it (unique together);
+        # pk -> the stored values of FIELDS and amenity ids, so unchanged rows aren't rewritten
+        columns = [Facility._meta.get_field(name) for name in self.FIELDS]
+        existing, names, stored = {}, {}, {}
+        for pk, name_fa, name_en, city_id, *values in Facility.objects.using(db).values_list(
+                'fac_id', 'name_fa', 'name_en', 'city_id', *(f.attname for f in columns)).iterator(chunk_size=5000):
+            existing[(name_fa, city_id)] = (pk, name_en)
+            names[(name_en, city_id)] = (name_fa, city_id)
+            stored[pk] = (_state(columns, values), set())
+        for facility_id, amenity_id in FacilityAmenity.objects.using(db).values_list('facility_id', 'amenity_id'):
+            if facility_id in stored:
+                stored[facility_id][1].add(amenity_id)
+
+        amenities = {}  # id(facility) -> (facility, amenity ids) until its batch is written
+
+        def link(created, updated):
+            rows = [amenities.pop(id(f)) for f in (*created, *updated) if id(f) in amenities]
+            if not rows:
+                return
+            FacilityAmenity.objects.using(db).filter(facility_id__in=[f.pk for f, _ in rows]).delete()
+            FacilityAmenity.objects.using(db).bulk_create([
+                FacilityAmenity(facility_id=f.pk, amenity_id=amenity_id) for f, ids in rows for amenity_id in ids
+            ])
+
+        batch = self.batch(Facility, self.FIELDS, key=('name_en', 'city_id'), after=link)
+        skipped_count = unchanged_count = 0
+
+        for item in items:
+            name_fa = item.get('name_fa')
+            if not name_fa:
+                continue
+
+            city_id = item.get('city_id')
+            city_name = item.get('city_name_fa')
+            if city_id not in cities:
+                city_id = city_names.get(city_name)
+            if city_id is None:
+                self.stdout.write(self.style.WARNING(
+                    f'⚠ شهر یافت نشد: {city_name} (ID: {item.get("city_id")}) برای {name_fa}'))
+                skipped_count += 1
+                continue
+
+            category_id = self.category_for(item, categories, fallback)
+            location = point(item.get('location'))
+            if category_id is None or location is None:
+                self.stdout.write(self.style.ERROR(f'❌ خطا در ذخیره {name_fa}: دسته‌بندی یا موقعیت ندارد'))
+                skipped_count += 1
+                continue
+
+            fields = {
+                'name_en': item.get('name_en', ""),
+                'category_id': category_id,
+                'address': item.get('address', ""),
+                'location': location,
+                'phone': item.get('phone', ""),
+                'email': item.get('email', ""),
+                'website': item.get('website', ""),
+                'description_fa': item.get('description_fa', ""),
+                'description_en': item.get('description_en', ""),
+                'avg_rating': item.get('avg_rating', 0.0),
+                'review_count': item.get('review_count', 0),
+                **{name: item.get(name, default) for name, default in self.defaults.items()},
+                **self.fixed,
+            }
+
+            key = (name_fa, city_id)
+            owner = names.get((fields['name_en'], city_id))
+            if owner is not None and owner != key and self.rename_duplicates:
+                fields['name_en'] += f" ({item.get('id')})"
+                owner = names.get((fields['name_en'], city_id))
+            if owner is not None and owner != key:
+                self.stdout.write(self.style.ERROR(f'❌ خطا در ذخیره {name_fa}: نام انگلیسی تکراری در این شهر'))
+                skipped_count += 1
+                continue
+
+            previous = existing.get(key)
+            amenity_ids = [a for a in dict.fromkeys(item.get('amenities') or ()) if a in valid_amenity_ids]
+            if isinstance(previous, tuple) and previous[0] in stored:
+                values, linked = stored.pop(previous[0])
+                if (values == _state(columns, [fields[f.attname] for f in columns])
+                        and (not amenity_ids or set(amenity_ids) == linked)):
+                    unchanged_count += 1
+                    continue
+            if isinstance(previous, Facility) and previous in batch:
+                # listed twice and not written yet: the later entry wins, as with update_or_create
+                names.pop((previous.name_en, city_id), None)
+                for name, value in fields.items():
+                    setattr(previous, name, value)
+                facility = previous
+            else:
+                pk = None
+                if previous is not None:
+                    pk, name_en = (previous.pk, previous.name_en) if isinstance(previous, Facility) else previous
+                    names.pop((name_en, city_id), None)
+                facility = Facility(fac_id=pk, name_fa=name_fa, city_id=city_id, **fields)
+            names[(facility.name_en, city_id)] = key
+            existing[key] = facility
+            if amenity_ids:
+                amenities[id(facility)] = (facility, amenity_ids)
+            if facility is not previous:
+                batch.add(facility, created=facility.pk is None)
+        batch.flush()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ گزارش نهایی {self.label}: {batch.created_rows} ایجاد، '
+            f'{batch.updated_rows} بروزرسانی، {unchanged_count} بدون تغییر، {skipped_count} پرش'
+        ))
+        return batch.rows
@@ -1,41 +1,44 @@
-import os
-from django.core.management import BaseCommand, call_command
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management import BaseCommand, call_command, load_command_class
+from django.db import connections
+from team4 import search_index
 from team4.models import Facility
 
-class Command(BaseCommand):
-    help = 'Cleans the DB and runs all load commands, showing only final counts'
+# مراحل بارگذاری به ترتیب وابستگی؛ زنجیره‌های هر مرحله مستقل‌اند و می‌توانند هم‌زمان اجرا شوند.
+# بارگذارهای مکان‌ها یک زنجیره‌اند: هر کدام نام‌های ثبت‌شده‌ی قبلی را برای تکراری‌ها می‌بینند.
+STAGES = [
+    [['load_provinces'], ['load_category'], ['load_amenity']],
+    [['load_cities']],
+    [['load_villages'], ['load_hospitals', 'load_hotels', 'load_restaurants', 'load_museums']],
+]
 
-    def handle(self, *args, **options):
-        db = 'team4'
 
-        # ۱. پاکسازی Facility
-        self.stdout.write(self.style.WARNING('🗑️  In progress: Clearing Facility table...'))
-        Facility.objects.using(db).all().delete()
-        self.stdout.write(self.style.SUCCESS('✅ Facility table cleared.'))
+class Command(BaseCommand):
+    help = 'Cleans the DB and runs all load commands, showing only final counts'
 
-        # ۲. لیست دستورات بارگذاری
-        commands_to_run = [
-            'load_provinces',
-            'load_cities',
-            'load_villages',
-            'load_category',
-            'load_amenity',
-            'load_hospitals',
-            'load_hotels',
-            'load_restaurants',
-            'load_museums',
-        ]
+    def add_arguments(self, parser):
+        parser.add_argument('--database', type=str, default='team4')
+        parser.add_argument('--parallel', type=int, default=1,
+                            help='Independent loaders run at once (1 = one after another)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk write and transaction')
 
-        self.stdout.write(self.style.MIGRATE_HEADING('\n🚀 Starting Data Import...'))
+    def handle(self, *args, **options):
+        db = options['database']
+        workers = max(options['parallel'], 1)
+        if workers > 1 and connections[db].vendor == 'sqlite':
+            # SQLite has a single writer; parallel loaders would only wait on its lock
+            self.stdout.write(self.style.WARNING('⚠ SQLite: loaders run one after another.'))
+            workers = 1
 
-        for cmd in commands_to_run:
-            try:
-                # اجرای دستور بدون چاپ جزییات داخلی (Silent execution)
-                call_command(cmd, database=db)
-                self.stdout.write(self.style.SUCCESS(f'✔ {cmd}: Completed successfully.'))
-            except Exception:
-                # در صورت بروز خطا فقط نام دستور را نمایش می‌دهد
-                self.stdout.write(self.style.ERROR(f'✘ {cmd}: Encountered some issues during import.'))
+        t0 = time.perf_counter()
+        # ایندکس جستجوی نام‌ها یک‌بار در پایان بازسازی می‌شود
+        with search_index.bulk_load(using=db):
+            results = self.load_all(db, workers, options['batch_size'], options['verbosity'])
+        self.stdout.write(self.style.SUCCESS('✅ Search index rebuilt.'))
+        self.report(results, time.perf_counter() - t0)
 
         # ۳. نمایش آمار نهایی
         self.stdout.write(self.style.MIGRATE_HEADING('\n📊 FINAL IMPORT SUMMARY:'))
@@ -45,4 +48,60 @@ class Command(BaseCommand):
         except Exception:
             self.stdout.write(self.style.ERROR('Could not retrieve final stats.'))
 
-        self.stdout.write(self.style.SUCCESS('\n✨ Full process finished.'))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS('\n✨ Full process finished.'))
+
+    def load_all(self, db, workers, batch_size, verbosity):
+        # ۱. پاکسازی Facility
+        self.stdout.write(self.style.WARNING('🗑️  In progress: Clearing Facility table...'))
+        Facility.objects.using(db).all().delete()
+        self.stdout.write(self.style.SUCCESS('✅ Facility table cleared.'))
+
+        # ۲. اجرای مرحله به مرحله‌ی دستورات بارگذاری
+        self.stdout.write(self.style.MIGRATE_HEADING('\n🚀 Starting Data Import...'))
+        results = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for stage in STAGES:
+                if workers > 1:
+                    chains = pool.map(lambda chain: self.run_in_thread(chain, db, batch_size), stage)
+                else:
+                    chains = [self.run_chain(chain, db, batch_size) for chain in stage]
+                for chain in chains:
+                    for cmd, ok, rows, seconds, output in chain:
+                        if verbosity > 1:
+                            self.stdout.write(output)
+                        if ok:
+                            self.stdout.write(self.style.SUCCESS(f'✔ {cmd}: Completed successfully.'))
+                        else:
+                            # در صورت بروز خطا فقط نام دستور را نمایش می‌دهد
+                            self.stdout.write(self.style.ERROR(f'✘ {cmd}: Encountered some issues during import.'))
+                        results.append((cmd, rows, seconds))
+        return results
+
+    def run_in_thread(self, chain, db, batch_size):
+        try:
+            # ایندکس ردیف‌به‌ردیف در هر thread جدا متوقف می‌شود؛ بازسازی در پایان handle
+            with search_index.paused():
+                return self.run_chain(chain, db, batch_size)
+        finally:
+            connections.close_all()
+
+    def run_chain(self, chain, db, batch_size):
+        """دستورات یک زنجیره، پشت سر هم"""
+        results = []
+        for cmd in chain:
+            # اجرای دستور بدون چاپ جزییات داخلی (Silent execution)
+            command, output = load_command_class('team4', cmd), io.StringIO()
+            try:
+                call_command(command, database=db, batch_size=batch_size, stdout=output)
+                results.append((cmd, True, command.rows, command.seconds, output.getvalue()))
+            except Exception as e:
+                results.append((cmd, False, 0, 0.0, f'{output.getvalue()}{e}'))
+        return results
+
+    def report(self, results, seconds):
+        self.stdout.write(self.style.MIGRATE_HEADING('\n⏱️  Load throughput:'))
+        for cmd, rows, cmd_seconds in results:
+            rate = rows / cmd_seconds if cmd_seconds else 0
+            self.stdout.write(f' {cmd:18} | {rows:7} rows | {cmd_seconds:7.2f}s | {rate:9.0f} rows/s')
+        total = sum(rows for _, rows, _ in results)
+        self.stdout.write(f' {"total (wall)":18} | {total:7} rows | {seconds:7.2f}s | {total / seconds:9.0f} rows/s')
@@ -1,52 +1,32 @@
-import json
-from django.core.management.base import BaseCommand
+from team4.loaders import FixtureCommand
 from team4.models import Amenity
 
-class Command(BaseCommand):
-    help = 'Load amenities from JSON fixture'
-
-    def add_arguments(self, parser):
-        parser.add_argument('--database', type=str, default='team4', help='The database to use')
 
-    def handle(self, *args, **options):
-        db = options['database']
-        # Path to your amenities JSON
-        fixture_path = 'team4/fixtures/amenities.json'
-        
-        try:
-            with open(fixture_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except FileNotFoundError:
-            self.stdout.write(self.style.ERROR(f'Fixture not found at {fixture_path}'))
-            return
+class Command(FixtureCommand):
+    help = 'Load amenities from JSON fixture'
+    fixture = 'amenities.json'
 
-        created_count = 0
-        updated_count = 0
+    def load(self, items):
+        existing = set(Amenity.objects.using(self.db).values_list('amenity_id', flat=True))
+        batch = self.batch(Amenity, ['name_fa', 'name_en', 'icon'])
 
-        for item in data:
+        for item in items:
             # Map the JSON structure to your model fields
             pk = item.get('pk')
             fields = item.get('fields', {})
-            
-            name_fa = fields.get('name_fa')
-            name_en = fields.get('name_en')
-            icon = fields.get('icon', '')
-
-            # Use update_or_create to handle existing PKs gracefully
-            amenity, created = Amenity.objects.using(db).update_or_create(
+            amenity = Amenity(
                 amenity_id=pk,
-                defaults={
-                    'name_fa': name_fa,
-                    'name_en': name_en,
-                    'icon': icon
-                }
+                name_fa=fields.get('name_fa'),
+                name_en=fields.get('name_en'),
+                icon=fields.get('icon', ''),
             )
-
-            if created:
-                created_count += 1
-            else:
-                updated_count += 1
+            # existing PKs are updated in place
+            batch.add(amenity, created=pk not in existing)
+            existing.add(pk)
+        batch.flush()
 
         self.stdout.write(self.style.SUCCESS(
-            f'✅ Amenity Load Complete: {created_count} created, {updated_count} updated on database "{db}"'
-        ))
\ No newline at end of file
+            f'✅ Amenity Load Complete: {batch.created_rows} created, {batch.updated_rows} updated '
+            f'on database "{self.db}"'
+        ))
+        return batch.rows
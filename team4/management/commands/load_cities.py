@@ -1,63 +1,55 @@
-from django.core.management.base import BaseCommand
+from team4.loaders import FixtureCommand, point
 from team4.models import City, Province
-from team4.fields import Point
-import json
 
-class Command(BaseCommand):
+
+class Command(FixtureCommand):
     help = 'Load cities with location data'
+    fixture = 'cities.json'
+    index_kinds = ('city',)
 
-    def handle(self, *args, **options):
-        fixture_path = 'team4/fixtures/cities.json'
-        
-        with open(fixture_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        updated_count = 0
-        created_count = 0
+    def load(self, items):
+        provinces = set(Province.objects.using(self.db).values_list('province_id', flat=True))
+        # We identify the city by its English Name and Province (unique together)
+        existing = {
+            (province_id, name_en): city_id
+            for city_id, province_id, name_en in City.objects.using(self.db).values_list(
+                'city_id', 'province_id', 'name_en')
+        }
+        taken = set(existing.values())
+        batch = self.batch(City, ['name_fa', 'location'])
         skipped_count = 0
-        
-        for item in data:
+
+        for item in items:
             city_id = item['city_id']
-            name_fa = item['name_fa']
             name_en = item['name_en']
-            
-            province_data = item.get('province', {})
-            p_id = province_data.get('province_id')
-            
-            try:
-                province = Province.objects.using('team4').get(province_id=p_id)
-            except Province.DoesNotExist:
+            p_id = (item.get('province') or {}).get('province_id')
+            if p_id not in provinces:
                 skipped_count += 1
                 continue
-            
-            location = None
-            loc_data = item.get('location', {})
-            if loc_data.get('latitude') and loc_data.get('longitude'):
-                location = Point(float(loc_data['longitude']), float(loc_data['latitude']))
-            
-            # --- FIX: Use update_or_create to handle Unique Constraints ---
-            try:
-                # We identify the city by its English Name and Province
-                # This bypasses the Duplicate Entry error
-                city, created = City.objects.using('team4').update_or_create(
-                    name_en=name_en,
-                    province=province,
-                    defaults={
-                        'city_id': city_id, # Sync the ID
-                        'name_fa': name_fa,
-                        'location': location,
-                    }
-                )
-                
-                if created:
-                    created_count += 1
-                else:
-                    updated_count += 1
-                    
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f'❌ Error with {name_en}: {e}'))
+
+            location = point(item.get('location'))
+            if location is None:
+                self.stdout.write(self.style.ERROR(f'❌ Error with {name_en}: no location'))
                 skipped_count += 1
-        
+                continue
+
+            key = (p_id, name_en)
+            if key in existing:
+                city = City(city_id=existing[key], province_id=p_id, name_en=name_en,
+                            name_fa=item['name_fa'], location=location)
+                batch.add(city, created=False)
+                continue
+            if city_id in taken:
+                self.stdout.write(self.style.ERROR(f'❌ Error with {name_en}: city_id {city_id} is taken'))
+                skipped_count += 1
+                continue
+            batch.add(City(city_id=city_id, province_id=p_id, name_en=name_en,
+                           name_fa=item['name_fa'], location=location))
+            existing[key] = city_id
+            taken.add(city_id)
+        batch.flush()
+
         self.stdout.write(self.style.SUCCESS(
-            f'\n✅ Complete: {created_count} created, {updated_count} updated, {skipped_count} skipped'
-        ))
\ No newline at end of file
+            f'\n✅ Complete: {batch.created_rows} created, {batch.updated_rows} updated, {skipped_count} skipped'
+        ))
+        return batch.rows
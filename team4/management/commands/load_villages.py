@@ -1,70 +1,57 @@
-from django.core.management.base import BaseCommand
-from team4.models import Village, City
-from team4.fields import Point # Ensure this matches your PointField's helper
-import json
+from team4.loaders import FixtureCommand, point
+from team4.models import City, Village
 
-class Command(BaseCommand):
+
+class Command(FixtureCommand):
     help = 'Load villages from JSON fixture'
+    fixture = 'villages.json'
+    index_kinds = ('village',)
 
-    def handle(self, *args, **options):
-        fixture_path = 'team4/fixtures/villages.json'
-        
-        # Clear existing data to avoid UniqueTogether errors
+    def load(self, items):
+        # Clear existing data to avoid UniqueTogether errors. Nothing references villages and the
+        # search index is rebuilt after the load, so no per-row delete (and post_delete) is needed.
         self.stdout.write("Cleaning existing villages...")
-        Village.objects.using('team4').all().delete()
-        
-        try:
-            with open(fixture_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except FileNotFoundError:
-            self.stdout.write(self.style.ERROR(f'File not found at {fixture_path}'))
-            return
+        Village.objects.using(self.db).all()._raw_delete(self.db)
 
-        created_count = 0
+        cities = set(City.objects.using(self.db).values_list('city_id', flat=True))
+        seen_ids, seen_names = set(), set()
+        batch = self.batch(Village)
         skipped_count = 0
 
-        for item in data:
+        for item in items:
             village_id = item['village_id']
             name_fa = item['name_fa']
             name_en = item['name_en']
-            
-            # Your model only links to City. 
-            # We extract city_id from the nested JSON object.
-            city_data = item.get('city', {})
-            city_id = city_data.get('city_id')
 
-            try:
-                city = City.objects.using('team4').get(city_id=city_id)
-            except City.DoesNotExist:
+            # Your model only links to City.
+            # We extract city_id from the nested JSON object.
+            city_id = (item.get('city') or {}).get('city_id')
+            if city_id not in cities:
                 self.stdout.write(self.style.WARNING(
                     f'⚠ Skipping {name_fa}: City {city_id} not found'
                 ))
                 skipped_count += 1
                 continue
+            if village_id in seen_ids or (city_id, name_en) in seen_names:
+                self.stdout.write(self.style.WARNING(f'⚠ Skipping {name_fa}: duplicate village'))
+                skipped_count += 1
+                continue
+            seen_ids.add(village_id)
+            seen_names.add((city_id, name_en))
 
-            # Process Location
-            location_data = item.get('location', {})
-            location = None
-            if location_data.get('latitude') and location_data.get('longitude'):
-                lat = float(location_data['latitude'])
-                lng = float(location_data['longitude'])
-                # Using Point class to match your PointField requirements
-                location = Point(lng, lat)
-
-            # Create the record
-            # We use village_id=village_id because you have it in your JSON
-            Village.objects.using('team4').create(
+            written = batch.rows
+            batch.add(Village(
                 village_id=village_id,
                 name_fa=name_fa,
                 name_en=name_en,
-                city=city,
-                location=location
-            )
-            created_count += 1
-
-            if created_count % 500 == 0:
-                self.stdout.write(f'... Created {created_count} villages')
+                city_id=city_id,
+                location=point(item.get('location')),
+            ))
+            if batch.rows > written:
+                self.stdout.write(f'... Created {batch.rows} villages')
+        batch.flush()
 
         self.stdout.write(self.style.SUCCESS(
-            f'\n✅ Done: {created_count} villages created, {skipped_count} skipped'
-        ))
\ No newline at end of file
+            f'\n✅ Done: {batch.rows} villages created, {skipped_count} skipped'
+        ))
+        return batch.rows
@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from team4 import search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the normalized name search index (provinces, cities, villages, facilities)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', type=str, default='team4')
+        parser.add_argument('--kinds', nargs='+', choices=['province', 'city', 'village', 'facility'],
+                            help='Only these kinds (default: all).')
+
+    def handle(self, *args, **options):
+        t0 = time.perf_counter()
+        rows = search_index.reindex(options['kinds'], using=options['database'])
+        self.stdout.write(self.style.SUCCESS(f'✅ {rows} names indexed in {time.perf_counter() - t0:.1f}s'))
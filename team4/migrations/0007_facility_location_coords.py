@@ -0,0 +1,50 @@
+# Generated by Django 4.2.27 on 2026-10-18 06:18
+
+from django.db import migrations, models
+import team4.fields
+
+
+def fill_coords(apps, schema_editor):
+    db = schema_editor.connection.alias
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute(
+            "UPDATE facilities_facility SET location_lat = ST_Y(location), location_lng = ST_X(location)"
+        )
+        return
+    Facility = apps.get_model('team4', 'Facility')
+    batch = []
+    for facility in Facility.objects.using(db).only('fac_id', 'location').iterator(chunk_size=2000):
+        if facility.location is None:
+            continue
+        facility.location_lat = facility.location.latitude
+        facility.location_lng = facility.location.longitude
+        batch.append(facility)
+        if len(batch) >= 2000:
+            Facility.objects.using(db).bulk_update(batch, ['location_lat', 'location_lng'])
+            batch = []
+    Facility.objects.using(db).bulk_update(batch, ['location_lat', 'location_lng'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team4', '0006_facility_price_tier'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='facility',
+            name='location_lat',
+            field=team4.fields.PointCoordinateField(axis='latitude', point_field='location', verbose_name='عرض جغرافیایی'),
+        ),
+        migrations.AddField(
+            model_name='facility',
+            name='location_lng',
+            field=team4.fields.PointCoordinateField(axis='longitude', point_field='location', verbose_name='طول جغرافیایی'),
+        ),
+        migrations.RunPython(fill_coords, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='facility',
+            index=models.Index(fields=['location_lat', 'location_lng'], name='idx_facility_lat_lng'),
+        ),
+    ]
@@ -0,0 +1,118 @@
+# Generated by Django 4.2.27 on 2026-10-18 06:25
+
+import re
+
+from django.db import migrations, models
+
+# team4.search_index.normalize when this migration was written, frozen here
+_FOLD = str.maketrans({
+    'ي': 'ی', 'ى': 'ی', 'ئ': 'ی', 'ك': 'ک', 'ة': 'ه', 'ۀ': 'ه',
+    'أ': 'ا', 'إ': 'ا', 'ٱ': 'ا', 'ؤ': 'و',
+    '\u200c': ' ', '\u200d': None, '\u0640': None,  # ZWNJ, ZWJ, tatweel
+    **{chr(c): None for c in range(0x064B, 0x0660)},  # harakat, shadda, sukun...
+    '\u0670': None,  # superscript alef
+    **{chr(0x06F0 + d): str(d) for d in range(10)},  # Persian digits
+    **{chr(0x0660 + d): str(d) for d in range(10)},  # Arabic-Indic digits
+})
+_WORD = re.compile(r'\w+')
+
+
+def normalize(text):
+    return ' '.join(_WORD.findall((text or '').translate(_FOLD).casefold()))
+
+SQLITE_FTS = [
+    # external-content FTS5 tables over facilities_search_name, kept in sync by triggers
+    "CREATE VIRTUAL TABLE facilities_search_name_fts USING fts5("
+    "text, content='facilities_search_name', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE VIRTUAL TABLE facilities_search_name_trigram USING fts5("
+    "compact, content='facilities_search_name', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER facilities_search_name_ai AFTER INSERT ON facilities_search_name BEGIN "
+    "INSERT INTO facilities_search_name_fts(rowid, text) VALUES (new.id, new.text); "
+    "INSERT INTO facilities_search_name_trigram(rowid, compact) VALUES (new.id, new.compact); END",
+    "CREATE TRIGGER facilities_search_name_ad AFTER DELETE ON facilities_search_name BEGIN "
+    "INSERT INTO facilities_search_name_fts(facilities_search_name_fts, rowid, text) VALUES ('delete', old.id, old.text); "
+    "INSERT INTO facilities_search_name_trigram(facilities_search_name_trigram, rowid, compact) "
+    "VALUES ('delete', old.id, old.compact); END",
+    "CREATE TRIGGER facilities_search_name_au AFTER UPDATE ON facilities_search_name BEGIN "
+    "INSERT INTO facilities_search_name_fts(facilities_search_name_fts, rowid, text) VALUES ('delete', old.id, old.text); "
+    "INSERT INTO facilities_search_name_trigram(facilities_search_name_trigram, rowid, compact) "
+    "VALUES ('delete', old.id, old.compact); "
+    "INSERT INTO facilities_search_name_fts(rowid, text) VALUES (new.id, new.text); "
+    "INSERT INTO facilities_search_name_trigram(rowid, compact) VALUES (new.id, new.compact); END",
+]
+SQLITE_FTS_DROP = [
+    "DROP TRIGGER IF EXISTS facilities_search_name_ai",
+    "DROP TRIGGER IF EXISTS facilities_search_name_ad",
+    "DROP TRIGGER IF EXISTS facilities_search_name_au",
+    "DROP TABLE IF EXISTS facilities_search_name_fts",
+    "DROP TABLE IF EXISTS facilities_search_name_trigram",
+]
+MYSQL_FTS = [
+    "ALTER TABLE facilities_search_name ADD FULLTEXT INDEX ft_search_name_text (text)",
+    "ALTER TABLE facilities_search_name ADD FULLTEXT INDEX ft_search_name_compact (compact) WITH PARSER ngram",
+]
+
+
+def create_fts(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'mysql':
+        statements = MYSQL_FTS
+    elif vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5'), sqlite_version()")
+            fts5, version = cursor.fetchone()
+        if not fts5 or tuple(map(int, version.split('.'))) < (3, 34):  # trigram tokenizer
+            return  # search_index falls back to LIKE
+        statements = SQLITE_FTS
+    else:
+        return
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for sql in SQLITE_FTS_DROP:
+            schema_editor.execute(sql)
+
+
+def fill_index(apps, schema_editor):
+    db = schema_editor.connection.alias
+    SearchName = apps.get_model('team4', 'SearchName')
+    for kind, model_name in (('province', 'Province'), ('city', 'City'), ('village', 'Village'), ('facility', 'Facility')):
+        model = apps.get_model('team4', model_name)
+        batch = []
+        for pk, name_fa, name_en in model.objects.using(db).values_list('pk', 'name_fa', 'name_en').iterator(chunk_size=2000):
+            text = normalize(f'{name_fa} {name_en}')
+            batch.append(SearchName(kind=kind, object_id=pk, text=text, compact=text.replace(' ', '')))
+            if len(batch) >= 2000:
+                SearchName.objects.using(db).bulk_create(batch)
+                batch = []
+        SearchName.objects.using(db).bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team4', '0007_facility_location_coords'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchName',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('province', 'استان'), ('city', 'شهر'), ('village', 'روستا'), ('facility', 'مکان')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('text', models.CharField(max_length=500)),
+                ('compact', models.CharField(max_length=500)),
+            ],
+            options={
+                'db_table': 'facilities_search_name',
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_fts, drop_fts),
+        migrations.RunPython(fill_index, migrations.RunPython.noop),
+    ]
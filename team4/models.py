@@ -2,7 +2,7 @@ from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator, EmailValidator
 from django.core.exceptions import ValidationError
 from django.conf import settings
-from .fields import PointField, Point
+from .fields import PointField, PointCoordinateField, Point
 import math
 
 
@@ -213,6 +213,9 @@ class Facility(models.Model):
     
     address = models.TextField(verbose_name="آدرس")
     location = PointField(verbose_name="موقعیت جغرافیایی") 
+    # کپی مختصات location در ستون‌های ایندکس‌دار، برای جستجوی شعاعی در SQL
+    location_lat = PointCoordinateField('location', 'latitude', verbose_name="عرض جغرافیایی")
+    location_lng = PointCoordinateField('location', 'longitude', verbose_name="طول جغرافیایی")
     phone = models.CharField(max_length=20, blank=True, verbose_name="تلفن")
     email = models.EmailField(blank=True, validators=[EmailValidator()], verbose_name="ایمیل")
     website = models.URLField(max_length=200, blank=True, verbose_name="وبسایت")
@@ -261,11 +264,19 @@ class Facility(models.Model):
             models.Index(fields=['category'], name='idx_facility_category'),
             models.Index(fields=['city'], name='idx_facility_city'),
             models.Index(fields=['status'], name='idx_facility_status'),
+            models.Index(fields=['location_lat', 'location_lng'], name='idx_facility_lat_lng'),
         ]
 
     def __str__(self):
         return f"{self.name_fa} - {self.city.name_fa}"
 
+    def save(self, *args, **kwargs):
+        # با تغییر location، ستون‌های مختصات هم باید ذخیره شوند
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'location' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'location_lat', 'location_lng'}
+        super().save(*args, **kwargs)
+
     def get_coordinates(self):
         if self.location:
             return (self.location.longitude, self.location.latitude)
@@ -532,3 +543,40 @@ class Review(models.Model):
         self.facility.avg_rating = stats['avg_rating'] or 0.00
         self.facility.review_count = stats['review_count'] or 0
         self.facility.save(update_fields=['avg_rating', 'review_count'])
+
+
+class SearchName(models.Model):
+    """نام نرمال‌شده‌ی استان، شهر، روستا و مکان‌ها برای جستجوی متنی (team4.search_index)"""
+    KIND_CHOICES = [
+        ('province', 'استان'),
+        ('city', 'شهر'),
+        ('village', 'روستا'),
+        ('facility', 'مکان'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    # name_fa و name_en نرمال‌شده، با فاصله بین کلمات
+    text = models.CharField(max_length=500)
+    # همان text بدون فاصله، برای جستجوی زیررشته‌ای (trigram)
+    compact = models.CharField(max_length=500)
+
+    class Meta:
+        db_table = 'facilities_search_name'
+        unique_together = [['kind', 'object_id']]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}: {self.text}"
+
+
+class SearchIndexState(models.Model):
+    """نسخه‌ی (generation) داده‌های هر ایندکس درون‌حافظه‌ای، برای باطل کردن کپی‌های پروسه‌های دیگر (team4.region_index)"""
+    name = models.CharField(max_length=64, primary_key=True)
+    generation = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'facilities_search_index_state'
+
+    def __str__(self):
+        return f"{self.name} #{self.generation}"
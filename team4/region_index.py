@@ -0,0 +1,267 @@
+"""
+In-memory autocomplete over the names of every province, city and village.
+
+The index is a sorted array of keys with binary search, a flattened trie. Each
+region contributes, for name_fa and for name_en after search_index.normalize():
+
+  the whole name, and the same without spaces    "head" keys (نجف آباد, نجفآباد)
+  the name from each later word on               "word" keys (آباد)
+
+A query is looked up with two bisects. The slice between them is every key that
+starts with the query. Each key carries one packed int:
+
+  tier (head / word) | kind (province, city, village) | len(name_fa) | entry
+
+Ranking is just sorting those ints, after the exact names (a dict). The order
+matches search_index.rank(): exact name, then name prefix, then word prefix.
+Within a tier, provinces come before cities before villages, and shorter
+names come first. Prefixes shared by more than SCAN_LIMIT keys have their best
+MAX_LIMIT entries per kind computed at build time. Lookup cost is then bounded
+by SCAN_LIMIT whatever the query; it runs well under a millisecond.
+
+The index is built lazily, per database alias, on the first lookup. It stays
+within TEAM4_REGION_INDEX_MAX_MB (estimated with sys.getsizeof). A larger index
+is dropped and complete() returns None, so callers go to the database
+(search_index.matching_ids). Any change to region names calls invalidate() from
+team4.search_index: row saves and deletes, bulk_load() and reindex(), and so
+the load_provinces / load_cities / load_villages commands. invalidate() drops
+this process's copy and bumps a generation in SearchIndexState. Other processes
+compare that generation at most every TEAM4_REGION_INDEX_CHECK_SECONDS and
+rebuild. One thread builds while the others keep answering from the old copy.
+"""
+import heapq
+import logging
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db.models import F
+
+from team4.search_index import normalize
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('province', 'city', 'village')
+# keys scanned per lookup at most; longer slices use the precomputed best entries
+SCAN_LIMIT = 512
+# largest `limit` a lookup may ask for
+MAX_LIMIT = 50
+
+_STATE = 'regions'  # the SearchIndexState row
+_MAX_CHAR = '\U0010ffff'
+_ENTRY = (1 << 24) - 1
+_HEAD, _WORD = 1, 2
+
+_lock = threading.Lock()
+_slots = {}  # alias -> [generation, checked at, _Index or None]
+
+
+def _max_bytes():
+    return int(getattr(settings, 'TEAM4_REGION_INDEX_MAX_MB', 64) * 1024 * 1024)
+
+
+def _check_seconds():
+    return getattr(settings, 'TEAM4_REGION_INDEX_CHECK_SECONDS', 5)
+
+
+def _score(tier, kind, name_fa, entry):
+    return (tier << 44) | (kind << 40) | (min(len(name_fa), 0xFFFF) << 24) | entry
+
+
+def _best(scores, limit):
+    """Best `limit` entries of each kind among packed `scores`, one score per entry, sorted."""
+    best = {}
+    for s in scores:
+        entry = s & _ENTRY
+        if s < best.get(entry, s + 1):
+            best[entry] = s
+    top = []
+    for kind in range(len(KINDS)):
+        top.extend(heapq.nsmallest(limit, (s for s in best.values() if (s >> 40) & 0xF == kind)))
+    return array('Q', sorted(top))
+
+
+class _Budget(Exception):
+    pass
+
+
+class _Index:
+    """One immutable build of the index; safe to share between threads."""
+
+    def __init__(self, rows, max_bytes):
+        entries, pairs, exact = [], [], {}
+        strings = {}
+        size = 0
+
+        def shared(value):
+            return strings.setdefault(value, value)
+
+        for kind, pk, name_fa, name_en, parent_id, parent_name in rows:
+            entry = len(entries)
+            if entry > _ENTRY:
+                raise _Budget(f'more than {_ENTRY} regions')
+            entries.append((kind, str(pk), name_fa,
+                            None if parent_id is None else shared(str(parent_id)),
+                            None if parent_name is None else shared(parent_name)))
+            size += sys.getsizeof(entries[-1]) + sys.getsizeof(name_fa) + 60
+            names = {normalize(name_fa), normalize(name_en)} - {''}
+            for name in names:
+                if name not in exact:
+                    exact[name] = []
+                    size += 160  # dict slot, list, score
+                exact[name].append(_score(0, kind, name_fa, entry))
+                words = name.split(' ')
+                keys = {(name, _HEAD), (''.join(words), _HEAD)}
+                keys.update((' '.join(words[i:]), _WORD) for i in range(1, len(words)))
+                for key, tier in keys:
+                    pairs.append((key, _score(tier, kind, name_fa, entry)))
+                    size += sys.getsizeof(key) + 16
+            if size > max_bytes:
+                raise _Budget(f'over {max_bytes} bytes after {len(entries)} regions')
+
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.scores = array('Q', (score for _, score in pairs))
+        del pairs
+        self.entries = entries
+        self.exact = {name: sorted(scores) for name, scores in exact.items()}
+        self.tops = self._tops()
+        size += sum(sys.getsizeof(top) for top in self.tops.values())
+        if size > max_bytes:
+            raise _Budget(f'over {max_bytes} bytes with {len(self.tops)} precomputed prefixes')
+        self.nbytes = size + sys.getsizeof(self.keys) + sys.getsizeof(self.scores)
+
+    def _tops(self):
+        """Best entries of every prefix shared by more than SCAN_LIMIT keys, level by level."""
+        keys, tops = self.keys, {}
+        todo = [('', 0, len(keys))]
+        while todo:
+            prefix, lo, hi = todo.pop()
+            depth = len(prefix) + 1
+            while lo < hi and len(keys[lo]) < depth:  # the key equal to `prefix` sorts first
+                lo += 1
+            while lo < hi:
+                child = keys[lo][:depth]
+                end = bisect_left(keys, child + _MAX_CHAR, lo, hi)
+                if end - lo > SCAN_LIMIT:
+                    tops[child] = _best(self.scores[lo:end], MAX_LIMIT)
+                    todo.append((child, lo, end))
+                lo = end
+        return tops
+
+    def complete(self, query, kinds=None, limit=10):
+        q = normalize(query)
+        if not q:
+            return []
+        limit = min(limit, MAX_LIMIT)
+        allowed = None if kinds is None else {KINDS.index(kind) for kind in kinds}
+        lo = bisect_left(self.keys, q)
+        hi = bisect_left(self.keys, q + _MAX_CHAR, lo)
+        if hi - lo > SCAN_LIMIT:
+            ranked = self.tops[q]
+        else:
+            ranked = _best(self.scores[lo:hi], limit)
+
+        out, seen = [], set()
+        for s in heapq.merge(self.exact.get(q, ()), ranked):
+            entry = s & _ENTRY
+            if entry in seen or (allowed is not None and (s >> 40) & 0xF not in allowed):
+                continue
+            seen.add(entry)
+            out.append(entry)
+            if len(out) >= limit:
+                break
+        return [self._result(entry) for entry in out]
+
+    def _result(self, entry):
+        kind, pk, name, parent_id, parent_name = self.entries[entry]
+        return {
+            'id': pk,
+            'name': name,
+            'parent_region_id': parent_id,
+            'parent_region_name': parent_name,
+        }
+
+
+def _rows(using):
+    from team4.models import City, Province, Village
+
+    for pk, name_fa, name_en in Province.objects.using(using).values_list('province_id', 'name_fa', 'name_en'):
+        yield 0, pk, name_fa, name_en, None, None
+    cities = City.objects.using(using).values_list('city_id', 'name_fa', 'name_en', 'province_id', 'province__name_fa')
+    for row in cities.iterator(chunk_size=2000):
+        yield (1, *row)
+    villages = Village.objects.using(using).values_list('village_id', 'name_fa', 'name_en', 'city_id', 'city__name_fa')
+    for row in villages.iterator(chunk_size=2000):
+        yield (2, *row)
+
+
+def build(using='team4', max_bytes=None):
+    """A fresh index of the regions in `using`, or None when it would not fit in `max_bytes`."""
+    max_bytes = _max_bytes() if max_bytes is None else max_bytes
+    t0 = time.perf_counter()
+    try:
+        index = _Index(_rows(using), max_bytes)
+    except _Budget as exc:
+        logger.warning('region index for %s not built (%s); region search uses the database', using, exc)
+        return None
+    logger.info('region index for %s: %d regions, %d keys, ~%.1f MB in %.2fs', using, len(index.entries),
+                len(index.keys), index.nbytes / 1024 / 1024, time.perf_counter() - t0)
+    return index
+
+
+def generation(using='team4'):
+    from team4.models import SearchIndexState
+
+    value = SearchIndexState.objects.using(using).filter(name=_STATE).values_list('generation', flat=True).first()
+    return value or 0
+
+
+def invalidate(using='team4'):
+    """Region names changed in `using`: drop our copy now and make the other processes rebuild theirs."""
+    from team4.models import SearchIndexState
+
+    _slots.pop(using, None)
+    states = SearchIndexState.objects.using(using)
+    if not states.filter(name=_STATE).update(generation=F('generation') + 1):
+        states.get_or_create(name=_STATE, defaults={'generation': 1})
+
+
+def _get(using):
+    max_bytes = _max_bytes()
+    if max_bytes <= 0:
+        return None
+    slot = _slots.get(using)
+    if slot is not None and time.monotonic() - slot[1] < _check_seconds():
+        return slot[2]
+    current = generation(using)
+    if slot is not None and slot[0] == current:
+        slot[1] = time.monotonic()
+        return slot[2]
+    # one thread rebuilds; while it does, the others answer from the old copy if there is one
+    if not _lock.acquire(blocking=slot is None):
+        return slot[2]
+    try:
+        latest = _slots.get(using)
+        if latest is not None and latest is not slot and latest[0] == current:
+            return latest[2]
+        index = build(using, max_bytes)
+        _slots[using] = [current, time.monotonic(), index]
+        return index
+    finally:
+        _lock.release()
+
+
+def complete(query, kinds=None, limit=10, using='team4'):
+    """
+    Best `limit` regions of `kinds` (default: all) with a name or a word of the
+    name starting with `query`. Results are region-search dicts, best first.
+    Returns None when there is no in-memory index (disabled or over budget).
+    """
+    index = _get(using)
+    if index is None:
+        return None
+    return index.complete(query, kinds, limit)
@@ -0,0 +1,261 @@
+"""
+Normalized full-text index of team4 names (provinces, cities, villages, facilities).
+
+Every named row has a SearchName row holding its name_fa and name_en folded by
+normalize(): Arabic ي / ك / ة written as Persian ی / ک / ه, diacritics and
+tatweel dropped, Persian and Arabic digits as ASCII, case folded. ZWNJ counts as
+a word break in `text`, and `compact` is the same text with no spaces at all.
+
+Two indexes run on top of that table. The migration creates them where the
+backend has them:
+
+  word prefix   each query word is the start of a word of the name (autocomplete).
+                SQLite: FTS5 (unicode61, prefix indexes); MySQL: FULLTEXT,
+                `+word*` in boolean mode
+  trigram       the query, spaces ignored, is a substring of the name, so it also
+                finds the middle of a compound (آباد in نجف‌آباد).
+                SQLite: FTS5 trigram tokenizer; MySQL: FULLTEXT WITH PARSER ngram
+
+matching_ids() uses the word-prefix index and falls back to the trigram one
+when that finds nothing. Queries too short for an n-gram index, and backends
+without FTS, fall back to LIKE on the normalized columns, which is still a scan
+of one narrow table rather than of every name column.
+
+Rows are kept in sync by post_save / post_delete (team4.signals). Bulk loads skip
+the signals and wrap themselves in bulk_load(), which reindexes once at the end;
+generators that bulk_create may instead write entries() themselves. Every change
+to a region name also invalidates the in-memory autocomplete (team4.region_index).
+"""
+import re
+import threading
+from contextlib import contextmanager
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+TABLE = 'facilities_search_name'
+FTS_TABLE = 'facilities_search_name_fts'
+TRIGRAM_TABLE = 'facilities_search_name_trigram'
+# shortest substring the n-gram indexes can look up (SQLite trigram; MySQL ngram_token_size)
+MIN_NGRAM = {'sqlite': 3, 'mysql': 2}
+REGION_KINDS = frozenset({'province', 'city', 'village'})
+
+_FOLD = str.maketrans({
+    'ي': 'ی', 'ى': 'ی', 'ئ': 'ی', 'ك': 'ک', 'ة': 'ه', 'ۀ': 'ه',
+    'أ': 'ا', 'إ': 'ا', 'ٱ': 'ا', 'ؤ': 'و',
+    '\u200c': ' ', '\u200d': None, '\u0640': None,  # ZWNJ, ZWJ, tatweel
+    **{chr(c): None for c in range(0x064B, 0x0660)},  # harakat, shadda, sukun...
+    '\u0670': None,  # superscript alef
+    **{chr(0x06F0 + d): str(d) for d in range(10)},  # Persian digits
+    **{chr(0x0660 + d): str(d) for d in range(10)},  # Arabic-Indic digits
+})
+_WORD = re.compile(r'\w+')
+
+_local = threading.local()
+_backends = {}
+
+
+def normalize(text):
+    """Folded words of `text`, separated by single spaces."""
+    return ' '.join(_WORD.findall((text or '').translate(_FOLD).casefold()))
+
+
+def _models():
+    from team4.models import City, Facility, Province, Village
+
+    return {'province': Province, 'city': City, 'village': Village, 'facility': Facility}
+
+
+def kind_of(model):
+    for kind, kind_model in _models().items():
+        if model is kind_model:
+            return kind
+    return None
+
+
+def _entry(kind, object_id, name_fa, name_en):
+    from team4.models import SearchName
+
+    text = normalize(f'{name_fa} {name_en}')
+    return SearchName(kind=kind, object_id=object_id, text=text, compact=text.replace(' ', ''))
+
+
+def entries(kind, objects):
+    """SearchName rows for model instances of `kind`, for bulk_create next to them."""
+    return [_entry(kind, obj.pk, obj.name_fa, obj.name_en) for obj in objects]
+
+
+def _syncing(kind):
+    return kind not in getattr(_local, 'paused', ())
+
+
+def _regions_changed(kinds, using):
+    if REGION_KINDS.intersection(kinds):
+        from team4 import region_index
+
+        region_index.invalidate(using)
+
+
+def index(instance, using='team4'):
+    """Add or refresh the entry of one saved Province / City / Village / Facility."""
+    from team4.models import SearchName
+
+    kind = kind_of(type(instance))
+    if kind is None or not _syncing(kind):
+        return
+    entry = _entry(kind, instance.pk, instance.name_fa, instance.name_en)
+    SearchName.objects.using(using).update_or_create(
+        kind=kind, object_id=instance.pk, defaults={'text': entry.text, 'compact': entry.compact},
+    )
+    _regions_changed([kind], using)
+
+
+def remove(instance, using='team4'):
+    from team4.models import SearchName
+
+    kind = kind_of(type(instance))
+    if kind is None or not _syncing(kind):
+        return
+    SearchName.objects.using(using).filter(kind=kind, object_id=instance.pk).delete()
+    _regions_changed([kind], using)
+
+
+def reindex(kinds=None, using='team4', batch_size=2000):
+    """Rebuild the entries of `kinds` (default: all) from the name columns. Returns the row count."""
+    from team4.models import SearchName
+
+    models = _models()
+    kinds = kinds or list(models)
+    total = 0
+    for kind in kinds:
+        SearchName.objects.using(using).filter(kind=kind).delete()
+        rows = models[kind].objects.using(using).values_list('pk', 'name_fa', 'name_en')
+        batch = []
+        for pk, name_fa, name_en in rows.iterator(chunk_size=batch_size):
+            batch.append(_entry(kind, pk, name_fa, name_en))
+            if len(batch) >= batch_size:
+                SearchName.objects.using(using).bulk_create(batch)
+                total += len(batch)
+                batch = []
+        SearchName.objects.using(using).bulk_create(batch)
+        total += len(batch)
+    _regions_changed(kinds, using)
+    return total
+
+
+@contextmanager
+def paused(*kinds):
+    """
+    Don't sync `kinds` (default: all) row by row while the block runs; the
+    caller reindexes. The pause is per thread: worker threads of a bulk load
+    enter it themselves.
+    """
+    previous = getattr(_local, 'paused', frozenset())
+    _local.paused = previous | set(kinds or _models())
+    try:
+        yield
+    finally:
+        _local.paused = previous
+
+
+@contextmanager
+def bulk_load(*kinds, using='team4'):
+    """
+    Don't sync `kinds` (default: all) row by row while the block runs; reindex
+    them once when it ends.
+    """
+    kinds = kinds or tuple(_models())
+    previous = getattr(_local, 'paused', frozenset())
+    try:
+        with paused(*kinds):
+            yield
+    finally:
+        resumed = [k for k in kinds if k not in previous]
+        if resumed:  # an enclosing bulk_load() reindexes the rest
+            reindex(resumed, using=using)
+
+
+def _backend(using):
+    """'sqlite' / 'mysql' when the FTS tables or indexes exist there, else None."""
+    if using not in _backends:
+        connection = connections[using]
+        backend = None
+        if connection.vendor == 'mysql':
+            backend = 'mysql'
+        elif connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names():
+            backend = 'sqlite'
+        _backends[using] = backend
+    return _backends[using]
+
+
+def _fts_ids(sql, kind, match):
+    # ids straight from the FTS index, joined back for the kind. CROSS JOIN keeps
+    # SQLite from putting the (kind, object_id) index first and probing FTS per row
+    return Q(id__in=RawSQL(sql, [match, kind]))
+
+
+def _prefix_filter(kind, words, backend):
+    if backend == 'sqlite':
+        return _fts_ids(
+            f'SELECT s.id FROM {FTS_TABLE} f CROSS JOIN {TABLE} s ON s.id = f.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s AND s.kind = %s',
+            kind, ' '.join(f'"{w}"*' for w in words),
+        )
+    if backend == 'mysql':
+        return _fts_ids(
+            f'SELECT id FROM {TABLE} WHERE MATCH(text) AGAINST (%s IN BOOLEAN MODE) AND kind = %s',
+            kind, ' '.join(f'+{w}*' for w in words),
+        )
+    q = Q(kind=kind)
+    for w in words:
+        q &= Q(text__startswith=w) | Q(text__contains=f' {w}')
+    return q
+
+
+def _substring_filter(kind, compact, backend):
+    if backend == 'sqlite' and len(compact) >= MIN_NGRAM['sqlite']:
+        return _fts_ids(
+            f'SELECT s.id FROM {TRIGRAM_TABLE} f CROSS JOIN {TABLE} s ON s.id = f.rowid '
+            f'WHERE {TRIGRAM_TABLE} MATCH %s AND s.kind = %s',
+            kind, f'"{compact}"',
+        )
+    if backend == 'mysql' and len(compact) >= MIN_NGRAM['mysql']:
+        return _fts_ids(
+            f'SELECT id FROM {TABLE} WHERE MATCH(compact) AGAINST (%s IN BOOLEAN MODE) AND kind = %s',
+            kind, f'"{compact}"',
+        )
+    return Q(kind=kind, compact__contains=compact)
+
+
+def matching_ids(kind, query, using='team4'):
+    """
+    Ids of the `kind` rows whose name matches `query`, as a subquery for
+    `pk__in=`: names with a word starting with each query word, or when there
+    are none, names containing the query.
+    """
+    from team4.models import SearchName
+
+    words = normalize(query).split()
+    rows = SearchName.objects.using(using)
+    if not words:
+        return rows.none().values('object_id')
+    backend = _backend(using)
+    prefix = rows.filter(_prefix_filter(kind, words, backend)).values('object_id')
+    if prefix.exists():
+        return prefix
+    return rows.filter(_substring_filter(kind, ''.join(words), backend)).values('object_id')
+
+
+def rank(query, name_fa, name_en):
+    """Sort key of a match: exact name, then name prefix, then word prefix, then the rest; shorter first."""
+    q = normalize(query)
+    best = 3
+    for name in (normalize(name_fa), normalize(name_en)):
+        if name == q:
+            best = min(best, 0)
+        elif name.startswith(q):
+            best = min(best, 1)
+        elif f' {q}' in f' {name}':
+            best = min(best, 2)
+    return best, len(name_fa or '')
@@ -102,13 +102,17 @@ class FacilityListSerializer(serializers.ModelSerializer):
             }
         return None
     
+    # min_price / primary_image_url are annotated by FacilityService.with_list_data;
+    # without them every row costs its own queries
     def get_primary_image(self, obj):
+        if hasattr(obj, 'primary_image_url'):
+            return obj.primary_image_url
         image = obj.get_primary_image()
         return image.image_url if image else None
     
     def get_price_from(self, obj):
         """Get minimum price or tier range"""
-        min_price = obj.get_min_price()
+        min_price = obj.min_price if hasattr(obj, 'min_price') else obj.get_min_price()
         if min_price:
             return {
                 'type': 'exact',
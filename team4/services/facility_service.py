@@ -1,21 +1,39 @@
-from django.db.models import Q, F, Count, Min, Avg
+from django.db.models import Q, F, Count, Min, Avg, OuterRef, Prefetch, Subquery
 from django.core.exceptions import ObjectDoesNotExist
 from ..fields import Point
-from team4.models import Facility, City, Category, Amenity, Pricing
+from team4 import search_index
+from team4.models import Facility, City, Category, Amenity, Pricing, Image
+from team4.services.spatial_service import SpatialService
 
 
 class FacilityService:
     
+    @staticmethod
+    def with_list_data(queryset):
+        """
+        هر چیزی که FacilityListSerializer لازم دارد، با تعداد ثابتی کوئری
+
+        The lowest active price (min_price) and the primary image URL
+        (primary_image_url) are subqueries of the main SELECT, city / province /
+        category are joined and amenities come in one prefetch, so a page costs
+        the same queries whatever its size.
+        """
+        prices = Pricing.objects.filter(facility=OuterRef('pk'), status=True).order_by('price')
+        images = Image.objects.filter(facility=OuterRef('pk'), is_primary=True).order_by('image_id')
+        return queryset.select_related('city', 'city__province', 'category').prefetch_related(
+            Prefetch('amenities', queryset=Amenity.objects.only('amenity_id', 'name_fa', 'name_en'))
+        ).annotate(
+            min_price=Subquery(prices.values('price')[:1]),
+            primary_image_url=Subquery(images.values('image_url')[:1]),
+        )
+    
     @staticmethod
     def search_facilities(city_name=None, category_name=None, **filters):
         queryset = Facility.objects.filter(status=True)
         
-        # فیلتر شهر
+        # فیلتر شهر (ایندکس متنی نرمال‌شده)
         if city_name:
-            queryset = queryset.filter(
-                Q(city__name_fa__icontains=city_name) | 
-                Q(city__name_en__icontains=city_name)
-            )
+            queryset = queryset.filter(city__in=search_index.matching_ids('city', city_name))
         
         # فیلتر دسته‌بندی
         if category_name:
@@ -24,11 +42,8 @@ class FacilityService:
                 Q(category__name_en__icontains=category_name)
             )
         
-        # Select Related برای بهینه‌سازی
-        queryset = queryset.select_related('city', 'city__province', 'category')
-        queryset = queryset.prefetch_related('amenities', 'pricing_set', 'images')
-        
-        return queryset
+        # قیمت، تصویر و امکانات بدون کوئری جدا برای هر ردیف
+        return FacilityService.with_list_data(queryset)
     
     @staticmethod
     def filter_facilities(queryset, filters):
@@ -72,7 +87,7 @@ class FacilityService:
     def sort_by_distance(facilities, reference_point):
         # تبدیل به Point اگر tuple است
         if isinstance(reference_point, (tuple, list)):
-            reference_point = Point(reference_point[0], reference_point[1], srid=4326)
+            reference_point = Point(reference_point[0], reference_point[1])
         
         facilities_with_distance = []
         
@@ -134,30 +149,24 @@ class FacilityService:
                 Q(category__name_en__icontains=category_name)
             )
         
-        nearby = nearby.select_related('city', 'category').prefetch_related('amenities')
+        nearby = FacilityService.with_list_data(nearby)
+        
+        # فیلتر شعاع: bounding box در SQL و فاصله دقیق فقط برای ردیف‌های داخل آن
+        center = center_facility.location
+        hits = SpatialService.within_radius(nearby, center.latitude, center.longitude, radius_km)
         
-        # محاسبه فاصله و فیلتر
         nearby_with_distance = []
         
-        for facility in nearby:
-            if not facility.location:
-                continue
-                
-            distance = facility.calculate_distance_to(center_facility.location)
+        for facility, distance in SpatialService.hydrate(nearby, hits):
+            # محاسبه زمان پیاده‌روی (فرض: 5 km/h)
+            walking_time = round((distance / 5) * 60)  # دقیقه
             
-            if distance and distance <= radius_km:
-                # محاسبه زمان پیاده‌روی (فرض: 5 km/h)
-                walking_time = round((distance / 5) * 60)  # دقیقه
-                
-                nearby_with_distance.append({
-                    'facility': facility,
-                    'distance_km': round(distance, 2),
-                    'walking_time_minutes': walking_time,
-                    'driving_time_minutes': None  # باید از Neshan API بگیریم
-                })
-        
-        # مرتب‌سازی بر اساس فاصله
-        nearby_with_distance.sort(key=lambda x: x['distance_km'])
+            nearby_with_distance.append({
+                'facility': facility,
+                'distance_km': round(distance, 2),
+                'walking_time_minutes': walking_time,
+                'driving_time_minutes': None  # باید از Neshan API بگیریم
+            })
         
         return center_facility, nearby_with_distance
     
@@ -169,13 +178,8 @@ class FacilityService:
         if len(fac_ids) > 5:
             return {'error': 'حداکثر 5 مکان قابل مقایسه است'}
         
-        facilities = Facility.objects.filter(
-            fac_id__in=fac_ids,
-            status=True
-        ).select_related(
-            'city', 'category'
-        ).prefetch_related(
-            'amenities', 'pricing_set', 'images'
+        facilities = FacilityService.with_list_data(
+            Facility.objects.filter(fac_id__in=fac_ids, status=True)
         )
         
         if not facilities:
@@ -193,8 +197,7 @@ class FacilityService:
         
         for facility in facilities:
             # دریافت کمترین قیمت
-            min_price_obj = facility.pricing_set.filter(status=True).order_by('price').first()
-            min_price = float(min_price_obj.price) if min_price_obj else 0
+            min_price = float(facility.min_price) if facility.min_price is not None else 0
             
             # آپدیت کمترین قیمت
             if min_price > 0 and min_price < lowest_price:
@@ -208,7 +211,7 @@ class FacilityService:
             
             # دریافت امکانات
             facility_amenities = facility.amenities.all()
-            amenity_count = facility_amenities.count()
+            amenity_count = len(facility_amenities)
             
             if amenity_count > most_amenities_count:
                 most_amenities_count = amenity_count
@@ -229,7 +232,7 @@ class FacilityService:
             comparison_data.append({
                 'fac_id': facility.fac_id,
                 'name_fa': facility.name_fa,
-                'image_url': facility.get_primary_image().image_url if facility.get_primary_image() else None,
+                'image_url': facility.primary_image_url,
                 'avg_rating': float(facility.avg_rating),
                 'price_per_night': min_price,
                 'distance_from_center_km': round(distance_from_center, 2),
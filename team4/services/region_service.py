@@ -1,4 +1,6 @@
-from django.db.models import Q
+from django.conf import settings
+
+from team4 import region_index, search_index
 from team4.models import Province, City, Village
 
 
@@ -6,19 +8,27 @@ class RegionService:
     """سرویس برای مدیریت جستجوی مناطق (استان، شهر، روستا)"""
     
     @staticmethod
-    def search_regions(query, region_type=None):
+    def search_regions(query, region_type=None, limit=None):
         """
         جستجوی مناطق بر اساس نوع
         
         Args:
             query: متن جستجو
             region_type: نوع منطقه - 'province', 'city', 'village' (اختیاری)
+            limit: حداکثر تعداد نتایج (پیش‌فرض TEAM4_REGION_SEARCH_LIMIT)
             
         Returns:
-            list: لیست دیکشنری‌های حاوی اطلاعات منطقه
+            list: لیست دیکشنری‌های حاوی اطلاعات منطقه، بهترین تطابق اول
         """
         if not query:
             return []
+        limit = min(limit or settings.TEAM4_REGION_SEARCH_LIMIT, region_index.MAX_LIMIT)
+        
+        # تکمیل خودکار از ایندکس درون‌حافظه‌ای؛ اگر ایندکس نبود یا پیشوندی پیدا نشد، جستجو در پایگاه داده
+        kinds = [region_type] if region_type else None
+        results = region_index.complete(query, kinds, limit)
+        if results:
+            return results
         
         results = []
         
@@ -34,15 +44,18 @@ class RegionService:
         if not region_type or region_type == 'village':
             results.extend(RegionService._search_villages(query))
         
-        return results
+        return results[:limit]
+    
+    @staticmethod
+    def _ranked(queryset, kind, query):
+        """ردیف‌های منطبق از ایندکس متنی، به ترتیب نزدیکی نام به query"""
+        matches = queryset.filter(pk__in=search_index.matching_ids(kind, query))
+        return sorted(matches, key=lambda obj: search_index.rank(query, obj.name_fa, obj.name_en))
     
     @staticmethod
     def _search_provinces(query):
         """جستجوی استان‌ها"""
-        provinces = Province.objects.filter(
-            Q(name_fa__icontains=query) | 
-            Q(name_en__icontains=query)
-        )
+        provinces = RegionService._ranked(Province.objects.all(), 'province', query)
         
         return [{
             'id': str(province.province_id),
@@ -54,10 +67,7 @@ class RegionService:
     @staticmethod
     def _search_cities(query):
         """جستجوی شهرها"""
-        cities = City.objects.select_related('province').filter(
-            Q(name_fa__icontains=query) | 
-            Q(name_en__icontains=query)
-        )
+        cities = RegionService._ranked(City.objects.select_related('province'), 'city', query)
         
         return [{
             'id': str(city.city_id),
@@ -69,10 +79,7 @@ class RegionService:
     @staticmethod
     def _search_villages(query):
         """جستجوی روستاها"""
-        villages = Village.objects.select_related('city', 'city__province').filter(
-            Q(name_fa__icontains=query) | 
-            Q(name_en__icontains=query)
-        )
+        villages = RegionService._ranked(Village.objects.select_related('city', 'city__province'), 'village', query)
         
         return [{
             'id': str(village.village_id),
@@ -0,0 +1,90 @@
+"""
+جستجوی مکانی امکانات (شعاع و k نزدیک‌ترین)
+
+Facility.location is a POINT, which neither a B-tree nor SQLite can range-scan,
+so every query here runs on the indexed location_lat / location_lng copies
+(idx_facility_lat_lng):
+
+  1. the circle's bounding box is a range filter in SQL
+  2. only (pk, lat, lng) of the rows inside the box are read
+  3. exact haversine distances are computed for those rows (core.geo)
+  4. full Facility rows are loaded only for the hits the caller keeps,
+     e.g. one page of them (hydrate)
+"""
+from django.db.models import Q
+
+from core import geo
+
+# k-nearest: first search radius, and the radius at which the box is the whole earth
+KNN_START_KM = 2.0
+KNN_MAX_KM = 20_000.0
+
+
+def _box_filter(box):
+    min_lat, max_lat, min_lon, max_lon = box
+    q = Q(location_lat__gte=min_lat, location_lat__lte=max_lat)
+    if min_lon < -180:  # box crosses the antimeridian
+        return q & (Q(location_lng__gte=min_lon + 360) | Q(location_lng__lte=max_lon))
+    if max_lon > 180:
+        return q & (Q(location_lng__gte=min_lon) | Q(location_lng__lte=max_lon - 360))
+    return q & Q(location_lng__gte=min_lon, location_lng__lte=max_lon)
+
+
+def _candidates(queryset, lat, lng, radius_km):
+    rows = list(
+        queryset.filter(_box_filter(geo.bounding_box(lat, lng, radius_km)))
+        .order_by()
+        .prefetch_related(None)
+        .values_list('pk', 'location_lat', 'location_lng')
+    )
+    pks = [row[0] for row in rows]
+    return pks, [row[1] for row in rows], [row[2] for row in rows]
+
+
+class SpatialService:
+
+    @staticmethod
+    def within_radius(queryset, lat, lng, radius_km):
+        """
+        امکانات داخل شعاع radius_km از (lat, lng)، نزدیک‌ترین اول
+
+        Returns:
+            list: [(fac_id, distance_km), ...]
+        """
+        pks, lats, lngs = _candidates(queryset, lat, lng, radius_km)
+        if not pks:
+            return []
+        idx, dist = geo.within_radius(lat, lng, lats, lngs, radius_km)
+        return [(pks[i], float(d)) for i, d in zip(idx, dist)]
+
+    @staticmethod
+    def k_nearest(queryset, lat, lng, k, max_km=None):
+        """
+        k نزدیک‌ترین مکان به (lat, lng)، در صورت تعیین max_km فقط داخل آن شعاع
+
+        The search radius starts at KNN_START_KM and grows (by the density seen
+        so far, at least doubling) until k facilities lie within it: anything
+        outside that circle is farther than all of them, so the answer is exact.
+
+        Returns:
+            list: [(fac_id, distance_km), ...]
+        """
+        if k <= 0:
+            return []
+        limit = min(max_km or KNN_MAX_KM, KNN_MAX_KM)
+        radius = min(KNN_START_KM, limit)
+        while True:
+            hits = SpatialService.within_radius(queryset, lat, lng, radius)
+            if len(hits) >= k or radius >= limit:
+                return hits[:k]
+            grow = (k / len(hits)) ** 0.5 * 1.2 if hits else 4
+            radius = min(radius * max(2, grow), limit)
+
+    @staticmethod
+    def hydrate(queryset, hits):
+        """
+        تبدیل [(fac_id, distance_km)] به [(facility, distance_km)] با یک کوئری،
+        به همان ترتیب (مکان‌هایی که در این فاصله حذف شده‌اند کنار گذاشته می‌شوند)
+        """
+        facilities = queryset.in_bulk([pk for pk, _ in hits])
+        return [(facilities[pk], distance) for pk, distance in hits if pk in facilities]
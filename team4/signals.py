@@ -0,0 +1,24 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from team4 import search_index
+from team4.models import City, Facility, Province, Village
+
+
+@receiver(post_save, sender=Province)
+@receiver(post_save, sender=City)
+@receiver(post_save, sender=Village)
+@receiver(post_save, sender=Facility)
+def index_name(sender, instance, using, update_fields=None, **kwargs):
+    # ذخیره‌هایی که نام را تغییر نمی‌دهند (مثلاً امتیاز) نیازی به ایندکس ندارند
+    if update_fields is not None and not {'name_fa', 'name_en'} & set(update_fields):
+        return
+    search_index.index(instance, using=using)
+
+
+@receiver(post_delete, sender=Province)
+@receiver(post_delete, sender=City)
+@receiver(post_delete, sender=Village)
+@receiver(post_delete, sender=Facility)
+def unindex_name(sender, instance, using, **kwargs):
+    search_index.remove(instance, using=using)
@@ -0,0 +1,96 @@
+"""
+Tests for the streaming, batched fixture loaders
+"""
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from team4.fields import Point
+from team4.loaders import iter_json
+from team4.models import Amenity, Category, City, Facility, FacilityAmenity, Province, SearchName
+
+
+def write_fixture(test, items):
+    fd, path = tempfile.mkstemp(suffix='.json')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(items, f, ensure_ascii=False, indent=2)
+    test.addCleanup(os.remove, path)
+    return path
+
+
+class IterJsonTest(SimpleTestCase):
+    """تست خواندن تدریجی آرایه JSON"""
+
+    def test_matches_json_load_at_any_read_size(self):
+        items = [{"name_fa": "هتل [پارس]", "tags": ["a,b", {"x": "]"}], "n": i} for i in range(50)]
+        path = write_fixture(self, items)
+        for read_size in (1, 7, 100, 1 << 16):
+            self.assertEqual(list(iter_json(path, read_size)), items)
+        self.assertEqual(list(iter_json(write_fixture(self, []))), [])
+
+    def test_rejects_malformed_arrays(self):
+        for text in ('{"a": 1}', '[1, 2', '[1 2]', '[{"a": }]'):
+            fd, path = tempfile.mkstemp(suffix='.json')
+            with os.fdopen(fd, 'w') as f:
+                f.write(text)
+            self.addCleanup(os.remove, path)
+            with self.assertRaises(ValueError, msg=text):
+                list(iter_json(path, 3))
+
+
+class FacilityLoaderTest(TestCase):
+    """تست بارگذاری دسته‌ای هتل‌ها"""
+    databases = {"default", "team4"}
+
+    def setUp(self):
+        fars = Province.objects.create(name_fa="فارس", name_en="Fars")
+        self.shiraz = City.objects.create(province=fars, name_fa="شیراز", name_en="Shiraz",
+                                          location=Point(52.58, 29.59))
+        self.category = Category.objects.create(name_fa="هتل", name_en="Hotel")
+        self.wifi = Amenity.objects.create(name_fa="اینترنت", name_en="Wifi")
+        self.parking = Amenity.objects.create(name_fa="پارکینگ", name_en="Parking")
+        self.hotels = [
+            {"name_fa": "هتل پارس", "name_en": "Pars Hotel", "city_id": self.shiraz.pk, "address": "شیراز",
+             "location": {"latitude": 29.6, "longitude": 52.5}, "amenities": [self.wifi.pk, 999]},
+            {"name_fa": "هتل زند", "name_en": "Zand Hotel", "city_id": 999, "city_name_fa": "شیراز",
+             "category_id": self.category.pk, "location": {"latitude": 29.61, "longitude": 52.51}},
+            {"name_fa": "هتل بی‌شهر", "name_en": "Nowhere", "city_id": 999,
+             "location": {"latitude": 30, "longitude": 50}},
+        ]
+
+    def load(self, items, **options):
+        call_command("load_hotels", file=write_fixture(self, items), stdout=StringIO(), **options)
+
+    def test_creates_then_updates_in_place(self):
+        self.load(self.hotels, batch_size=1)
+        pars = Facility.objects.get(name_en="Pars Hotel")
+        self.assertEqual(Facility.objects.count(), 2)
+        self.assertEqual(pars.category, self.category)
+        self.assertEqual((pars.location_lat, pars.location_lng), (29.6, 52.5))
+        self.assertEqual(list(pars.amenities.all()), [self.wifi])
+        self.assertEqual(SearchName.objects.filter(kind="facility").count(), 2)
+
+        self.hotels[0].update(address="خیابان زند", amenities=[self.parking.pk],
+                              location={"latitude": 29.7, "longitude": 52.6})
+        self.load(self.hotels)
+        updated = Facility.objects.get(pk=pars.pk)
+        self.assertEqual(updated.address, "خیابان زند")
+        self.assertEqual((updated.location_lat, updated.location_lng), (29.7, 52.6))
+        self.assertEqual(list(updated.amenities.all()), [self.parking])
+        self.assertEqual(Facility.objects.count(), 2)
+
+    def test_unchanged_rows_are_not_rewritten(self):
+        self.load(self.hotels)
+        stamps = dict(Facility.objects.values_list("fac_id", "updated_at"))
+        self.load(self.hotels)
+        self.assertEqual(dict(Facility.objects.values_list("fac_id", "updated_at")), stamps)
+        self.assertEqual(FacilityAmenity.objects.count(), 1)
+
+    def test_later_duplicate_wins(self):
+        self.load([*self.hotels, {**self.hotels[0], "address": "دوم"}], batch_size=10)
+        self.assertEqual(Facility.objects.get(name_en="Pars Hotel").address, "دوم")
+        self.assertEqual(FacilityAmenity.objects.count(), 1)
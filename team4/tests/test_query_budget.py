@@ -0,0 +1,52 @@
+"""
+Query budgets for team4 list endpoints
+"""
+from django.test import TestCase
+
+from core.query_budget import QueryBudgetMixin
+from team4.fields import Point
+from team4.models import Amenity, Category, City, Facility, FacilityAmenity, Image, Pricing, Province
+
+
+class FacilityListQueryBudgetTest(QueryBudgetMixin, TestCase):
+    """تعداد کوئری لیست امکانات نباید با تعداد ردیف‌ها رشد کند"""
+    databases = {"default", "team4"}
+
+    def setUp(self):
+        province = Province.objects.create(name_fa="فارس", name_en="Fars")
+        self.city = City.objects.create(province=province, name_fa="شیراز", name_en="Shiraz",
+                                        location=Point(52.58, 29.59))
+        self.category = Category.objects.create(name_fa="هتل", name_en="Hotel")
+        self.amenity = Amenity.objects.create(name_fa="وای‌فای", name_en="WiFi")
+
+    def make_facilities(self, n):
+        for i in range(Facility.objects.count(), n):
+            facility = Facility.objects.create(
+                name_fa=f"هتل {i}", name_en=f"Hotel {i}", category=self.category, city=self.city,
+                address="شیراز", location=Point(52.58, 29.59 + i * 1e-4),
+            )
+            FacilityAmenity.objects.create(facility=facility, amenity=self.amenity)
+            Image.objects.create(facility=facility, image_url=f"https://example.com/{i}.jpg", is_primary=True)
+            Pricing.objects.create(facility=facility, price_type="Per Night", price=1_000_000)
+
+    def test_facility_list(self):
+        self.assertQueryBudget(
+            "team4 facilities list", "/team4/api/facilities/", self.make_facilities, budget=6,
+            data={"page_size": 100},
+        )
+
+    def test_facility_nearby(self):
+        self.assertQueryBudget(
+            "team4 facilities nearby", "/team4/api/facilities/nearby/", self.make_facilities, budget=6,
+            data={"lat": 29.59, "lng": 52.58, "radius": 50_000, "page_size": 100},
+        )
+
+    def test_compare(self):
+        self.make_facilities(5)
+        ids = list(Facility.objects.values_list("fac_id", flat=True))
+        with self.assertNumQueries(2, using="team4"):
+            res = self.client.post("/team4/api/facilities/compare/", {"facility_ids": ids},
+                                   content_type="application/json")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["facilities"][0]["image_url"], "https://example.com/0.jpg")
+        self.assertEqual(res.json()["facilities"][0]["price_per_night"], 1_000_000)
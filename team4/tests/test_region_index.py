@@ -0,0 +1,83 @@
+"""
+Tests for the in-memory region autocomplete
+"""
+from django.test import TestCase, override_settings
+
+from team4 import region_index, search_index
+from team4.fields import Point
+from team4.models import City, Province, SearchIndexState, Village
+from team4.services.region_service import RegionService
+
+
+class RegionIndexTest(TestCase):
+    """تست تکمیل خودکار نام مناطق از ایندکس درون‌حافظه‌ای"""
+    databases = {"default", "team4"}
+
+    def setUp(self):
+        self.fars = Province.objects.create(name_fa="فارس", name_en="Fars")
+        self.shiraz = City.objects.create(province=self.fars, name_fa="شیراز", name_en="Shiraz",
+                                          location=Point(52.58, 29.59))
+        self.marvdasht = City.objects.create(province=self.fars, name_fa="مرودشت", name_en="Marvdasht",
+                                             location=Point(52.8, 29.87))
+        self.village = Village.objects.create(city=self.marvdasht, name_fa="شیرازی‌آباد", name_en="Shirazi Abad")
+
+    def names(self, query, kinds=None, limit=10):
+        return [r["name"] for r in region_index.complete(query, kinds, limit)]
+
+    def test_ranked_completions_with_parent(self):
+        City.objects.create(province=self.fars, name_fa="شهر شیراز", name_en="Shahr-e Shiraz",
+                            location=Point(52.5, 29.5))
+        self.assertEqual(self.names("شیراز"), ["شیراز", "شیرازی‌آباد", "شهر شیراز"])
+        self.assertEqual(self.names("shir", ["village"]), ["شیرازی‌آباد"])
+        self.assertEqual(self.names("آباد"), ["شیرازی‌آباد"])  # word after the ZWNJ
+        self.assertEqual(self.names("شیرازیآ"), ["شیرازی‌آباد"])  # typed without it
+        self.assertEqual(self.names("ش", limit=1), ["شیراز"])
+        self.assertEqual(region_index.complete("مرودشت"), [{
+            "id": str(self.marvdasht.pk), "name": "مرودشت",
+            "parent_region_id": str(self.fars.pk), "parent_region_name": "فارس",
+        }])
+
+    def test_refreshed_when_regions_change(self):
+        self.assertEqual(self.names("کازرون"), [])
+        City.objects.create(province=self.fars, name_fa="کازرون", name_en="Kazerun", location=Point(51.65, 29.62))
+        self.assertEqual(self.names("کاز"), ["کازرون"])
+        with search_index.bulk_load("village"):
+            Village.objects.bulk_create([Village(city=self.shiraz, name_fa=f"کازه {i}", name_en=f"Kazeh {i}")
+                                         for i in range(3)])
+        self.assertEqual(self.names("کاز"), ["کازرون", "کازه 0", "کازه 1", "کازه 2"])
+        self.assertGreater(SearchIndexState.objects.get(name="regions").generation, 0)
+
+    def test_other_process_rebuild(self):
+        self.assertEqual(self.names("فار"), ["فارس"])
+        with override_settings(TEAM4_REGION_INDEX_CHECK_SECONDS=0):
+            # another process renamed it: only the generation in the database tells us
+            Province.objects.filter(pk=self.fars.pk).update(name_fa="پارس")
+            SearchIndexState.objects.filter(name="regions").update(generation=10**6)
+            self.assertEqual(self.names("پار"), ["پارس"])
+
+    def test_over_budget_falls_back_to_database(self):
+        with override_settings(TEAM4_REGION_INDEX_MAX_MB=0.0001):
+            region_index.invalidate()
+            self.assertIsNone(region_index.complete("شیراز"))
+            results = RegionService.search_regions("شیراز", "city")
+        self.assertEqual([r["name"] for r in results], ["شیراز"])
+        self.assertEqual(results[0]["parent_region_name"], "فارس")
+
+    def test_long_prefix_lists_match_a_full_scan(self):
+        rows = [(0, 1, "دهستان", "Dehestan", None, None)]
+        rows += [(2, i, f"ده {'ب' * (i % 7)}{i}", f"Deh {i}", 5, "شیراز") for i in range(2000)]
+        rows += [(1, i, f"دهدشت {i}", f"Dehdasht {i}", 1, "فارس") for i in range(700)]
+        index = region_index._Index(rows, 1 << 30)
+        self.assertIn("ده", index.tops)
+
+        def scan(query, kinds):
+            hits = []
+            for row in rows:
+                tiers = [0 if i == 0 else 1 for name in row[2:4] for i, _ in enumerate(name.split())
+                         if " ".join(name.casefold().split()[i:]).startswith(query)]
+                if tiers and region_index.KINDS[row[0]] in kinds:
+                    hits.append((min(tiers), row[0], len(row[2]), row[2]))
+            return [hit[-1] for hit in sorted(hits, key=lambda hit: hit[:3])]
+
+        for query, kinds in [("ده", region_index.KINDS), ("deh", ["village"]), ("ده ب", ["village"])]:
+            self.assertEqual([r["name"] for r in index.complete(query, kinds, 20)], scan(query, kinds)[:20])
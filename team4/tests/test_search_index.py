@@ -0,0 +1,87 @@
+"""
+Tests for the normalized name search index
+"""
+from django.test import TestCase
+
+from team4 import search_index
+from team4.fields import Point
+from team4.models import Category, City, Facility, Province, SearchName, Village
+from team4.services.region_service import RegionService
+
+
+class NormalizeTest(TestCase):
+    """تست نرمال‌سازی متن فارسی"""
+
+    def test_folds_arabic_letters_zwnj_and_diacritics(self):
+        self.assertEqual(search_index.normalize("كتابخانه‌ي  مُحَمَّد"), "کتابخانه ی محمد")
+        self.assertEqual(search_index.normalize("Hotel ۱۲۳"), "hotel 123")
+        self.assertEqual(search_index.normalize(None), "")
+
+
+class SearchIndexTest(TestCase):
+    """تست ایندکس متنی نام مناطق و مکان‌ها"""
+    databases = {"default", "team4"}
+
+    def setUp(self):
+        self.fars = Province.objects.create(name_fa="فارس", name_en="Fars")
+        self.isfahan = Province.objects.create(name_fa="اصفهان", name_en="Isfahan")
+        self.shiraz = City.objects.create(province=self.fars, name_fa="شیراز", name_en="Shiraz",
+                                          location=Point(52.58, 29.59))
+        self.najafabad = City.objects.create(province=self.isfahan, name_fa="نجف‌آباد", name_en="Najafabad",
+                                             location=Point(51.36, 32.63))
+        self.village = Village.objects.create(city=self.shiraz, name_fa="کوشك", name_en="Kushk")
+        self.category = Category.objects.create(name_fa="هتل", name_en="Hotel")
+        self.hotel = Facility.objects.create(name_fa="هتل پارس", name_en="Pars Hotel", category=self.category,
+                                             city=self.shiraz, address="شیراز", location=Point(52.58, 29.6))
+
+    def ids(self, kind, query):
+        return set(search_index.matching_ids(kind, query).values_list("object_id", flat=True))
+
+    def test_fts_backend_on_sqlite(self):
+        self.assertEqual(search_index._backend("team4"), "sqlite")
+
+    def test_synced_on_save_and_delete(self):
+        self.assertEqual(SearchName.objects.count(), 6)
+        self.shiraz.name_fa = "شیراز نو"
+        self.shiraz.save()
+        self.assertEqual(self.ids("city", "نو"), {self.shiraz.pk})
+        self.village.delete()
+        self.assertFalse(SearchName.objects.filter(kind="village").exists())
+
+    def test_word_prefix_and_folding(self):
+        self.assertEqual(self.ids("city", "شی"), {self.shiraz.pk})
+        self.assertEqual(self.ids("city", "SHIR"), {self.shiraz.pk})
+        self.assertEqual(self.ids("village", "كوش"), {self.village.pk})  # Arabic kaf
+        self.assertEqual(self.ids("facility", "پارس هت"), {self.hotel.pk})
+        self.assertEqual(self.ids("city", "آباد"), {self.najafabad.pk})  # after the ZWNJ
+
+    def test_substring_fallback(self):
+        self.assertEqual(self.ids("city", "نجفآباد"), {self.najafabad.pk})  # typed without ZWNJ
+        self.assertEqual(self.ids("city", "afab"), {self.najafabad.pk})
+        self.assertEqual(self.ids("city", "یر"), {self.shiraz.pk})  # shorter than a trigram
+        self.assertEqual(self.ids("city", "تهران"), set())
+
+    def test_bulk_load_reindexes_once(self):
+        with search_index.bulk_load("village"):
+            Village.objects.bulk_create([Village(city=self.shiraz, name_fa=f"ده {i}", name_en=f"Deh {i}")
+                                         for i in range(5)])
+            Village.objects.create(city=self.shiraz, name_fa="قلات", name_en="Ghalat")
+            self.assertEqual(SearchName.objects.filter(kind="village").count(), 1)
+        self.assertEqual(SearchName.objects.filter(kind="village").count(), 7)
+        self.assertEqual(len(self.ids("village", "ده")), 5)
+
+    def test_region_search_ranked(self):
+        City.objects.create(province=self.fars, name_fa="شهر شیراز", name_en="Shahr-e Shiraz",
+                            location=Point(52.5, 29.5))
+        results = RegionService.search_regions("شیراز", "city")
+        self.assertEqual([r["name"] for r in results], ["شیراز", "شهر شیراز"])
+        self.assertEqual(results[0]["parent_region_name"], "فارس")
+
+    def test_facility_search_filters(self):
+        Facility.objects.create(name_fa="هتل کوثر", name_en="Kowsar Hotel", category=self.category,
+                                city=self.najafabad, address="نجف‌آباد", location=Point(51.36, 32.63))
+        res = self.client.post("/team4/api/facilities/search/", {"name": "پارس"}, content_type="application/json")
+        self.assertEqual([f["fac_id"] for f in res.json()["results"]], [self.hotel.pk])
+        res = self.client.post("/team4/api/facilities/search/", {"province": "اصفهان"},
+                               content_type="application/json")
+        self.assertEqual([f["name_en"] for f in res.json()["results"]], ["Kowsar Hotel"])
@@ -0,0 +1,122 @@
+"""
+Tests for SpatialService, the indexed coordinate columns and routing
+"""
+import random
+from unittest import mock
+
+import httpx
+from django.test import SimpleTestCase, TestCase
+
+from core.geo import haversine_km
+from team4.fields import Point
+from team4.models import Category, City, Facility, Province
+from team4.services.spatial_service import SpatialService
+
+TEHRAN = (35.6892, 51.3890)
+
+
+class SpatialServiceTest(TestCase):
+    """تست جستجوی شعاعی و k نزدیک‌ترین"""
+    databases = {"default", "team4"}
+
+    def setUp(self):
+        province = Province.objects.create(name_fa="تهران", name_en="Tehran")
+        self.city = City.objects.create(province=province, name_fa="تهران", name_en="Tehran",
+                                        location=Point(TEHRAN[1], TEHRAN[0]))
+        self.category = Category.objects.create(name_fa="بیمارستان", name_en="Hospital", is_emergency=True)
+        rng = random.Random(4)
+        Facility.objects.bulk_create([
+            Facility(name_fa=f"مکان {i}", name_en=f"Place {i}", category=self.category, city=self.city,
+                     address="تهران", location=Point(TEHRAN[1] + rng.uniform(-0.5, 0.5),
+                                                      TEHRAN[0] + rng.uniform(-0.5, 0.5)))
+            for i in range(300)
+        ])
+        self.facilities = Facility.objects.filter(status=True)
+
+    def brute_force(self, lat, lng):
+        out = [(f.fac_id, haversine_km(lat, lng, f.location.latitude, f.location.longitude))
+               for f in self.facilities]
+        return sorted(out, key=lambda hit: hit[1])
+
+    def test_coordinates_follow_location(self):
+        facility = Facility.objects.create(name_fa="الف", name_en="A", city=self.city, address="-",
+                                           location=Point(51.0, 35.0))
+        self.assertEqual((facility.location_lat, facility.location_lng), (35.0, 51.0))
+
+        facility.location = Point(52.0, 36.0)
+        facility.save(update_fields=['location'])
+        Facility.objects.update_or_create(name_en="A", city=self.city, defaults={'location': Point(53.0, 37.0)})
+        facility.refresh_from_db()
+        self.assertEqual((facility.location_lat, facility.location_lng), (37.0, 53.0))
+
+        self.assertFalse(Facility.objects.filter(location_lat__isnull=True).exists())  # bulk_create too
+
+    def test_within_radius_matches_brute_force(self):
+        expected = [(pk, d) for pk, d in self.brute_force(*TEHRAN) if d <= 15]
+        hits = SpatialService.within_radius(self.facilities, *TEHRAN, 15)
+        self.assertEqual([pk for pk, _ in hits], [pk for pk, _ in expected])
+        for (_, got), (_, want) in zip(hits, expected):
+            self.assertAlmostEqual(got, want, places=6)
+
+    def test_k_nearest(self):
+        expected = self.brute_force(*TEHRAN)
+        self.assertEqual([pk for pk, _ in SpatialService.k_nearest(self.facilities, *TEHRAN, 7)],
+                         [pk for pk, _ in expected[:7]])
+        # far from every facility: the radius has to grow many times
+        self.assertEqual(len(SpatialService.k_nearest(self.facilities, 0.0, 0.0, 3)), 3)
+        capped = SpatialService.k_nearest(self.facilities, *TEHRAN, 1000, max_km=10)
+        self.assertEqual(len(capped), sum(1 for _, d in expected if d <= 10))
+
+    def test_antimeridian(self):
+        Facility.objects.create(name_fa="فیجی", name_en="Fiji", city=self.city, address="-",
+                                location=Point(-179.99, -17.0))
+        hits = SpatialService.within_radius(self.facilities, -17.0, 179.99, 10)
+        self.assertEqual([Facility.objects.get(pk=pk).name_en for pk, _ in hits], ["Fiji"])
+
+    def test_hydrate_keeps_order(self):
+        hits = SpatialService.within_radius(self.facilities, *TEHRAN, 20)[:5]
+        with self.assertNumQueries(1, using="team4"):
+            pairs = SpatialService.hydrate(self.facilities, hits)
+        self.assertEqual([(f.fac_id, d) for f, d in pairs], hits)
+
+    def test_nearby_endpoint(self):
+        res = self.client.get("/team4/api/facilities/nearby/",
+                              {"lat": TEHRAN[0], "lng": TEHRAN[1], "radius": 15000, "page_size": 5})
+        self.assertEqual(res.status_code, 200)
+        expected = [(pk, d) for pk, d in self.brute_force(*TEHRAN) if d <= 15]
+        self.assertEqual(res.json()["count"], len(expected))
+        distances = [item["distance_meters"] for item in res.json()["results"]]
+        self.assertEqual(distances, sorted(distances))
+
+        res = self.client.get("/team4/api/facilities/nearby/", {"lat": TEHRAN[0], "lng": TEHRAN[1], "k": 3})
+        self.assertEqual(res.json()["count"], 3)
+
+    def test_emergency_endpoint(self):
+        res = self.client.get("/team4/api/facilities/emergency/",
+                              {"lat": TEHRAN[0], "lng": TEHRAN[1], "radius": 25, "page": 2})
+        self.assertEqual(res.status_code, 200)
+        expected = [(pk, round(d, 2)) for pk, d in self.brute_force(*TEHRAN) if d <= 25][10:20]
+        self.assertEqual([(item["fac_id"], item["distance_km"]) for item in res.json()["results"]], expected)
+
+
+class RoutingViewTest(SimpleTestCase):
+    """تست پاسخ مسیریابی وقتی سرویس نقشه پاسخ نامعتبر می‌دهد"""
+
+    def route(self, response):
+        get = mock.AsyncMock(return_value=response)
+        with mock.patch("team4.views.async_http_client.get", get):
+            return self.client.post("/team4/api/navigation/route/",
+                                    {"origin": "35.7,51.4", "destination": "35.8,51.5"},
+                                    content_type="application/json")
+
+    def test_upstream_json(self):
+        res = self.route(httpx.Response(200, json={"routes": []}))
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["routes"], [])
+        self.assertIn("internal_air_distance_km", res.json())
+
+    def test_non_json_upstream_body_is_unavailable(self):
+        res = self.route(httpx.Response(502, text="<html><body>Bad Gateway</body></html>",
+                                        headers={"content-type": "text/html"}))
+        self.assertEqual(res.status_code, 503)
+        self.assertIn("detail", res.json())
@@ -1,18 +1,23 @@
 from django.http import JsonResponse
 from django.shortcuts import render, get_object_or_404
-from django.db.models import Q
+from django.db.models import Prefetch, Q
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
-from rest_framework.views import APIView
 from rest_framework.pagination import PageNumberPagination
 from django.core.exceptions import ObjectDoesNotExist
-from .fields import Point
+import json
 import os
-import requests
+
+import httpx
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from dotenv import load_dotenv
 
 from core.auth import api_login_required
+from core.async_http import client as async_http_client
+from team4 import search_index
 from team4.models import Facility, Category, City, Amenity, Province, Village, RegionType, Favorite, Review
 from team4.serializers import (
     FacilityListSerializer, FacilityDetailSerializer,
@@ -24,6 +29,7 @@ from team4.serializers import (
 )
 from team4.services.facility_service import FacilityService
 from team4.services.region_service import RegionService
+from team4.services.spatial_service import SpatialService
 
 TEAM_NAME = "team4"
 load_dotenv()
@@ -104,15 +110,9 @@ class FacilityViewSet(viewsets.ModelViewSet):
                 Q(village__name_en__icontains=region_name)
             )
         elif region_type == 'city':
-            return queryset.filter(
-                Q(city__name_fa__icontains=region_name) |
-                Q(city__name_en__icontains=region_name)
-            )
+            return queryset.filter(city__in=search_index.matching_ids('city', region_name))
         elif region_type == 'province':
-            return queryset.filter(
-                Q(city__province__name_fa__icontains=region_name) |
-                Q(city__province__name_en__icontains=region_name)
-            )
+            return queryset.filter(city__province__in=search_index.matching_ids('province', region_name))
         return queryset
     
     def _apply_sorting(self, queryset, sort_by, region_name=None):
@@ -177,12 +177,9 @@ class FacilityViewSet(viewsets.ModelViewSet):
         # Start with base queryset
         facilities = self.queryset
         
-        # Apply name search filter
+        # Apply name search filter (normalized full-text index)
         if name_query:
-            facilities = facilities.filter(
-                Q(name_fa__icontains=name_query) |
-                Q(name_en__icontains=name_query)
-            )
+            facilities = facilities.filter(fac_id__in=search_index.matching_ids('facility', name_query))
         
         # Apply region filter
         facilities = self._apply_region_filter(facilities, region_type, region_name)
@@ -219,6 +216,9 @@ class FacilityViewSet(viewsets.ModelViewSet):
         if filters:
             facilities = FacilityService.filter_facilities(facilities, filters)
         
+        # Prices, images and amenities for the whole page in a fixed number of queries
+        facilities = FacilityService.with_list_data(facilities)
+        
         # Apply sorting
         sorted_result = self._apply_sorting(facilities, sort_by, region_name)
         
@@ -296,12 +296,9 @@ class FacilityViewSet(viewsets.ModelViewSet):
         # Start with base queryset
         facilities = self.queryset
         
-        # Apply name search filter
+        # Apply name search filter (normalized full-text index)
         if name_query:
-            facilities = facilities.filter(
-                Q(name_fa__icontains=name_query) |
-                Q(name_en__icontains=name_query)
-            )
+            facilities = facilities.filter(fac_id__in=search_index.matching_ids('facility', name_query))
         
         # Apply region filter
         facilities = self._apply_region_filter(facilities, region_type, region_name)
@@ -339,6 +336,9 @@ class FacilityViewSet(viewsets.ModelViewSet):
         if filters:
             facilities = FacilityService.filter_facilities(facilities, filters)
         
+        # Prices, images and amenities for the whole page in a fixed number of queries
+        facilities = FacilityService.with_list_data(facilities)
+        
         # Apply sorting
         sorted_result = self._apply_sorting(facilities, sort_by, region_name)
         
@@ -447,7 +447,8 @@ class FacilityViewSet(viewsets.ModelViewSet):
         Query Parameters:
         - lat: Latitude (required)
         - lng: Longitude (required)
-        - radius: Search radius in meters (required)
+        - radius: Search radius in meters (required unless k is given)
+        - k: Return only the k nearest places, within radius if given (optional)
         - categories: Comma-separated category names (optional)
         - price_tiers: Comma-separated price tiers (optional)
         
@@ -457,24 +458,28 @@ class FacilityViewSet(viewsets.ModelViewSet):
         lat = request.query_params.get('lat')
         lng = request.query_params.get('lng')
         radius = request.query_params.get('radius')
+        k = request.query_params.get('k')
         
-        if not all([lat, lng, radius]):
+        if not all([lat, lng]) or not (radius or k):
             return Response(
-                {'error': 'پارامترهای lat، lng و radius الزامی هستند'},
+                {'error': 'پارامترهای lat و lng به همراه radius یا k الزامی هستند'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         try:
             lat = float(lat)
             lng = float(lng)
-            radius_meters = int(radius)
+            radius_meters = int(radius) if radius else None
+            k = int(k) if k else None
             
             if not (-90 <= lat <= 90):
                 raise ValueError('Latitude باید بین -90 تا 90 باشد')
             if not (-180 <= lng <= 180):
                 raise ValueError('Longitude باید بین -180 تا 180 باشد')
-            if radius_meters <= 0:
+            if radius_meters is not None and radius_meters <= 0:
                 raise ValueError('شعاع باید مثبت باشد')
+            if k is not None and not (1 <= k <= 100):
+                raise ValueError('k باید بین 1 تا 100 باشد')
                 
         except ValueError as e:
             return Response(
@@ -482,9 +487,6 @@ class FacilityViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Create center point
-        center_point = Point(lng, lat)
-        
         # Start with base queryset
         facilities = self.queryset
         
@@ -503,32 +505,24 @@ class FacilityViewSet(viewsets.ModelViewSet):
             tier_list = [t.strip() for t in price_tiers_param.split(',')]
             facilities = facilities.filter(price_tier__in=tier_list)
         
-        # Calculate distances and filter by radius
-        nearby_places = []
-        radius_km = radius_meters / 1000.0
-        
-        for facility in facilities:
-            if facility.location:
-                try:
-                    distance_km = facility.calculate_distance_to(center_point)
-                    if distance_km and distance_km <= radius_km:
-                        nearby_places.append({
-                            'facility': facility,
-                            'distance_meters': distance_km * 1000  # Convert to meters
-                        })
-                except:
-                    continue
-        
-        # Sort by distance
-        nearby_places.sort(key=lambda x: x['distance_meters'])
-        
-        # Paginate
-        page = self.paginate_queryset(nearby_places)
+        # Bounding box in SQL, exact distance on the rows inside it only
+        radius_km = radius_meters / 1000.0 if radius_meters else None
+        if k:
+            hits = SpatialService.k_nearest(facilities, lat, lng, k, max_km=radius_km)
+        else:
+            hits = SpatialService.within_radius(facilities, lat, lng, radius_km)
+        
+        # Paginate the (id, distance) hits, then load just that page's facilities
+        page = self.paginate_queryset(hits)
+        nearby_places = [
+            {'facility': facility, 'distance_meters': distance_km * 1000}  # Convert to meters
+            for facility, distance_km in SpatialService.hydrate(
+                FacilityService.with_list_data(facilities), hits if page is None else page
+            )
+        ]
+        serializer = NearbyPlaceSerializer(nearby_places, many=True)
         if page is not None:
-            serializer = NearbyPlaceSerializer(page, many=True)
             return self.get_paginated_response(serializer.data)
-        
-        serializer = NearbyPlaceSerializer(nearby_places, many=True)
         return Response(serializer.data)
     
     @action(detail=True, methods=['get'])
@@ -594,7 +588,9 @@ class FacilityViewSet(viewsets.ModelViewSet):
         When lat/lng provided, returns facilities sorted by distance.
         """
         # Filter emergency facilities
-        facilities = self.queryset.filter(category__is_emergency=True)
+        facilities = self.queryset.filter(category__is_emergency=True).select_related(
+            'category', 'city', 'city__province'
+        ).prefetch_related('amenities', 'pricing_set', 'images')
         
         # Filter by city
         city_name = request.query_params.get('city')
@@ -615,39 +611,18 @@ class FacilityViewSet(viewsets.ModelViewSet):
                 lng = float(lng)
                 radius = float(radius)
                 
-                from .fields import Point
-                user_location = Point(lng, lat, srid=4326)
-                
-                # Calculate distance and filter
-                facilities_with_distance = []
-                for facility in facilities:
-                    distance = facility.calculate_distance_to(user_location)
-                    if distance and distance <= radius:
-                        facilities_with_distance.append({
-                            'facility': facility,
-                            'distance_km': round(distance, 2)
-                        })
+                # Bounding box in SQL, exact distance on the rows inside it only
+                hits = SpatialService.within_radius(facilities, lat, lng, radius)
                 
-                # Sort by distance
-                facilities_with_distance.sort(key=lambda x: x['distance_km'])
-                
-                # Pagination
-                page = self.paginate_queryset([f['facility'] for f in facilities_with_distance])
+                # Pagination: only the facilities of this page are loaded
+                page = self.paginate_queryset(hits)
+                facilities_with_distance = SpatialService.hydrate(facilities, hits if page is None else page)
+                serializer = self.get_serializer([f for f, _ in facilities_with_distance], many=True)
+                data = serializer.data
+                for item, (_, distance) in zip(data, facilities_with_distance):
+                    item['distance_km'] = round(distance, 2)
                 if page is not None:
-                    # Add distance to serializer data
-                    serializer = self.get_serializer(page, many=True)
-                    data = serializer.data
-                    for i, item in enumerate(data):
-                        item['distance_km'] = facilities_with_distance[i]['distance_km']
                     return self.get_paginated_response(data)
-                
-                serializer = self.get_serializer(
-                    [f['facility'] for f in facilities_with_distance],
-                    many=True
-                )
-                data = serializer.data
-                for i, item in enumerate(data):
-                    item['distance_km'] = facilities_with_distance[i]['distance_km']
                 return Response({
                     'count': len(data),
                     'results': data
@@ -710,11 +685,13 @@ def search_regions(request):
     Query Parameters:
     - query: Search query string (required)
     - region_type: Filter by type - 'province', 'city', or 'village' (optional)
+    - limit: Maximum number of results (optional, default TEAM4_REGION_SEARCH_LIMIT, at most 50)
     
-    Returns matching regions with their type and geographic information.
+    Returns matching regions with their type and geographic information, best match first.
     """
     query = request.query_params.get('query', '').strip()
     region_type = request.query_params.get('region_type', '').strip().lower()
+    limit = request.query_params.get('limit', '').strip()
     
     # Validate query parameter
     if not query:
@@ -731,8 +708,18 @@ def search_regions(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
+    try:
+        limit = int(limit) if limit else None
+        if limit is not None and not (1 <= limit <= 50):
+            raise ValueError('limit باید بین 1 تا 50 باشد')
+    except ValueError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
     # Search via Service
-    results = RegionService.search_regions(query, region_type or None)
+    results = RegionService.search_regions(query, region_type or None, limit)
     
     # Serialize results
     serializer = RegionSearchResultSerializer(results, many=True)
@@ -764,11 +751,9 @@ class FavoriteViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         # Only current user's favorites
-        return Favorite.objects.filter(user=self.request.user).select_related(
-            'facility',
-            'facility__category',
-            'facility__city',
-            'facility__city__province'
+        # facility_detail (FacilityListSerializer) needs the list annotations too
+        return Favorite.objects.filter(user=self.request.user).prefetch_related(
+            Prefetch('facility', queryset=FacilityService.with_list_data(Facility.objects.all()))
         )
     
     def create(self, request):
@@ -995,16 +980,33 @@ class ReviewViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
        
-class RoutingView(APIView):
+def _request_payload(request):
+    """JSON body or form fields, like DRF's request.data; None when the JSON is malformed."""
+    if request.content_type == "application/json":
+        try:
+            return json.loads(request.body or b"{}")
+        except ValueError:
+            return None
+    return request.POST
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class RoutingView(View):
     """
     API View to handle routing requests via an external Map Service.
+
+    A plain async Django view rather than a DRF APIView (DRF has no async
+    handlers): while Neshan answers, the worker serves other requests when the
+    project runs under app404.asgi.
     """
 
-    def post(self, request):
-        # Your logic remains exactly the same
-        serializer = RoutingRequestSerializer(data=request.data)
+    async def post(self, request):
+        data = _request_payload(request)
+        if data is None:
+            return _json_response({"detail": "JSON parse error"}, status.HTTP_400_BAD_REQUEST)
+        serializer = RoutingRequestSerializer(data=data)
         if not serializer.is_valid():
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            return _json_response(serializer.errors, status.HTTP_400_BAD_REQUEST)
 
         origin_point = serializer.validated_data['origin']
         dest_point = serializer.validated_data['destination']
@@ -1025,23 +1027,30 @@ class RoutingView(APIView):
         }
 
         try:
-            response = requests.get(service_url, headers={'Api-Key': api_key}, params=params, timeout=10)
+            response = await async_http_client.get(
+                service_url, headers={'Api-Key': api_key} if api_key else {}, params=params, timeout=10, cache_ttl=60
+            )
             result = response.json()
 
             if response.status_code == 200:
                 result['internal_air_distance_km'] = round(origin_point.distance(dest_point), 3)
-                return Response(result, status=status.HTTP_200_OK)
+                return _json_response(result, status.HTTP_200_OK)
             
-            return Response(
+            return _json_response(
                 {
                     "detail": "خطا در دریافت اطلاعات از سرویس نقشه. لطفا ورودی‌ها را بررسی کنید.",
                     "service_response": result
                 }, 
-                status=response.status_code
+                response.status_code
             )
             
-        except requests.exceptions.RequestException:
-            return Response(
+        except (httpx.HTTPError, ValueError):  # ValueError: a body that isn't JSON, e.g. a proxy's HTML 502
+            return _json_response(
                 {"detail": "خطا در برقراری ارتباط با سرویس نقشه. لطفاً وضعیت اینترنت را بررسی کنید."}, 
-                status=status.HTTP_503_SERVICE_UNAVAILABLE
-            )
\ No newline at end of file
+                status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+
+
+def _json_response(data, status_code):
+    # same output as DRF's JSONRenderer: UTF-8, not \u-escaped
+    return JsonResponse(data, status=status_code, safe=False, json_dumps_params={"ensure_ascii": False})
@@ -2,11 +2,17 @@
 
 from __future__ import annotations
 
-import json
-import math
 from ipaddress import ip_address
-from urllib.error import URLError
-from urllib.request import urlopen
+
+import httpx
+import requests
+
+from core.async_http import client as async_http_client
+from core.geo import k_nearest
+from core.http import client as http_client
+
+# An IP's location rarely changes; repeat visitors skip the lookup entirely.
+GEOLOCATION_CACHE_TTL = 3600
 
 
 def get_client_ip(request, *, ip_override: str | None = None) -> str | None:
@@ -39,20 +45,34 @@ def resolve_client_city(
     - source: how city was resolved
     - geo: raw geolocation payload (if available)
     """
-    if client_ip:
-        geo = _geolocate_ip(client_ip)
-        if geo:
-            if geo.get("city"):
-                city = _match_city_name(cities, str(geo["city"]))
-                if city:
-                    return {"city": city, "source": "ip_city_name", "geo": geo}
-
-            latitude = _to_float(geo.get("latitude"))
-            longitude = _to_float(geo.get("longitude"))
-            if latitude is not None and longitude is not None:
-                city = _nearest_city_by_coordinates(cities, latitude=latitude, longitude=longitude)
-                if city:
-                    return {"city": city, "source": "ip_coordinates", "geo": geo}
+    geo = _geolocate_ip(client_ip) if client_ip else None
+    return _resolve_city(cities, geo, preferred_city_id)
+
+
+async def aresolve_client_city(
+    *,
+    cities: list[dict],
+    client_ip: str | None,
+    preferred_city_id: str | None = None,
+) -> dict | None:
+    """resolve_client_city for async views: the IP lookup does not hold a worker thread."""
+    geo = await _ageolocate_ip(client_ip) if client_ip else None
+    return _resolve_city(cities, geo, preferred_city_id)
+
+
+def _resolve_city(cities: list[dict], geo: dict | None, preferred_city_id: str | None) -> dict | None:
+    if geo:
+        if geo.get("city"):
+            city = _match_city_name(cities, str(geo["city"]))
+            if city:
+                return {"city": city, "source": "ip_city_name", "geo": geo}
+
+        latitude = _to_float(geo.get("latitude"))
+        longitude = _to_float(geo.get("longitude"))
+        if latitude is not None and longitude is not None:
+            city = _nearest_city_by_coordinates(cities, latitude=latitude, longitude=longitude)
+            if city:
+                return {"city": city, "source": "ip_coordinates", "geo": geo}
 
     if preferred_city_id:
         city = _match_city_id(cities, preferred_city_id)
@@ -70,20 +90,42 @@ def _geolocate_ip(client_ip: str) -> dict | None:
     - For private/local addresses, return None to avoid misleading results.
     - Keep timeout short to avoid slowing requests.
     """
+    url = _geolocation_url(client_ip)
+    if url is None:
+        return None
+    try:
+        response = http_client.get(url, timeout=1.5, retries=0, cache_ttl=GEOLOCATION_CACHE_TTL)
+        response.raise_for_status()
+        payload = response.json()
+    except (requests.RequestException, ValueError):
+        return None
+    return _parse_geolocation(payload)
+
+
+async def _ageolocate_ip(client_ip: str) -> dict | None:
+    url = _geolocation_url(client_ip)
+    if url is None:
+        return None
+    try:
+        response = await async_http_client.get(url, timeout=1.5, retries=0, cache_ttl=GEOLOCATION_CACHE_TTL)
+        response.raise_for_status()
+        payload = response.json()
+    except (httpx.HTTPError, ValueError):
+        return None
+    return _parse_geolocation(payload)
+
+
+def _geolocation_url(client_ip: str) -> str | None:
     try:
         parsed_ip = ip_address(client_ip)
         if parsed_ip.is_private or parsed_ip.is_loopback or parsed_ip.is_unspecified:
             return None
     except ValueError:
         return None
+    return f"https://ipapi.co/{client_ip}/json/"
 
-    url = f"https://ipapi.co/{client_ip}/json/"
-    try:
-        with urlopen(url, timeout=1.5) as response:
-            payload = json.loads(response.read().decode("utf-8"))
-    except (URLError, TimeoutError, ValueError, json.JSONDecodeError):
-        return None
 
+def _parse_geolocation(payload) -> dict | None:
     if not isinstance(payload, dict):
         return None
 
@@ -115,9 +157,9 @@ def _match_city_name(cities: list[dict], city_name: str) -> dict | None:
 
 
 def _nearest_city_by_coordinates(cities: list[dict], *, latitude: float, longitude: float) -> dict | None:
-    best_city: dict | None = None
-    best_distance_km: float | None = None
-
+    candidates: list[dict] = []
+    lats: list[float] = []
+    lons: list[float] = []
     for city in cities:
         coords = city.get("coordinates") or []
         if len(coords) != 2:
@@ -126,27 +168,12 @@ def _nearest_city_by_coordinates(cities: list[dict], *, latitude: float, longitu
         city_lon = _to_float(coords[1])
         if city_lat is None or city_lon is None:
             continue
-        distance = _haversine_km(latitude, longitude, city_lat, city_lon)
-        if best_distance_km is None or distance < best_distance_km:
-            best_distance_km = distance
-            best_city = city
-
-    return best_city
-
-
-def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    radius_km = 6371.0
-    phi1 = math.radians(lat1)
-    phi2 = math.radians(lat2)
-    delta_phi = math.radians(lat2 - lat1)
-    delta_lambda = math.radians(lon2 - lon1)
-
-    a = (
-        math.sin(delta_phi / 2.0) ** 2
-        + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2.0) ** 2
-    )
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return radius_km * c
+        candidates.append(city)
+        lats.append(city_lat)
+        lons.append(city_lon)
+
+    idx, _ = k_nearest(latitude, longitude, lats, lons, 1)
+    return candidates[idx[0]] if len(idx) else None
 
 
 def _to_float(value) -> float | None:
@@ -2,11 +2,13 @@ from django.http import JsonResponse
 from django.shortcuts import render
 from django.views.decorators.http import require_GET
 from django.contrib.auth import get_user_model
+from asgiref.sync import sync_to_async
 
+from core.async_views import require_GET as async_require_GET
 from core.auth import api_login_required
 from .services.contracts import DEFAULT_LIMIT
 from .services.db_provider import DatabaseProvider
-from .services.location_service import get_client_ip, resolve_client_city
+from .services.location_service import aresolve_client_city, get_client_ip
 from .services.recommendation_service import RecommendationService
 
 TEAM_NAME = "team5"
@@ -55,15 +57,16 @@ def get_popular_recommendations(request):
     )
 
 
-@require_GET
-def get_nearest_recommendations(request):
+@async_require_GET
+async def get_nearest_recommendations(request):
+    # async: the IP geolocation call does not hold a worker while it waits (app404.asgi)
     limit = _parse_limit(request)
     city_override = request.GET.get("cityId")
     ip_override = request.GET.get("ip")
 
     client_ip = get_client_ip(request, ip_override=ip_override)
-    resolved = resolve_client_city(
-        cities=provider.get_cities(),
+    resolved = await aresolve_client_city(
+        cities=await sync_to_async(provider.get_cities)(),
         client_ip=client_ip,
         preferred_city_id=city_override,
     )
@@ -82,7 +85,7 @@ def get_nearest_recommendations(request):
         )
 
     city = resolved["city"]
-    items = recommendation_service.get_nearest_by_city(city_id=city["cityId"], limit=limit)
+    items = await sync_to_async(recommendation_service.get_nearest_by_city)(city_id=city["cityId"], limit=limit)
     return JsonResponse(
         {
             "kind": "nearest",
@@ -1,9 +1,10 @@
 import os
-import requests
 from typing import List
 import re
 from collections import Counter
 
+from core.http import client as http_client
+
 class FreeAIService:
     """سرویس تولید خلاصه و تگ با Hugging Face"""
     def __init__(self):
@@ -29,7 +30,10 @@ class FreeAIService:
             }
         }
         try:
-            response = requests.post(self.base_url, headers=headers, json=payload, timeout=30)
+            # the summary call has no side effects, so one retry on 429/503 (model loading) is safe
+            response = http_client.post(
+                self.base_url, headers=headers, json=payload, timeout=30, retries=1, deadline=45
+            )
             if response.status_code != 200:
                 print("HF Error:", response.text)
                 return None
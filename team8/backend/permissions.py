@@ -1,10 +1,10 @@
-import requests
 from rest_framework.permissions import BasePermission
-from django.conf import settings
+
+from .utils import verify_user_with_core
 
 
 class IsAuthenticatedViaCookie(BasePermission):
-    """Verify auth via Core service, populate request.user_data"""
+    """Verify auth via Core (in-process or HTTP), populate request.user_data"""
     def has_permission(self, request, view):
         if request.method == "OPTIONS":
             return True
@@ -13,23 +13,16 @@ class IsAuthenticatedViaCookie(BasePermission):
         if not token:
             return False
 
-        try:
-            resp = requests.get(
-                f"{settings.CORE_BASE_URL}/api/auth/verify/",
-                cookies={"access_token": token},
-                timeout=2
-            )
-            if resp.status_code == 200:
-                request.user_data = {
-                    "id": resp.headers.get("X-User-Id"),
-                    "email": resp.headers.get("X-User-Email"),
-                    "first_name": resp.headers.get("X-User-First-Name", ""),
-                    "last_name": resp.headers.get("X-User-Last-Name", ""),
-                }
-                return True
-        except Exception:
-            pass
-        return False
+        info = verify_user_with_core({"access_token": token})
+        if info is None:
+            return False
+        request.user_data = {
+            "id": info["id"],
+            "email": info["email"],
+            "first_name": info["first_name"],
+            "last_name": info["last_name"],
+        }
+        return True
 
 
 class IsOwnerOrReadOnly(BasePermission):
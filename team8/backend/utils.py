@@ -1,7 +1,17 @@
+import http.cookiejar
+
 import requests
 from rest_framework.views import exception_handler
 from django.conf import settings
 
+try:
+    # pooled, retrying client shared with the rest of the monolith
+    from core.http import client as _http
+except ImportError:
+    # standalone deployment: still keep connections alive between calls
+    _http = requests.Session()
+    _http.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+
 
 def custom_exception_handler(exc, context):
     """Clean error responses"""
@@ -14,7 +24,7 @@ def custom_exception_handler(exc, context):
 def call_ai_service(endpoint, data, timeout=10):
     """Call AI service endpoint"""
     try:
-        resp = requests.post(
+        resp = _http.post(
             f"{settings.AI_SERVICE_URL}/{endpoint}",
             json=data,
             timeout=timeout
@@ -22,8 +32,20 @@ def call_ai_service(endpoint, data, timeout=10):
         return resp.json() if resp.status_code == 200 else None
     except Exception:
         return None
+
+
+def log_activity(user, action_type, target_id=None, metadata=None):
+    """
+    Record a user activity
+    
+    Args:
+        user: User instance
+        action_type: Activity type key
+        target_id: Id of the affected object
         metadata: Additional metadata dict
     """
+    from .models import ActivityLog
+    
     try:
         ActivityLog.objects.create(
             user=user,
@@ -35,21 +57,41 @@ def call_ai_service(endpoint, data, timeout=10):
         print(f"Failed to log activity: {e}")
 
 
+def _core_verifier():
+    """core.verifier when Core runs in this process, else None (HTTP fallback)"""
+    try:
+        from django.apps import apps
+        if apps.is_installed("core"):
+            from core import verifier
+            return verifier
+    except ImportError:
+        pass
+    return None
+
+
 def verify_user_with_core(cookies):
     """
     Verify user authentication with Core service
     
+    Decodes the token locally when Core is in the same process; only calls
+    /api/auth/verify/ over HTTP when this backend is deployed on its own.
+    
     Args:
         cookies: Request cookies containing access_token
     
     Returns:
         dict: User info or None if not authenticated
     """
+    verifier = _core_verifier()
+    if verifier is not None:
+        info = verifier.verify_token(cookies.get("access_token"))
+        if info is None:
+            return None
+        return {**info, 'age': str(info['age'] or '')}
+
     try:
-        from .settings import CORE_BASE_URL
-        
-        response = requests.get(
-            f"{CORE_BASE_URL}/api/auth/verify/",
+        response = _http.get(
+            f"{settings.CORE_BASE_URL}/api/auth/verify/",
             cookies=cookies,
             timeout=3
         )